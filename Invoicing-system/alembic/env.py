@@ -18,6 +18,10 @@ from app.models.descargo import Descargo
 from app.models.linea_transaccional import LineaDocumentoTransaccional, LineaDescargo, LineaFactura, Factura
 from app.models.servicio import Servicio
 from app.models.producto import Producto
+from app.models.resumen_paciente import ResumenPaciente
+from app.models.lote_facturacion import LoteFacturacion, ItemLoteFacturacion
+from app.models.trabajo_pdf import TrabajoPDF
+from app.models.correo_saliente import CorreoSaliente
 
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,60 @@
+"""lotes de facturacion masiva
+
+Revision ID: 2f6b8d3e1a75
+Revises: 9a4c6e1f3b82
+Create Date: 2026-10-18 19:04:37.512604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6b8d3e1a75'
+down_revision: Union[str, None] = '9a4c6e1f3b82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('lotes_facturacion',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('cliente_id', sa.Integer(), nullable=True),
+    sa.Column('workers', sa.Integer(), nullable=False),
+    sa.Column('creado_en', sa.DateTime(), nullable=False),
+    sa.Column('iniciado_en', sa.DateTime(), nullable=True),
+    sa.Column('terminado_en', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['cliente_id'], ['clientes.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_lotes_facturacion_id'), 'lotes_facturacion', ['id'], unique=False)
+    op.create_table('lotes_facturacion_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('lote_id', sa.Integer(), nullable=False),
+    sa.Column('paciente_id', sa.Integer(), nullable=False),
+    sa.Column('cliente_id', sa.Integer(), nullable=True),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('factura_id', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('intentos', sa.Integer(), nullable=False),
+    sa.Column('actualizado_en', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['cliente_id'], ['clientes.id'], ),
+    sa.ForeignKeyConstraint(['factura_id'], ['facturas.id'], ),
+    sa.ForeignKeyConstraint(['lote_id'], ['lotes_facturacion.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['paciente_id'], ['pacientes.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('lote_id', 'paciente_id', name='uq_lotes_facturacion_items_paciente')
+    )
+    op.create_index('ix_lotes_facturacion_items_lote_estado', 'lotes_facturacion_items', ['lote_id', 'estado'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_lotes_facturacion_items_lote_estado', table_name='lotes_facturacion_items')
+    op.drop_table('lotes_facturacion_items')
+    op.drop_index(op.f('ix_lotes_facturacion_id'), table_name='lotes_facturacion')
+    op.drop_table('lotes_facturacion')
@@ -0,0 +1,36 @@
+"""versiones_catalogo para invalidar la cache de catalogo
+
+Revision ID: 4b7e2c9d1a30
+Revises: dc553c30f645
+Create Date: 2026-10-18 15:05:12.114205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2c9d1a30'
+down_revision: Union[str, None] = 'dc553c30f645'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    versiones = op.create_table('versiones_catalogo',
+    sa.Column('nombre', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('nombre')
+    )
+    op.bulk_insert(versiones, [
+        {'nombre': 'servicios', 'version': 0},
+        {'nombre': 'productos', 'version': 0},
+    ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('versiones_catalogo')
@@ -0,0 +1,53 @@
+"""marca factura_id en descargos con indice parcial de no facturados
+
+Revision ID: 5e0b7d4a9c13
+Revises: c3a9f1d27b64
+Create Date: 2026-10-18 17:21:37.640912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b7d4a9c13'
+down_revision: Union[str, None] = 'c3a9f1d27b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('descargos', sa.Column('factura_id', sa.Integer(), nullable=True))
+    if op.get_bind().dialect.name != 'sqlite':
+        op.create_foreign_key('descargos_factura_id_fkey', 'descargos', 'facturas', ['factura_id'], ['id'])
+
+    # Backfill: la primera factura que incluye alguna línea de cada descargo
+    op.execute("""
+        UPDATE descargos SET factura_id = (
+            SELECT MIN(lf.factura_id)
+            FROM lineas_transaccionales lt
+            JOIN lineas_factura lf ON lf.linea_transaccional_id = lt.id
+            WHERE lt.descargo_id = descargos.id
+        )
+        WHERE EXISTS (
+            SELECT 1
+            FROM lineas_transaccionales lt
+            JOIN lineas_factura lf ON lf.linea_transaccional_id = lt.id
+            WHERE lt.descargo_id = descargos.id AND lf.factura_id IS NOT NULL
+        )
+    """)
+
+    op.create_index('ix_descargos_no_facturados', 'descargos', ['paciente_id'], unique=False,
+                    postgresql_where=sa.text('factura_id IS NULL'),
+                    sqlite_where=sa.text('factura_id IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_descargos_no_facturados', table_name='descargos')
+    if op.get_bind().dialect.name != 'sqlite':
+        op.drop_constraint('descargos_factura_id_fkey', 'descargos', type_='foreignkey')
+    op.drop_column('descargos', 'factura_id')
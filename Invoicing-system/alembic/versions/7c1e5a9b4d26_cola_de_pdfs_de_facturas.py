@@ -0,0 +1,45 @@
+"""cola de pdfs de facturas
+
+Revision ID: 7c1e5a9b4d26
+Revises: 2f6b8d3e1a75
+Create Date: 2026-10-18 20:12:09.338410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e5a9b4d26'
+down_revision: Union[str, None] = '2f6b8d3e1a75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('trabajos_pdf',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('factura_id', sa.Integer(), nullable=False),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('enviar_correo', sa.Boolean(), nullable=False),
+    sa.Column('intentos', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('creado_en', sa.DateTime(), nullable=False),
+    sa.Column('iniciado_en', sa.DateTime(), nullable=True),
+    sa.Column('terminado_en', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['factura_id'], ['facturas.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('factura_id')
+    )
+    op.create_index('ix_trabajos_pdf_estado', 'trabajos_pdf', ['estado', 'id'], unique=False)
+    # Las facturas ya emitidas no se encolan: se renderizan y cachean en su primera descarga
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_trabajos_pdf_estado', table_name='trabajos_pdf')
+    op.drop_table('trabajos_pdf')
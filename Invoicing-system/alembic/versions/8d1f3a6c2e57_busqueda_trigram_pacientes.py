@@ -0,0 +1,79 @@
+"""busqueda de pacientes: nombre_normalizado e indice trigram
+
+Revision ID: 8d1f3a6c2e57
+Revises: 4b7e2c9d1a30
+Create Date: 2026-10-18 16:02:41.503118
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d1f3a6c2e57'
+down_revision: Union[str, None] = '4b7e2c9d1a30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOTE = 5000
+
+
+def _normalizar(texto):
+    # Copia de app.core.texto.normalizar_texto: la migración no debe depender del código de la app
+    if not texto:
+        return ""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    sin_marcas = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", sin_marcas).strip().lower()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('pacientes', sa.Column('nombre_normalizado', sa.String(length=100), nullable=True))
+
+    # Rellenar por lotes en Python para normalizar igual que la aplicación
+    conexion = op.get_bind()
+    pacientes = sa.table('pacientes', sa.column('id', sa.Integer), sa.column('nombre_completo', sa.String),
+                         sa.column('nombre_normalizado', sa.String))
+    ultimo_id = 0
+    while True:
+        filas = conexion.execute(
+            sa.select(pacientes.c.id, pacientes.c.nombre_completo)
+            .where(pacientes.c.id > ultimo_id)
+            .order_by(pacientes.c.id)
+            .limit(LOTE)
+        ).all()
+        if not filas:
+            break
+        conexion.execute(
+            pacientes.update()
+            .where(pacientes.c.id == sa.bindparam('_id'))
+            .values(nombre_normalizado=sa.bindparam('_normalizado')),
+            [{'_id': fila.id, '_normalizado': _normalizar(fila.nombre_completo)} for fila in filas]
+        )
+        ultimo_id = filas[-1].id
+
+    if conexion.dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        # GIN trigram: LIKE '%x%', operador % y similarity(); el índice por patrón
+        # sirve al autocompletado por prefijo del nombre completo
+        op.execute(
+            'CREATE INDEX ix_pacientes_nombre_normalizado_trgm '
+            'ON pacientes USING gin (nombre_normalizado gin_trgm_ops)'
+        )
+        op.execute(
+            'CREATE INDEX ix_pacientes_nombre_normalizado_prefijo '
+            'ON pacientes (nombre_normalizado varchar_pattern_ops)'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_pacientes_nombre_normalizado_prefijo')
+        op.execute('DROP INDEX IF EXISTS ix_pacientes_nombre_normalizado_trgm')
+    op.drop_column('pacientes', 'nombre_normalizado')
@@ -0,0 +1,62 @@
+"""proyeccion resumen_pacientes para los tableros
+
+Revision ID: 9a4c6e1f3b82
+Revises: 5e0b7d4a9c13
+Create Date: 2026-10-18 17:58:22.907341
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c6e1f3b82'
+down_revision: Union[str, None] = '5e0b7d4a9c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('resumen_pacientes',
+    sa.Column('paciente_id', sa.Integer(), nullable=False),
+    sa.Column('nombre_completo', sa.String(length=100), nullable=False),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('fecha_ingreso', sa.DateTime(), nullable=True),
+    sa.Column('fecha_alta', sa.DateTime(), nullable=True),
+    sa.Column('cantidad_descargos', sa.Integer(), nullable=False),
+    sa.Column('total_descargos', sa.Float(), nullable=False),
+    sa.Column('ultimo_descargo_en', sa.DateTime(), nullable=True),
+    sa.Column('descargos_no_facturados', sa.Integer(), nullable=False),
+    sa.Column('total_no_facturado', sa.Float(), nullable=False),
+    sa.Column('actualizado_en', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['paciente_id'], ['pacientes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('paciente_id')
+    )
+    op.create_index('ix_resumen_pacientes_estado', 'resumen_pacientes', ['estado', 'paciente_id'], unique=False)
+
+    # Carga inicial; después la mantienen los caminos de escritura y
+    # `python -m app.services.resumen_paciente_service --reconstruir`
+    op.execute("""
+        INSERT INTO resumen_pacientes (
+            paciente_id, nombre_completo, estado, fecha_ingreso, fecha_alta,
+            cantidad_descargos, total_descargos, ultimo_descargo_en,
+            descargos_no_facturados, total_no_facturado, actualizado_en
+        )
+        SELECT p.id, p.nombre_completo, COALESCE(p.estado, 'internado'), p.fecha_ingreso, p.fecha_alta,
+               COUNT(d.id), COALESCE(SUM(d.total), 0), MAX(d.fecha),
+               COALESCE(SUM(CASE WHEN d.id IS NOT NULL AND d.factura_id IS NULL THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN d.id IS NOT NULL AND d.factura_id IS NULL THEN d.total ELSE 0 END), 0),
+               CURRENT_TIMESTAMP
+        FROM pacientes p
+        LEFT OUTER JOIN descargos d ON d.paciente_id = p.id
+        GROUP BY p.id, p.nombre_completo, p.estado, p.fecha_ingreso, p.fecha_alta
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resumen_pacientes_estado', table_name='resumen_pacientes')
+    op.drop_table('resumen_pacientes')
@@ -0,0 +1,31 @@
+"""version de facturas y etag de pdfs para GET condicional
+
+Revision ID: b8d2f4a6c391
+Revises: 7c1e5a9b4d26
+Create Date: 2026-10-18 21:03:44.120587
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d2f4a6c391'
+down_revision: Union[str, None] = '7c1e5a9b4d26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('facturas', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    # Sin etag_factura los PDFs ya cacheados se vuelven a renderizar en su próxima descarga
+    op.add_column('trabajos_pdf', sa.Column('etag_factura', sa.String(length=34), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('trabajos_pdf', 'etag_factura')
+    op.drop_column('facturas', 'version')
@@ -0,0 +1,52 @@
+"""indices de claves foraneas, estado de pacientes y listados de facturas
+
+Revision ID: c3a9f1d27b64
+Revises: 8d1f3a6c2e57
+Create Date: 2026-10-18 16:48:09.271534
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9f1d27b64'
+down_revision: Union[str, None] = '8d1f3a6c2e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_pacientes_estado_activos', 'pacientes', ['estado', 'id'], unique=False,
+                    postgresql_where=sa.text("estado <> 'facturado'"))
+    op.create_index('ix_descargos_paciente_id_fecha', 'descargos', ['paciente_id', 'fecha'], unique=False)
+    op.create_index(op.f('ix_lineas_transaccionales_descargo_id'), 'lineas_transaccionales', ['descargo_id'],
+                    unique=False)
+    op.create_index('ix_lineas_transaccionales_servicio_id', 'lineas_transaccionales', ['servicio_id'],
+                    unique=False, postgresql_where=sa.text('servicio_id IS NOT NULL'),
+                    sqlite_where=sa.text('servicio_id IS NOT NULL'))
+    op.create_index('ix_lineas_transaccionales_producto_id', 'lineas_transaccionales', ['producto_id'],
+                    unique=False, postgresql_where=sa.text('producto_id IS NOT NULL'),
+                    sqlite_where=sa.text('producto_id IS NOT NULL'))
+    op.create_index(op.f('ix_lineas_factura_factura_id'), 'lineas_factura', ['factura_id'], unique=False)
+    op.create_index('ix_facturas_fecha_emision_id', 'facturas', ['fecha_emision', 'id'], unique=False)
+    op.create_index('ix_facturas_paciente_id_fecha_emision', 'facturas', ['paciente_id', 'fecha_emision', 'id'],
+                    unique=False)
+    op.create_index('ix_facturas_cliente_id_fecha_emision', 'facturas', ['cliente_id', 'fecha_emision', 'id'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_facturas_cliente_id_fecha_emision', table_name='facturas')
+    op.drop_index('ix_facturas_paciente_id_fecha_emision', table_name='facturas')
+    op.drop_index('ix_facturas_fecha_emision_id', table_name='facturas')
+    op.drop_index(op.f('ix_lineas_factura_factura_id'), table_name='lineas_factura')
+    op.drop_index('ix_lineas_transaccionales_producto_id', table_name='lineas_transaccionales')
+    op.drop_index('ix_lineas_transaccionales_servicio_id', table_name='lineas_transaccionales')
+    op.drop_index(op.f('ix_lineas_transaccionales_descargo_id'), table_name='lineas_transaccionales')
+    op.drop_index('ix_descargos_paciente_id_fecha', table_name='descargos')
+    op.drop_index('ix_pacientes_estado_activos', table_name='pacientes')
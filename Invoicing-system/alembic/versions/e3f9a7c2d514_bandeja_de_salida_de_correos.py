@@ -0,0 +1,60 @@
+"""bandeja de salida de correos
+
+Revision ID: e3f9a7c2d514
+Revises: b8d2f4a6c391
+Create Date: 2026-10-18 21:47:12.503318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3f9a7c2d514'
+down_revision: Union[str, None] = 'b8d2f4a6c391'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('correos_salientes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('factura_id', sa.Integer(), nullable=False),
+    sa.Column('destinatario', sa.String(length=255), nullable=False),
+    sa.Column('asunto', sa.String(length=255), nullable=False),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('intentos', sa.Integer(), nullable=False),
+    sa.Column('proximo_intento', sa.DateTime(), nullable=False),
+    sa.Column('reclamado_por', sa.String(length=32), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('creado_en', sa.DateTime(), nullable=False),
+    sa.Column('iniciado_en', sa.DateTime(), nullable=True),
+    sa.Column('enviado_en', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['factura_id'], ['facturas.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_correos_salientes_estado', 'correos_salientes', ['estado', 'proximo_intento', 'id'], unique=False)
+    op.create_index('ix_correos_salientes_reclamado_por', 'correos_salientes', ['reclamado_por'], unique=False)
+    # Correos que la cola de PDFs tenía pendientes pasan a la bandeja de salida
+    op.execute(
+        """
+        INSERT INTO correos_salientes (factura_id, destinatario, asunto, estado, intentos, proximo_intento, creado_en)
+        SELECT f.id, c.correo, 'Factura #' || f.numero_factura, 'pendiente', 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+        FROM trabajos_pdf t
+        JOIN facturas f ON f.id = t.factura_id
+        JOIN clientes c ON c.id = f.cliente_id
+        WHERE t.enviar_correo AND c.correo IS NOT NULL AND c.correo <> ''
+        """
+    )
+    op.drop_column('trabajos_pdf', 'enviar_correo')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('trabajos_pdf', sa.Column('enviar_correo', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.drop_index('ix_correos_salientes_reclamado_por', table_name='correos_salientes')
+    op.drop_index('ix_correos_salientes_estado', table_name='correos_salientes')
+    op.drop_table('correos_salientes')
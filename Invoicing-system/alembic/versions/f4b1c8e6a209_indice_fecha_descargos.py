@@ -0,0 +1,27 @@
+"""indice por fecha en descargos
+
+Revision ID: f4b1c8e6a209
+Revises: e3f9a7c2d514
+Create Date: 2026-10-18 23:12:05.318744
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b1c8e6a209'
+down_revision: Union[str, None] = 'e3f9a7c2d514'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_descargos_fecha', 'descargos', ['fecha'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_descargos_fecha', table_name='descargos')
@@ -1,7 +1,9 @@
+from typing import Optional, Union
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.schemas.cliente import ClienteCreate, ClienteUpdate, ClienteResponse
 from app.services.cliente_service import ClienteService
+from app.schemas.paginacion import Pagina, ParametrosPagina
 from app.core.database import get_db
 
 router = APIRouter(prefix="/clientes", tags=["clientes"])
@@ -17,9 +19,15 @@ def get_cliente(cliente_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Cliente not found")
     return cliente
 
-@router.get("/", response_model=list[ClienteResponse])
-def list_clientes(db: Session = Depends(get_db)):
-    return ClienteService(db).list_clientes()
+@router.get("/", response_model=Union[Pagina[ClienteResponse], list[ClienteResponse]])
+def list_clientes(
+    nombre: Optional[str] = None,
+    pagina: ParametrosPagina = Depends(),
+    db: Session = Depends(get_db)
+):
+    if pagina.completo:
+        return ClienteService(db).list_clientes()
+    return ClienteService(db).list_clientes_page(pagina.limite, pagina.cursor, nombre=nombre)
 
 @router.put("/{cliente_id}", response_model=ClienteResponse)
 def update_cliente(cliente_id: int, cliente: ClienteUpdate, db: Session = Depends(get_db)):
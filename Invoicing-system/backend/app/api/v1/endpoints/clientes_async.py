@@ -0,0 +1,47 @@
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.async_cliente_repository import AsyncClienteRepository
+from app.schemas.cliente import ClienteCreate, ClienteUpdate, ClienteResponse
+from app.schemas.paginacion import Pagina, ParametrosPagina
+from app.core.database import get_async_db
+
+# Variante async del router de clientes (ver pacientes_async.py)
+router = APIRouter(prefix="/clientes", tags=["clientes"])
+
+@router.post("/", response_model=ClienteResponse)
+async def create_cliente(cliente: ClienteCreate, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncClienteRepository(db).create(cliente)
+
+@router.get("/{cliente_id}", response_model=ClienteResponse)
+async def get_cliente(cliente_id: int, db: AsyncSession = Depends(get_async_db)):
+    cliente = await AsyncClienteRepository(db).get(cliente_id)
+    if not cliente:
+        raise HTTPException(status_code=404, detail="Cliente not found")
+    return cliente
+
+@router.get("/", response_model=Union[Pagina[ClienteResponse], list[ClienteResponse]])
+async def list_clientes(
+    nombre: Optional[str] = None,
+    pagina: ParametrosPagina = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    repo = AsyncClienteRepository(db)
+    if pagina.completo:
+        return await repo.list()
+    items, next_cursor = await repo.list_page(pagina.limite, pagina.cursor, nombre=nombre)
+    return {"items": items, "next_cursor": next_cursor, "limite": pagina.limite}
+
+@router.put("/{cliente_id}", response_model=ClienteResponse)
+async def update_cliente(cliente_id: int, cliente: ClienteUpdate, db: AsyncSession = Depends(get_async_db)):
+    updated_cliente = await AsyncClienteRepository(db).update(cliente_id, cliente)
+    if not updated_cliente:
+        raise HTTPException(status_code=404, detail="Cliente not found")
+    return updated_cliente
+
+@router.delete("/{cliente_id}", response_model=ClienteResponse)
+async def delete_cliente(cliente_id: int, db: AsyncSession = Depends(get_async_db)):
+    deleted_cliente = await AsyncClienteRepository(db).delete(cliente_id)
+    if not deleted_cliente:
+        raise HTTPException(status_code=404, detail="Cliente not found")
+    return deleted_cliente
@@ -1,11 +1,16 @@
 from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from app.schemas.descargo_schema import DescargoCreate, DescargoResponse
+from app.schemas.descargo_schema import DescargoCreate, DescargoResponse, ReporteCargaDescargos
 from app.schemas.paciente_schema import PacienteConDescargosSimpleResponse
 from app.services.descargo_service import DescargoService
 from app.services.paciente_service import PacienteService
+from app.services.carga_masiva_service import (
+    CargaMasivaDescargosService,
+    TAMANO_LOTE,
+    formato_desde_content_type
+)
 from app.core.database import get_db
 
 router = APIRouter(prefix="/descargos", tags=["descargos"])
@@ -15,6 +20,18 @@ def crear_descargo(descargo: DescargoCreate, db: Session = Depends(get_db)):
     service = DescargoService(db)
     return service.crear_descargo(descargo)
 
+@router.post("/bulk", response_model=ReporteCargaDescargos)
+async def carga_masiva_descargos(
+    request: Request,
+    tamano_lote: int = Query(TAMANO_LOTE, ge=1, le=10000),
+    solo_rechazos: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Carga masiva desde un cuerpo NDJSON (application/x-ndjson) o CSV (text/csv) leído en streaming."""
+    formato = formato_desde_content_type(request.headers.get("content-type"))
+    service = CargaMasivaDescargosService(db, tamano_lote, solo_rechazos)
+    return await service.procesar(request.stream(), formato)
+
 @router.get("/paciente/{paciente_id}", response_model=list[DescargoResponse])
 def listar_descargos_paciente(paciente_id: int, db: Session = Depends(get_db)):
     service = DescargoService(db)
@@ -57,9 +74,10 @@ def obtener_descargos_paciente(paciente_id: int, db: Session = Depends(get_db)):
     return response_data
 
 @router.get("/buscar/", response_model=List[DescargoResponse])
-def buscar_descargos(search: str = None, db: Session = Depends(get_db)):
+def buscar_descargos(desde: datetime, hasta: datetime, search: str = None, db: Session = Depends(get_db)):
+    """Descargos de todos los pacientes en el rango de fechas, opcionalmente por descripción de línea."""
     service = DescargoService(db)
-    return service.buscar_descargos(search)
+    return service.buscar_descargos(desde, hasta, search)
 
 @router.get("/internados-con-descargos/")
 def get_interned_patients_with_descargos(db: Session = Depends(get_db)):
@@ -0,0 +1,38 @@
+from typing import List
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.descargo_schema import DescargoCreate, DescargoResponse
+from app.services.descargo_service import AsyncDescargoService
+from app.core.database import get_async_db
+
+# Variante async del router de descargos (ver pacientes_async.py)
+router = APIRouter(prefix="/descargos", tags=["descargos"])
+
+@router.post("/", response_model=DescargoResponse)
+async def crear_descargo(descargo: DescargoCreate, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncDescargoService(db).crear_descargo(descargo)
+
+@router.get("/paciente/{paciente_id}", response_model=List[DescargoResponse])
+async def obtener_descargos_paciente(paciente_id: int, db: AsyncSession = Depends(get_async_db)):
+    descargos = await AsyncDescargoService(db).obtener_descargos_paciente(paciente_id)
+    return [
+        {
+            "id": descargo.id,
+            "paciente_id": descargo.paciente_id,
+            "fecha": descargo.fecha,
+            "total": float(descargo.total) if descargo.total is not None else 0.0,
+            "lineas": [
+                {
+                    "id": linea_trans.linea_descargo.id,
+                    "descripcion": linea_trans.linea_descargo.descripcion,
+                    "subtotal_sin_iva": float(linea_trans.linea_descargo.subtotal_sin_iva),
+                    "cantidad": linea_trans.cantidad,
+                    "servicio_id": linea_trans.servicio_id,
+                    "producto_id": linea_trans.producto_id
+                }
+                for linea_trans in descargo.lineas_transaccionales
+                if linea_trans.linea_descargo
+            ]
+        }
+        for descargo in descargos
+    ]
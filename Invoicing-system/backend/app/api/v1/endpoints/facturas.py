@@ -1,44 +1,111 @@
-import os
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from datetime import date, datetime, time
+from typing import List, Optional, Union
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session, sessionmaker
 from app.services.factura_service import FacturaService
+from app.core.cache_http import CACHE_PRIVADO, cabeceras_cache, condicional, etag_coincide, no_modificado
 from app.core.database import get_db
-from app.schemas.factura import FacturaResponse
-from app.services.pdf_service import PDFService, EmailService
+from app.schemas.factura import FacturaResponse, FacturaResumen, LoteFacturacionCrear, LoteFacturacionProgreso
+from app.schemas.paginacion import Pagina, ParametrosPagina
+from app.services.lote_facturacion_service import LoteFacturacionService, ejecutar_lote
+from app.services.cola_pdf_service import FacturaPDFService
+from app.services.exportacion_facturas_service import exportar_zip
 
 router = APIRouter(prefix="/facturas", tags=["facturas"])
 
 @router.post("/generar/{paciente_id}/{cliente_id}", response_model=dict)
 def generar_factura(paciente_id: int, cliente_id: int, db: Session = Depends(get_db)):
+    """Emite la factura; el PDF y el correo (con ENABLE_EMAIL) se generan en segundo plano."""
     service = FacturaService(db)
     try:
-        factura_data = service.generar_factura(paciente_id, cliente_id)
-        
-        # Generar PDF
-        pdf_service = PDFService()
-        pdf_bytes = pdf_service.generar_factura_pdf(factura_data)
-        
-        # Enviar por correo
-        if os.getenv('ENABLE_EMAIL', 'false').lower() == 'true':
-            email_service = EmailService()
-            email_service.enviar_factura(
-                factura_data['cliente']['correo'],
-                factura_data,
-                pdf_bytes
-            )
-        
-        return factura_data
+        return service.generar_factura(paciente_id, cliente_id)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/resumen", response_model=Pagina[FacturaResumen])
+def listar_resumen_facturas(
+    estado_pago: Optional[str] = None,
+    cliente_id: Optional[int] = None,
+    paciente_id: Optional[int] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    pagina: ParametrosPagina = Depends(),
+    db: Session = Depends(get_db)
+):
+    """Listado liviano para la página de facturas; el detalle completo sigue en /facturas/{id}."""
+    return FacturaService(db).listar_resumen(
+        pagina.limite, pagina.cursor,
+        estado_pago=estado_pago, cliente_id=cliente_id, paciente_id=paciente_id,
+        desde=desde, hasta=hasta
+    )
+
+@router.post("/lotes", response_model=LoteFacturacionProgreso, status_code=202)
+def crear_lote_facturacion(
+    datos: LoteFacturacionCrear, background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+):
+    """Factura en segundo plano a todos los pacientes de alta con descargos sin facturar."""
+    if datos.cliente_id is None and not datos.asignaciones:
+        raise HTTPException(status_code=400, detail="Indique cliente_id y/o asignaciones")
+    progreso = LoteFacturacionService(db).crear_lote(datos.cliente_id, datos.asignaciones, datos.workers)
+    background_tasks.add_task(ejecutar_lote, progreso["id"])
+    return progreso
+
+@router.get("/lotes/{lote_id}", response_model=LoteFacturacionProgreso)
+def obtener_lote_facturacion(lote_id: int, db: Session = Depends(get_db)):
+    return LoteFacturacionService(db).obtener_progreso(lote_id)
+
+@router.post("/lotes/{lote_id}/reanudar", response_model=LoteFacturacionProgreso, status_code=202)
+def reanudar_lote_facturacion(lote_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """
+    Reprocesa los pacientes pendientes o fallidos de un lote que no está en curso, o que
+    quedó en curso sin actividad porque su proceso murió.
+    """
+    progreso = LoteFacturacionService(db).reanudar(lote_id)
+    background_tasks.add_task(ejecutar_lote, lote_id)
+    return progreso
+
+@router.get("/export.zip")
+def exportar_facturas_zip(
+    desde: date,
+    hasta: date,
+    cliente_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    PDFs de las facturas emitidas entre `desde` y `hasta` (inclusive) en un ZIP que se
+    transmite mientras se arma. La generación usa sesiones propias: la de la petición
+    se cierra antes de que empiece el cuerpo de la respuesta.
+    """
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="desde debe ser anterior o igual a hasta")
+    filtros = {
+        "desde": datetime.combine(desde, time.min),
+        "hasta": datetime.combine(hasta, time.max),
+        "cliente_id": cliente_id,
+    }
+    if not FacturaService(db).hay_facturas(**filtros):
+        raise HTTPException(status_code=404, detail="No hay facturas en el rango indicado")
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+    return StreamingResponse(
+        exportar_zip(session_factory, **filtros),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="facturas_{desde}_{hasta}.zip"',
+            "Cache-Control": CACHE_PRIVADO,
+        }
+    )
+
 @router.get("/{factura_id}", response_model=dict)
-def obtener_factura(factura_id: int, db: Session = Depends(get_db)):
+def obtener_factura(factura_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Con If-None-Match vigente responde 304 sin cargar las líneas de la factura."""
     service = FacturaService(db)
     try:
+        respuesta = condicional(request, response, service.etag_factura(factura_id), CACHE_PRIVADO)
+        if respuesta:
+            return respuesta
         return service.obtener_factura(factura_id)
     except HTTPException as e:
         raise e
@@ -46,30 +113,44 @@ def obtener_factura(factura_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{factura_id}/pdf")
-def descargar_factura_pdf(factura_id: int, db: Session = Depends(get_db)):
-    service = FacturaService(db)
+def descargar_factura_pdf(factura_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Sirve el PDF cacheado desde disco (FileResponse, sin armarlo en memoria); solo se
+    renderiza si todavía no está en la caché. El ETag es el sha256 del archivo.
+    """
     try:
-        factura_data = service.obtener_factura(factura_id)
-        pdf_service = PDFService()
-        pdf_bytes = pdf_service.generar_factura_pdf(factura_data)
-        
-        return StreamingResponse(
-            pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=factura_{factura_data['factura']['numero_factura']}.pdf"
-            }
+        ruta, numero_factura, sha256 = FacturaPDFService(db).obtener_pdf(factura_id)
+        valor = f'"{sha256}"'
+        if etag_coincide(request, valor):
+            return no_modificado(valor, CACHE_PRIVADO)
+        return FileResponse(
+            ruta, media_type="application/pdf", filename=f"factura_{numero_factura}.pdf",
+            headers=cabeceras_cache(valor, CACHE_PRIVADO)
         )
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/", response_model=List[dict])
-def listar_facturas(db: Session = Depends(get_db)):
+@router.get("/", response_model=Union[dict, List[dict]])
+def listar_facturas(
+    estado_pago: Optional[str] = None,
+    cliente_id: Optional[int] = None,
+    paciente_id: Optional[int] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    pagina: ParametrosPagina = Depends(),
+    db: Session = Depends(get_db)
+):
     service = FacturaService(db)
     try:
-        return service.listar_facturas()
+        if pagina.completo:
+            return service.listar_facturas()
+        return service.listar_facturas_pagina(
+            pagina.limite, pagina.cursor,
+            estado_pago=estado_pago, cliente_id=cliente_id, paciente_id=paciente_id,
+            desde=desde, hasta=hasta
+        )
     except HTTPException as e:
         raise e
     except Exception as e:
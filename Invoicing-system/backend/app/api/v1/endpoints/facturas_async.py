@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache_http import CACHE_PRIVADO, condicional
+from app.core.database import get_async_db
+from app.services.factura_service import AsyncFacturaService
+
+# Variante async del router de facturas (ver pacientes_async.py). La emisión usa el
+# mismo motor que facturas.py a través de AsyncSession.run_sync
+router = APIRouter(prefix="/facturas", tags=["facturas"])
+
+@router.post("/generar/{paciente_id}/{cliente_id}", response_model=dict)
+async def generar_factura(paciente_id: int, cliente_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Emite la factura; el PDF y el correo (con ENABLE_EMAIL) se generan en segundo plano."""
+    return await AsyncFacturaService(db).generar_factura(paciente_id, cliente_id)
+
+@router.get("/{factura_id}", response_model=dict)
+async def obtener_factura(
+    factura_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    """Con If-None-Match vigente responde 304 sin cargar las líneas de la factura."""
+    service = AsyncFacturaService(db)
+    respuesta = condicional(request, response, await service.etag_factura(factura_id), CACHE_PRIVADO)
+    if respuesta:
+        return respuesta
+    return await service.obtener_factura(factura_id)
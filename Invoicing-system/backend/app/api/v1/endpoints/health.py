@@ -0,0 +1,26 @@
+import time
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core import database
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+@router.get("/db")
+def health_db():
+    """Comprueba la conexión con un SELECT 1 y devuelve las estadísticas vivas de los pools."""
+    inicio = time.perf_counter()
+    try:
+        database.verificar_conexion()
+        estado, error = "ok", None
+    except Exception as e:
+        estado, error = "error", str(e)
+    latencia_ms = round((time.perf_counter() - inicio) * 1000, 3)
+
+    pools = [database.monitor_pool.estadisticas()]
+    if database.async_engine_iniciado():
+        pools.append(database.monitor_pool_async.estadisticas())
+
+    return JSONResponse(
+        status_code=200 if estado == "ok" else 503,
+        content={"estado": estado, "error": error, "latencia_ms": latencia_ms, "pools": pools}
+    )
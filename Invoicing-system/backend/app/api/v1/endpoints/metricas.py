@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core import database
+from app.core.metricas import registro
+
+router = APIRouter(tags=["metricas"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metricas():
+    """Métricas por ruta y de los pools de conexiones en formato de texto de Prometheus."""
+    monitores = [database.monitor_pool]
+    if database.async_engine_iniciado():
+        monitores.append(database.monitor_pool_async)
+    return PlainTextResponse(registro.exportar(monitores), media_type="text/plain; version=0.0.4; charset=utf-8")
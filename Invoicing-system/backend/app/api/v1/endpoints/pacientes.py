@@ -1,18 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.services.paciente_service import PacienteService
-from app.schemas.paciente_schema import PacienteCreate, PacienteResponse, PacienteConDescargosSimpleResponse
+from app.schemas.paciente_schema import (
+    PacienteCreate, PacienteResponse, PacienteConDescargosSimpleResponse, ResumenPacienteResponse
+)
+from app.services.resumen_paciente_service import ResumenPacienteService
+from app.schemas.paginacion import Pagina, ParametrosPagina
+from app.repositories.busqueda_pacientes import LIMITE_BUSQUEDA, LIMITE_BUSQUEDA_MAXIMO
 from app.core.database import get_db
 
 router = APIRouter(prefix="/pacientes", tags=["pacientes"])
 
-@router.get("/listar_pacientes/", response_model=list[PacienteResponse])
-def get_patients(db: Session = Depends(get_db)):
-    return PacienteService(db).obtener_todos_pacientes()
+@router.get("/listar_pacientes/", response_model=Union[Pagina[PacienteResponse], list[PacienteResponse]])
+def get_patients(
+    estado: Optional[str] = None,
+    ingreso_desde: Optional[datetime] = None,
+    ingreso_hasta: Optional[datetime] = None,
+    pagina: ParametrosPagina = Depends(),
+    db: Session = Depends(get_db)
+):
+    if pagina.completo:
+        return PacienteService(db).obtener_todos_pacientes()
+    return PacienteService(db).listar_pacientes(
+        pagina.limite, pagina.cursor,
+        estado=estado, ingreso_desde=ingreso_desde, ingreso_hasta=ingreso_hasta
+    )
 
 @router.get("/buscar_paciente/", response_model=list[PacienteResponse])
-def search_patients(search: str = None, db: Session = Depends(get_db)):
-    return PacienteService(db).buscar_pacientes(search)
+def search_patients(
+    search: str = None,
+    limit: int = Query(LIMITE_BUSQUEDA, ge=1, le=LIMITE_BUSQUEDA_MAXIMO),
+    modo: Literal["contiene", "prefijo"] = "contiene",
+    estado: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    return PacienteService(db).buscar_pacientes(search, limit, modo, estado)
+
+@router.get("/resumen/", response_model=list[ResumenPacienteResponse])
+def patient_summaries(
+    estado: Optional[str] = None,
+    con_descargos: bool = False,
+    no_facturados: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Tableros: contadores y totales por paciente desde la proyección, sin armar el árbol de descargos."""
+    return ResumenPacienteService(db).listar(estado, con_descargos, no_facturados)
 
 @router.post("/crear_paciente/", response_model=PacienteResponse)
 def create_patient(paciente: PacienteCreate, db: Session = Depends(get_db)):
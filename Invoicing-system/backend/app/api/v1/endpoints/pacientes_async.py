@@ -0,0 +1,84 @@
+from datetime import datetime
+from typing import Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.async_paciente_repository import AsyncPacienteRepository
+from app.schemas.paciente_schema import PacienteCreate, PacienteResponse, ResumenPacienteResponse
+from app.repositories.resumen_paciente_repository import ResumenPacienteRepository
+from app.schemas.paginacion import Pagina, ParametrosPagina
+from app.repositories.busqueda_pacientes import LIMITE_BUSQUEDA, LIMITE_BUSQUEDA_MAXIMO
+from app.core.database import get_async_db
+
+# Variante async del router de pacientes: se monta antes que el router síncrono cuando
+# "pacientes" figura en ASYNC_ROUTERS; las rutas no migradas siguen en pacientes.py.
+router = APIRouter(prefix="/pacientes", tags=["pacientes"])
+
+@router.get("/listar_pacientes/", response_model=Union[Pagina[PacienteResponse], list[PacienteResponse]])
+async def get_patients(
+    estado: Optional[str] = None,
+    ingreso_desde: Optional[datetime] = None,
+    ingreso_hasta: Optional[datetime] = None,
+    pagina: ParametrosPagina = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    repo = AsyncPacienteRepository(db)
+    if pagina.completo:
+        return await repo.obtener_todos_pacientes()
+    items, next_cursor = await repo.listar_pacientes(
+        pagina.limite, pagina.cursor,
+        estado=estado, ingreso_desde=ingreso_desde, ingreso_hasta=ingreso_hasta
+    )
+    return {"items": items, "next_cursor": next_cursor, "limite": pagina.limite}
+
+@router.get("/buscar_paciente/", response_model=list[PacienteResponse])
+async def search_patients(
+    search: str = None,
+    limit: int = Query(LIMITE_BUSQUEDA, ge=1, le=LIMITE_BUSQUEDA_MAXIMO),
+    modo: Literal["contiene", "prefijo"] = "contiene",
+    estado: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await AsyncPacienteRepository(db).buscar_pacientes(search, limit, modo, estado)
+
+@router.get("/resumen/", response_model=list[ResumenPacienteResponse])
+async def patient_summaries(
+    estado: Optional[str] = None,
+    con_descargos: bool = False,
+    no_facturados: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda session: ResumenPacienteRepository(session).listar(estado, con_descargos, no_facturados)
+    )
+
+@router.post("/crear_paciente/", response_model=PacienteResponse)
+async def create_patient(paciente: PacienteCreate, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncPacienteRepository(db).crear_paciente(paciente.model_dump())
+
+@router.get("/{paciente_id}", response_model=PacienteResponse)
+async def get_patient(paciente_id: int, db: AsyncSession = Depends(get_async_db)):
+    paciente = await AsyncPacienteRepository(db).obtener_por_id(paciente_id)
+    if not paciente:
+        raise HTTPException(status_code=404, detail="Paciente no encontrado")
+    return paciente
+
+@router.put("/{paciente_id}", response_model=PacienteResponse)
+async def update_patient(paciente_id: int, paciente: PacienteCreate, db: AsyncSession = Depends(get_async_db)):
+    updated_paciente = await AsyncPacienteRepository(db).actualizar_paciente(paciente_id, paciente.model_dump())
+    if not updated_paciente:
+        raise HTTPException(status_code=404, detail="Paciente no encontrado")
+    return updated_paciente
+
+@router.delete("/{paciente_id}")
+async def delete_patient(paciente_id: int, db: AsyncSession = Depends(get_async_db)):
+    paciente = await AsyncPacienteRepository(db).eliminar_paciente(paciente_id)
+    if not paciente:
+        raise HTTPException(status_code=404, detail="Paciente no encontrado")
+    return {"detail": "Paciente eliminado"}
+
+@router.patch("/daralta_paciente/{paciente_id}/alta", response_model=PacienteResponse)
+async def discharge_patient(paciente_id: int, db: AsyncSession = Depends(get_async_db)):
+    paciente = await AsyncPacienteRepository(db).set_alta(paciente_id)
+    if not paciente:
+        raise HTTPException(status_code=404, detail="Paciente no encontrado")
+    return paciente
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app.schemas.servicio_producto_schema import (
     ProductoCreate, 
@@ -6,6 +7,8 @@ from app.schemas.servicio_producto_schema import (
     TipoProductoEnum
 )
 from app.services.producto_service import ProductoService
+from app.schemas.paginacion import Pagina, ParametrosPagina
+from app.core.cache_http import CACHE_CATALOGO, condicional, recurso
 from app.core.database import get_db
 
 router = APIRouter(prefix="/productos", tags=["productos"])
@@ -14,16 +17,37 @@ router = APIRouter(prefix="/productos", tags=["productos"])
 def crear_producto(producto: ProductoCreate, db: Session = Depends(get_db)):
     return ProductoService(db).crear_producto(producto)
 
-@router.get("/", response_model=list[ProductoResponse])
-def listar_productos(db: Session = Depends(get_db)):
-    return ProductoService(db).listar_productos()
+@router.get("/", response_model=Union[Pagina[ProductoResponse], list[ProductoResponse]])
+def listar_productos(
+    request: Request,
+    response: Response,
+    tipo: Optional[TipoProductoEnum] = None,
+    pagina: ParametrosPagina = Depends(),
+    db: Session = Depends(get_db)
+):
+    no_modificado = condicional(request, response, ProductoService(db).etag_catalogo(recurso(request)), CACHE_CATALOGO)
+    if no_modificado:
+        return no_modificado
+    if pagina.completo:
+        return ProductoService(db).listar_productos(tipo=tipo)
+    return ProductoService(db).listar_productos_pagina(pagina.limite, pagina.cursor, tipo=tipo)
+
+@router.get("/cache/estadisticas")
+def estadisticas_cache_productos(db: Session = Depends(get_db)):
+    return ProductoService(db).estadisticas_cache()
 
 @router.get("/{producto_id}", response_model=ProductoResponse)
-def obtener_producto(producto_id: int, db: Session = Depends(get_db)):
+def obtener_producto(producto_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    no_modificado = condicional(request, response, ProductoService(db).etag_catalogo(recurso(request)), CACHE_CATALOGO)
+    if no_modificado:
+        return no_modificado
     return ProductoService(db).obtener_producto(producto_id)
 
 @router.get("/tipo/{tipo}", response_model=list[ProductoResponse])
-def listar_por_tipo(tipo: TipoProductoEnum, db: Session = Depends(get_db)):
+def listar_por_tipo(tipo: TipoProductoEnum, request: Request, response: Response, db: Session = Depends(get_db)):
+    no_modificado = condicional(request, response, ProductoService(db).etag_catalogo(recurso(request)), CACHE_CATALOGO)
+    if no_modificado:
+        return no_modificado
     return ProductoService(db).listar_productos(tipo=tipo)
 
 @router.put("/{producto_id}", response_model=ProductoResponse)
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app.schemas.servicio_producto_schema import (
     ServicioCreate, 
@@ -6,6 +7,8 @@ from app.schemas.servicio_producto_schema import (
     TipoServicioEnum
 )
 from app.services.servicio_service import ServicioService
+from app.schemas.paginacion import Pagina, ParametrosPagina
+from app.core.cache_http import CACHE_CATALOGO, condicional, recurso
 from app.core.database import get_db
 
 router = APIRouter(prefix="/servicios", tags=["servicios"])
@@ -14,16 +17,37 @@ router = APIRouter(prefix="/servicios", tags=["servicios"])
 def crear_servicio(servicio: ServicioCreate, db: Session = Depends(get_db)):
     return ServicioService(db).crear_servicio(servicio)
 
-@router.get("/", response_model=list[ServicioResponse])
-def listar_servicios(db: Session = Depends(get_db)):
-    return ServicioService(db).listar_servicios()
+@router.get("/", response_model=Union[Pagina[ServicioResponse], list[ServicioResponse]])
+def listar_servicios(
+    request: Request,
+    response: Response,
+    tipo: Optional[TipoServicioEnum] = None,
+    pagina: ParametrosPagina = Depends(),
+    db: Session = Depends(get_db)
+):
+    no_modificado = condicional(request, response, ServicioService(db).etag_catalogo(recurso(request)), CACHE_CATALOGO)
+    if no_modificado:
+        return no_modificado
+    if pagina.completo:
+        return ServicioService(db).listar_servicios(tipo=tipo)
+    return ServicioService(db).listar_servicios_pagina(pagina.limite, pagina.cursor, tipo=tipo)
+
+@router.get("/cache/estadisticas")
+def estadisticas_cache_servicios(db: Session = Depends(get_db)):
+    return ServicioService(db).estadisticas_cache()
 
 @router.get("/{servicio_id}", response_model=ServicioResponse)
-def obtener_servicio(servicio_id: int, db: Session = Depends(get_db)):
+def obtener_servicio(servicio_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    no_modificado = condicional(request, response, ServicioService(db).etag_catalogo(recurso(request)), CACHE_CATALOGO)
+    if no_modificado:
+        return no_modificado
     return ServicioService(db).obtener_servicio(servicio_id)
 
 @router.get("/tipo/{tipo}", response_model=list[ServicioResponse])
-def listar_por_tipo(tipo: TipoServicioEnum, db: Session = Depends(get_db)):
+def listar_por_tipo(tipo: TipoServicioEnum, request: Request, response: Response, db: Session = Depends(get_db)):
+    no_modificado = condicional(request, response, ServicioService(db).etag_catalogo(recurso(request)), CACHE_CATALOGO)
+    if no_modificado:
+        return no_modificado
     return ServicioService(db).listar_servicios(tipo=tipo)
 
 @router.put("/{servicio_id}", response_model=ServicioResponse)
@@ -0,0 +1,39 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+
+class AlmacenPDF:
+    """
+    Almacén de PDFs direccionado por contenido: cada archivo se guarda como
+    <sha256[:2]>/<sha256>.pdf. Escribir es idempotente (el mismo contenido cae en la
+    misma ruta) y atómico (archivo temporal + rename), así que varios workers o
+    procesos pueden guardar a la vez sin dejar archivos a medias.
+    """
+
+    def __init__(self, directorio):
+        self.directorio = Path(directorio)
+
+    def ruta(self, sha256: str) -> Path:
+        return self.directorio / sha256[:2] / f"{sha256}.pdf"
+
+    def existe(self, sha256: str) -> bool:
+        return bool(sha256) and self.ruta(sha256).is_file()
+
+    def guardar(self, contenido: bytes) -> str:
+        sha256 = hashlib.sha256(contenido).hexdigest()
+        destino = self.ruta(sha256)
+        if destino.is_file():
+            return sha256
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(dir=destino.parent, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as archivo:
+                archivo.write(contenido)
+            os.replace(temporal, destino)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.unlink(temporal)
+            raise
+        return sha256
@@ -0,0 +1,48 @@
+import hashlib
+from fastapi import Request, Response
+
+# Facturas: datos de pacientes, solo en la caché del navegador y revalidando siempre
+# (estado_pago puede cambiar); con el ETag la revalidación es un 304 sin cuerpo
+CACHE_PRIVADO = "private, no-cache"
+# Catálogo: compartible y estable; un cambio se ve como mucho un minuto después
+CACHE_CATALOGO = "public, max-age=60, must-revalidate"
+
+
+def etag(*partes) -> str:
+    """ETag fuerte a partir de los valores que determinan la representación."""
+    firma = "\x1f".join("" if parte is None else str(parte) for parte in partes)
+    return f'"{hashlib.sha256(firma.encode()).hexdigest()[:32]}"'
+
+
+def etag_coincide(request: Request, valor: str) -> bool:
+    """If-None-Match con comparación débil (RFC 9110): ignora el prefijo W/."""
+    cabecera = request.headers.get("if-none-match")
+    if not cabecera:
+        return False
+    if cabecera.strip() == "*":
+        return True
+    return any(candidato.strip().removeprefix("W/") == valor for candidato in cabecera.split(","))
+
+
+def cabeceras_cache(valor: str, cache_control: str) -> dict:
+    return {"ETag": valor, "Cache-Control": cache_control}
+
+
+def no_modificado(valor: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers=cabeceras_cache(valor, cache_control))
+
+
+def condicional(request: Request, response: Response, valor: str, cache_control: str):
+    """
+    GET condicional: devuelve un 304 si If-None-Match coincide con `valor`; si no,
+    agrega ETag y Cache-Control a `response` y devuelve None para seguir con el cuerpo.
+    """
+    if etag_coincide(request, valor):
+        return no_modificado(valor, cache_control)
+    response.headers.update(cabeceras_cache(valor, cache_control))
+    return None
+
+
+def recurso(request: Request) -> str:
+    """Ruta y parámetros de la petición: distintos listados del mismo catálogo tienen distinto ETag."""
+    return f"{request.url.path}?{request.url.query}"
@@ -8,6 +8,24 @@ load_dotenv()
 
 class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # URL para el motor asíncrono; si se omite se deriva de DATABASE_URL (asyncpg / aiosqlite)
+    ASYNC_DATABASE_URL: str = Field(default="", env="ASYNC_DATABASE_URL")
+    # Routers servidos con handlers async, separados por comas (p. ej. "pacientes,descargos")
+    ASYNC_ROUTERS: str = Field(default="", env="ASYNC_ROUTERS")
+
+    #Configuracion del pool de conexiones (por worker de uvicorn)
+    DB_POOL_SIZE: int = Field(default=5, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(default=10, env="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT: float = Field(default=30.0, env="DB_POOL_TIMEOUT")
+    DB_POOL_RECYCLE: int = Field(default=1800, env="DB_POOL_RECYCLE")
+    DB_POOL_PRE_PING: bool = Field(default=True, env="DB_POOL_PRE_PING")
+    # Detrás de PgBouncer (transaction pooling): sin pool local ni prepared statements
+    DB_PGBOUNCER: bool = Field(default=False, env="DB_PGBOUNCER")
+
+    # Cabecera Server-Timing (tiempo de app y de SQL) en cada respuesta, para depurar
+    METRICAS_SERVER_TIMING: bool = Field(default=False, env="METRICAS_SERVER_TIMING")
+    # Solo desarrollo: informa por stderr las consultas repetidas (N+1) de cada petición
+    DETECTAR_N_MAS_1: bool = Field(default=False, env="DETECTAR_N_MAS_1")
 
     #Configuracion de email
     EMAIL_FROM: EmailStr = Field(default="no-reply@example.com", env="EMAIL_FROM")
@@ -16,8 +34,28 @@ class Settings(BaseSettings):
     SMTP_USER: str = Field(default="", env="SMTP_USER")
     SMTP_PASSWORD: str = Field(default="", env="SMTP_PASSWORD")
     ENABLE_EMAIL: bool = Field(default=False, env="ENABLE_EMAIL")
+    SMTP_STARTTLS: bool = Field(default=True, env="SMTP_STARTTLS")
+    # Conexiones SMTP persistentes del enviador de la bandeja de salida (por worker de uvicorn)
+    SMTP_CONEXIONES: int = Field(default=2, env="SMTP_CONEXIONES")
+
+    #Facturación por lotes: workers por corrida (cada uno usa una conexión del pool)
+    FACTURACION_LOTE_WORKERS: int = Field(default=4, env="FACTURACION_LOTE_WORKERS")
+    # Un lote en curso sin actividad (inicio ni resultados) por estos minutos murió con su proceso y se puede reanudar
+    FACTURACION_LOTE_TIMEOUT_MINUTOS: int = Field(default=15, env="FACTURACION_LOTE_TIMEOUT_MINUTOS")
+
+    #PDFs de facturas: renderizado en segundo plano (0 workers: solo bajo demanda) y caché en disco
+    PDF_WORKERS: int = Field(default=2, env="PDF_WORKERS")
+    PDF_CACHE_DIR: str = Field(default="var/pdfs", env="PDF_CACHE_DIR")
+    # Procesos que renderizan fuera del worker de la API (por worker de uvicorn; 0: en el hilo que lo pide)
+    PDF_PROCESOS: int = Field(default=2, env="PDF_PROCESOS")
+    # Exportación en ZIP: hilos que leen o renderizan PDFs en paralelo por descarga
+    EXPORTACION_WORKERS: int = Field(default=4, env="EXPORTACION_WORKERS")
     
 
+    @property
+    def routers_async(self) -> list[str]:
+        return [nombre.strip() for nombre in self.ASYNC_ROUTERS.split(",") if nombre.strip()]
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,202 @@
+"""
+Presupuesto de consultas y detección de N+1.
+
+RegistroConsultas agrupa las sentencias ejecutadas por su forma normalizada (sin
+literales ni parámetros, con las listas de IN y VALUES colapsadas): la misma forma
+repetida muchas veces en una operación es el síntoma típico de un N+1 (una carga
+perezosa o una consulta por elemento dentro de un bucle), y la misma sentencia con
+los mismos parámetros repetida es trabajo desperdiciado.
+
+PresupuestoConsultas (context manager o decorador) falla con PresupuestoExcedido
+cuando el bloque supera el máximo de sentencias declarado o repite una forma más de
+lo permitido; los tests de endpoints lo usan a través del fixture
+`presupuesto_consultas`. MiddlewareNMas1 (DETECTAR_N_MAS_1, solo para desarrollo)
+registra las sentencias de cada petición e informa los sospechosos de N+1 con la
+pila de la aplicación desde la que se ejecutaron.
+"""
+import re
+import sys
+import threading
+import traceback
+from collections import Counter
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+from pathlib import Path
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Veces que una misma forma puede repetirse en una petición antes de sospechar un N+1
+UMBRAL_N_MAS_1 = 3
+
+_ESPACIOS = re.compile(r"\s+")
+_LITERALES = re.compile(r"'(?:[^']|'')*'|(?<![\w.])-?\d+(?:\.\d+)?\b")
+# Marcadores de parámetros de cada driver: ?, %s, %(nombre)s, $1, :nombre
+_PARAMETROS = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?")
+_LISTA = re.compile(r"\(\?(?:, \?)+\)")
+_FILAS = re.compile(r"(\((?:\?|\?, \.\.\.)(?:, \?)*\))(?:, \1)+")
+
+_APP = Path(__file__).resolve().parents[1]
+
+
+def normalizar(sentencia: str) -> str:
+    """Forma de la sentencia: iguales para la misma consulta con otros valores o tamaños de lista."""
+    sentencia = _ESPACIOS.sub(" ", sentencia.strip())
+    sentencia = _LITERALES.sub("?", _PARAMETROS.sub("?", sentencia))
+    sentencia = _LISTA.sub("(?, ...)", sentencia)
+    return _FILAS.sub(r"\1, ...", sentencia)
+
+
+def pila_aplicacion() -> list:
+    """Frames de la pila actual que pertenecen a app/ (sin SQLAlchemy, Starlette ni app/core)."""
+    return [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(str(_APP)) and not frame.filename.startswith(str(_APP / "core"))
+    ]
+
+
+class RegistroConsultas:
+    def __init__(self, capturar_pila: bool = False):
+        self.capturar_pila = capturar_pila
+        self.sentencias = []
+        self.formas = Counter()
+        self.identicas = Counter()
+        # Pila de la primera repetición de cada forma: es la línea del bucle que la repite
+        self.pilas = {}
+        self._lock = threading.Lock()
+
+    def agregar(self, sentencia: str, parametros=None):
+        forma = normalizar(sentencia)
+        with self._lock:
+            self.sentencias.append(sentencia)
+            self.formas[forma] += 1
+            self.identicas[(sentencia, repr(parametros))] += 1
+            if self.capturar_pila and self.formas[forma] == 2:
+                self.pilas[forma] = pila_aplicacion()
+
+    @property
+    def total(self) -> int:
+        return len(self.sentencias)
+
+    def repetidas(self, umbral: int = UMBRAL_N_MAS_1) -> list:
+        """Formas ejecutadas al menos `umbral` veces, de la más repetida a la menos."""
+        return [(forma, veces) for forma, veces in self.formas.most_common() if veces >= umbral]
+
+    def duplicadas(self) -> list:
+        """Sentencias ejecutadas más de una vez con exactamente los mismos parámetros."""
+        return [(sentencia, veces) for (sentencia, _), veces in self.identicas.most_common() if veces > 1]
+
+    def resumen(self, limite: int = 10) -> str:
+        lineas = [f"{self.total} sentencias, {len(self.formas)} formas distintas:"]
+        lineas += [f"  {veces:>4} x {forma}" for forma, veces in self.formas.most_common(limite)]
+        if len(self.formas) > limite:
+            lineas.append(f"  ... y {len(self.formas) - limite} formas más")
+        return "\n".join(lineas)
+
+
+class PresupuestoExcedido(AssertionError):
+    pass
+
+
+class PresupuestoConsultas(ContextDecorator):
+    """
+    Cuenta las sentencias del bloque y falla al salir si:
+      - son más de `maximo`,
+      - alguna forma se repite más de `maximo_por_forma` veces (N+1),
+      - alguna sentencia se repite idéntica, salvo con `permitir_duplicadas`.
+
+    Sin `engine` escucha todos los engines del proceso (también acepta una Connection).
+    `ignorar(sentencia)` excluye sentencias de la cuenta (p. ej. los SAVEPOINT de un
+    fixture). Usable como `with PresupuestoConsultas(3) as registro:` o como
+    decorador `@PresupuestoConsultas(3)`.
+    """
+
+    def __init__(self, maximo: int = None, maximo_por_forma: int = None,
+                 permitir_duplicadas: bool = False, engine=None, ignorar=None):
+        self.maximo = maximo
+        self.maximo_por_forma = maximo_por_forma
+        self.permitir_duplicadas = permitir_duplicadas
+        self.objetivo = engine if engine is not None else Engine
+        self.ignorar = ignorar
+        self._activos = []
+
+    def __enter__(self) -> RegistroConsultas:
+        registro = RegistroConsultas()
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            if self.ignorar is None or not self.ignorar(statement):
+                registro.agregar(statement, parameters)
+
+        event.listen(self.objetivo, "before_cursor_execute", registrar)
+        self._activos.append((registro, registrar))
+        return registro
+
+    def __exit__(self, tipo, valor, traza):
+        registro, registrar = self._activos.pop()
+        event.remove(self.objetivo, "before_cursor_execute", registrar)
+        if tipo is None:
+            self.verificar(registro)
+        return False
+
+    def verificar(self, registro: RegistroConsultas):
+        problemas = []
+        if self.maximo is not None and registro.total > self.maximo:
+            problemas.append(f"{registro.total} sentencias, el presupuesto es {self.maximo}")
+        if self.maximo_por_forma is not None:
+            problemas += [
+                f"{veces} repeticiones (máximo {self.maximo_por_forma}) de: {forma}"
+                for forma, veces in registro.repetidas(self.maximo_por_forma + 1)
+            ]
+        if not self.permitir_duplicadas:
+            problemas += [f"{veces} veces idéntica: {sentencia}" for sentencia, veces in registro.duplicadas()]
+        if problemas:
+            raise PresupuestoExcedido("\n".join(problemas) + "\n" + registro.resumen())
+
+
+_registro_peticion: ContextVar = ContextVar("consultas_peticion", default=None)
+
+
+def _registrar_en_peticion(conn, cursor, statement, parameters, context, executemany):
+    registro = _registro_peticion.get()
+    if registro is not None:
+        registro.agregar(statement, parameters)
+
+
+class MiddlewareNMas1:
+    """
+    Solo para desarrollo (DETECTAR_N_MAS_1): captura pilas y cuesta bastante más que
+    MiddlewareMetricas. Al terminar cada petición informa por stderr las formas
+    repetidas `umbral` o más veces y las sentencias duplicadas.
+    """
+
+    def __init__(self, app, umbral: int = UMBRAL_N_MAS_1, salida=None):
+        self.app = app
+        self.umbral = umbral
+        self.salida = salida
+        if not event.contains(Engine, "before_cursor_execute", _registrar_en_peticion):
+            event.listen(Engine, "before_cursor_execute", _registrar_en_peticion)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        registro = RegistroConsultas(capturar_pila=True)
+        token = _registro_peticion.set(registro)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _registro_peticion.reset(token)
+            self.informar(f"{scope['method']} {scope['path']}", registro)
+
+    def informar(self, peticion: str, registro: RegistroConsultas):
+        repetidas = registro.repetidas(self.umbral)
+        duplicadas = registro.duplicadas()
+        if not repetidas and not duplicadas:
+            return
+        salida = self.salida or sys.stderr
+        print(f"Posible N+1 en {peticion} ({registro.total} sentencias):", file=salida)
+        for forma, veces in repetidas:
+            print(f"  {veces} x {forma}", file=salida)
+            for linea in traceback.format_list(registro.pilas.get(forma, [])):
+                print("    " + linea.rstrip().replace("\n", "\n    "), file=salida)
+        for sentencia, veces in duplicadas:
+            print(f"  {veces} veces idéntica: {_ESPACIOS.sub(' ', sentencia.strip())}", file=salida)
@@ -1,6 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.orm import sessionmaker
 import sys
 import os
 from pathlib import Path
@@ -10,30 +9,98 @@ backend_path = str(Path(__file__).parent.parent)
 if backend_path not in sys.path:
     sys.path.insert(0, backend_path)
 
+from app.core import metricas
 from app.core.config import settings
+from app.core.pool import MonitorPool, opciones_engine
 
 
+# El motor y la fábrica de sesiones se crean en el primer uso: importar los modelos
+# (Alembic, tests, workers de uvicorn) no abre conexiones. La conectividad se
+# comprueba en el lifespan de la aplicación con verificar_conexion().
+monitor_pool = MonitorPool("sync")
+_engine = None
+_SessionLocal = None
 
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = metricas.instrumentar(monitor_pool.instrumentar(
+            create_engine(settings.DATABASE_URL, **opciones_engine(settings.DATABASE_URL, monitor_pool))
+        ))
+    return _engine
 
-# Crear el motor de conexión
-engine = create_engine(settings.DATABASE_URL)
+def get_sessionmaker():
+    global _SessionLocal
+    if _SessionLocal is None:
+        _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+    return _SessionLocal
 
-# Verificar la conexión
-try:
-    # Intenta conectarse al motor
-    with engine.connect() as connection:
-        print("Conexión exitosa con la base de datos.")
-except Exception as e:
-    print(f"Error al conectar a la base de datos: {e}")
+def verificar_conexion():
+    """Abre una conexión y ejecuta SELECT 1; lanza la excepción del driver si falla."""
+    with get_engine().connect() as connection:
+        connection.execute(text("SELECT 1"))
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def __getattr__(nombre):
+    # Compatibilidad con `from app.core.database import engine, SessionLocal`
+    if nombre == "engine":
+        return get_engine()
+    if nombre == "SessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 Base = declarative_base()
 
 # Dependencia para obtener la sesión de la base de datos
 def get_db():
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
+
+
+# Motor asíncrono: se crea en el primer uso para que el driver (asyncpg/aiosqlite)
+# solo sea necesario cuando algún router async está activo
+DRIVERS_ASYNC = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+monitor_pool_async = MonitorPool("async")
+_async_engine = None
+_AsyncSessionLocal = None
+
+def url_async(url: str) -> str:
+    """Traduce una URL síncrona al driver asíncrono equivalente."""
+    esquema, separador, resto = url.partition("://")
+    return f"{DRIVERS_ASYNC.get(esquema, esquema)}{separador}{resto}"
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        url = settings.ASYNC_DATABASE_URL or url_async(settings.DATABASE_URL)
+        _async_engine = create_async_engine(url, **opciones_engine(url, monitor_pool_async, asincrono=True))
+        metricas.instrumentar(monitor_pool_async.instrumentar(_async_engine.sync_engine))
+    return _async_engine
+
+def async_engine_iniciado() -> bool:
+    return _async_engine is not None
+
+def get_async_sessionmaker():
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=get_async_engine(),
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False
+        )
+    return _AsyncSessionLocal
+
+# Dependencia para obtener la sesión asíncrona
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -0,0 +1,218 @@
+"""
+Métricas por petición: latencia, sentencias SQL, tiempo en SQL, filas y tamaño de la
+respuesta, agrupadas por plantilla de ruta (/pacientes/{paciente_id}, no por id).
+
+MiddlewareMetricas (ASGI puro, sin BaseHTTPMiddleware) abre una medición por petición
+en una ContextVar; los eventos before/after_cursor_execute del engine suman en ella
+las sentencias que corren en ese contexto, también desde el threadpool de los
+endpoints síncronos (anyio copia el contexto al hilo). Las sentencias de hilos en
+segundo plano (colas de PDFs, correos, lotes) no tienen medición y no se cuentan.
+
+GET /metrics expone el registro en formato de texto de Prometheus. Los contadores son
+por worker de uvicorn: Prometheus los suma al consultar cada worker o, detrás de un
+único puerto, se ven los del worker que atendió el scrape.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event
+
+CUBETAS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Cantidad de sentencias por petición: las colas largas delatan consultas N+1
+CUBETAS_SENTENCIAS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIN_RUTA = "sin_ruta"
+
+
+class Medicion:
+    __slots__ = ("sentencias", "segundos_sql", "filas")
+
+    def __init__(self):
+        self.sentencias = 0
+        self.segundos_sql = 0.0
+        self.filas = 0
+
+
+_medicion: ContextVar = ContextVar("medicion_peticion", default=None)
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if _medicion.get() is not None:
+        conn.info.setdefault("inicio_sentencias", []).append(time.perf_counter())
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    medicion = _medicion.get()
+    if medicion is None:
+        return
+    inicios = conn.info.get("inicio_sentencias")
+    if inicios:
+        medicion.segundos_sql += time.perf_counter() - inicios.pop()
+    medicion.sentencias += 1
+    # Filas afectadas, o devueltas si el driver las informa al ejecutar (psycopg2 sí;
+    # sqlite3 solo en escrituras)
+    if cursor.rowcount > 0:
+        medicion.filas += cursor.rowcount
+
+
+def instrumentar(engine):
+    """Cuenta en la petición en curso las sentencias de `engine` (o `AsyncEngine.sync_engine`)."""
+    event.listen(engine, "before_cursor_execute", _antes_de_ejecutar)
+    event.listen(engine, "after_cursor_execute", _despues_de_ejecutar)
+    return engine
+
+
+class _Serie:
+    __slots__ = ("peticiones", "latencia", "latencia_total", "sentencias", "sentencias_total",
+                 "segundos_sql", "filas", "bytes", "estados")
+
+    def __init__(self):
+        self.peticiones = 0
+        self.latencia = [0] * (len(CUBETAS_LATENCIA) + 1)
+        self.latencia_total = 0.0
+        self.sentencias = [0] * (len(CUBETAS_SENTENCIAS) + 1)
+        self.sentencias_total = 0
+        self.segundos_sql = 0.0
+        self.filas = 0
+        self.bytes = 0
+        self.estados = {}
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def registrar(self, metodo: str, ruta: str, estado: int, segundos: float, medicion: Medicion, bytes_: int):
+        with self._lock:
+            serie = self._series.get((metodo, ruta))
+            if serie is None:
+                serie = self._series[(metodo, ruta)] = _Serie()
+            serie.peticiones += 1
+            serie.latencia[bisect_left(CUBETAS_LATENCIA, segundos)] += 1
+            serie.latencia_total += segundos
+            serie.sentencias[bisect_left(CUBETAS_SENTENCIAS, medicion.sentencias)] += 1
+            serie.sentencias_total += medicion.sentencias
+            serie.segundos_sql += medicion.segundos_sql
+            serie.filas += medicion.filas
+            serie.bytes += bytes_
+            serie.estados[estado] = serie.estados.get(estado, 0) + 1
+
+    def reiniciar(self):
+        with self._lock:
+            self._series = {}
+
+    def exportar(self, monitores=()) -> str:
+        """Texto de exposición de Prometheus (version 0.0.4)."""
+        lineas = []
+        with self._lock:
+            self._exportar_series(lineas, sorted(self._series.items()))
+        _pools(lineas, [monitor.estadisticas() for monitor in monitores])
+        return "\n".join(lineas) + "\n"
+
+    @staticmethod
+    def _exportar_series(lineas, series):
+        _histograma(lineas, "http_request_duration_seconds", "Latencia de las peticiones por ruta",
+                    series, CUBETAS_LATENCIA, "latencia", "latencia_total")
+        _histograma(lineas, "http_request_sql_statements", "Sentencias SQL por petición",
+                    series, CUBETAS_SENTENCIAS, "sentencias", "sentencias_total")
+        _contador(lineas, "http_request_sql_seconds_total", "Tiempo total en SQL", series, "segundos_sql")
+        _contador(lineas, "http_request_sql_rows_total", "Filas devueltas o afectadas (según el driver)",
+                  series, "filas")
+        _contador(lineas, "http_response_size_bytes_total", "Bytes enviados en el cuerpo", series, "bytes")
+        lineas += [
+            "# HELP http_requests_total Peticiones por ruta y código de estado",
+            "# TYPE http_requests_total counter",
+        ]
+        for (metodo, ruta), serie in series:
+            for estado, cantidad in sorted(serie.estados.items()):
+                lineas.append(f'http_requests_total{{{_etiquetas(metodo, ruta)},status="{estado}"}} {cantidad}')
+
+
+def _etiquetas(metodo: str, ruta: str) -> str:
+    ruta = ruta.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{metodo}",route="{ruta}"'
+
+
+def _histograma(lineas, nombre, ayuda, series, cubetas, campo, campo_total):
+    lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} histogram"]
+    for (metodo, ruta), serie in series:
+        etiquetas = _etiquetas(metodo, ruta)
+        acumulado = 0
+        for limite, cantidad in zip((*cubetas, "+Inf"), getattr(serie, campo)):
+            acumulado += cantidad
+            lineas.append(f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+        lineas.append(f"{nombre}_sum{{{etiquetas}}} {getattr(serie, campo_total)}")
+        lineas.append(f"{nombre}_count{{{etiquetas}}} {serie.peticiones}")
+
+
+def _contador(lineas, nombre, ayuda, series, campo):
+    lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} counter"]
+    for (metodo, ruta), serie in series:
+        lineas.append(f"{nombre}{{{_etiquetas(metodo, ruta)}}} {getattr(serie, campo)}")
+
+
+# Estadísticas de MonitorPool que se exponen: (métrica, clave, tipo)
+_METRICAS_POOL = (
+    ("db_pool_checkouts_total", "checkouts", "counter"),
+    ("db_pool_timeouts_total", "timeouts", "counter"),
+    ("db_pool_connections_open", "conexiones_abiertas", "gauge"),
+    ("db_pool_connections_in_use", "en_uso", "gauge"),
+    ("db_pool_wait_max_ms", "espera_maxima_ms", "gauge"),
+)
+
+
+def _pools(lineas, estadisticas):
+    for nombre, clave, tipo in _METRICAS_POOL:
+        valores = [(datos["pool"], datos[clave]) for datos in estadisticas if clave in datos]
+        if valores:
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            lineas += [f'{nombre}{{pool="{pool}"}} {valor}' for pool, valor in valores]
+
+
+registro = RegistroMetricas()
+
+
+class MiddlewareMetricas:
+    """
+    Mide cada petición HTTP y la registra bajo la plantilla de su ruta. Con
+    `server_timing` agrega la cabecera Server-Timing (app y sql) a la respuesta.
+    """
+
+    def __init__(self, app, server_timing: bool = False, registro_metricas: RegistroMetricas = None):
+        self.app = app
+        self.server_timing = server_timing
+        self.registro = registro_metricas or registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        medicion = Medicion()
+        token = _medicion.set(medicion)
+        inicio = time.perf_counter()
+        estado = 500
+        enviados = 0
+
+        async def enviar(mensaje):
+            nonlocal estado, enviados
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                if self.server_timing:
+                    total = (time.perf_counter() - inicio) * 1000
+                    sql = medicion.segundos_sql * 1000
+                    valor = f'app;dur={total:.2f}, sql;dur={sql:.2f};desc="{medicion.sentencias} sentencias"'
+                    mensaje["headers"] = [*mensaje.get("headers", []), (b"server-timing", valor.encode())]
+            elif mensaje["type"] == "http.response.body":
+                enviados += len(mensaje.get("body", b""))
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _medicion.reset(token)
+            ruta = scope.get("route")
+            self.registro.registrar(
+                scope["method"], getattr(ruta, "path", SIN_RUTA), estado,
+                time.perf_counter() - inicio, medicion, enviados
+            )
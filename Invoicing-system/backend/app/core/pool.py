@@ -0,0 +1,127 @@
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from app.core.config import settings
+
+
+class MonitorPool:
+    """
+    Estadísticas de uso de un pool de conexiones.
+
+    Los eventos del pool cuentan checkouts, checkins y conexiones abiertas; la
+    espera hasta obtener una conexión se mide en la subclase de pool que devuelve
+    `clase_pool`, porque SQLAlchemy no emite un evento al empezar a esperar.
+    """
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.conexiones_abiertas = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self.pool = None
+
+    def clase_pool(self, base):
+        """Subclase de `base` que registra en este monitor el tiempo de espera de cada checkout."""
+        monitor = self
+
+        class PoolMedido(base):
+            def _do_get(self):
+                inicio = time.perf_counter()
+                try:
+                    return super()._do_get()
+                except exc.TimeoutError:
+                    monitor.registrar_timeout()
+                    raise
+                finally:
+                    monitor.registrar_espera(time.perf_counter() - inicio)
+
+        PoolMedido.__name__ = f"{base.__name__}Medido"
+        return PoolMedido
+
+    def instrumentar(self, engine):
+        """Escucha los eventos del pool del engine (síncrono o `AsyncEngine.sync_engine`)."""
+        self.pool = engine.pool
+        event.listen(engine, "connect", self._al_conectar)
+        event.listen(engine, "close", self._al_cerrar)
+        event.listen(engine, "checkout", self._al_checkout)
+        event.listen(engine, "checkin", self._al_checkin)
+        return engine
+
+    def registrar_espera(self, segundos: float):
+        with self._lock:
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+
+    def registrar_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def _al_conectar(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.conexiones_abiertas += 1
+
+    def _al_cerrar(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.conexiones_abiertas -= 1
+
+    def _al_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _al_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            datos = {
+                "pool": self.nombre,
+                "clase": type(self.pool).__name__ if self.pool is not None else None,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "conexiones_abiertas": self.conexiones_abiertas,
+                "timeouts": self.timeouts,
+                "espera_media_ms": round(self.espera_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "espera_maxima_ms": round(self.espera_maxima * 1000, 3),
+            }
+        # NullPool y SingletonThreadPool no llevan estas cuentas
+        if isinstance(self.pool, QueuePool):
+            datos.update({
+                "tamano": self.pool.size(),
+                "en_uso": self.pool.checkedout(),
+                "disponibles": self.pool.checkedin(),
+                "overflow": max(self.pool.overflow(), 0),
+                "max_overflow": self.pool._max_overflow,
+            })
+        return datos
+
+
+def opciones_engine(url: str, monitor: MonitorPool, asincrono: bool = False) -> dict:
+    """Argumentos de create_engine / create_async_engine según la configuración del pool."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # SQLite en memoria usa un pool de una conexión por hilo; no aplica dimensionarlo
+        return {}
+
+    if settings.DB_PGBOUNCER:
+        # PgBouncer ya agrupa las conexiones: cada checkout abre y cierra la suya, y en
+        # modo transacción no se pueden reutilizar prepared statements entre sesiones
+        opciones = {"poolclass": NullPool}
+        if asincrono and url.get_driver_name() == "asyncpg":
+            opciones["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+        return opciones
+
+    return {
+        "poolclass": monitor.clase_pool(AsyncAdaptedQueuePool if asincrono else QueuePool),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
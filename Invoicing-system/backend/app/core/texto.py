@@ -0,0 +1,13 @@
+import re
+import unicodedata
+
+_ESPACIOS = re.compile(r"\s+")
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sin tildes ni diacríticos y con los espacios colapsados ("José  Núñez" -> "jose nunez")."""
+    if not texto:
+        return ""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    sin_marcas = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return _ESPACIOS.sub(" ", sin_marcas).strip().lower()
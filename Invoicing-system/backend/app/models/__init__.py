@@ -4,6 +4,11 @@ from .descargo import Descargo
 from .linea_transaccional import LineaDocumentoTransaccional, LineaDescargo, LineaFactura, Factura
 from .servicio import Servicio, TipoServicio
 from .producto import Producto, TipoProducto
+from .catalogo import VersionCatalogo
+from .resumen_paciente import ResumenPaciente
+from .lote_facturacion import LoteFacturacion, ItemLoteFacturacion
+from .trabajo_pdf import TrabajoPDF
+from .correo_saliente import CorreoSaliente
 
 __all__ = [
     "Paciente",
@@ -17,4 +22,10 @@ __all__ = [
     "TipoServicio",
     "Producto",
     "TipoProducto",
+    "VersionCatalogo",
+    "ResumenPaciente",
+    "LoteFacturacion",
+    "ItemLoteFacturacion",
+    "TrabajoPDF",
+    "CorreoSaliente",
 ]
\ No newline at end of file
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String
+from app.core.database import Base
+
+class VersionCatalogo(Base):
+    """Contador de versión por catálogo; se incrementa en cada alta, cambio o baja."""
+    __tablename__ = "versiones_catalogo"
+
+    nombre = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
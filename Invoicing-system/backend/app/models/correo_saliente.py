@@ -0,0 +1,32 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from app.core.database import Base
+
+class CorreoSaliente(Base):
+    """
+    Bandeja de salida de correos (outbox). La fila se escribe en la misma transacción
+    que la factura, así que no hay factura emitida sin su correo ni correo de una
+    factura que no llegó a confirmarse. EnviadorCorreos la vacía en segundo plano.
+    """
+    __tablename__ = "correos_salientes"
+
+    id = Column(Integer, primary_key=True)
+    factura_id = Column(Integer, ForeignKey("facturas.id", ondelete="CASCADE"), nullable=False)
+    destinatario = Column(String(255), nullable=False)
+    asunto = Column(String(255), nullable=False)
+    # pendiente/enviando/enviado/descartado (descartado: agotó los reintentos o el
+    # servidor lo rechazó de forma permanente; queda para revisión)
+    estado = Column(String(20), nullable=False, default="pendiente")
+    intentos = Column(Integer, nullable=False, default=0)
+    proximo_intento = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Corrida del enviador que lo reclamó (el lote se reclama con un solo UPDATE)
+    reclamado_por = Column(String(32))
+    error = Column(Text)
+    creado_en = Column(DateTime, nullable=False, default=datetime.utcnow)
+    iniciado_en = Column(DateTime)
+    enviado_en = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_correos_salientes_estado", "estado", "proximo_intento", "id"),
+        Index("ix_correos_salientes_reclamado_por", "reclamado_por"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Index, Integer, Float, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
@@ -10,6 +10,9 @@ class Descargo(Base):
     paciente_id = Column(Integer, ForeignKey("pacientes.id"))
     fecha = Column(DateTime, default=datetime.utcnow)
     total = Column(Float, default=0.0, nullable=False)
+    # Factura que incluyó las líneas del descargo; NULL mientras no se facture.
+    # La mantiene FacturaRepository al crear la factura, en la misma transacción
+    factura_id = Column(Integer, ForeignKey("facturas.id"), nullable=True)
     
     # Relaciones
     paciente = relationship("Paciente", back_populates="descargos")
@@ -19,6 +22,19 @@ class Descargo(Base):
         cascade="all, delete-orphan",
         lazy="joined"
     )
+
+    __table_args__ = (
+        # Descargos de un paciente, por fecha
+        Index("ix_descargos_paciente_id_fecha", "paciente_id", "fecha"),
+        # Búsqueda por rango de fechas de todos los pacientes (GET /descargos/buscar/): el
+        # índice anterior no sirve sin paciente_id
+        Index("ix_descargos_fecha", "fecha"),
+        # Solo los pendientes de facturar, que son pocos frente al histórico
+        Index(
+            "ix_descargos_no_facturados", "paciente_id",
+            postgresql_where=factura_id.is_(None), sqlite_where=factura_id.is_(None)
+        ),
+    )
     
     @property
     def lineas(self):
@@ -1,15 +1,23 @@
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Integer, Float, ForeignKey, String
+from sqlalchemy import Column, DateTime, Index, Integer, Float, ForeignKey, String, literal_column
 from sqlalchemy.orm import relationship
 from app.core.database import Base
-import copy
+
+def _clonar_columnas(instancia):
+    """Nueva instancia transitoria con los valores de columna de `instancia`, sin id ni relaciones."""
+    valores = {
+        columna: getattr(instancia, columna)
+        for columna in instancia.__table__.columns.keys()
+        if columna != "id"
+    }
+    return type(instancia)(**valores)
 
 class LineaDocumentoTransaccional(Base):
     __tablename__ = "lineas_transaccionales"
     
     id = Column(Integer, primary_key=True, index=True)
     cantidad = Column(Integer, default=1)
-    descargo_id = Column(Integer, ForeignKey("descargos.id"))
+    descargo_id = Column(Integer, ForeignKey("descargos.id"), index=True)
     servicio_id = Column(Integer, ForeignKey("servicios.id"), nullable=True)
     producto_id = Column(Integer, ForeignKey("productos.id"), nullable=True)
     
@@ -34,8 +42,20 @@ class LineaDocumentoTransaccional(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Cada línea referencia un servicio o un producto: índices parciales sin los NULL
+        Index(
+            "ix_lineas_transaccionales_servicio_id", "servicio_id",
+            postgresql_where=servicio_id.isnot(None), sqlite_where=servicio_id.isnot(None)
+        ),
+        Index(
+            "ix_lineas_transaccionales_producto_id", "producto_id",
+            postgresql_where=producto_id.isnot(None), sqlite_where=producto_id.isnot(None)
+        ),
+    )
+
     def clone(self):
-        return copy.deepcopy(self)
+        return _clonar_columnas(self)
 
 class LineaDescargo(Base):
     __tablename__ = "lineas_descargo"
@@ -55,7 +75,7 @@ class LineaDescargo(Base):
     )
 
     def clone(self):
-        return copy.deepcopy(self)
+        return _clonar_columnas(self)
 
 class LineaFactura(Base):
     __tablename__ = 'lineas_factura'
@@ -72,7 +92,7 @@ class LineaFactura(Base):
     )
     
     # Clave foránea para relación con Factura
-    factura_id = Column(Integer, ForeignKey('facturas.id'))
+    factura_id = Column(Integer, ForeignKey('facturas.id'), index=True)
     
     # Relaciones
     factura = relationship("Factura", back_populates="lineas_factura")
@@ -82,7 +102,7 @@ class LineaFactura(Base):
     )
 
     def clone(self):
-        return copy.deepcopy(self)
+        return _clonar_columnas(self)
 
 class Factura(Base):
     __tablename__ = 'facturas'
@@ -95,6 +115,10 @@ class Factura(Base):
     total_general = Column(Float)
     estado_pago = Column(String(20), default="pendiente")
     terminos_condiciones = Column(String(500))
+    # Versión de la fila para los ETag: cualquier UPDATE (ORM o Core) la incrementa
+    version = Column(
+        Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1")
+    )
     
     # Claves foráneas
     paciente_id = Column(Integer, ForeignKey('pacientes.id'))
@@ -107,4 +131,11 @@ class Factura(Base):
         "LineaFactura", 
         back_populates="factura",
         cascade="all, delete-orphan"
+    )
+
+    __table_args__ = (
+        # Listado por fecha (keyset fecha_emision, id) y sus filtros por paciente o cliente
+        Index("ix_facturas_fecha_emision_id", "fecha_emision", "id"),
+        Index("ix_facturas_paciente_id_fecha_emision", "paciente_id", "fecha_emision", "id"),
+        Index("ix_facturas_cliente_id_fecha_emision", "cliente_id", "fecha_emision", "id"),
     )
\ No newline at end of file
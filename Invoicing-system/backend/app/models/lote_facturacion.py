@@ -0,0 +1,44 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class LoteFacturacion(Base):
+    """
+    Corrida de facturación masiva (cierre de mes). El progreso se lee de sus ítems,
+    así que cualquier proceso puede consultarlo mientras los workers facturan.
+    """
+    __tablename__ = "lotes_facturacion"
+
+    id = Column(Integer, primary_key=True, index=True)
+    estado = Column(String(20), nullable=False, default="pendiente")  # pendiente/en_curso/terminado/interrumpido
+    # Cliente por defecto de la regla de asignación (NULL: solo las asignaciones explícitas)
+    cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=True)
+    workers = Column(Integer, nullable=False, default=1)
+    creado_en = Column(DateTime, nullable=False, default=datetime.utcnow)
+    iniciado_en = Column(DateTime)
+    terminado_en = Column(DateTime)
+
+    items = relationship("ItemLoteFacturacion", back_populates="lote", order_by="ItemLoteFacturacion.id")
+
+
+class ItemLoteFacturacion(Base):
+    """Un paciente dentro del lote, con su resultado; un fallo no afecta a los demás."""
+    __tablename__ = "lotes_facturacion_items"
+
+    id = Column(Integer, primary_key=True)
+    lote_id = Column(Integer, ForeignKey("lotes_facturacion.id", ondelete="CASCADE"), nullable=False)
+    paciente_id = Column(Integer, ForeignKey("pacientes.id"), nullable=False)
+    cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=True)
+    estado = Column(String(20), nullable=False, default="pendiente")  # pendiente/facturado/omitido/fallido
+    factura_id = Column(Integer, ForeignKey("facturas.id"), nullable=True)
+    error = Column(Text)
+    intentos = Column(Integer, nullable=False, default=0)
+    actualizado_en = Column(DateTime)
+
+    lote = relationship("LoteFacturacion", back_populates="items")
+
+    __table_args__ = (
+        UniqueConstraint("lote_id", "paciente_id", name="uq_lotes_facturacion_items_paciente"),
+        Index("ix_lotes_facturacion_items_lote_estado", "lote_id", "estado"),
+    )
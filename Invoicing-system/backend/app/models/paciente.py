@@ -1,7 +1,8 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Index, Integer, String, DateTime
+from sqlalchemy.orm import relationship, validates
 from app.core.database import Base
+from app.core.texto import normalizar_texto
 from app.services.states.paciente_states import InternadoState, AltaState, FacturadoState
 from sqlalchemy import event
 
@@ -10,6 +11,8 @@ class Paciente(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     nombre_completo = Column(String(100), nullable=False)
+    # Nombre en minúsculas y sin tildes para la búsqueda (índice trigram en PostgreSQL)
+    nombre_normalizado = Column(String(100))
     fecha_ingreso = Column(DateTime, default=datetime.utcnow)
     fecha_alta = Column(DateTime, nullable=True)
     afeccion = Column(String(200))
@@ -20,6 +23,21 @@ class Paciente(Base):
     descargos = relationship("Descargo", back_populates="paciente")
     facturas = relationship("Factura", back_populates="paciente")
 
+    __table_args__ = (
+        # Las consultas calientes buscan internados y altas, que son pocos frente a los
+        # facturados; en PostgreSQL el índice parcial deja fuera a estos últimos.
+        # SQLite no deduce estado = 'alta' => estado <> 'facturado', así que allí es completo.
+        Index(
+            "ix_pacientes_estado_activos", "estado", "id",
+            postgresql_where=estado != "facturado"
+        ),
+    )
+
+    @validates("nombre_completo")
+    def _normalizar_nombre(self, key, nombre_completo):
+        self.nombre_normalizado = normalizar_texto(nombre_completo)
+        return nombre_completo
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if not hasattr(self, '_state'):
@@ -29,6 +47,10 @@ class Paciente(Base):
         """Delegar la acción al estado actual."""
         return self._state.agregar_descargo(self, descargo_data)
 
+    def validar_descargo(self):
+        """Delegar la validación al estado actual (lanza ValueError si no se admite)."""
+        return self._state.validar_descargo(self)
+
     def dar_alta(self):
         """Delegar la acción al estado actual."""
         return self._state.dar_alta(self)
@@ -37,6 +59,10 @@ class Paciente(Base):
         """Delegar la acción al estado actual."""
         return self._state.facturar(self, factura_data)
 
+    def registrar_factura(self):
+        """Delegar al estado actual el paso a facturado tras crear la factura."""
+        return self._state.registrar_factura(self)
+
     def get_estado(self):
         """Obtener el estado actual desde la base de datos."""
         # Sincronizar _state con el valor de estado en la base de datos
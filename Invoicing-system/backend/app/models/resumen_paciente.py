@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
+from app.core.database import Base
+
+class ResumenPaciente(Base):
+    """
+    Proyección de lectura para los tableros: una fila por paciente con los agregados
+    de sus descargos. No es la fuente de verdad; la mantiene ResumenPacienteRepository
+    en la misma transacción que cada escritura y se puede reconstruir desde cero.
+    """
+    __tablename__ = "resumen_pacientes"
+
+    paciente_id = Column(Integer, ForeignKey("pacientes.id", ondelete="CASCADE"), primary_key=True)
+    nombre_completo = Column(String(100), nullable=False)
+    estado = Column(String(20), nullable=False)
+    fecha_ingreso = Column(DateTime)
+    fecha_alta = Column(DateTime)
+    cantidad_descargos = Column(Integer, nullable=False, default=0)
+    total_descargos = Column(Float, nullable=False, default=0.0)
+    ultimo_descargo_en = Column(DateTime)
+    descargos_no_facturados = Column(Integer, nullable=False, default=0)
+    total_no_facturado = Column(Float, nullable=False, default=0.0)
+    actualizado_en = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_resumen_pacientes_estado", "estado", "paciente_id"),
+    )
@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from app.core.database import Base
+
+class TrabajoPDF(Base):
+    """
+    Renderizado del PDF de una factura: cola persistente y a la vez índice de la caché.
+
+    Una fila por factura. Mientras está pendiente la toma algún worker de ColaPDF (en
+    este proceso o en otro, también tras un reinicio); cuando está lista, `sha256`
+    apunta al archivo en el almacén direccionado por contenido.
+    """
+    __tablename__ = "trabajos_pdf"
+
+    id = Column(Integer, primary_key=True)
+    factura_id = Column(Integer, ForeignKey("facturas.id", ondelete="CASCADE"), nullable=False, unique=True)
+    estado = Column(String(20), nullable=False, default="pendiente")  # pendiente/en_curso/listo/fallido
+    sha256 = Column(String(64))
+    # ETag de la factura con la que se renderizó: si cambia, el PDF cacheado ya no vale
+    etag_factura = Column(String(34))
+    intentos = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    creado_en = Column(DateTime, nullable=False, default=datetime.utcnow)
+    iniciado_en = Column(DateTime)
+    terminado_en = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_trabajos_pdf_estado", "estado", "id"),
+    )
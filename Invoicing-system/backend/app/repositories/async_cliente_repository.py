@@ -0,0 +1,49 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.cliente import Cliente
+from app.repositories.cliente_repository import consulta_listado_clientes
+from app.repositories.paginacion import armar_pagina, consulta_pagina
+from app.schemas.cliente import ClienteCreate, ClienteUpdate
+
+class AsyncClienteRepository:
+    """Versión asíncrona de ClienteRepository."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, cliente_data: ClienteCreate) -> Cliente:
+        cliente = Cliente(**cliente_data.model_dump())
+        self.db.add(cliente)
+        await self.db.commit()
+        await self.db.refresh(cliente)
+        return cliente
+
+    async def get(self, cliente_id: int) -> Cliente | None:
+        return await self.db.get(Cliente, cliente_id)
+
+    async def list(self) -> list[Cliente]:
+        result = await self.db.scalars(select(Cliente))
+        return result.all()
+
+    async def list_page(self, limite: int, cursor: str = None, **filtros):
+        columnas = (Cliente.id,)
+        result = await self.db.scalars(
+            consulta_pagina(consulta_listado_clientes(**filtros), columnas, limite, cursor)
+        )
+        return armar_pagina(result.all(), columnas, limite)
+
+    async def update(self, cliente_id: int, cliente_data: ClienteUpdate) -> Cliente | None:
+        cliente = await self.get(cliente_id)
+        if cliente:
+            for key, value in cliente_data.model_dump(exclude_unset=True).items():
+                setattr(cliente, key, value)
+            await self.db.commit()
+            await self.db.refresh(cliente)
+        return cliente
+
+    async def delete(self, cliente_id: int) -> Cliente | None:
+        cliente = await self.get(cliente_id)
+        if cliente:
+            await self.db.delete(cliente)
+            await self.db.commit()
+        return cliente
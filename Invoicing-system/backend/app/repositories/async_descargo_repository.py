@@ -0,0 +1,31 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.models import Descargo, LineaDocumentoTransaccional
+from app.repositories.descargo_repository import DescargoRepository
+from app.schemas.descargo_schema import LineaDescargoCreate
+
+class AsyncDescargoRepository:
+    """Versión asíncrona de DescargoRepository."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def crear_descargo_con_lineas(self, paciente_id: int, lineas: list[LineaDescargoCreate]):
+        # El camino de escritura en lote (catálogo en caché, executemany, un commit) se
+        # reutiliza tal cual: run_sync lo ejecuta sobre la conexión asíncrona sin bloquear
+        # el event loop.
+        return await self.db.run_sync(
+            lambda session: DescargoRepository(session).crear_descargo_con_lineas(paciente_id, lineas)
+        )
+
+    async def obtener_descargos_por_paciente(self, paciente_id: int):
+        result = await self.db.scalars(
+            select(Descargo)
+            .where(Descargo.paciente_id == paciente_id)
+            .options(
+                joinedload(Descargo.lineas_transaccionales)
+                .joinedload(LineaDocumentoTransaccional.linea_descargo)
+            )
+        )
+        return result.unique().all()
@@ -0,0 +1,34 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.models import Factura, LineaFactura, LineaDocumentoTransaccional
+from app.repositories.factura_repository import FacturaRepository
+
+class AsyncFacturaRepository:
+    """
+    Lecturas de facturas sobre AsyncSession. La emisión no tiene versión propia: pasa
+    por el motor de FacturaRepository con AsyncSession.run_sync (ver AsyncFacturaService).
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _query_con_detalle(self):
+        return select(Factura).options(
+            joinedload(Factura.paciente),
+            joinedload(Factura.cliente),
+            joinedload(Factura.lineas_factura)
+            .joinedload(LineaFactura.linea_transaccional)
+            .joinedload(LineaDocumentoTransaccional.linea_descargo)
+        )
+
+    async def obtener_factura(self, factura_id: int):
+        result = await self.db.scalars(self._query_con_detalle().where(Factura.id == factura_id))
+        return result.unique().first()
+
+    async def listar_facturas(self):
+        result = await self.db.scalars(self._query_con_detalle())
+        return result.unique().all()
+
+    async def firma_factura(self, factura_id: int):
+        return await self.db.run_sync(lambda session: FacturaRepository(session).firma_factura(factura_id))
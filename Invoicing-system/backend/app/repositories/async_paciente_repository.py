@@ -0,0 +1,88 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.paciente import Paciente
+from app.repositories.busqueda_pacientes import LIMITE_BUSQUEDA, BuscadorPacientes
+from app.repositories.paciente_repository import consulta_listado_pacientes
+from app.repositories.paginacion import armar_pagina, consulta_pagina
+from app.repositories.resumen_paciente_repository import ResumenPacienteRepository
+
+class AsyncPacienteRepository:
+    """Versión asíncrona de PacienteRepository para los routers servidos con AsyncSession."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _actualizar_resumen(self, paciente_id: int):
+        await self.db.run_sync(lambda session: ResumenPacienteRepository(session).actualizar([paciente_id]))
+
+    async def obtener_por_id(self, paciente_id: int):
+        return await self.db.get(Paciente, paciente_id)
+
+    async def crear_paciente(self, paciente_data: dict):
+        paciente = Paciente(**paciente_data)
+        self.db.add(paciente)
+        await self.db.flush()
+        await self._actualizar_resumen(paciente.id)
+        await self.db.commit()
+        await self.db.refresh(paciente)
+        return paciente
+
+    async def actualizar_paciente(self, paciente_id: int, paciente_data: dict):
+        paciente = await self.obtener_por_id(paciente_id)
+        if paciente:
+            for key, value in paciente_data.items():
+                setattr(paciente, key, value)
+            await self._actualizar_resumen(paciente_id)
+            await self.db.commit()
+            await self.db.refresh(paciente)
+        return paciente
+
+    async def eliminar_paciente(self, paciente_id: int):
+        paciente = await self.obtener_por_id(paciente_id)
+        if paciente:
+            await self.db.run_sync(lambda session: ResumenPacienteRepository(session).eliminar(paciente_id))
+            await self.db.delete(paciente)
+            await self.db.commit()
+        return paciente
+
+    async def set_alta(self, paciente_id: int):
+        paciente = await self.obtener_por_id(paciente_id)
+        if paciente:
+            try:
+                paciente.dar_alta()  # Delega al estado actual
+                await self._actualizar_resumen(paciente_id)
+                await self.db.commit()
+                await self.db.refresh(paciente)
+            except Exception as e:
+                await self.db.rollback()
+                raise Exception(f"Error al dar de alta al paciente: {str(e)}")
+        return paciente
+
+    async def obtener_todos_pacientes(self):
+        result = await self.db.scalars(select(Paciente))
+        return result.all()
+
+    async def listar_pacientes(self, limite: int, cursor: str = None, **filtros):
+        columnas = (Paciente.id,)
+        result = await self.db.scalars(
+            consulta_pagina(consulta_listado_pacientes(**filtros), columnas, limite, cursor)
+        )
+        return armar_pagina(result.all(), columnas, limite)
+
+    async def buscar_pacientes(
+        self, search_term: str = None, limite: int = LIMITE_BUSQUEDA, modo: str = "contiene", estado: str = None
+    ):
+        if not search_term or not search_term.strip():
+            query = select(Paciente)
+            if estado:
+                query = query.where(Paciente.estado == estado)
+            result = await self.db.scalars(query)
+            return result.all()
+        # Misma búsqueda que la versión síncrona (pg_trgm o índice en memoria)
+        return await self.db.run_sync(
+            lambda session: BuscadorPacientes(session).buscar(search_term, limite, modo, estado)
+        )
+
+    async def obtener_pacientes_internados(self):
+        result = await self.db.scalars(select(Paciente).where(Paciente.estado == "internado"))
+        return result.all()
@@ -0,0 +1,260 @@
+import heapq
+import re
+import threading
+import weakref
+from array import array
+from collections import Counter
+from sqlalchemy import event, func, literal, or_, select
+from sqlalchemy.orm import Session, object_session
+from app.core.texto import normalizar_texto
+from app.models.paciente import Paciente
+
+LIMITE_BUSQUEDA = 50
+LIMITE_BUSQUEDA_MAXIMO = 100
+# Umbral por defecto de pg_trgm.similarity_threshold (operador %)
+UMBRAL_SIMILITUD = 0.3
+MODOS = ("contiene", "prefijo")
+
+_PALABRA = re.compile(r"\w+")
+
+
+def trigramas(texto: str) -> set[str]:
+    """Trigramas al estilo pg_trgm: cada palabra con dos espacios delante y uno detrás."""
+    resultado = set()
+    for palabra in _PALABRA.findall(texto):
+        relleno = f"  {palabra} "
+        resultado.update(relleno[i:i + 3] for i in range(len(relleno) - 2))
+    return resultado
+
+
+def trigramas_prefijo(texto: str) -> set[str]:
+    """Trigramas que contiene cualquier palabra que empiece por `texto` (sin el relleno final)."""
+    resultado = set()
+    for palabra in _PALABRA.findall(texto):
+        relleno = f"  {palabra}"
+        resultado.update(relleno[i:i + 3] for i in range(len(relleno) - 2))
+    return resultado
+
+
+def similitud(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    comunes = len(a & b)
+    return comunes / (len(a) + len(b) - comunes)
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido trigrama -> ids en memoria, para bases sin pg_trgm (SQLite).
+
+    Se carga completo en la primera búsqueda y luego se mantiene con los cambios
+    confirmados en este proceso (ver los eventos al final del módulo). Las listas
+    de ids son arrays de enteros para que el índice ocupe poco con millones de filas.
+    """
+
+    # Trigramas presentes en más de esta fracción de filas (y de FRECUENCIA_MINIMA)
+    # no discriminan; se ignoran al generar candidatos difusos
+    FRACCION_MAXIMA = 0.1
+    FRECUENCIA_MINIMA = 1000
+    CANDIDATOS_DIFUSOS = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cargado = False
+        self.nombres = {}
+        self.postings = {}
+
+    def cargar(self, db: Session):
+        filas = db.execute(
+            select(Paciente.id, Paciente.nombre_normalizado, Paciente.nombre_completo).order_by(Paciente.id)
+        )
+        nombres = {}
+        postings = {}
+        for paciente_id, normalizado, nombre in filas:
+            normalizado = normalizado or normalizar_texto(nombre)
+            nombres[paciente_id] = normalizado
+            for trigrama in trigramas(normalizado):
+                lista = postings.get(trigrama)
+                if lista is None:
+                    lista = postings[trigrama] = array("i")
+                lista.append(paciente_id)
+        with self._lock:
+            self.nombres = nombres
+            self.postings = postings
+            self.cargado = True
+
+    def aplicar(self, cambios: dict):
+        """Aplica {id: nombre normalizado, o None si se eliminó} ya confirmados."""
+        with self._lock:
+            if not self.cargado:
+                return
+            for paciente_id, normalizado in cambios.items():
+                anterior = self.nombres.pop(paciente_id, None)
+                if anterior is not None:
+                    for trigrama in trigramas(anterior):
+                        lista = self.postings.get(trigrama)
+                        if lista is not None and paciente_id in lista:
+                            lista.remove(paciente_id)
+                if normalizado is not None:
+                    self.nombres[paciente_id] = normalizado
+                    for trigrama in trigramas(normalizado):
+                        self.postings.setdefault(trigrama, array("i")).append(paciente_id)
+
+    def buscar(self, termino: str, limite: int, modo: str = "contiene") -> list[int]:
+        with self._lock:
+            if modo == "prefijo":
+                return self._buscar_prefijo(termino, limite)
+            return self._buscar_contiene(termino, limite)
+
+    def _candidatos(self, trigramas_termino: set[str]):
+        """Ids de la lista más corta entre los trigramas del término (todos deben aparecer)."""
+        listas = [self.postings.get(t, ()) for t in trigramas_termino]
+        return min(listas, key=len) if listas else ()
+
+    def _buscar_contiene(self, termino: str, limite: int) -> list[int]:
+        # Coincidencias exactas de subcadena primero. Entre ellas, el nombre más corto
+        # es el de mayor similitud (comparten los trigramas del término), así que se
+        # ordena por longitud sin calcular la similitud de miles de filas
+        trig_termino = trigramas(termino)
+        trig_internos = {t for t in trig_termino if not t.startswith(" ") and not t.endswith(" ")}
+        candidatos = self._candidatos(trig_internos) if trig_internos else self.nombres.keys()
+        exactos = heapq.nsmallest(
+            limite,
+            ((len(self.nombres[pid]), pid) for pid in candidatos if termino in self.nombres[pid])
+        )
+        resultado = [pid for _, pid in exactos]
+        if len(resultado) >= limite:
+            return resultado
+
+        # Completar con coincidencias difusas (errores de tipeo), como el operador % de pg_trgm
+        vistos = set(resultado)
+        maximo = max(self.FRECUENCIA_MINIMA, int(len(self.nombres) * self.FRACCION_MAXIMA))
+        conteo = Counter()
+        for trigrama in trig_termino:
+            lista = self.postings.get(trigrama, ())
+            if len(lista) <= maximo:
+                conteo.update(lista)
+        difusos = []
+        for pid, _ in conteo.most_common(self.CANDIDATOS_DIFUSOS):
+            if pid in vistos:
+                continue
+            valor = similitud(trig_termino, trigramas(self.nombres[pid]))
+            if valor >= UMBRAL_SIMILITUD:
+                difusos.append((-valor, pid))
+        difusos.sort()
+        return resultado + [pid for _, pid in difusos[:limite - len(resultado)]]
+
+    def _buscar_prefijo(self, termino: str, limite: int) -> list[int]:
+        trig = trigramas_prefijo(termino)
+        candidatos = self._candidatos(trig) if trig else self.nombres.keys()
+        palabra = f" {termino}"
+        coincidencias = []
+        for pid in candidatos:
+            nombre = self.nombres[pid]
+            if nombre.startswith(termino):
+                coincidencias.append((0, len(nombre), pid))
+            elif palabra in nombre:
+                coincidencias.append((1, len(nombre), pid))
+        return [pid for _, _, pid in heapq.nsmallest(limite, coincidencias)]
+
+
+# Un índice por engine: cada base de datos (y cada engine de test) tiene el suyo
+_indices = weakref.WeakKeyDictionary()
+_indices_lock = threading.Lock()
+
+
+def indice_para(db: Session) -> IndiceTrigramas:
+    engine = db.get_bind()
+    with _indices_lock:
+        indice = _indices.get(engine)
+        if indice is None:
+            indice = _indices[engine] = IndiceTrigramas()
+    if not indice.cargado:
+        indice.cargar(db)
+    return indice
+
+
+class BuscadorPacientes:
+    """
+    Búsqueda de pacientes por nombre, sin tildes ni mayúsculas, con ranking.
+
+    - modo "contiene": subcadena del nombre primero, después coincidencias aproximadas
+      por similitud de trigramas (tolera errores de tipeo).
+    - modo "prefijo": autocompletado; nombres o palabras que empiezan por el término.
+
+    En PostgreSQL usa pg_trgm sobre `nombre_normalizado` (índice GIN de la migración);
+    en otras bases usa IndiceTrigramas en memoria.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def buscar(self, termino: str, limite: int = LIMITE_BUSQUEDA, modo: str = "contiene", estado: str = None):
+        termino = normalizar_texto(termino)
+        if not termino:
+            return []
+        if self.db.get_bind().dialect.name == "postgresql":
+            return self._buscar_postgres(termino, limite, modo, estado)
+
+        ids = indice_para(self.db).buscar(termino, limite if not estado else limite * 10, modo)
+        if not ids:
+            return []
+        stmt = select(Paciente).where(Paciente.id.in_(ids))
+        if estado:
+            stmt = stmt.where(Paciente.estado == estado)
+        pacientes = {paciente.id: paciente for paciente in self.db.scalars(stmt)}
+        return [pacientes[pid] for pid in ids if pid in pacientes][:limite]
+
+    def _buscar_postgres(self, termino: str, limite: int, modo: str, estado: str):
+        columna = Paciente.nombre_normalizado
+        if modo == "prefijo":
+            empieza = columna.startswith(termino, autoescape=True)
+            condicion = or_(empieza, columna.contains(f" {termino}", autoescape=True))
+            orden = (empieza.desc(), func.length(columna), Paciente.id)
+        else:
+            contiene = columna.contains(termino, autoescape=True)
+            condicion = or_(contiene, columna.bool_op("%")(literal(termino)))
+            orden = (contiene.desc(), func.similarity(columna, termino).desc(), func.length(columna), Paciente.id)
+
+        stmt = select(Paciente).where(condicion)
+        if estado:
+            stmt = stmt.where(Paciente.estado == estado)
+        return self.db.scalars(stmt.order_by(*orden).limit(limite)).all()
+
+
+# Mantenimiento del índice en memoria: los cambios se acumulan por sesión y se
+# aplican solo cuando la transacción se confirma.
+def _registrar_cambio(paciente, eliminado: bool = False):
+    session = object_session(paciente)
+    if session is None:
+        return
+    cambios = session.info.setdefault("cambios_busqueda_pacientes", {})
+    cambios[paciente.id] = None if eliminado else (
+        paciente.nombre_normalizado or normalizar_texto(paciente.nombre_completo)
+    )
+
+
+@event.listens_for(Paciente, "after_insert")
+@event.listens_for(Paciente, "after_update")
+def _paciente_guardado(mapper, connection, paciente):
+    _registrar_cambio(paciente)
+
+
+@event.listens_for(Paciente, "after_delete")
+def _paciente_eliminado(mapper, connection, paciente):
+    _registrar_cambio(paciente, eliminado=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _aplicar_cambios(session):
+    cambios = session.info.pop("cambios_busqueda_pacientes", None)
+    if not cambios:
+        return
+    indice = _indices.get(session.get_bind())
+    if indice is not None:
+        indice.aplicar(cambios)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_cambios(session):
+    session.info.pop("cambios_busqueda_pacientes", None)
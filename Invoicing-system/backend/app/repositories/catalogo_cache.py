@@ -0,0 +1,137 @@
+import threading
+from dataclasses import dataclass
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from app.models.catalogo import VersionCatalogo
+from app.models.servicio import Servicio
+from app.models.producto import Producto
+
+
+@dataclass(frozen=True)
+class ItemCatalogo:
+    """
+    Copia inmutable de un servicio o producto del catálogo.
+
+    Expone los mismos atributos y métodos que usan los descargos y los listados
+    (calcular_precio, get_descripcion), con los valores ya calculados al cargar.
+    """
+    id: int
+    tipo: object
+    precio_base: float
+    descripcion: str
+    precio: float
+    descripcion_completa: str
+
+    @classmethod
+    def desde_modelo(cls, modelo):
+        return cls(
+            id=modelo.id,
+            tipo=modelo.tipo,
+            precio_base=modelo.precio_base,
+            descripcion=modelo.descripcion,
+            precio=modelo.calcular_precio(),
+            descripcion_completa=modelo.get_descripcion()
+        )
+
+    def calcular_precio(self) -> float:
+        return self.precio
+
+    def get_descripcion(self) -> str:
+        return self.descripcion_completa
+
+
+class CatalogoCache:
+    """
+    Snapshot en memoria del catálogo, indexado por id.
+
+    Se carga en el primer uso y se valida contra la fila de `versiones_catalogo`,
+    que los repositorios incrementan en la misma transacción que el cambio. Como el
+    contador vive en la base de datos, un cambio confirmado por cualquier worker es
+    visible en la siguiente lectura de todos los procesos; comprobarlo cuesta una
+    consulta por clave primaria en lugar de cargar el catálogo.
+    """
+
+    def __init__(self, nombre: str, modelo):
+        self.nombre = nombre
+        self.modelo = modelo
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidaciones = 0
+
+    def obtener(self, db: Session) -> dict[int, ItemCatalogo]:
+        version = self.version(db)
+        with self._lock:
+            if self._snapshot is not None:
+                if self._version == version:
+                    self.hits += 1
+                    return self._snapshot
+                self.invalidaciones += 1
+                self._snapshot = None
+            self.misses += 1
+
+        # La versión se lee antes que los datos: si el catálogo cambia durante la
+        # carga, el snapshot queda con la versión anterior y se recarga la próxima vez.
+        # populate_existing evita reutilizar instancias ya cargadas en la sesión.
+        items = db.query(self.modelo).order_by(self.modelo.id).populate_existing()
+        snapshot = {item.id: ItemCatalogo.desde_modelo(item) for item in items}
+        with self._lock:
+            self._snapshot = snapshot
+            self._version = version
+        return snapshot
+
+    def listar(self, db: Session, tipo=None) -> list[ItemCatalogo]:
+        items = self.obtener(db).values()
+        if tipo:
+            return [item for item in items if item.tipo == tipo]
+        return list(items)
+
+    def incrementar_version(self, db: Session):
+        """Marca el catálogo como modificado; debe llamarse antes del commit del cambio."""
+        resultado = db.execute(
+            update(VersionCatalogo)
+            .where(VersionCatalogo.nombre == self.nombre)
+            .values(version=VersionCatalogo.version + 1)
+        )
+        if resultado.rowcount == 0:
+            db.add(VersionCatalogo(nombre=self.nombre, version=1))
+        db.info.get(VERSIONES_LEIDAS, {}).pop(self.nombre, None)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "catalogo": self.nombre,
+                "version": self._version,
+                "items": len(self._snapshot) if self._snapshot is not None else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidaciones": self.invalidaciones
+            }
+
+    def version(self, db: Session) -> int:
+        """
+        Versión confirmada del catálogo (también la base de los ETag de sus endpoints).
+        Se lee una vez por transacción: el ETag y el listado de la misma petición la
+        comparten y responden sobre la misma versión.
+        """
+        leidas = db.info.setdefault(VERSIONES_LEIDAS, {})
+        if self.nombre not in leidas:
+            leidas[self.nombre] = db.scalar(
+                select(VersionCatalogo.version).where(VersionCatalogo.nombre == self.nombre)
+            ) or 0
+        return leidas[self.nombre]
+
+
+VERSIONES_LEIDAS = "versiones_catalogo"
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _olvidar_versiones(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(VERSIONES_LEIDAS, None)
+
+
+servicios_cache = CatalogoCache("servicios", Servicio)
+productos_cache = CatalogoCache("productos", Producto)
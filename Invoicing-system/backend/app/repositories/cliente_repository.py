@@ -1,7 +1,15 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.cliente import Cliente
+from app.repositories.paginacion import paginar
 from app.schemas.cliente import ClienteCreate, ClienteUpdate
 
+def consulta_listado_clientes(nombre: str = None):
+    stmt = select(Cliente)
+    if nombre:
+        stmt = stmt.where(Cliente.nombre.ilike(f"%{nombre}%"))
+    return stmt
+
 class ClienteRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -24,6 +32,9 @@ class ClienteRepository:
     def list(self) -> list[Cliente]:
         return self.db.query(Cliente).all()
 
+    def list_page(self, limite: int, cursor: str = None, **filtros):
+        return paginar(self.db, consulta_listado_clientes(**filtros), (Cliente.id,), limite, cursor)
+
     def update(self, cliente_id: int, cliente_data: ClienteUpdate) -> Cliente | None:
         cliente = self.get(cliente_id)
         if cliente:
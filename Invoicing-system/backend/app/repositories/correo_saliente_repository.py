@@ -0,0 +1,125 @@
+from datetime import datetime
+from sqlalchemy import DateTime, Integer, String, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+from app.models import Cliente, CorreoSaliente, Factura
+
+ESTADOS_CORREO = ("pendiente", "enviando", "enviado", "descartado")
+
+
+class CorreoSalienteRepository:
+    """
+    Bandeja de salida sobre correos_salientes. El enviador reclama un lote con un único
+    UPDATE que marca las filas con su token: si otro proceso reclamó alguna antes, la
+    condición estado = 'pendiente' la deja fuera y no se envía dos veces.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def encolar_factura(self, factura_id: int):
+        """
+        Encola el envío de la factura al correo de su cliente (si tiene). Sin commit:
+        va en la transacción que emite la factura.
+        """
+        ahora = datetime.utcnow()
+        self.db.execute(
+            insert(CorreoSaliente).from_select(
+                ["factura_id", "destinatario", "asunto", "estado", "intentos", "proximo_intento", "creado_en"],
+                select(
+                    Factura.id,
+                    Cliente.correo,
+                    literal("Factura #", String).concat(Factura.numero_factura),
+                    literal("pendiente", String),
+                    literal(0, Integer),
+                    literal(ahora, DateTime),
+                    literal(ahora, DateTime),
+                )
+                .join(Cliente, Cliente.id == Factura.cliente_id)
+                .where(Factura.id == factura_id, Cliente.correo.isnot(None), Cliente.correo != "")
+            )
+        )
+
+    def reclamar(self, token: str, limite: int, ahora: datetime = None):
+        """
+        Toma hasta `limite` correos pendientes cuyo próximo intento ya venció. Devuelve
+        filas con lo necesario para armar el mensaje (sin cargar la factura entera).
+        """
+        ahora = ahora or datetime.utcnow()
+        candidatos = (
+            select(CorreoSaliente.id)
+            .where(CorreoSaliente.estado == "pendiente", CorreoSaliente.proximo_intento <= ahora)
+            .order_by(CorreoSaliente.proximo_intento, CorreoSaliente.id)
+            .limit(limite)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        self.db.execute(
+            update(CorreoSaliente)
+            .where(CorreoSaliente.id.in_(candidatos), CorreoSaliente.estado == "pendiente")
+            .values(
+                estado="enviando", reclamado_por=token, iniciado_en=ahora,
+                intentos=CorreoSaliente.intentos + 1
+            ),
+            execution_options={"synchronize_session": False}
+        )
+        self.db.commit()
+        return self.db.execute(
+            select(
+                CorreoSaliente.id,
+                CorreoSaliente.factura_id,
+                CorreoSaliente.destinatario,
+                CorreoSaliente.asunto,
+                CorreoSaliente.intentos,
+                Factura.numero_factura,
+                Factura.fecha_emision,
+                Factura.total_general,
+                Cliente.nombre.label("cliente_nombre"),
+            )
+            .join(Factura, Factura.id == CorreoSaliente.factura_id)
+            .outerjoin(Cliente, Cliente.id == Factura.cliente_id)
+            .where(CorreoSaliente.reclamado_por == token, CorreoSaliente.estado == "enviando")
+            .order_by(CorreoSaliente.id)
+        ).all()
+
+    def marcar_enviados(self, ids):
+        if ids:
+            self.db.execute(
+                update(CorreoSaliente)
+                .where(CorreoSaliente.id.in_(ids))
+                .values(estado="enviado", error=None, enviado_en=datetime.utcnow()),
+                execution_options={"synchronize_session": False}
+            )
+
+    def reprogramar(self, correo_id: int, error: str, proximo_intento: datetime):
+        self.db.execute(
+            update(CorreoSaliente)
+            .where(CorreoSaliente.id == correo_id)
+            .values(estado="pendiente", error=error[:1000], proximo_intento=proximo_intento),
+            execution_options={"synchronize_session": False}
+        )
+
+    def descartar(self, correo_id: int, error: str):
+        self.db.execute(
+            update(CorreoSaliente)
+            .where(CorreoSaliente.id == correo_id)
+            .values(estado="descartado", error=error[:1000]),
+            execution_options={"synchronize_session": False}
+        )
+
+    def recuperar_atascados(self, iniciados_antes_de: datetime) -> int:
+        """Devuelve a pendiente los correos en envío de un enviador que murió."""
+        filas = self.db.execute(
+            update(CorreoSaliente)
+            .where(CorreoSaliente.estado == "enviando", CorreoSaliente.iniciado_en < iniciados_antes_de)
+            .values(estado="pendiente"),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+        self.db.commit()
+        return filas
+
+    def conteos(self) -> dict:
+        conteos = dict.fromkeys(ESTADOS_CORREO, 0)
+        conteos.update(self.db.execute(
+            select(CorreoSaliente.estado, func.count()).group_by(CorreoSaliente.estado)
+        ).all())
+        return conteos
@@ -1,82 +1,58 @@
+from collections import defaultdict
+from datetime import datetime
 from sqlalchemy.orm import Session
-from app.models import Descargo, LineaDocumentoTransaccional, LineaDescargo, Servicio, Producto
+from app.models import Descargo, LineaDocumentoTransaccional, LineaDescargo
+from app.repositories.catalogo_cache import servicios_cache, productos_cache
+from app.repositories.resumen_paciente_repository import ResumenPacienteRepository
 from app.schemas.descargo_schema import LineaDescargoCreate
 from fastapi import HTTPException
+from sqlalchemy import insert
 from sqlalchemy.orm import joinedload
-from app.services.prototypes.prototype_base import (
-    linea_transaccional_prototype_servicio,
-    linea_transaccional_prototype_producto,
-    linea_descargo_prototype
-)
 
 class DescargoRepository:
     def __init__(self, db: Session):
         self.db = db
 
     def crear_descargo_con_lineas(self, paciente_id: int, lineas: list[LineaDescargoCreate]):
+        """
+        Crea el descargo y todas sus líneas en una sola transacción.
+
+        El catálogo referenciado se resuelve desde la caché de catálogo, las líneas
+        se construyen en memoria y cada tabla de líneas se inserta con un único
+        executemany, de modo que el número de sentencias no depende del número de líneas.
+        """
         try:
-            descargo = Descargo(paciente_id=paciente_id)
-            self.db.add(descargo)
-            self.db.commit()
-            self.db.refresh(descargo)
-            
+            servicios, productos = self.cargar_catalogo(lineas)
+
             total = 0.0
-            lineas_response = []
-            
+            items = []
             for linea in lineas:
                 if linea.servicio_id is not None and linea.producto_id is not None:
                     raise HTTPException(
                         status_code=400,
                         detail="Cada línea debe tener solo servicio o producto, no ambos"
                     )
-                
-                # Seleccionar prototipo adecuado
-                linea_trans_prototype = (
-                    linea_transaccional_prototype_servicio.clone() if linea.servicio_id
-                    else linea_transaccional_prototype_producto.clone() if linea.producto_id
-                    else linea_transaccional_prototype_servicio.clone()
-                )
-                
-                precio = self._obtener_precio(linea.servicio_id, linea.producto_id)
+
+                precio, descripcion = self.resolver_item(linea, servicios, productos)
                 subtotal = precio * linea.cantidad
                 total += subtotal
-                
-                # Personalizar el prototipo
-                linea_trans = linea_trans_prototype
-                linea_trans.cantidad = linea.cantidad
-                linea_trans.servicio_id = linea.servicio_id
-                linea_trans.producto_id = linea.producto_id
-                linea_trans.descargo_id = descargo.id
-                
-                self.db.add(linea_trans)
-                self.db.commit()
-                
-                # Clonar y personalizar LineaDescargo
-                linea_descargo = linea_descargo_prototype.clone()
-                descripcion = self._generar_descripcion(linea.servicio_id, linea.producto_id)
-                linea_descargo.descripcion = descripcion
-                linea_descargo.subtotal_sin_iva = subtotal
-                linea_descargo.linea_transaccional_id = linea_trans.id
-                
-                self.db.add(linea_descargo)
-                self.db.commit()
-                
-                lineas_response.append({
-                    "id": linea_descargo.id,
-                    "descripcion": descripcion,
-                    "subtotal_sin_iva": subtotal,
-                    "cantidad": linea.cantidad,
-                    "servicio_id": linea.servicio_id,
-                    "producto_id": linea.producto_id
-                })
-            
-            descargo.total = total
+                items.append((linea, descripcion, subtotal))
+
+            descargo = Descargo(paciente_id=paciente_id, total=total)
+            self.db.add(descargo)
+            self.db.flush()
+
+            lineas_response = self._insertar_lineas(
+                [(descargo.id, linea, descripcion, subtotal) for linea, descripcion, subtotal in items]
+            )
+            ResumenPacienteRepository(self.db).actualizar([paciente_id])
+
             self.db.commit()
             self.db.refresh(descargo)
-            
+
             setattr(descargo, 'lineas', lineas_response)
             return descargo
-            
+
         except Exception as e:
             self.db.rollback()
             raise HTTPException(
@@ -84,38 +60,149 @@ class DescargoRepository:
                 detail=f"Error al crear descargo: {str(e)}"
             )
 
-    def _obtener_precio(self, servicio_id: int = None, producto_id: int = None) -> float:
-        if servicio_id:
-            servicio = self.db.query(Servicio).filter(Servicio.id == servicio_id).first()
+    def crear_descargos_en_lote(self, grupos: dict[int, list[tuple]]) -> dict[int, int]:
+        """
+        Crea un descargo por paciente con sus líneas ya resueltas, en una sola transacción.
+
+        `grupos` asocia paciente_id con tuplas (linea, descripcion, subtotal). Devuelve
+        paciente_id → descargo_id. Si algo falla, el llamador debe hacer rollback.
+        """
+        descargos = {
+            paciente_id: Descargo(
+                paciente_id=paciente_id,
+                total=sum(subtotal for _, _, subtotal in items)
+            )
+            for paciente_id, items in grupos.items()
+        }
+        self.db.add_all(descargos.values())
+        self.db.flush()
+
+        descargo_ids = {paciente_id: descargo.id for paciente_id, descargo in descargos.items()}
+        self._insertar_lineas([
+            (descargo_ids[paciente_id], linea, descripcion, subtotal)
+            for paciente_id, items in grupos.items()
+            for linea, descripcion, subtotal in items
+        ])
+        ResumenPacienteRepository(self.db).actualizar(grupos.keys())
+        self.db.commit()
+        return descargo_ids
+
+    def _insertar_lineas(self, items: list[tuple]) -> list[dict]:
+        """
+        Inserta en lote las líneas transaccionales y sus líneas de descargo.
+
+        `items` son tuplas (descargo_id, linea, descripcion, subtotal) que pueden
+        pertenecer a varios descargos recién creados; devuelve las líneas de respuesta
+        en el mismo orden.
+
+        Se usa el INSERT de Core sobre la tabla (y no el bulk insert del ORM, que parte
+        el lote según qué columnas vienen a None), con un RETURNING que SQLAlchemy agrupa
+        en pocas sentencias (insertmanyvalues). Ni la base ni el RETURNING garantizan el
+        orden, y sort_by_parameter_order no sirve aquí: sin columna centinela SQLite
+        vuelve a un INSERT por fila. Cada id se empareja con su fila por los valores
+        devueltos; las líneas de descargo por linea_transaccional_id, que es único, y las
+        transaccionales por sus columnas: dos filas con los mismos valores son
+        intercambiables.
+        """
+        filas = [
+            {
+                "cantidad": linea.cantidad,
+                "descargo_id": descargo_id,
+                "servicio_id": linea.servicio_id,
+                "producto_id": linea.producto_id
+            }
+            for descargo_id, linea, _, _ in items
+        ]
+        tabla = LineaDocumentoTransaccional
+        ids_por_valores = defaultdict(list)
+        for id_, *valores in sorted(self.db.execute(
+            insert(tabla.__table__)
+            .returning(tabla.id, tabla.cantidad, tabla.descargo_id, tabla.servicio_id, tabla.producto_id),
+            filas
+        ), reverse=True):
+            ids_por_valores[tuple(valores)].append(id_)
+        trans_ids = [
+            ids_por_valores[(fila["cantidad"], fila["descargo_id"], fila["servicio_id"], fila["producto_id"])].pop()
+            for fila in filas
+        ]
+
+        linea_descargo_ids = dict(self.db.execute(
+            insert(LineaDescargo.__table__)
+            .returning(LineaDescargo.linea_transaccional_id, LineaDescargo.id),
+            [
+                {
+                    "descripcion": descripcion,
+                    "subtotal_sin_iva": subtotal,
+                    "linea_transaccional_id": trans_id
+                }
+                for (_, _, descripcion, subtotal), trans_id in zip(items, trans_ids)
+            ]
+        ).all())
+
+        return [
+            {
+                "id": linea_descargo_ids[trans_id],
+                "descripcion": descripcion,
+                "subtotal_sin_iva": subtotal,
+                "cantidad": linea.cantidad,
+                "servicio_id": linea.servicio_id,
+                "producto_id": linea.producto_id
+            }
+            for (_, linea, descripcion, subtotal), trans_id in zip(items, trans_ids)
+        ]
+
+    def cargar_catalogo(self, lineas: list[LineaDescargoCreate]):
+        """Devuelve los snapshots de servicios y productos que necesitan las líneas."""
+        servicios = {}
+        if any(linea.servicio_id for linea in lineas):
+            servicios = servicios_cache.obtener(self.db)
+        productos = {}
+        if any(linea.producto_id for linea in lineas):
+            productos = productos_cache.obtener(self.db)
+        return servicios, productos
+
+    def resolver_item(self, linea: LineaDescargoCreate, servicios: dict, productos: dict) -> tuple[float, str]:
+        """Devuelve el precio unitario y la descripción de la línea a partir del catálogo cargado."""
+        if linea.servicio_id:
+            servicio = servicios.get(linea.servicio_id)
             if not servicio:
                 raise HTTPException(
                     status_code=404,
-                    detail=f"Servicio con ID {servicio_id} no encontrado"
+                    detail=f"Servicio con ID {linea.servicio_id} no encontrado"
                 )
-            return servicio.calcular_precio()
-        elif producto_id:
-            producto = self.db.query(Producto).filter(Producto.id == producto_id).first()
+            return servicio.calcular_precio(), f"Servicio: {servicio.get_descripcion()}"
+        elif linea.producto_id:
+            producto = productos.get(linea.producto_id)
             if not producto:
                 raise HTTPException(
                     status_code=404,
-                    detail=f"Producto con ID {producto_id} no encontrado"
+                    detail=f"Producto con ID {linea.producto_id} no encontrado"
                 )
-            return producto.calcular_precio()
+            return producto.calcular_precio(), f"Producto: {producto.get_descripcion()}"
         else:
             raise HTTPException(
                 status_code=400,
                 detail="Se requiere servicio_id o producto_id"
             )
-
-    def _generar_descripcion(self, servicio_id: int = None, producto_id: int = None) -> str:
-        if servicio_id:
-            servicio = self.db.query(Servicio).filter(Servicio.id == servicio_id).first()
-            return f"Servicio: {servicio.get_descripcion()}" if servicio else f"Servicio ID: {servicio_id}"
-        elif producto_id:
-            producto = self.db.query(Producto).filter(Producto.id == producto_id).first()
-            return f"Producto: {producto.get_descripcion()}" if producto else f"Producto ID: {producto_id}"
-        return "Ítem no especificado"
     
+    def buscar_descargos(self, desde: datetime, hasta: datetime, search: str = None):
+        """
+        Descargos de todos los pacientes con fecha entre `desde` y `hasta` (inclusive), por
+        fecha; con `search`, solo los que tienen alguna línea cuya descripción lo contiene.
+        """
+        query = self.db.query(Descargo).filter(Descargo.fecha >= desde, Descargo.fecha <= hasta)
+        if search:
+            query = query.filter(Descargo.lineas_transaccionales.any(
+                LineaDocumentoTransaccional.linea_descargo.has(LineaDescargo.descripcion.ilike(f"%{search}%"))
+            ))
+        return query\
+            .options(
+                joinedload(Descargo.lineas_transaccionales)
+                .joinedload(LineaDocumentoTransaccional.linea_descargo)
+            )\
+            .order_by(Descargo.fecha, Descargo.id)\
+            .all()
+
     def obtener_descargos_por_paciente(self, paciente_id: int):
         descargos = self.db.query(Descargo)\
             .filter(Descargo.paciente_id == paciente_id)\
@@ -124,4 +211,4 @@ class DescargoRepository:
                 .joinedload(LineaDocumentoTransaccional.linea_descargo)
             )\
             .all()
-        return descargos
\ No newline at end of file
+        return descargos
@@ -1,16 +1,68 @@
+from datetime import datetime
+from sqlalchemy import func, insert, literal, select, update
 from sqlalchemy.orm import Session, joinedload
-from app.models import Factura, LineaFactura, LineaDocumentoTransaccional
+from app.models import (
+    Descargo, Factura, LineaDescargo, LineaFactura, LineaDocumentoTransaccional, Paciente, Cliente
+)
+from app.repositories.correo_saliente_repository import CorreoSalienteRepository
+from app.repositories.paginacion import paginar, paginar_filas
+from app.repositories.resumen_paciente_repository import ResumenPacienteRepository
 from app.services.prototypes.prototype_base import linea_factura_prototype
 
+TASA_IVA = 0.16
+
+def marcar_descargos_facturados(factura_id: int):
+    """
+    UPDATE que asigna `factura_id` a los descargos con líneas en esa factura (ya
+    insertadas). Un descargo ya marcado conserva su primera factura.
+    """
+    return (
+        update(Descargo)
+        .where(Descargo.id.in_(
+            select(LineaDocumentoTransaccional.descargo_id)
+            .join(LineaFactura, LineaFactura.linea_transaccional_id == LineaDocumentoTransaccional.id)
+            .where(LineaFactura.factura_id == factura_id)
+        ))
+        .where(Descargo.factura_id.is_(None))
+        .values(factura_id=factura_id)
+    )
+
+def consulta_lineas_facturables(paciente_id: int, tasa_iva: float = TASA_IVA):
+    """
+    Líneas de los descargos sin facturar del paciente con su IVA y total calculados en
+    SQL: las mismas reglas que antes se aplicaban en Python (línea de descargo presente,
+    cantidad positiva) y sin líneas que ya estén en otra factura.
+    """
+    subtotal = func.coalesce(LineaDescargo.subtotal_sin_iva, 0.0)
+    iva = subtotal * literal(tasa_iva)
+    return (
+        select(
+            LineaDocumentoTransaccional.id.label("linea_transaccional_id"),
+            subtotal.label("subtotal"),
+            iva.label("iva"),
+            (subtotal + iva).label("total_con_iva"),
+        )
+        .join(LineaDescargo, LineaDescargo.linea_transaccional_id == LineaDocumentoTransaccional.id)
+        .join(Descargo, Descargo.id == LineaDocumentoTransaccional.descargo_id)
+        .outerjoin(LineaFactura, LineaFactura.linea_transaccional_id == LineaDocumentoTransaccional.id)
+        .where(
+            Descargo.paciente_id == paciente_id,
+            Descargo.factura_id.is_(None),
+            LineaDocumentoTransaccional.cantidad > 0,
+            LineaFactura.id.is_(None),
+        )
+    )
+
 class FacturaRepository:
     def __init__(self, db: Session):
         self.db = db
 
     def create_factura(self, factura_data, lineas_data):
+        # Factura, líneas y marca de los descargos en una sola transacción: o se
+        # confirma todo o nada queda facturado a medias
         factura = Factura(**factura_data)
         self.db.add(factura)
-        self.db.commit()
-        self.db.refresh(factura)
+        self.db.flush()
 
         for linea_data in lineas_data:
             # Clonacion de la linea factura
@@ -22,9 +74,84 @@ class FacturaRepository:
             
             self.db.add(linea_factura)
 
+        self.db.flush()
+        self.db.execute(marcar_descargos_facturados(factura.id))
+        ResumenPacienteRepository(self.db).actualizar([factura.paciente_id])
         self.db.commit()
         return factura
 
+    def crear_factura_desde_descargos(
+        self, paciente: Paciente, factura_data: dict, tasa_iva: float = TASA_IVA, enviar_correo: bool = False
+    ):
+        """
+        Factura todas las líneas pendientes del paciente en una transacción, sin
+        cargarlas en Python: totales con un agregado, líneas de factura con un único
+        INSERT ... SELECT, marca de los descargos y paso del paciente a facturado.
+        Con `enviar_correo` el correo al cliente se encola en la misma transacción.
+
+        Devuelve None (sin escribir nada) si no hay líneas que facturar. Si el estado
+        del paciente no admite facturar lanza ValueError y se deshace todo.
+        """
+        try:
+            # Bloquea y relee al paciente: dos facturaciones simultáneas (p. ej. un lote y
+            # el botón de la pantalla) no pueden tomar las mismas líneas, y la segunda ve
+            # el estado que dejó la primera
+            self.db.refresh(paciente, with_for_update=True)
+            paciente.get_estado()
+            paciente.registrar_factura()
+            lineas = consulta_lineas_facturables(paciente.id, tasa_iva).subquery()
+            cantidad, subtotal, impuesto = self.db.execute(
+                select(
+                    func.count(),
+                    func.coalesce(func.sum(lineas.c.subtotal), 0.0),
+                    func.coalesce(func.sum(lineas.c.iva), 0.0),
+                )
+            ).one()
+            if not cantidad:
+                self.db.rollback()
+                return None
+
+            factura = Factura(
+                **factura_data, subtotal=subtotal, impuesto=impuesto, total_general=subtotal + impuesto
+            )
+            self.db.add(factura)
+            self.db.flush()
+
+            self.db.execute(
+                insert(LineaFactura).from_select(
+                    ["linea_transaccional_id", "iva", "total_con_iva", "factura_id"],
+                    select(
+                        lineas.c.linea_transaccional_id, lineas.c.iva, lineas.c.total_con_iva, literal(factura.id)
+                    ).order_by(lineas.c.linea_transaccional_id)
+                )
+            )
+            self.db.execute(marcar_descargos_facturados(factura.id), execution_options={"synchronize_session": False})
+            ResumenPacienteRepository(self.db).actualizar([paciente.id])
+            if enviar_correo:
+                CorreoSalienteRepository(self.db).encolar_factura(factura.id)
+            self.db.commit()
+            return factura
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def firma_factura(self, factura_id: int):
+        """
+        Columnas que pueden cambiar en la respuesta de una factura emitida: su versión
+        y los datos del paciente y del cliente que se muestran (las líneas ya no cambian).
+        Una consulta por clave primaria, sin cargar líneas; None si no existe.
+        """
+        return self.db.execute(
+            select(
+                Factura.version,
+                Paciente.nombre_completo, Paciente.fecha_ingreso, Paciente.fecha_alta, Paciente.afeccion,
+                Cliente.nombre, Cliente.direccion, Cliente.telefono, Cliente.correo,
+            )
+            .outerjoin(Paciente, Paciente.id == Factura.paciente_id)
+            .outerjoin(Cliente, Cliente.id == Factura.cliente_id)
+            .where(Factura.id == factura_id)
+        ).first()
+
     def obtener_factura(self, factura_id: int):
         return self.db.query(Factura)\
             .options(
@@ -46,4 +173,79 @@ class FacturaRepository:
                 .joinedload(LineaFactura.linea_transaccional)
                 .joinedload(LineaDocumentoTransaccional.linea_descargo)
             )\
-            .all()
\ No newline at end of file
+            .all()
+
+    def listar_facturas_pagina(self, limite: int, cursor: str = None, **filtros):
+        """Facturas más recientes primero, paginadas por (fecha_emision, id)."""
+        stmt = select(Factura).options(
+            joinedload(Factura.paciente),
+            joinedload(Factura.cliente),
+            joinedload(Factura.lineas_factura)
+            .joinedload(LineaFactura.linea_transaccional)
+            .joinedload(LineaDocumentoTransaccional.linea_descargo)
+        )
+        return paginar(
+            self.db, self._filtrar(stmt, **filtros), (Factura.fecha_emision, Factura.id),
+            limite, cursor, descendente=True
+        )
+
+    def listar_resumen(self, limite: int, cursor: str = None, **filtros):
+        """
+        Proyección del listado: un select de columnas con los nombres de paciente y
+        cliente, sin líneas ni instancias ORM. Las filas van directo al serializador.
+        """
+        stmt = (
+            select(
+                Factura.id,
+                Factura.numero_factura,
+                Factura.fecha_emision,
+                Factura.subtotal,
+                Factura.total_general,
+                Factura.estado_pago,
+                Factura.paciente_id,
+                Paciente.nombre_completo.label("paciente_nombre"),
+                Paciente.fecha_ingreso.label("paciente_fecha_ingreso"),
+                Factura.cliente_id,
+                Cliente.nombre.label("cliente_nombre")
+            )
+            .outerjoin(Paciente, Paciente.id == Factura.paciente_id)
+            .outerjoin(Cliente, Cliente.id == Factura.cliente_id)
+        )
+        return paginar_filas(
+            self.db, self._filtrar(stmt, **filtros), (Factura.fecha_emision, Factura.id),
+            limite, cursor, descendente=True
+        )
+
+    def hay_facturas(self, **filtros) -> bool:
+        return self.db.scalar(select(self._filtrar(select(Factura.id), **filtros).exists())) or False
+
+    def facturas_para_exportar(self, tamano_lote: int = 500, **filtros):
+        """
+        (id, numero_factura, fecha_emision) en orden de emisión. Se leen por lotes con un
+        cursor del lado del servidor (yield_per): el resultado nunca está entero en memoria.
+        """
+        stmt = self._filtrar(
+            select(Factura.id, Factura.numero_factura, Factura.fecha_emision), **filtros
+        ).order_by(Factura.fecha_emision, Factura.id)
+        return self.db.execute(stmt, execution_options={"yield_per": tamano_lote})
+
+    @staticmethod
+    def _filtrar(
+        stmt,
+        estado_pago: str = None,
+        cliente_id: int = None,
+        paciente_id: int = None,
+        desde: datetime = None,
+        hasta: datetime = None
+    ):
+        if estado_pago:
+            stmt = stmt.where(Factura.estado_pago == estado_pago)
+        if cliente_id:
+            stmt = stmt.where(Factura.cliente_id == cliente_id)
+        if paciente_id:
+            stmt = stmt.where(Factura.paciente_id == paciente_id)
+        if desde:
+            stmt = stmt.where(Factura.fecha_emision >= desde)
+        if hasta:
+            stmt = stmt.where(Factura.fecha_emision <= hasta)
+        return stmt
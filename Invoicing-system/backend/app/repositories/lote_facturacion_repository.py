@@ -0,0 +1,128 @@
+from datetime import datetime
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+from app.models import Descargo, Factura, ItemLoteFacturacion, LoteFacturacion, Paciente
+
+ESTADOS_ITEM = ("pendiente", "facturado", "omitido", "fallido")
+# Ítems que una corrida (o su reanudación) todavía tiene que procesar
+ESTADOS_POR_PROCESAR = ("pendiente", "fallido")
+
+
+class LoteFacturacionRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def pacientes_facturables(self) -> list[int]:
+        """Pacientes de alta con algún descargo sin factura, en orden de id."""
+        return self.db.scalars(
+            select(Paciente.id)
+            .where(Paciente.estado == "alta")
+            .where(Paciente.descargos.any(Descargo.factura_id.is_(None)))
+            .order_by(Paciente.id)
+        ).all()
+
+    def crear(self, cliente_id, asignaciones: dict, workers: int) -> LoteFacturacion:
+        """
+        Crea el lote con un ítem por paciente facturable. El cliente de cada ítem sale de
+        `asignaciones` (paciente_id -> cliente_id) y, si no figura, del cliente por defecto.
+        """
+        lote = LoteFacturacion(cliente_id=cliente_id, workers=workers, estado="pendiente")
+        self.db.add(lote)
+        self.db.flush()
+        pacientes = self.pacientes_facturables()
+        if pacientes:
+            self.db.execute(insert(ItemLoteFacturacion), [
+                {
+                    "lote_id": lote.id, "paciente_id": paciente_id,
+                    "cliente_id": asignaciones.get(paciente_id, cliente_id),
+                    "estado": "pendiente", "intentos": 0,
+                }
+                for paciente_id in pacientes
+            ])
+        self.db.commit()
+        return lote
+
+    def obtener(self, lote_id: int):
+        return self.db.get(LoteFacturacion, lote_id)
+
+    def items_por_procesar(self, lote_id: int):
+        """(item_id, paciente_id, cliente_id) pendientes o fallidos del lote."""
+        return self.db.execute(
+            select(ItemLoteFacturacion.id, ItemLoteFacturacion.paciente_id, ItemLoteFacturacion.cliente_id)
+            .where(ItemLoteFacturacion.lote_id == lote_id)
+            .where(ItemLoteFacturacion.estado.in_(ESTADOS_POR_PROCESAR))
+            .order_by(ItemLoteFacturacion.id)
+        ).all()
+
+    def registrar_resultado(self, item_id: int, estado: str, factura_id: int = None, error: str = None):
+        self.db.execute(
+            update(ItemLoteFacturacion)
+            .where(ItemLoteFacturacion.id == item_id)
+            .values(
+                estado=estado, factura_id=factura_id, error=error,
+                intentos=ItemLoteFacturacion.intentos + 1, actualizado_en=datetime.utcnow()
+            )
+        )
+        self.db.commit()
+
+    def cambiar_estado(self, lote_id: int, estado: str):
+        valores = {"estado": estado}
+        if estado == "en_curso":
+            valores["iniciado_en"] = datetime.utcnow()
+        elif estado == "terminado":
+            valores["terminado_en"] = datetime.utcnow()
+        self.db.execute(update(LoteFacturacion).where(LoteFacturacion.id == lote_id).values(**valores))
+        self.db.commit()
+
+    def tomar_para_reanudar(self, lote_id: int, sin_actividad_desde: datetime) -> bool:
+        """
+        Pasa el lote a en curso si no lo está, o si lo está pero sin actividad (ni inicio
+        ni resultados de ítems) desde `sin_actividad_desde`: la corrida murió con su
+        proceso. Es un UPDATE condicional, así que dos reanudaciones a la vez no toman
+        el mismo lote. Devuelve si lo tomó.
+        """
+        actividad_reciente = (
+            select(ItemLoteFacturacion.id)
+            .where(ItemLoteFacturacion.lote_id == lote_id)
+            .where(ItemLoteFacturacion.actualizado_en >= sin_actividad_desde)
+            .exists()
+        )
+        filas = self.db.execute(
+            update(LoteFacturacion)
+            .where(LoteFacturacion.id == lote_id)
+            .where(or_(
+                LoteFacturacion.estado != "en_curso",
+                and_(LoteFacturacion.iniciado_en < sin_actividad_desde, ~actividad_reciente)
+            ))
+            .values(estado="en_curso", iniciado_en=datetime.utcnow()),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+        self.db.commit()
+        return filas == 1
+
+    def factura_previa(self, paciente_id: int):
+        """Factura más reciente del paciente si ya está facturado (otra corrida o la pantalla)."""
+        return self.db.scalar(
+            select(Factura.id)
+            .join(Paciente, Paciente.id == Factura.paciente_id)
+            .where(Factura.paciente_id == paciente_id, Paciente.estado == "facturado")
+            .order_by(Factura.fecha_emision.desc(), Factura.id.desc())
+            .limit(1)
+        )
+
+    def conteos(self, lote_id: int) -> dict:
+        conteos = dict.fromkeys(ESTADOS_ITEM, 0)
+        conteos.update(self.db.execute(
+            select(ItemLoteFacturacion.estado, func.count())
+            .where(ItemLoteFacturacion.lote_id == lote_id)
+            .group_by(ItemLoteFacturacion.estado)
+        ).all())
+        return conteos
+
+    def errores(self, lote_id: int):
+        return self.db.execute(
+            select(ItemLoteFacturacion.paciente_id, ItemLoteFacturacion.error)
+            .where(ItemLoteFacturacion.lote_id == lote_id)
+            .where(ItemLoteFacturacion.estado == "fallido")
+            .order_by(ItemLoteFacturacion.paciente_id)
+        ).all()
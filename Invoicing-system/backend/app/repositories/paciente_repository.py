@@ -1,20 +1,44 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app.models.paciente import Paciente
 from app.models.descargo import Descargo
 from app.models.linea_transaccional import LineaDocumentoTransaccional, LineaFactura, Factura
-from sqlalchemy import func
+from app.repositories.busqueda_pacientes import LIMITE_BUSQUEDA, BuscadorPacientes
+from app.repositories.paginacion import paginar
+from app.repositories.resumen_paciente_repository import ResumenPacienteRepository
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from datetime import datetime
+
+def consulta_listado_pacientes(estado: str = None, ingreso_desde: datetime = None, ingreso_hasta: datetime = None):
+    """Select filtrado del listado de pacientes, compartido con AsyncPacienteRepository."""
+    stmt = select(Paciente)
+    if estado:
+        stmt = stmt.where(Paciente.estado == estado)
+    if ingreso_desde:
+        stmt = stmt.where(Paciente.fecha_ingreso >= ingreso_desde)
+    if ingreso_hasta:
+        stmt = stmt.where(Paciente.fecha_ingreso <= ingreso_hasta)
+    return stmt
 
 class PacienteRepository:
     def __init__(self, db: Session):
         self.db = db
+        self.resumen = ResumenPacienteRepository(db)
 
     def obtener_por_id(self, paciente_id: int):
         return self.db.query(Paciente).filter(Paciente.id == paciente_id).first()
 
+    def obtener_por_ids(self, paciente_ids) -> dict:
+        if not paciente_ids:
+            return {}
+        pacientes = self.db.query(Paciente).filter(Paciente.id.in_(paciente_ids))
+        return {paciente.id: paciente for paciente in pacientes}
+
     def crear_paciente(self, paciente_data: dict):
         paciente = Paciente(**paciente_data)
         self.db.add(paciente)
+        self.db.flush()
+        self.resumen.actualizar([paciente.id])
         self.db.commit()
         self.db.refresh(paciente)
         return paciente
@@ -24,6 +48,7 @@ class PacienteRepository:
         if paciente:
             for key, value in paciente_data.items():
                 setattr(paciente, key, value)
+            self.resumen.actualizar([paciente_id])
             self.db.commit()
             self.db.refresh(paciente)
         return paciente
@@ -31,6 +56,7 @@ class PacienteRepository:
     def eliminar_paciente(self, paciente_id: int):
         paciente = self.obtener_por_id(paciente_id)
         if paciente:
+            self.resumen.eliminar(paciente_id)
             self.db.delete(paciente)
             self.db.commit()
         return paciente
@@ -40,6 +66,7 @@ class PacienteRepository:
         if paciente:
             try:
                 paciente.dar_alta()  # Delega al estado actual
+                self.resumen.actualizar([paciente_id])
                 self.db.commit()
                 self.db.refresh(paciente)
             except Exception as e:
@@ -52,6 +79,7 @@ class PacienteRepository:
         if paciente:
             try:
                 descargo = paciente.agregar_descargo(descargo_data)
+                self.resumen.actualizar([paciente_id])
                 self.db.commit()
                 self.db.refresh(paciente)
                 return descargo
@@ -67,6 +95,7 @@ class PacienteRepository:
                 factura = paciente.facturar(factura_data)
                 # Asegurarse de que SQLAlchemy detecte los cambios
                 self.db.add(paciente)  # Marca el objeto como "modificado"
+                self.resumen.actualizar([paciente_id])
                 self.db.commit()
                 print(f"Estado después de commit: {paciente.estado}")  # Depuración
                 self.db.refresh(paciente)
@@ -80,14 +109,19 @@ class PacienteRepository:
     def obtener_todos_pacientes(self):
         return self.db.query(Paciente).all()
 
-    def buscar_pacientes(self, search_term: str = None):
-        query = self.db.query(Paciente)
-        if search_term:
-            search_term = f"%{search_term}%"
-            query = query.filter(
-                (Paciente.nombre_completo.ilike(search_term))
-            )
-        return query.all()
+    def listar_pacientes(self, limite: int, cursor: str = None, **filtros):
+        return paginar(self.db, consulta_listado_pacientes(**filtros), (Paciente.id,), limite, cursor)
+
+    def buscar_pacientes(
+        self, search_term: str = None, limite: int = LIMITE_BUSQUEDA, modo: str = "contiene", estado: str = None
+    ):
+        # Sin término se conserva el comportamiento anterior: todos los pacientes
+        if not search_term or not search_term.strip():
+            query = self.db.query(Paciente)
+            if estado:
+                query = query.filter(Paciente.estado == estado)
+            return query.all()
+        return BuscadorPacientes(self.db).buscar(search_term, limite, modo, estado)
 
     def obtener_pacientes_internados(self):
         return self.db.query(Paciente).filter(Paciente.estado == "internado").all()
@@ -100,28 +134,35 @@ class PacienteRepository:
             .all()
         )
 
-    def obtener_pacientes_alta_con_descargos_no_facturados(self):
-        # Subconsulta para obtener descargos que están asociados a facturas
-        descargos_facturados = (
-            self.db.query(LineaDocumentoTransaccional.descargo_id)
-            .select_from(LineaDocumentoTransaccional)
-            .join(LineaFactura, LineaDocumentoTransaccional.id == LineaFactura.linea_transaccional_id)
-            .join(Factura, LineaFactura.factura_id == Factura.id)
-            .distinct()
-            .subquery()
+    def obtener_pacientes_internados_con_descargos(self):
+        """Internados con al menos un descargo, con descargos y líneas precargados."""
+        return (
+            self.db.query(Paciente)
+            .filter(Paciente.estado == "internado")
+            .filter(Paciente.descargos.any())
+            .options(*self._opciones_descargos_con_lineas())
+            .order_by(Paciente.id)
+            .all()
         )
 
-        # Consulta principal para obtener pacientes en estado "alta" con descargos no facturados
-        pacientes = (
+    def obtener_pacientes_alta_con_descargos_no_facturados(self):
+        # Pacientes en estado "alta" con algún descargo sin factura: la marca
+        # Descargo.factura_id se resuelve con el índice parcial de no facturados
+        return (
             self.db.query(Paciente)
-            .select_from(Paciente)
-            .join(Descargo, Paciente.id == Descargo.paciente_id)
             .filter(Paciente.estado == "alta")
-            .filter(~Descargo.id.in_(descargos_facturados))
-            .options(
-                joinedload(Paciente.descargos).joinedload(Descargo.lineas_transaccionales)
-            )
-            .distinct()
+            .filter(Paciente.descargos.any(Descargo.factura_id.is_(None)))
+            .options(*self._opciones_descargos_con_lineas())
+            .order_by(Paciente.id)
             .all()
         )
-        return pacientes
\ No newline at end of file
+
+    @staticmethod
+    def _opciones_descargos_con_lineas():
+        # selectinload: una consulta por nivel (descargos, líneas, líneas de descargo)
+        # con IN sobre los ids del nivel anterior, sin importar cuántos pacientes haya
+        return (
+            selectinload(Paciente.descargos)
+            .selectinload(Descargo.lineas_transaccionales)
+            .selectinload(LineaDocumentoTransaccional.linea_descargo),
+        )
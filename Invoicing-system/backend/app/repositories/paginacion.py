@@ -0,0 +1,88 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 500
+
+
+def codificar_cursor(valores: list) -> str:
+    """Cursor opaco con los valores de la clave de orden de la última fila devuelta."""
+    datos = [valor.isoformat() if isinstance(valor, (date, datetime)) else valor for valor in valores]
+    return base64.urlsafe_b64encode(json.dumps(datos).encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, columnas) -> list:
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(datos, list) or len(datos) != len(columnas):
+            raise ValueError
+        valores = []
+        for columna, valor in zip(columnas, datos):
+            tipo = columna.type.python_type
+            valores.append(tipo.fromisoformat(valor) if tipo in (date, datetime) else tipo(valor))
+        return valores
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+
+def consulta_pagina(stmt, columnas, limite: int, cursor: Optional[str] = None, descendente: bool = False):
+    """
+    Aplica paginación por keyset a un select: ordena por `columnas` (la última debe
+    ser única, normalmente el id) y continúa estrictamente después del cursor.
+
+    Pide una fila de más para saber si hay página siguiente sin un COUNT.
+    """
+    if cursor:
+        valores = decodificar_cursor(cursor, columnas)
+        clave = tuple_(*columnas) if len(columnas) > 1 else columnas[0]
+        limite_cursor = tuple_(*valores) if len(columnas) > 1 else valores[0]
+        stmt = stmt.where(clave < limite_cursor if descendente else clave > limite_cursor)
+    orden = [columna.desc() if descendente else columna.asc() for columna in columnas]
+    return stmt.order_by(*orden).limit(limite + 1)
+
+
+def armar_pagina(filas, columnas, limite: int) -> tuple[list, Optional[str]]:
+    """Recorta la fila extra de consulta_pagina y calcula el cursor siguiente."""
+    filas = list(filas)
+    if len(filas) <= limite:
+        return filas, None
+    filas = filas[:limite]
+    ultima = filas[-1]
+    return filas, codificar_cursor([getattr(ultima, columna.key) for columna in columnas])
+
+
+def paginar(db, stmt, columnas, limite: int, cursor: Optional[str] = None, descendente: bool = False):
+    """Versión síncrona completa: ejecuta la consulta y devuelve (items, next_cursor)."""
+    filas = db.scalars(consulta_pagina(stmt, columnas, limite, cursor, descendente)).unique().all()
+    return armar_pagina(filas, columnas, limite)
+
+
+def paginar_filas(db, stmt, columnas, limite: int, cursor: Optional[str] = None, descendente: bool = False):
+    """Como paginar, para selects de columnas (Core): devuelve Rows sin hidratar modelos."""
+    filas = db.execute(consulta_pagina(stmt, columnas, limite, cursor, descendente)).all()
+    return armar_pagina(filas, columnas, limite)
+
+
+def paginar_lista(items, limite: int, cursor: Optional[str] = None):
+    """
+    Keyset por id sobre una lista ya en memoria (snapshots del catálogo en caché),
+    con el mismo formato de cursor que las consultas.
+    """
+    if cursor:
+        try:
+            relleno = "=" * (-len(cursor) % 4)
+            (ultimo_id,) = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+            ultimo_id = int(ultimo_id)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+        items = [item for item in items if item.id > ultimo_id]
+    items = sorted(items, key=lambda item: item.id)[:limite + 1]
+    if len(items) <= limite:
+        return items, None
+    items = items[:limite]
+    return items, codificar_cursor([items[-1].id])
@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from app.models.producto import Producto, TipoProducto
 from app.schemas.servicio_producto_schema import ProductoCreate
+from app.repositories.catalogo_cache import productos_cache
+from app.repositories.paginacion import paginar_lista
 from app.services.factories.product_factory import ProductoFactoryManager
 
 class ProductoRepository:
@@ -13,6 +15,7 @@ class ProductoRepository:
         # Crear la instancia del producto usando la fábrica
         db_producto = factory.create_producto(producto)
         self.db.add(db_producto)
+        productos_cache.incrementar_version(self.db)
         self.db.commit()
         self.db.refresh(db_producto)
         return db_producto
@@ -20,14 +23,19 @@ class ProductoRepository:
     def obtener_por_id(self, producto_id: int):
         return self.db.query(Producto).filter(Producto.id == producto_id).first()
 
-    def listar_productos(self):
-        return self.db.query(Producto).all()
+    def listar_productos(self, tipo: TipoProducto = None):
+        return productos_cache.listar(self.db, tipo)
+
+    def listar_productos_pagina(self, limite: int, cursor: str = None, tipo: TipoProducto = None):
+        # El listado sale del snapshot en caché; se pagina en memoria por id
+        return paginar_lista(productos_cache.listar(self.db, tipo), limite, cursor)
 
     def actualizar_producto(self, producto_id: int, producto_data: dict):
         producto = self.obtener_por_id(producto_id)
         if producto:
             for key, value in producto_data.items():
                 setattr(producto, key, value)
+            productos_cache.incrementar_version(self.db)
             self.db.commit()
             self.db.refresh(producto)
         return producto
@@ -36,5 +44,6 @@ class ProductoRepository:
         producto = self.obtener_por_id(producto_id)
         if producto:
             self.db.delete(producto)
+            productos_cache.incrementar_version(self.db)
             self.db.commit()
         return producto
\ No newline at end of file
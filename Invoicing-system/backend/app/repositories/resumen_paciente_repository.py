@@ -0,0 +1,78 @@
+from datetime import datetime
+from sqlalchemy import DateTime, case, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+from app.models import Descargo, Paciente, ResumenPaciente
+
+_COLUMNAS = (
+    "paciente_id", "nombre_completo", "estado", "fecha_ingreso", "fecha_alta",
+    "cantidad_descargos", "total_descargos", "ultimo_descargo_en",
+    "descargos_no_facturados", "total_no_facturado", "actualizado_en",
+)
+
+
+def consulta_resumen():
+    """Select que calcula el resumen de cada paciente desde las tablas normalizadas."""
+    no_facturado = Descargo.id.isnot(None) & Descargo.factura_id.is_(None)
+    return (
+        select(
+            Paciente.id,
+            Paciente.nombre_completo,
+            func.coalesce(Paciente.estado, "internado"),
+            Paciente.fecha_ingreso,
+            Paciente.fecha_alta,
+            func.count(Descargo.id),
+            func.coalesce(func.sum(Descargo.total), 0.0),
+            func.max(Descargo.fecha),
+            func.coalesce(func.sum(case((no_facturado, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((no_facturado, Descargo.total), else_=0.0)), 0.0),
+            literal(datetime.utcnow(), DateTime),
+        )
+        .outerjoin(Descargo, Descargo.paciente_id == Paciente.id)
+        .group_by(Paciente.id, Paciente.nombre_completo, Paciente.estado, Paciente.fecha_ingreso, Paciente.fecha_alta)
+    )
+
+
+class ResumenPacienteRepository:
+    """
+    Mantiene y consulta la proyección resumen_pacientes.
+
+    Los caminos de escritura (pacientes, descargos, facturas) llaman a `actualizar`
+    con los pacientes afectados antes de su commit: la fila se recalcula desde las
+    tablas normalizadas dentro de la misma transacción, así que la proyección nunca
+    queda por delante ni por detrás de los datos confirmados.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def actualizar(self, paciente_ids):
+        ids = sorted({paciente_id for paciente_id in paciente_ids if paciente_id is not None})
+        if not ids:
+            return
+        self.db.flush()
+        # Bloquear los pacientes (en orden de id) serializa los recálculos concurrentes
+        # del mismo paciente; en SQLite la escritura ya es exclusiva
+        self.db.execute(select(Paciente.id).where(Paciente.id.in_(ids)).order_by(Paciente.id).with_for_update())
+        self.db.execute(delete(ResumenPaciente).where(ResumenPaciente.paciente_id.in_(ids)))
+        self.db.execute(
+            insert(ResumenPaciente).from_select(_COLUMNAS, consulta_resumen().where(Paciente.id.in_(ids)))
+        )
+
+    def eliminar(self, paciente_id: int):
+        self.db.execute(delete(ResumenPaciente).where(ResumenPaciente.paciente_id == paciente_id))
+
+    def reconstruir(self) -> int:
+        """Regenera la proyección completa; devuelve cuántas filas quedaron."""
+        self.db.execute(delete(ResumenPaciente))
+        self.db.execute(insert(ResumenPaciente).from_select(_COLUMNAS, consulta_resumen()))
+        return self.db.scalar(select(func.count()).select_from(ResumenPaciente))
+
+    def listar(self, estado: str = None, con_descargos: bool = False, no_facturados: bool = False):
+        stmt = select(ResumenPaciente)
+        if estado:
+            stmt = stmt.where(ResumenPaciente.estado == estado)
+        if con_descargos:
+            stmt = stmt.where(ResumenPaciente.cantidad_descargos > 0)
+        if no_facturados:
+            stmt = stmt.where(ResumenPaciente.descargos_no_facturados > 0)
+        return self.db.scalars(stmt.order_by(ResumenPaciente.paciente_id)).all()
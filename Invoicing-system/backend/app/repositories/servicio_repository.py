@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from app.models.servicio import Servicio, TipoServicio
 from app.schemas.servicio_producto_schema import ServicioCreate
+from app.repositories.catalogo_cache import servicios_cache
+from app.repositories.paginacion import paginar_lista
 from app.services.factories.service_factory import ServicioFactoryManager
 
 class ServicioRepository:
@@ -13,6 +15,7 @@ class ServicioRepository:
         # Crear la instancia del servicio usando la fábrica
         db_servicio = factory.create_servicio(servicio)
         self.db.add(db_servicio)
+        servicios_cache.incrementar_version(self.db)
         self.db.commit()
         self.db.refresh(db_servicio)
         return db_servicio
@@ -20,14 +23,19 @@ class ServicioRepository:
     def obtener_por_id(self, servicio_id: int):
         return self.db.query(Servicio).filter(Servicio.id == servicio_id).first()
 
-    def listar_servicios(self):
-        return self.db.query(Servicio).all()
+    def listar_servicios(self, tipo: TipoServicio = None):
+        return servicios_cache.listar(self.db, tipo)
+
+    def listar_servicios_pagina(self, limite: int, cursor: str = None, tipo: TipoServicio = None):
+        # El listado sale del snapshot en caché; se pagina en memoria por id
+        return paginar_lista(servicios_cache.listar(self.db, tipo), limite, cursor)
 
     def actualizar_servicio(self, servicio_id: int, servicio_data: dict):
         servicio = self.obtener_por_id(servicio_id)
         if servicio:
             for key, value in servicio_data.items():
                 setattr(servicio, key, value)
+            servicios_cache.incrementar_version(self.db)
             self.db.commit()
             self.db.refresh(servicio)
         return servicio
@@ -36,5 +44,6 @@ class ServicioRepository:
         servicio = self.obtener_por_id(servicio_id)
         if servicio:
             self.db.delete(servicio)
+            servicios_cache.incrementar_version(self.db)
             self.db.commit()
         return servicio
\ No newline at end of file
@@ -0,0 +1,105 @@
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.models import Factura, TrabajoPDF
+
+MAXIMO_INTENTOS = 3
+
+
+class TrabajoPDFRepository:
+    """
+    Cola de renderizado sobre la tabla trabajos_pdf. Un worker reclama un trabajo con
+    un UPDATE condicionado a estado = 'pendiente': si otro worker (o proceso) lo tomó
+    antes, el UPDATE no afecta filas y se prueba con el siguiente.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def encolar(self, factura_id: int):
+        trabajo = self.db.scalar(select(TrabajoPDF).where(TrabajoPDF.factura_id == factura_id))
+        if trabajo is None:
+            self.db.add(TrabajoPDF(factura_id=factura_id, estado="pendiente"))
+        elif trabajo.estado == "fallido":
+            trabajo.estado = "pendiente"
+            trabajo.intentos = 0
+        self.db.commit()
+
+    def reclamar(self):
+        """Toma el trabajo pendiente más antiguo; devuelve (id, factura_id) o None."""
+        while True:
+            candidato = self.db.execute(
+                select(TrabajoPDF.id, TrabajoPDF.factura_id)
+                .where(TrabajoPDF.estado == "pendiente")
+                .order_by(TrabajoPDF.id)
+                .limit(1)
+            ).first()
+            if candidato is None:
+                self.db.rollback()
+                return None
+            tomado = self.db.execute(
+                update(TrabajoPDF)
+                .where(TrabajoPDF.id == candidato.id, TrabajoPDF.estado == "pendiente")
+                .values(estado="en_curso", iniciado_en=datetime.utcnow(), intentos=TrabajoPDF.intentos + 1)
+            ).rowcount
+            self.db.commit()
+            if tomado:
+                return candidato
+
+    def completar(self, trabajo_id: int, sha256: str, etag_factura: str):
+        self.db.execute(
+            update(TrabajoPDF)
+            .where(TrabajoPDF.id == trabajo_id)
+            .values(
+                estado="listo", sha256=sha256, etag_factura=etag_factura, error=None,
+                terminado_en=datetime.utcnow()
+            )
+        )
+        self.db.commit()
+
+    def fallar(self, trabajo_id: int, error: str):
+        """Vuelve a pendiente hasta MAXIMO_INTENTOS; después queda fallido."""
+        intentos = self.db.scalar(select(TrabajoPDF.intentos).where(TrabajoPDF.id == trabajo_id)) or 0
+        self.db.execute(
+            update(TrabajoPDF)
+            .where(TrabajoPDF.id == trabajo_id)
+            .values(
+                estado="pendiente" if intentos < MAXIMO_INTENTOS else "fallido",
+                error=error[:1000], terminado_en=datetime.utcnow()
+            )
+        )
+        self.db.commit()
+
+    def recuperar_atascados(self, iniciados_antes_de: datetime) -> int:
+        """Devuelve a pendiente los trabajos en curso de un worker que murió (p. ej. un reinicio)."""
+        filas = self.db.execute(
+            update(TrabajoPDF)
+            .where(TrabajoPDF.estado == "en_curso", TrabajoPDF.iniciado_en < iniciados_antes_de)
+            .values(estado="pendiente")
+        ).rowcount
+        self.db.commit()
+        return filas
+
+    def obtener_pdf(self, factura_id: int):
+        """
+        (numero_factura, sha256 y etag_factura del PDF listo, o None); None si la
+        factura no existe.
+        """
+        return self.db.execute(
+            select(Factura.numero_factura, TrabajoPDF.sha256, TrabajoPDF.etag_factura)
+            .outerjoin(TrabajoPDF, (TrabajoPDF.factura_id == Factura.id) & (TrabajoPDF.estado == "listo"))
+            .where(Factura.id == factura_id)
+        ).first()
+
+    def registrar_pdf(self, factura_id: int, sha256: str, etag_factura: str):
+        """Guarda el resultado de un renderizado bajo demanda."""
+        trabajo = self.db.scalar(select(TrabajoPDF).where(TrabajoPDF.factura_id == factura_id))
+        if trabajo is None:
+            trabajo = TrabajoPDF(factura_id=factura_id, intentos=0)
+            self.db.add(trabajo)
+        trabajo.sha256 = sha256
+        trabajo.etag_factura = etag_factura
+        trabajo.estado = "listo"
+        trabajo.error = None
+        trabajo.terminado_en = datetime.utcnow()
+        self.db.commit()
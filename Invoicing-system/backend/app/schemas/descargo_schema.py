@@ -16,6 +16,10 @@ class LineaDescargoCreate(BaseModel):
                 raise ValueError("Solo se permite servicio O producto, no ambos")
         return v
 
+class FilaCargaDescargo(LineaDescargoCreate):
+    """Fila de una carga masiva: una línea de descargo con su paciente."""
+    paciente_id: int
+
 class DescargoCreate(BaseModel):
     paciente_id: int
     lineas: List[LineaDescargoCreate] = Field(..., min_items=1)
@@ -42,4 +46,17 @@ class PacienteConDescargosSimpleResponse(PacienteResponse):
     descargos: List[DescargoResponse] = []
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ResultadoFilaCarga(BaseModel):
+    fila: int
+    aceptada: bool
+    paciente_id: Optional[int] = None
+    descargo_id: Optional[int] = None
+    error: Optional[str] = None
+
+class ReporteCargaDescargos(BaseModel):
+    filas_aceptadas: int = 0
+    filas_rechazadas: int = 0
+    descargos_creados: int = 0
+    filas: List[ResultadoFilaCarga] = []
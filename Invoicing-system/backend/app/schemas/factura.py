@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class LineaFacturaResponse(BaseModel):
     descripcion: str
@@ -73,4 +73,46 @@ class FacturaResponse(BaseModel):
                     }
                 ]
             }
-        }
\ No newline at end of file
+        }
+
+class FacturaResumen(BaseModel):
+    """Fila del listado de facturas: solo las columnas que muestra la página de facturas."""
+    id: int
+    numero_factura: Optional[str] = None
+    fecha_emision: Optional[datetime] = None
+    subtotal: Optional[float] = None
+    total_general: Optional[float] = None
+    estado_pago: Optional[str] = None
+    paciente_id: Optional[int] = None
+    paciente_nombre: Optional[str] = None
+    paciente_fecha_ingreso: Optional[datetime] = None
+    cliente_id: Optional[int] = None
+    cliente_nombre: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class LoteFacturacionCrear(BaseModel):
+    """Regla de cliente del lote: asignación explícita por paciente y, si no hay, `cliente_id`."""
+    cliente_id: Optional[int] = None
+    asignaciones: Dict[int, int] = {}
+    workers: Optional[int] = None
+
+class ErrorLoteFacturacion(BaseModel):
+    paciente_id: int
+    error: Optional[str] = None
+
+class LoteFacturacionProgreso(BaseModel):
+    id: int
+    estado: str
+    workers: int
+    total: int
+    pendiente: int
+    facturado: int
+    omitido: int
+    fallido: int
+    creado_en: datetime
+    iniciado_en: Optional[datetime] = None
+    terminado_en: Optional[datetime] = None
+    errores: List[ErrorLoteFacturacion] = []
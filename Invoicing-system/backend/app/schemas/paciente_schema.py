@@ -47,4 +47,18 @@ class PacienteConDescargosResponse(BaseModel):
     estado: Optional[str] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+class ResumenPacienteResponse(BaseModel):
+    id: int = Field(..., validation_alias="paciente_id")
+    nombre_completo: str
+    estado: str
+    fecha_ingreso: Optional[datetime] = None
+    fecha_alta: Optional[datetime] = None
+    cantidad_descargos: int
+    total_descargos: float
+    ultimo_descargo_en: Optional[datetime] = None
+    descargos_no_facturados: int
+    total_no_facturado: float
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,29 @@
+from typing import Generic, List, Optional, TypeVar
+from fastapi import Query
+from pydantic import BaseModel
+from app.repositories.paginacion import LIMITE_MAXIMO, LIMITE_POR_DEFECTO
+
+T = TypeVar("T")
+
+class Pagina(BaseModel, Generic[T]):
+    """Página de un listado con paginación por keyset; next_cursor es None en la última."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+    limite: int
+
+
+class ParametrosPagina:
+    """Dependencia con los parámetros de paginación comunes a los listados."""
+
+    def __init__(
+        self,
+        limit: int = Query(LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+        cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+        completo: bool = Query(
+            False,
+            description="Devuelve la lista completa sin paginar (formato anterior, para el frontend actual)"
+        )
+    ):
+        self.limite = limit
+        self.cursor = cursor
+        self.completo = completo
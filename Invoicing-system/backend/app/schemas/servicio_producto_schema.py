@@ -8,6 +8,7 @@ class TipoServicioEnum(str, Enum):
     examen_laboratorio = "examen_laboratorio"
     suministro_medicamento = "suministro_medicamento"
     procedimiento_medico = "procedimiento_medico"
+    imagen_rayos_x = "imagen_rayos_x"
 
 class TipoProductoEnum(str, Enum):
     medicamentos = "medicamentos"
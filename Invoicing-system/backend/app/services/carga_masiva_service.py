@@ -0,0 +1,214 @@
+import csv
+import json
+from typing import AsyncIterator, Optional
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from app.repositories.descargo_repository import DescargoRepository
+from app.repositories.paciente_repository import PacienteRepository
+from app.schemas.descargo_schema import FilaCargaDescargo
+
+TAMANO_LOTE = 500
+
+FORMATOS = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+COLUMNAS_CSV = ("paciente_id", "servicio_id", "producto_id", "cantidad")
+
+
+def formato_desde_content_type(content_type: Optional[str]) -> str:
+    """Determina el formato de la carga a partir de la cabecera Content-Type."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    formato = FORMATOS.get(media_type)
+    if not formato:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Formato no soportado: use {', '.join(FORMATOS)}"
+        )
+    return formato
+
+
+async def iterar_lineas(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Corta el cuerpo por fragmentos y produce una línea a la vez, todavía en bytes.
+
+    En UTF-8 el byte del salto de línea nunca forma parte de otro carácter, así que se
+    puede cortar antes de decodificar; cada línea se decodifica por separado y un byte
+    inválido solo invalida su línea.
+    """
+    pendiente = b""
+    async for chunk in chunks:
+        pendiente += chunk
+        *lineas, pendiente = pendiente.split(b"\n")
+        for linea in lineas:
+            yield linea.rstrip(b"\r")
+    if pendiente:
+        yield pendiente.rstrip(b"\r")
+
+
+class ParserFilas:
+    """Convierte cada línea NDJSON o CSV en un dict de campos; None para líneas sin datos."""
+
+    def __init__(self, formato: str):
+        self.formato = formato
+        self.columnas = None
+
+    def parsear(self, texto: str) -> Optional[dict]:
+        if not texto.strip():
+            return None
+        if self.formato == "ndjson":
+            datos = json.loads(texto)
+            if not isinstance(datos, dict):
+                raise ValueError("Cada línea NDJSON debe ser un objeto")
+            return datos
+
+        valores = next(csv.reader([texto]))
+        if self.columnas is None:
+            # La primera línea con datos es la cabecera
+            self.columnas = [valor.strip() for valor in valores]
+            faltantes = {"paciente_id", "cantidad"} - set(self.columnas)
+            if faltantes:
+                raise ValueError(f"Cabecera CSV sin columnas: {', '.join(sorted(faltantes))}")
+            return None
+        if len(valores) != len(self.columnas):
+            raise ValueError(f"Se esperaban {len(self.columnas)} columnas y llegaron {len(valores)}")
+        return {
+            columna: (valor.strip() or None)
+            for columna, valor in zip(self.columnas, valores)
+            if columna in COLUMNAS_CSV
+        }
+
+
+def _id_o_none(valor) -> Optional[int]:
+    """El paciente_id crudo de una fila inválida, solo si es un entero (el reporte es Optional[int])."""
+    try:
+        return int(str(valor))
+    except ValueError:
+        return None
+
+
+def _rechazo(numero: int, error: str, paciente_id: Optional[int] = None) -> dict:
+    return {"fila": numero, "aceptada": False, "paciente_id": paciente_id, "descargo_id": None, "error": error}
+
+
+class CargaMasivaDescargosService:
+    """
+    Ingesta masiva de líneas de descargo (archivos nocturnos de farmacia y laboratorio).
+
+    El cuerpo se lee de forma incremental y se escribe en lotes de tamaño fijo: en
+    memoria solo vive el lote en curso. Dentro de cada lote las filas se agrupan por
+    paciente y se crea un descargo por paciente. Con `solo_rechazos` el reporte solo
+    detalla las filas rechazadas (las aceptadas se cuentan), y la memoria no crece
+    con el tamaño del archivo.
+    """
+
+    def __init__(self, db, tamano_lote: int = TAMANO_LOTE, solo_rechazos: bool = False):
+        self.db = db
+        self.tamano_lote = tamano_lote
+        self.solo_rechazos = solo_rechazos
+        self.descargo_repo = DescargoRepository(db)
+        self.paciente_repo = PacienteRepository(db)
+
+    async def procesar(self, chunks: AsyncIterator[bytes], formato: str) -> dict:
+        parser = ParserFilas(formato)
+        reporte = {"filas_aceptadas": 0, "filas_rechazadas": 0, "descargos_creados": 0, "filas": []}
+        lote = []
+        numero = 0
+
+        async for linea in iterar_lineas(chunks):
+            numero += 1
+            try:
+                datos = parser.parsear(linea.decode("utf-8"))
+            except UnicodeDecodeError as e:
+                mensaje = f"La línea no es UTF-8 válido: {e.reason} en el byte {e.start}"
+                self._registrar(reporte, [_rechazo(numero, mensaje)])
+                continue
+            except (ValueError, csv.Error) as e:
+                # csv.Error: p. ej. un byte NUL en la línea
+                self._registrar(reporte, [_rechazo(numero, str(e))])
+                continue
+            if datos is None:
+                continue
+
+            lote.append((numero, datos))
+            if len(lote) >= self.tamano_lote:
+                self._registrar(reporte, await run_in_threadpool(self.escribir_lote, lote))
+                lote = []
+
+        if lote:
+            self._registrar(reporte, await run_in_threadpool(self.escribir_lote, lote))
+        return reporte
+
+    def escribir_lote(self, lote: list[tuple[int, dict]]) -> list[dict]:
+        """Valida y escribe un lote en una sola transacción; devuelve el resultado por fila."""
+        resultados = {}
+        filas = []
+        for numero, datos in lote:
+            try:
+                filas.append((numero, FilaCargaDescargo(**datos)))
+            except ValidationError as e:
+                mensajes = "; ".join(error["msg"] for error in e.errors())
+                resultados[numero] = _rechazo(numero, mensajes, _id_o_none(datos.get("paciente_id")))
+
+        pacientes = self.paciente_repo.obtener_por_ids({fila.paciente_id for _, fila in filas})
+        servicios, productos = self.descargo_repo.cargar_catalogo([fila for _, fila in filas])
+
+        grupos = {}
+        for numero, fila in filas:
+            paciente = pacientes.get(fila.paciente_id)
+            if not paciente:
+                resultados[numero] = _rechazo(numero, "Paciente no encontrado", fila.paciente_id)
+                continue
+            try:
+                paciente.validar_descargo()
+                precio, descripcion = self.descargo_repo.resolver_item(fila, servicios, productos)
+            except ValueError as e:
+                resultados[numero] = _rechazo(numero, str(e), fila.paciente_id)
+                continue
+            except HTTPException as e:
+                resultados[numero] = _rechazo(numero, e.detail, fila.paciente_id)
+                continue
+            grupos.setdefault(fila.paciente_id, []).append((numero, fila, descripcion, precio * fila.cantidad))
+
+        if grupos:
+            try:
+                descargo_ids = self.descargo_repo.crear_descargos_en_lote({
+                    paciente_id: [(fila, descripcion, subtotal) for _, fila, descripcion, subtotal in items]
+                    for paciente_id, items in grupos.items()
+                })
+            except Exception as e:
+                self.db.rollback()
+                descargo_ids = {}
+                for paciente_id, items in grupos.items():
+                    for numero, _, _, _ in items:
+                        resultados[numero] = _rechazo(numero, f"Error al escribir el lote: {str(e)}", paciente_id)
+
+            for paciente_id, descargo_id in descargo_ids.items():
+                for numero, _, _, _ in grupos[paciente_id]:
+                    resultados[numero] = {
+                        "fila": numero,
+                        "aceptada": True,
+                        "paciente_id": paciente_id,
+                        "descargo_id": descargo_id,
+                        "error": None
+                    }
+
+        return [resultados[numero] for numero, _ in lote]
+
+    def _registrar(self, reporte: dict, resultados: list[dict]):
+        descargos = set()
+        for resultado in resultados:
+            if resultado["aceptada"]:
+                reporte["filas_aceptadas"] += 1
+                descargos.add(resultado["descargo_id"])
+            else:
+                reporte["filas_rechazadas"] += 1
+        reporte["descargos_creados"] += len(descargos)
+        if self.solo_rechazos:
+            reporte["filas"].extend(resultado for resultado in resultados if not resultado["aceptada"])
+        else:
+            reporte["filas"].extend(resultados)
@@ -16,6 +16,10 @@ class ClienteService:
     def list_clientes(self) -> list[Cliente]:
         return self.repo.list()
 
+    def list_clientes_page(self, limite: int, cursor: str = None, **filtros) -> dict:
+        items, next_cursor = self.repo.list_page(limite, cursor, **filtros)
+        return {"items": items, "next_cursor": next_cursor, "limite": limite}
+
     def update_cliente(self, cliente_id: int, cliente_data: ClienteUpdate) -> Cliente | None:
         return self.repo.update(cliente_id, cliente_data)
 
@@ -0,0 +1,176 @@
+"""
+Renderizado de PDFs de facturas en segundo plano y caché en disco.
+
+Al emitir una factura se encola un trabajo en trabajos_pdf; los workers de ColaPDF
+(hilos de este proceso, arrancados en el lifespan) lo renderizan y guardan el PDF en
+el AlmacenPDF. La descarga sirve el archivo cacheado y solo renderiza si falta o si
+la factura cambió desde que se renderizó.
+La tabla es la cola: lo pendiente sobrevive a un reinicio y lo toma cualquier
+proceso con workers activos.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.core.almacen_pdf import AlmacenPDF
+from app.core.config import settings
+from app.repositories.trabajo_pdf_repository import TrabajoPDFRepository
+from app.services.pdf_service import PDFService
+
+# Un trabajo en curso por más tiempo que esto se considera de un worker muerto
+TIEMPO_MAXIMO_RENDER = timedelta(minutes=10)
+INTERVALO_SONDEO = 5.0
+
+_almacen = None
+
+
+def obtener_almacen() -> AlmacenPDF:
+    global _almacen
+    if _almacen is None:
+        _almacen = AlmacenPDF(settings.PDF_CACHE_DIR)
+    return _almacen
+
+
+class FacturaPDFService:
+    def __init__(self, db: Session, almacen: AlmacenPDF = None):
+        self.db = db
+        self.repo = TrabajoPDFRepository(db)
+        self.almacen = almacen or obtener_almacen()
+
+    def renderizar(self, factura_id: int):
+        """
+        Devuelve (factura_data, bytes del PDF, ETag de la factura). El ETag se lee antes
+        que los datos: si la factura cambia en medio, el PDF queda con el ETag viejo y
+        se vuelve a renderizar en la próxima descarga.
+        """
+        from app.services.factura_service import FacturaService
+
+        servicio = FacturaService(self.db)
+        etag_factura = servicio.etag_factura(factura_id)
+        factura_data = servicio.obtener_factura(factura_id)
+        return factura_data, PDFService.renderizar(factura_data), etag_factura
+
+    def obtener_pdf(self, factura_id: int):
+        """
+        (ruta, número de factura, sha256) del PDF. Si no está en la caché (trabajo aún
+        pendiente, fallido, archivo borrado o factura modificada desde que se renderizó)
+        lo renderiza ahora y lo deja cacheado.
+        """
+        from app.services.factura_service import FacturaService
+
+        fila = self.repo.obtener_pdf(factura_id)
+        if fila is None:
+            raise HTTPException(status_code=404, detail="Factura no encontrada")
+        numero_factura, sha256, etag_guardado = fila
+        vigente = (
+            self.almacen.existe(sha256)
+            and etag_guardado == FacturaService(self.db).etag_factura(factura_id)
+        )
+        if not vigente:
+            _, contenido, etag_factura = self.renderizar(factura_id)
+            sha256 = self.almacen.guardar(contenido)
+            self.repo.registrar_pdf(factura_id, sha256, etag_factura)
+        return self.almacen.ruta(sha256), numero_factura, sha256
+
+
+class ColaPDF:
+    """Pool de hilos que consume trabajos_pdf; cada trabajo usa su propia sesión."""
+
+    def __init__(self, session_factory, almacen: AlmacenPDF, workers: int, intervalo: float = INTERVALO_SONDEO):
+        self.session_factory = session_factory
+        self.almacen = almacen
+        self.workers = workers
+        self.intervalo = intervalo
+        self._hay_trabajo = threading.Event()
+        self._detener = threading.Event()
+        self._hilos = []
+
+    def iniciar(self):
+        db = self.session_factory()
+        try:
+            TrabajoPDFRepository(db).recuperar_atascados(datetime.utcnow() - TIEMPO_MAXIMO_RENDER)
+        finally:
+            db.close()
+        for numero in range(self.workers):
+            hilo = threading.Thread(target=self._bucle, name=f"pdf-{numero}", daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+
+    def detener(self, timeout: float = 10.0):
+        self._detener.set()
+        self._hay_trabajo.set()
+        for hilo in self._hilos:
+            hilo.join(timeout)
+        self._hilos = []
+
+    def despertar(self):
+        self._hay_trabajo.set()
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            try:
+                procesado = self.procesar_uno()
+            except Exception as e:
+                print(f"Error en la cola de PDFs: {e}")
+                procesado = False
+            if not procesado:
+                # Sin trabajo: esperar un aviso de encolar() o sondear por los de otros procesos
+                self._hay_trabajo.wait(self.intervalo)
+                self._hay_trabajo.clear()
+
+    def procesar_uno(self) -> bool:
+        """Renderiza un trabajo pendiente; False si no había ninguno."""
+        db = self.session_factory()
+        repo = TrabajoPDFRepository(db)
+        try:
+            trabajo = repo.reclamar()
+            if trabajo is None:
+                return False
+            try:
+                _, contenido, etag_factura = FacturaPDFService(db, self.almacen).renderizar(trabajo.factura_id)
+                sha256 = self.almacen.guardar(contenido)
+                repo.completar(trabajo.id, sha256, etag_factura)
+            except Exception as e:
+                db.rollback()
+                repo.fallar(trabajo.id, getattr(e, "detail", None) or str(e))
+            return True
+        finally:
+            db.close()
+
+    def drenar(self, timeout: float = 60.0):
+        """Procesa en este hilo hasta vaciar la cola (CLI, tests y benchmarks)."""
+        limite = time.monotonic() + timeout
+        while time.monotonic() < limite and self.procesar_uno():
+            pass
+
+
+_cola = None
+
+
+def iniciar_cola(session_factory=None, workers: int = None):
+    """Arranca los workers del proceso (lifespan). Con 0 workers solo se renderiza bajo demanda."""
+    global _cola
+    workers = settings.PDF_WORKERS if workers is None else workers
+    if workers <= 0 or _cola is not None:
+        return _cola
+    if session_factory is None:
+        from app.core.database import get_sessionmaker
+        session_factory = get_sessionmaker()
+    _cola = ColaPDF(session_factory, obtener_almacen(), workers)
+    _cola.iniciar()
+    return _cola
+
+
+def detener_cola():
+    global _cola
+    if _cola is not None:
+        _cola.detener()
+        _cola = None
+
+
+def encolar_pdf(db: Session, factura_id: int):
+    """Encola el renderizado de la factura y avisa a los workers de este proceso."""
+    TrabajoPDFRepository(db).encolar(factura_id)
+    if _cola is not None:
+        _cola.despertar()
@@ -0,0 +1,91 @@
+"""
+Verificación de la marca Descargo.factura_id contra las líneas realmente facturadas.
+
+La marca la mantiene FacturaRepository al crear la factura; este chequeo detecta descargos
+con líneas facturadas y sin marca, o marcados con una factura que no contiene ninguna
+de sus líneas (por ejemplo, tras editar facturas a mano en la base).
+
+Uso (desde backend/):
+    python -m app.services.consistencia_facturacion
+    python -m app.services.consistencia_facturacion --corregir
+"""
+import argparse
+import sys
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.orm import Session
+from app.models import Descargo, LineaDocumentoTransaccional, LineaFactura
+from app.repositories.resumen_paciente_repository import ResumenPacienteRepository
+
+
+def _factura_segun_lineas():
+    """Primera factura que incluye alguna línea del descargo (NULL si ninguna)."""
+    return (
+        select(func.min(LineaFactura.factura_id))
+        .join(LineaDocumentoTransaccional, LineaDocumentoTransaccional.id == LineaFactura.linea_transaccional_id)
+        .where(LineaDocumentoTransaccional.descargo_id == Descargo.id)
+        .scalar_subquery()
+    )
+
+
+def _condiciones_inconsistencia():
+    linea_en_factura_marcada = (
+        select(LineaFactura.id)
+        .join(LineaDocumentoTransaccional, LineaDocumentoTransaccional.id == LineaFactura.linea_transaccional_id)
+        .where(LineaDocumentoTransaccional.descargo_id == Descargo.id)
+        .where(LineaFactura.factura_id == Descargo.factura_id)
+    )
+    return {
+        "sin_marca": (Descargo.factura_id.is_(None), _factura_segun_lineas().isnot(None)),
+        "marca_invalida": (Descargo.factura_id.isnot(None), ~exists(linea_en_factura_marcada)),
+    }
+
+
+def verificar_marcas_facturacion(db: Session, corregir: bool = False) -> dict:
+    """
+    Devuelve {"sin_marca": [ids], "marca_invalida": [ids]}. Con `corregir`, asigna a
+    esos descargos la factura que indican sus líneas (o NULL), recalcula el resumen de
+    sus pacientes (lo no facturado sale de la marca) y confirma.
+    """
+    resultado = {}
+    for tipo, condiciones in _condiciones_inconsistencia().items():
+        resultado[tipo] = db.scalars(select(Descargo.id).where(*condiciones).order_by(Descargo.id)).all()
+
+    if corregir and any(resultado.values()):
+        corregidos = [descargo_id for ids in resultado.values() for descargo_id in ids]
+        paciente_ids = db.scalars(
+            select(Descargo.paciente_id).where(Descargo.id.in_(corregidos)).distinct()
+        ).all()
+        for tipo, condiciones in _condiciones_inconsistencia().items():
+            if resultado[tipo]:
+                db.execute(
+                    update(Descargo).where(*condiciones).values(factura_id=_factura_segun_lineas()),
+                    execution_options={"synchronize_session": False}
+                )
+        ResumenPacienteRepository(db).actualizar(paciente_ids)
+        db.commit()
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corregir", action="store_true", help="corrige las marcas inconsistentes")
+    args = parser.parse_args(argv)
+
+    from app.core.database import get_sessionmaker
+
+    db = get_sessionmaker()()
+    try:
+        resultado = verificar_marcas_facturacion(db, corregir=args.corregir)
+    finally:
+        db.close()
+
+    for tipo, ids in resultado.items():
+        muestra = ", ".join(map(str, ids[:20])) + (" ..." if len(ids) > 20 else "")
+        print(f"{tipo}: {len(ids)}" + (f" ({muestra})" if ids else ""))
+    if args.corregir:
+        print("Marcas corregidas.")
+    return 1 if any(resultado.values()) and not args.corregir else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+Envío de correos desde la bandeja de salida (correos_salientes).
+
+La factura encola su correo en la misma transacción en que se emite; EnviadorCorreos
+corre en el event loop de la aplicación (arrancado en el lifespan con ENABLE_EMAIL),
+reclama lotes de la tabla y los manda por un pool de conexiones SMTP persistentes
+(aiosmtplib), sin abrir una conexión ni un handshake TLS por correo. Un servidor de
+correo lento o caído solo atrasa la bandeja: la emisión de facturas no lo espera.
+
+Los errores transitorios se reintentan con espera exponencial; los rechazos
+permanentes (5xx) y los que agotan MAXIMO_INTENTOS quedan descartados para revisión.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.repositories.correo_saliente_repository import CorreoSalienteRepository
+from app.services.cola_pdf_service import FacturaPDFService
+from app.services.pdf_service import EmailService
+
+LOTE = 50
+MAXIMO_INTENTOS = 5
+ESPERA_BASE = timedelta(seconds=30)
+ESPERA_MAXIMA = timedelta(hours=1)
+# Un correo en envío por más tiempo que esto es de un enviador que murió
+TIEMPO_MAXIMO_ENVIO = timedelta(minutes=10)
+INTERVALO_SONDEO = 5.0
+
+
+def espera_reintento(intentos: int) -> timedelta:
+    """30 s, 1 min, 2 min, ... hasta ESPERA_MAXIMA."""
+    return min(ESPERA_BASE * 2 ** (intentos - 1), ESPERA_MAXIMA)
+
+
+def es_permanente(error: Exception) -> bool:
+    """Rechazos 5xx del servidor (destinatario inexistente, mensaje rechazado)."""
+    if getattr(error, "recipients", None):
+        return all(_codigo_smtp(rechazo) >= 500 for rechazo in error.recipients)
+    return _codigo_smtp(error) >= 500
+
+
+def _codigo_smtp(error) -> int:
+    # Otras excepciones también tienen `code` (SQLAlchemy, como texto): solo cuentan enteros
+    codigo = getattr(error, "code", 0)
+    return codigo if isinstance(codigo, int) else 0
+
+
+class PoolSMTP:
+    """
+    Conexiones SMTP (aiosmtplib) abiertas una vez y reutilizadas entre correos y lotes.
+    Hasta `conexiones` envíos a la vez, cada uno por una conexión libre. Una conexión
+    que el servidor cerró por inactividad se reabre y el mensaje se reintenta una vez.
+
+    Sin aiosmtplib o con una configuración inválida falla al construirse (al arrancar
+    el enviador), no en cada envío: ahí sería un error transitorio por correo que,
+    agotados los reintentos, terminaría descartando toda la bandeja.
+    """
+
+    def __init__(self, host: str, port: int, usuario: str = "", clave: str = "",
+                 starttls: bool = True, conexiones: int = 2, timeout: float = 30.0):
+        import aiosmtplib
+
+        if not host or not 0 < port < 65536 or conexiones < 1:
+            raise ValueError(f"Configuración SMTP inválida: host={host!r}, port={port}, conexiones={conexiones}")
+        self._aiosmtplib = aiosmtplib
+        self.opciones = {
+            "hostname": host, "port": port, "username": usuario or None, "password": clave or None,
+            "start_tls": starttls, "timeout": timeout,
+        }
+        self.conexiones = conexiones
+        self.abiertas = 0
+        self._libres = []
+        self._semaforo = None
+
+    @classmethod
+    def desde_settings(cls):
+        return cls(
+            settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_USER, settings.SMTP_PASSWORD,
+            settings.SMTP_STARTTLS, settings.SMTP_CONEXIONES
+        )
+
+    async def enviar(self, mensaje):
+        aiosmtplib = self._aiosmtplib
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.conexiones)
+        async with self._semaforo:
+            smtp = self._libres.pop() if self._libres else aiosmtplib.SMTP(**self.opciones)
+            try:
+                for intento in (1, 2):
+                    try:
+                        if not smtp.is_connected:
+                            await smtp.connect()
+                            self.abiertas += 1
+                        await smtp.send_message(mensaje)
+                        break
+                    except aiosmtplib.SMTPServerDisconnected:
+                        if intento == 2:
+                            raise
+                        smtp = aiosmtplib.SMTP(**self.opciones)
+            except (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused):
+                # El servidor rechazó este mensaje; la conexión sigue sirviendo
+                self._libres.append(smtp)
+                raise
+            except BaseException:
+                smtp.close()
+                raise
+            self._libres.append(smtp)
+
+    async def cerrar(self):
+        libres, self._libres = self._libres, []
+        for smtp in libres:
+            try:
+                await smtp.quit()
+            except Exception:
+                smtp.close()
+
+
+class EnviadorCorreos:
+    def __init__(self, session_factory, transporte, lote: int = LOTE, intervalo: float = INTERVALO_SONDEO,
+                 almacen=None):
+        self.session_factory = session_factory
+        self.transporte = transporte
+        self.lote = lote
+        self.intervalo = intervalo
+        self.almacen = almacen
+        self.token = uuid.uuid4().hex
+        self._loop = None
+        self._hay_trabajo = None
+        self._tarea = None
+
+    async def iniciar(self):
+        self._loop = asyncio.get_running_loop()
+        self._hay_trabajo = asyncio.Event()
+        await asyncio.to_thread(self._recuperar_atascados)
+        self._tarea = asyncio.create_task(self._bucle(), name="enviador-correos")
+
+    async def detener(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+        await self.transporte.cerrar()
+
+    def despertar(self):
+        """Avisa que hay correos nuevos; se puede llamar desde cualquier hilo."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._hay_trabajo.set)
+
+    async def _bucle(self):
+        while True:
+            try:
+                procesados = await self.procesar_lote()
+            except Exception as e:
+                print(f"Error en el envío de correos: {e}")
+                procesados = 0
+            if not procesados:
+                try:
+                    await asyncio.wait_for(self._hay_trabajo.wait(), self.intervalo)
+                except asyncio.TimeoutError:
+                    pass
+                self._hay_trabajo.clear()
+
+    async def procesar_lote(self) -> int:
+        """Envía un lote de la bandeja; devuelve cuántos correos reclamó."""
+        correos = await asyncio.to_thread(self._reclamar)
+        if not correos:
+            return 0
+        # Los PDFs del lote se leen en una sola sesión, no una por correo y en paralelo
+        pdfs = await asyncio.to_thread(self._leer_pdfs, {correo.factura_id for correo in correos})
+        errores = await asyncio.gather(*(self._enviar(correo, pdfs[correo.factura_id]) for correo in correos))
+        await asyncio.to_thread(self._registrar, list(zip(correos, errores)))
+        return len(correos)
+
+    async def drenar(self):
+        """Envía hasta que no queden correos listos para enviar (tests y benchmarks)."""
+        while await self.procesar_lote():
+            pass
+
+    async def _enviar(self, correo, pdf):
+        """None si se envió; la excepción si falló (también si no se pudo leer su PDF)."""
+        if isinstance(pdf, Exception):
+            return pdf
+        try:
+            await self.transporte.enviar(EmailService.mensaje_factura(
+                correo.destinatario, self._datos(correo), pdf, settings.EMAIL_FROM
+            ))
+        except Exception as e:
+            return e
+        return None
+
+    @staticmethod
+    def _datos(correo) -> dict:
+        from app.services.factura_service import HOSPITAL
+
+        return {
+            "factura": {
+                "numero_factura": correo.numero_factura,
+                "fecha_emision": correo.fecha_emision,
+                "total_general": correo.total_general or 0.0,
+            },
+            "cliente": {"nombre": correo.cliente_nombre},
+            "hospital": HOSPITAL,
+        }
+
+    def _leer_pdfs(self, facturas) -> dict:
+        """factura_id → bytes del PDF, o la excepción si ese PDF no se pudo obtener."""
+        db = self.session_factory()
+        try:
+            servicio = FacturaPDFService(db, self.almacen)
+            pdfs = {}
+            for factura_id in facturas:
+                try:
+                    ruta, _, _ = servicio.obtener_pdf(factura_id)
+                    pdfs[factura_id] = ruta.read_bytes()
+                except Exception as e:
+                    pdfs[factura_id] = e
+            return pdfs
+        finally:
+            db.close()
+
+    def _reclamar(self):
+        db = self.session_factory()
+        try:
+            return CorreoSalienteRepository(db).reclamar(self.token, self.lote)
+        finally:
+            db.close()
+
+    def _registrar(self, resultados):
+        db = self.session_factory()
+        repo = CorreoSalienteRepository(db)
+        try:
+            repo.marcar_enviados([correo.id for correo, error in resultados if error is None])
+            ahora = datetime.utcnow()
+            for correo, error in resultados:
+                if error is None:
+                    continue
+                detalle = getattr(error, "detail", None) or str(error) or type(error).__name__
+                if es_permanente(error) or correo.intentos >= MAXIMO_INTENTOS:
+                    repo.descartar(correo.id, detalle)
+                else:
+                    repo.reprogramar(correo.id, detalle, ahora + espera_reintento(correo.intentos))
+            db.commit()
+        finally:
+            db.close()
+
+    def _recuperar_atascados(self):
+        db = self.session_factory()
+        try:
+            CorreoSalienteRepository(db).recuperar_atascados(datetime.utcnow() - TIEMPO_MAXIMO_ENVIO)
+        finally:
+            db.close()
+
+
+_enviador = None
+
+
+async def iniciar_enviador(session_factory=None):
+    """Arranca el enviador en el event loop de la aplicación (lifespan), si ENABLE_EMAIL."""
+    global _enviador
+    if not settings.ENABLE_EMAIL or _enviador is not None:
+        return _enviador
+    if session_factory is None:
+        from app.core.database import get_sessionmaker
+        session_factory = get_sessionmaker()
+    _enviador = EnviadorCorreos(session_factory, PoolSMTP.desde_settings())
+    await _enviador.iniciar()
+    return _enviador
+
+
+async def detener_enviador():
+    global _enviador
+    if _enviador is not None:
+        await _enviador.detener()
+        _enviador = None
+
+
+def avisar_correos():
+    """Despierta al enviador de este proceso tras encolar correos."""
+    if _enviador is not None:
+        _enviador.despertar()
@@ -1,7 +1,10 @@
+from datetime import datetime
 from sqlalchemy.orm import joinedload
 from fastapi import HTTPException, status
 from app.repositories.descargo_repository import DescargoRepository
 from app.repositories.paciente_repository import PacienteRepository
+from app.repositories.async_descargo_repository import AsyncDescargoRepository
+from app.repositories.async_paciente_repository import AsyncPacienteRepository
 from app.models.paciente import Paciente
 from app.models.descargo import Descargo
 from app.models.linea_transaccional import LineaDocumentoTransaccional
@@ -24,13 +27,6 @@ class DescargoService:
                 detail="No se pueden agregar descargos a un paciente ya facturado"
             )
 
-        # Validar que el paciente existe
-        if not self.paciente_repo.obtener_por_id(descargo_data.paciente_id):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Paciente no encontrado"
-            )
-        
         # Validar al menos una línea
         if not descargo_data.lineas:
             raise HTTPException(
@@ -62,6 +58,14 @@ class DescargoService:
     
         return descargos
     
+    def buscar_descargos(self, desde: datetime, hasta: datetime, search: str = None):
+        if desde > hasta:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="desde debe ser anterior o igual a hasta"
+            )
+        return self.descargo_repo.buscar_descargos(desde, hasta, search)
+
     def get_interned_patients_with_descargos(self):
         pacientes = self.db.query(Paciente)\
             .filter(Paciente.estado == "internado")\
@@ -86,4 +90,43 @@ class DescargoService:
             .all()
 
         pacientes_con_descargos = [p for p in pacientes if p.descargos]
-        return pacientes_con_descargos
\ No newline at end of file
+        return pacientes_con_descargos
+
+
+class AsyncDescargoService:
+    """Versión asíncrona de las operaciones de DescargoService que usan los routers async."""
+
+    def __init__(self, db):
+        self.db = db
+        self.descargo_repo = AsyncDescargoRepository(db)
+        self.paciente_repo = AsyncPacienteRepository(db)
+
+    async def crear_descargo(self, descargo_data: DescargoCreate):
+        paciente = await self.paciente_repo.obtener_por_id(descargo_data.paciente_id)
+        if not paciente:
+            raise HTTPException(status_code=404, detail="Paciente no encontrado")
+
+        if paciente.esta_facturado():
+            raise HTTPException(
+                status_code=400,
+                detail="No se pueden agregar descargos a un paciente ya facturado"
+            )
+
+        if not descargo_data.lineas:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Debe incluir al menos una línea"
+            )
+
+        return await self.descargo_repo.crear_descargo_con_lineas(
+            descargo_data.paciente_id,
+            descargo_data.lineas
+        )
+
+    async def obtener_descargos_paciente(self, paciente_id: int):
+        if not await self.paciente_repo.obtener_por_id(paciente_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Paciente no encontrado"
+            )
+        return await self.descargo_repo.obtener_descargos_por_paciente(paciente_id)
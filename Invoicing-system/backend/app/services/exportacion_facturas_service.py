@@ -0,0 +1,96 @@
+"""
+Exportación de los PDFs de un rango de facturas en un ZIP que se arma mientras se envía.
+
+Las facturas se leen con un cursor del servidor por lotes; un pool acotado de hilos
+toma cada PDF de la caché en disco (o lo renderiza si falta, como la descarga
+individual) y cada entrada se escribe en el ZIP apenas está lista. En memoria solo
+hay a la vez los PDFs de la ventana en vuelo y el trozo del ZIP aún no enviado, sin
+importar cuántas facturas tenga el rango.
+"""
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from app.core.almacen_pdf import AlmacenPDF
+from app.core.config import settings
+from app.repositories.factura_repository import FacturaRepository
+from app.services.cola_pdf_service import FacturaPDFService, obtener_almacen
+
+# PDFs pedidos por adelantado por cada worker
+VENTANA_POR_WORKER = 2
+TAMANO_LOTE = 500
+
+
+class _SalidaZip:
+    """Destino de solo escritura para zipfile: guarda lo escrito hasta que el generador lo entrega."""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, datos) -> int:
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def leer_pdf(session_factory, almacen: AlmacenPDF, factura_id: int) -> bytes:
+    """Bytes del PDF de la factura en una sesión propia (renderiza y cachea si falta)."""
+    db = session_factory()
+    try:
+        ruta, _, _ = FacturaPDFService(db, almacen).obtener_pdf(factura_id)
+        return ruta.read_bytes()
+    finally:
+        db.close()
+
+
+def _escribir(archivo: zipfile.ZipFile, fila, futuro, errores: list):
+    try:
+        contenido = futuro.result()
+    except Exception as e:
+        errores.append(f"{fila.numero_factura}: {getattr(e, 'detail', None) or e}")
+        return
+    entrada = zipfile.ZipInfo(f"factura_{fila.numero_factura}.pdf", date_time=fila.fecha_emision.timetuple()[:6])
+    # Los PDFs ya van comprimidos: se guardan sin volver a comprimir
+    archivo.writestr(entrada, contenido, compress_type=zipfile.ZIP_STORED)
+
+
+def exportar_zip(session_factory, workers: int = None, almacen: AlmacenPDF = None, **filtros):
+    """
+    Generador con los trozos del ZIP de las facturas que cumplen `filtros` (los de
+    FacturaRepository). Las facturas cuyo PDF no se pudo obtener se listan en
+    errores.txt dentro del mismo ZIP, porque a esa altura la respuesta ya empezó.
+    """
+    workers = workers or settings.EXPORTACION_WORKERS
+    almacen = almacen or obtener_almacen()
+    salida = _SalidaZip()
+    errores = []
+    db = session_factory()
+    try:
+        filas = FacturaRepository(db).facturas_para_exportar(TAMANO_LOTE, **filtros)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="exportacion") as pool, \
+                zipfile.ZipFile(salida, "w") as archivo:
+            en_vuelo = {}
+            for fila in filas:
+                en_vuelo[pool.submit(leer_pdf, session_factory, almacen, fila.id)] = fila
+                if len(en_vuelo) < workers * VENTANA_POR_WORKER:
+                    continue
+                terminados, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    _escribir(archivo, en_vuelo.pop(futuro), futuro, errores)
+                yield salida.vaciar()
+            while en_vuelo:
+                terminados, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    _escribir(archivo, en_vuelo.pop(futuro), futuro, errores)
+                yield salida.vaciar()
+            if errores:
+                archivo.writestr("errores.txt", "\n".join(errores) + "\n")
+        # Directorio central del ZIP, escrito al cerrarlo
+        yield salida.vaciar()
+    finally:
+        db.close()
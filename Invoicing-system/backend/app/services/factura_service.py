@@ -1,9 +1,25 @@
 from fastapi import HTTPException
 from datetime import datetime
+from sqlalchemy import inspect
+from app.core.cache_http import etag
+from app.core.config import settings
+from app.repositories.async_factura_repository import AsyncFacturaRepository
 from app.repositories.factura_repository import FacturaRepository
 from app.repositories.paciente_repository import PacienteRepository
 from app.repositories.cliente_repository import ClienteRepository 
 from app.repositories.descargo_repository import DescargoRepository
+from app.services.cola_pdf_service import encolar_pdf
+from app.services.correo_service import avisar_correos
+
+# Datos del emisor impresos en la factura y en el correo
+HOSPITAL = {
+    "nombre": "Hospital Ejemplo",
+    "direccion": "Health District, 123 Streets, Sopporo, Hokkaido",
+    "telefono": "+123 456 789",
+    "email": "hello@email.com",
+    "web": "www.yourweb.com",
+    "representante": "Dr. Ramiela Silva, MD, PHD - General Manager"
+}
 
 class FacturaService:
     def __init__(self, db):
@@ -15,87 +31,88 @@ class FacturaService:
 
     def generar_factura(self, paciente_id: int, cliente_id: int):
         try:
-            # 1. Validar paciente
-            paciente = self.paciente_repo.obtener_por_id(paciente_id)
-            if not paciente:
-                raise HTTPException(status_code=404, detail="Paciente no encontrado")
-            if paciente.estado != "alta":
-                raise HTTPException(status_code=400, detail="El paciente no se encuentra en estado de alta")
-            
-            # 2. Validar cliente
-            cliente = self.cliente_repo.get(cliente_id)
-            if not cliente:
-                raise HTTPException(status_code=404, detail="Cliente no encontrado")
-            
-            # 3. Obtener descargos
-            descargos = self.descargo_repo.obtener_descargos_por_paciente(paciente_id)
-            if not descargos:
-                raise HTTPException(status_code=400, detail="El paciente no tiene descargos para facturar")
-            
-            # 4. Calcular totales y preparar líneas de factura
-            subtotal = 0.0
-            impuesto = 0.0
-            lineas_factura = []
-            
-            for descargo in descargos:
-                for linea_trans in descargo.lineas_transaccionales:
-                    if not (linea_trans and linea_trans.linea_descargo and linea_trans.cantidad and linea_trans.cantidad > 0):
-                        continue
-                    
-                    subtotal_linea = linea_trans.linea_descargo.subtotal_sin_iva or 0
-                    iva = subtotal_linea * 0.16  # Asumiendo 16% de IVA
-                    total_con_iva = subtotal_linea + iva
-                    
-                    subtotal += subtotal_linea
-                    impuesto += iva
-                    
-                    linea_factura = {
-                        "linea_transaccional_id": linea_trans.id,
-                        "iva": iva,
-                        "total_con_iva": total_con_iva
-                    }
-                    lineas_factura.append(linea_factura)
-            
-            if not lineas_factura:
-                raise HTTPException(status_code=400, detail="No hay líneas válidas para facturar")
-            
-            total_general = subtotal + impuesto
-            
-            # 5. Generar número de factura
-            numero_factura = f"FACT-{datetime.now().strftime('%Y%m%d')}-{paciente_id:04d}"
-            
-            # 6. Preparar datos de factura
-            factura_data = {
-                "numero_factura": numero_factura,
-                "fecha_emision": datetime.now(),
-                "subtotal": subtotal,
-                "impuesto": impuesto,
-                "total_general": total_general,
-                "paciente_id": paciente_id,
-                "cliente_id": cliente_id,
-                "estado_pago": "pendiente",
-                "terminos_condiciones": "Pago dentro de 30 días"
-            }
-            
-            # 7. Crear factura en el repositorio
-            factura = self.repo.create_factura(factura_data, lineas_factura)
-            
-            # 8. Preparar respuesta
-            return self._prepare_factura_response(factura, paciente, cliente)
-            
+            factura = self.facturar(paciente_id, cliente_id)
+            # Preparar respuesta (factura con sus líneas en una consulta)
+            factura = self.repo.obtener_factura(inspect(factura).identity[0])
+            return self._prepare_factura_response(factura, factura.paciente, factura.cliente)
+
+        except HTTPException:
+            self.db.rollback()
+            raise
         except Exception as e:
             self.db.rollback()
             raise HTTPException(status_code=500, detail=f"Error al generar factura: {str(e)}")
 
+    def facturar(self, paciente_id: int, cliente_id: int):
+        """
+        Valida y crea la factura del paciente; devuelve la Factura sin armar la
+        respuesta (la usan generar_factura y la facturación por lotes). Los errores
+        de validación son HTTPException; los de base de datos se propagan tal cual.
+        """
+        # 1. Validar paciente
+        paciente = self.paciente_repo.obtener_por_id(paciente_id)
+        if not paciente:
+            raise HTTPException(status_code=404, detail="Paciente no encontrado")
+        if paciente.estado != "alta":
+            raise HTTPException(status_code=400, detail="El paciente no se encuentra en estado de alta")
+
+        # 2. Validar cliente
+        cliente = self.cliente_repo.get(cliente_id)
+        if not cliente:
+            raise HTTPException(status_code=404, detail="Cliente no encontrado")
+
+        # 3. Generar número de factura
+        numero_factura = f"FACT-{datetime.now().strftime('%Y%m%d')}-{paciente_id:04d}"
+        factura_data = {
+            "numero_factura": numero_factura,
+            "fecha_emision": datetime.now(),
+            "paciente_id": paciente_id,
+            "cliente_id": cliente_id,
+            "estado_pago": "pendiente",
+            "terminos_condiciones": "Pago dentro de 30 días"
+        }
+
+        # 4. Totales, líneas, marca de descargos, paso a facturado y correo (con
+        # ENABLE_EMAIL) en una sola transacción, calculados en la base
+        try:
+            factura = self.repo.crear_factura_desde_descargos(
+                paciente, factura_data, enviar_correo=settings.ENABLE_EMAIL
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if factura is None:
+            raise HTTPException(status_code=400, detail="No hay líneas válidas para facturar")
+
+        # 5. PDF en segundo plano; si no se pudo encolar se renderiza al descargarlo.
+        # El id sale de la identidad: factura.id recargaría la fila que expiró el commit
+        factura_id = inspect(factura).identity[0]
+        try:
+            encolar_pdf(self.db, factura_id)
+        except Exception as e:
+            self.db.rollback()
+            print(f"No se pudo encolar el PDF de la factura {factura_id}: {e}")
+        if settings.ENABLE_EMAIL:
+            avisar_correos()
+        return factura
+
     def obtener_factura(self, factura_id: int):
         try:
             factura = self.repo.obtener_factura(factura_id)
             if not factura:
                 raise HTTPException(status_code=404, detail="Factura no encontrada")
             return self._prepare_factura_response(factura, factura.paciente, factura.cliente)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error al obtener factura: {str(e)}")
 
+    def etag_factura(self, factura_id: int) -> str:
+        """ETag de GET /facturas/{id}, calculado sin armar la respuesta."""
+        firma = self.repo.firma_factura(factura_id)
+        if firma is None:
+            raise HTTPException(status_code=404, detail="Factura no encontrada")
+        return etag("factura", factura_id, *firma)
+
     def listar_facturas(self):
         try:
             facturas = self.repo.listar_facturas()
@@ -106,7 +123,31 @@ class FacturaService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error al listar facturas: {str(e)}")
 
-    def _prepare_factura_response(self, factura, paciente, cliente):
+    def listar_facturas_pagina(self, limite: int, cursor: str = None, **filtros):
+        try:
+            facturas, next_cursor = self.repo.listar_facturas_pagina(limite, cursor, **filtros)
+            return {
+                "items": [
+                    self._prepare_factura_response(factura, factura.paciente, factura.cliente)
+                    for factura in facturas
+                ],
+                "next_cursor": next_cursor,
+                "limite": limite
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al listar facturas: {str(e)}")
+
+    def listar_resumen(self, limite: int, cursor: str = None, **filtros):
+        filas, next_cursor = self.repo.listar_resumen(limite, cursor, **filtros)
+        return {"items": filas, "next_cursor": next_cursor, "limite": limite}
+
+    def hay_facturas(self, **filtros) -> bool:
+        return self.repo.hay_facturas(**filtros)
+
+    @staticmethod
+    def _prepare_factura_response(factura, paciente, cliente):
         """Método auxiliar para preparar la respuesta de la factura"""
         lineas = []
         for linea in factura.lineas_factura:
@@ -162,12 +203,45 @@ class FacturaService:
                 "correo": cliente.correo or ""
             },
             "lineas": lineas,
-            "hospital": {
-                "nombre": "Hospital Ejemplo",
-                "direccion": "Health District, 123 Streets, Sopporo, Hokkaido",
-                "telefono": "+123 456 789",
-                "email": "hello@email.com",
-                "web": "www.yourweb.com",
-                "representante": "Dr. Ramiela Silva, MD, PHD - General Manager"
-            }
-        }
\ No newline at end of file
+            "hospital": dict(HOSPITAL)
+        }
+
+class AsyncFacturaService:
+    """
+    Versión asíncrona de las operaciones de FacturaService que usa el router async.
+
+    La emisión corre FacturaService.facturar con AsyncSession.run_sync: el mismo motor
+    en SQL (totales, líneas, marcas, proyección y correo en una transacción) sobre la
+    conexión async, sin una segunda implementación que mantener.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.repo = AsyncFacturaRepository(db)
+
+    async def generar_factura(self, paciente_id: int, cliente_id: int):
+        try:
+            factura_id = await self.db.run_sync(
+                lambda session: inspect(FacturaService(session).facturar(paciente_id, cliente_id)).identity[0]
+            )
+            factura = await self.repo.obtener_factura(factura_id)
+            return FacturaService._prepare_factura_response(factura, factura.paciente, factura.cliente)
+
+        except HTTPException:
+            await self.db.rollback()
+            raise
+        except Exception as e:
+            await self.db.rollback()
+            raise HTTPException(status_code=500, detail=f"Error al generar factura: {str(e)}")
+
+    async def obtener_factura(self, factura_id: int):
+        factura = await self.repo.obtener_factura(factura_id)
+        if not factura:
+            raise HTTPException(status_code=404, detail="Factura no encontrada")
+        return FacturaService._prepare_factura_response(factura, factura.paciente, factura.cliente)
+
+    async def etag_factura(self, factura_id: int) -> str:
+        firma = await self.repo.firma_factura(factura_id)
+        if firma is None:
+            raise HTTPException(status_code=404, detail="Factura no encontrada")
+        return etag("factura", factura_id, *firma)
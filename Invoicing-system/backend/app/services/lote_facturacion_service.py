@@ -0,0 +1,234 @@
+"""
+Facturación masiva: factura a todos los pacientes de alta con descargos sin facturar.
+
+Cada paciente se factura en un worker de un pool acotado de hilos, con su propia
+sesión, a través de FacturaService.facturar (motor en SQL, una transacción por
+factura). El resultado queda en un ítem por paciente: un fallo no detiene el lote
+y el progreso se consulta en la base desde cualquier proceso.
+
+Volver a correr es seguro: un lote nuevo solo toma pacientes que siguen de alta con
+descargos sin facturar, y reanudar un lote solo reprocesa sus ítems pendientes o
+fallidos (el motor bloquea al paciente y no factura dos veces). Una corrida que falla
+deja el lote interrumpido; una cuyo proceso murió lo deja en curso, y se puede
+reanudar pasados FACTURACION_LOTE_TIMEOUT_MINUTOS sin actividad.
+
+Uso (desde backend/):
+    python -m app.services.lote_facturacion_service --cliente-id 1 --workers 4
+    python -m app.services.lote_facturacion_service --asignaciones asignaciones.csv
+    python -m app.services.lote_facturacion_service --reanudar 12
+"""
+import argparse
+import csv
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.repositories.cliente_repository import ClienteRepository
+from app.repositories.lote_facturacion_repository import LoteFacturacionRepository
+from app.services.factura_service import FacturaService
+
+WORKERS_MAXIMO = 16
+# Errores transitorios (bloqueos, deadlocks, "database is locked" de SQLite) se reintentan
+REINTENTOS = 3
+ESPERA_REINTENTO = 0.2
+
+
+class LoteFacturacionService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = LoteFacturacionRepository(db)
+
+    def crear_lote(self, cliente_id: int = None, asignaciones: dict = None, workers: int = None):
+        """
+        Crea el lote con los pacientes facturables. Regla de cliente: la asignación
+        explícita del paciente y, si no tiene, `cliente_id`; sin ninguna de las dos el
+        paciente queda fallido ("Sin cliente asignado") y se puede reanudar.
+        """
+        asignaciones = asignaciones or {}
+        workers = workers or settings.FACTURACION_LOTE_WORKERS
+        if not 1 <= workers <= WORKERS_MAXIMO:
+            raise HTTPException(status_code=400, detail=f"workers debe estar entre 1 y {WORKERS_MAXIMO}")
+        clientes = ClienteRepository(self.db)
+        for id_cliente in {cliente_id, *asignaciones.values()} - {None}:
+            if not clientes.get(id_cliente):
+                raise HTTPException(status_code=404, detail=f"Cliente {id_cliente} no encontrado")
+        lote = self.repo.crear(cliente_id, asignaciones, workers)
+        return self.obtener_progreso(lote.id)
+
+    def reanudar(self, lote_id: int):
+        """
+        Toma el lote para reprocesar sus pendientes y fallidos. Uno en curso solo se toma
+        si lleva FACTURACION_LOTE_TIMEOUT_MINUTOS sin actividad; si no, 409.
+        """
+        self.obtener_progreso(lote_id)
+        limite = datetime.utcnow() - timedelta(minutes=settings.FACTURACION_LOTE_TIMEOUT_MINUTOS)
+        if not self.repo.tomar_para_reanudar(lote_id, limite):
+            raise HTTPException(status_code=409, detail="El lote está en curso")
+        return self.obtener_progreso(lote_id)
+
+    def obtener_progreso(self, lote_id: int):
+        lote = self.repo.obtener(lote_id)
+        if not lote:
+            raise HTTPException(status_code=404, detail="Lote no encontrado")
+        conteos = self.repo.conteos(lote_id)
+        return {
+            "id": lote.id,
+            "estado": lote.estado,
+            "workers": lote.workers,
+            "total": sum(conteos.values()),
+            **conteos,
+            "creado_en": lote.creado_en,
+            "iniciado_en": lote.iniciado_en,
+            "terminado_en": lote.terminado_en,
+            "errores": [
+                {"paciente_id": paciente_id, "error": error}
+                for paciente_id, error in self.repo.errores(lote_id)
+            ],
+        }
+
+
+def facturar_item(session_factory, item_id: int, paciente_id: int, cliente_id: int) -> str:
+    """Factura un paciente del lote en su propia sesión y registra el resultado."""
+    db = session_factory()
+    repo = LoteFacturacionRepository(db)
+    try:
+        if cliente_id is None:
+            repo.registrar_resultado(item_id, "fallido", error="Sin cliente asignado")
+            return "fallido"
+        for intento in range(1, REINTENTOS + 1):
+            try:
+                factura = FacturaService(db).facturar(paciente_id, cliente_id)
+                repo.registrar_resultado(item_id, "facturado", factura_id=factura.id)
+                return "facturado"
+            except HTTPException as e:
+                db.rollback()
+                # Ya facturado (otra corrida, la pantalla o un reintento tras una caída)
+                ya_facturado = repo.factura_previa(paciente_id) if e.status_code == 400 else None
+                if ya_facturado:
+                    repo.registrar_resultado(item_id, "omitido", factura_id=ya_facturado, error=e.detail)
+                    return "omitido"
+                repo.registrar_resultado(item_id, "fallido", error=e.detail)
+                return "fallido"
+            except OperationalError:
+                db.rollback()
+                if intento == REINTENTOS:
+                    raise
+                time.sleep(ESPERA_REINTENTO * intento)
+    except Exception as e:
+        db.rollback()
+        repo.registrar_resultado(item_id, "fallido", error=str(e)[:1000])
+        return "fallido"
+    finally:
+        db.close()
+
+
+def ejecutar_lote(lote_id: int, session_factory=None, workers: int = None, al_avanzar=None) -> dict:
+    """
+    Procesa los ítems pendientes o fallidos del lote con un pool de `workers` hilos
+    (por defecto los del lote). `al_avanzar(estado)` se llama tras cada paciente.
+    Devuelve el progreso final.
+    """
+    if session_factory is None:
+        from app.core.database import get_sessionmaker
+        session_factory = get_sessionmaker()
+
+    db = session_factory()
+    try:
+        repo = LoteFacturacionRepository(db)
+        lote = repo.obtener(lote_id)
+        if not lote:
+            raise HTTPException(status_code=404, detail="Lote no encontrado")
+        workers = min(workers or lote.workers, WORKERS_MAXIMO)
+        items = repo.items_por_procesar(lote_id)
+        repo.cambiar_estado(lote_id, "en_curso")
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"lote-{lote_id}") as pool:
+                futuros = [pool.submit(facturar_item, session_factory, *item) for item in items]
+                try:
+                    for futuro in futuros:
+                        estado = futuro.result()
+                        if al_avanzar:
+                            al_avanzar(estado)
+                except BaseException:
+                    # Los ítems que no empezaron quedan pendientes para la reanudación
+                    pool.shutdown(cancel_futures=True)
+                    raise
+        except BaseException:
+            # Sin esto el lote quedaría en curso y la reanudación lo rechazaría
+            db.rollback()
+            try:
+                repo.cambiar_estado(lote_id, "interrumpido")
+            except Exception as e:
+                print(f"No se pudo marcar el lote {lote_id} como interrumpido: {e}")
+            raise
+
+        repo.cambiar_estado(lote_id, "terminado")
+        return LoteFacturacionService(db).obtener_progreso(lote_id)
+    finally:
+        db.close()
+
+
+def leer_asignaciones(ruta: str) -> dict:
+    """CSV con columnas paciente_id,cliente_id."""
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        return {int(fila["paciente_id"]): int(fila["cliente_id"]) for fila in csv.DictReader(archivo)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cliente-id", type=int, help="cliente por defecto de los pacientes sin asignación")
+    parser.add_argument("--asignaciones", help="CSV paciente_id,cliente_id con asignaciones explícitas")
+    parser.add_argument("--workers", type=int, default=settings.FACTURACION_LOTE_WORKERS)
+    parser.add_argument("--reanudar", type=int, metavar="LOTE_ID", help="reprocesa pendientes y fallidos de un lote")
+    args = parser.parse_args(argv)
+
+    from app.core.database import get_sessionmaker
+
+    session_factory = get_sessionmaker()
+    if args.reanudar:
+        lote_id = args.reanudar
+        db = session_factory()
+        try:
+            LoteFacturacionService(db).reanudar(lote_id)
+        except HTTPException as e:
+            parser.error(f"lote {lote_id}: {e.detail}")
+        finally:
+            db.close()
+    else:
+        asignaciones = leer_asignaciones(args.asignaciones) if args.asignaciones else {}
+        if args.cliente_id is None and not asignaciones:
+            parser.error("indique --cliente-id y/o --asignaciones")
+        db = session_factory()
+        try:
+            progreso = LoteFacturacionService(db).crear_lote(args.cliente_id, asignaciones, args.workers)
+        finally:
+            db.close()
+        lote_id = progreso["id"]
+        print(f"Lote {lote_id}: {progreso['total']} pacientes a facturar con {args.workers} workers")
+
+    procesados = []
+    inicio = time.perf_counter()
+
+    def al_avanzar(estado):
+        procesados.append(estado)
+        if len(procesados) % 50 == 0:
+            print(f"  {len(procesados)} procesados ({time.perf_counter() - inicio:.0f} s)")
+
+    progreso = ejecutar_lote(lote_id, session_factory, args.workers, al_avanzar)
+    duracion = time.perf_counter() - inicio
+    print(
+        f"Lote {lote_id} terminado en {duracion:.1f} s: {progreso['facturado']} facturados, "
+        f"{progreso['omitido']} omitidos, {progreso['fallido']} fallidos"
+    )
+    for error in progreso["errores"]:
+        print(f"  paciente {error['paciente_id']}: {error['error']}")
+    return 1 if progreso["fallido"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from app.repositories.busqueda_pacientes import LIMITE_BUSQUEDA
 from app.repositories.paciente_repository import PacienteRepository
 from app.schemas.paciente_schema import PacienteCreate, PacienteResponse, PacienteConDescargosSimpleResponse
 
@@ -24,78 +25,56 @@ class PacienteService:
     def obtener_todos_pacientes(self):
         return self.repo.obtener_todos_pacientes()
 
-    def buscar_pacientes(self, search_term: str = None):
-        return self.repo.buscar_pacientes(search_term)
+    def listar_pacientes(self, limite: int, cursor: str = None, **filtros):
+        items, next_cursor = self.repo.listar_pacientes(limite, cursor, **filtros)
+        return {"items": items, "next_cursor": next_cursor, "limite": limite}
+
+    def buscar_pacientes(
+        self, search_term: str = None, limite: int = LIMITE_BUSQUEDA, modo: str = "contiene", estado: str = None
+    ):
+        return self.repo.buscar_pacientes(search_term, limite, modo, estado)
 
     def obtener_pacientes_internados_con_descargos(self):
-        pacientes = self.repo.obtener_pacientes_internados()
-        result = []
-        for paciente in pacientes:
-            descargos = self.repo.obtener_descargos_paciente(paciente.id)
-            if descargos:
-                paciente_dict = {
-                    "id": paciente.id,
-                    "nombre_completo": paciente.nombre_completo,
-                    "fecha_ingreso": paciente.fecha_ingreso,
-                    "estado": paciente.estado,
-                    "descargos": [
-                        {
-                            "id": descargo.id,
-                            "paciente_id": descargo.paciente_id,
-                            "fecha": descargo.fecha,
-                            "total": float(descargo.total) if descargo.total is not None else 0.0,
-                            "lineas": [
-                                {
-                                    "id": linea_trans.linea_descargo.id,
-                                    "descripcion": linea_trans.linea_descargo.descripcion,
-                                    "subtotal_sin_iva": float(linea_trans.linea_descargo.subtotal_sin_iva),
-                                    "cantidad": linea_trans.cantidad,
-                                    "servicio_id": linea_trans.servicio_id,
-                                    "producto_id": linea_trans.producto_id
-                                }
-                                for linea_trans in descargo.lineas_transaccionales
-                                if linea_trans.linea_descargo
-                            ]
-                        }
-                        for descargo in descargos
-                    ]
-                }
-                result.append(PacienteConDescargosSimpleResponse(**paciente_dict))
-        return result
+        return [
+            self._paciente_con_descargos(paciente)
+            for paciente in self.repo.obtener_pacientes_internados_con_descargos()
+        ]
 
     def obtener_pacientes_alta_con_descargos_no_facturados(self):
-        pacientes = self.repo.obtener_pacientes_alta_con_descargos_no_facturados()
-        result = []
-        for paciente in pacientes:
-            descargos = [descargo for descargo in paciente.descargos]
-            if descargos:
-                paciente_dict = {
-                    "id": paciente.id,
-                    "nombre_completo": paciente.nombre_completo,
-                    "fecha_ingreso": paciente.fecha_ingreso,
-                    "fecha_alta": paciente.fecha_alta,
-                    "estado": paciente.estado,
-                    "descargos": [
+        return [
+            self._paciente_con_descargos(paciente, fecha_alta=paciente.fecha_alta)
+            for paciente in self.repo.obtener_pacientes_alta_con_descargos_no_facturados()
+        ]
+
+    @staticmethod
+    def _paciente_con_descargos(paciente, **extra):
+        """Arma la respuesta a partir de descargos y líneas ya precargados por el repositorio."""
+        paciente_dict = {
+            "id": paciente.id,
+            "nombre_completo": paciente.nombre_completo,
+            "fecha_ingreso": paciente.fecha_ingreso,
+            "estado": paciente.estado,
+            **extra,
+            "descargos": [
+                {
+                    "id": descargo.id,
+                    "paciente_id": descargo.paciente_id,
+                    "fecha": descargo.fecha,
+                    "total": float(descargo.total) if descargo.total is not None else 0.0,
+                    "lineas": [
                         {
-                            "id": descargo.id,
-                            "paciente_id": descargo.paciente_id,
-                            "fecha": descargo.fecha,
-                            "total": float(descargo.total) if descargo.total is not None else 0.0,
-                            "lineas": [
-                                {
-                                    "id": linea_trans.linea_descargo.id,
-                                    "descripcion": linea_trans.linea_descargo.descripcion,
-                                    "subtotal_sin_iva": float(linea_trans.linea_descargo.subtotal_sin_iva),
-                                    "cantidad": linea_trans.cantidad,
-                                    "servicio_id": linea_trans.servicio_id,
-                                    "producto_id": linea_trans.producto_id
-                                }
-                                for linea_trans in descargo.lineas_transaccionales
-                                if linea_trans.linea_descargo
-                            ]
+                            "id": linea_trans.linea_descargo.id,
+                            "descripcion": linea_trans.linea_descargo.descripcion,
+                            "subtotal_sin_iva": float(linea_trans.linea_descargo.subtotal_sin_iva),
+                            "cantidad": linea_trans.cantidad,
+                            "servicio_id": linea_trans.servicio_id,
+                            "producto_id": linea_trans.producto_id
                         }
-                        for descargo in descargos
+                        for linea_trans in descargo.lineas_transaccionales
+                        if linea_trans.linea_descargo
                     ]
                 }
-                result.append(PacienteConDescargosSimpleResponse(**paciente_dict))
-        return result
\ No newline at end of file
+                for descargo in paciente.descargos
+            ]
+        }
+        return PacienteConDescargosSimpleResponse(**paciente_dict)
@@ -1,28 +1,34 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from emails.template import JinjaTemplate
-import emails
-import os
+import multiprocessing
+import threading
+from app.services.plantilla_pdf import obtener_plantilla
+
+# reportlab se importa dentro de cada método: es pesado y solo lo necesitan las
+# rutas que generan facturas, no el arranque de cada worker.
 
 class PDFService:
+    """
+    Renderizado de facturas con la plantilla del proceso (plantilla_pdf). Es CPU puro y
+    retiene el GIL: con iniciar_procesos() los renderizados de `renderizar` se hacen en
+    un pool de procesos y el hilo que lo pide solo espera el resultado.
+    """
+
     @staticmethod
     def generar_factura_pdf(factura_data: dict):
+        from reportlab.platypus import Paragraph, Spacer
+
+        plantilla = obtener_plantilla()
         buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-        
-        styles = getSampleStyleSheet()
-        styles.add(ParagraphStyle(name='RightAlign', alignment=2))
-        
+        doc = plantilla.documento(buffer, factura_data)
+
         story = []
-        
+
         # Encabezado
-        story.append(Paragraph("FACTURA", styles['Title']))
+        story.append(Paragraph("FACTURA", plantilla.titulo))
         story.append(Spacer(1, 12))
-        
+
         # Información del cliente
         cliente = factura_data['cliente']
         cliente_info = [
@@ -32,56 +38,35 @@ class PDFService:
             f"{cliente['telefono']}",
             f"{cliente['correo']}"
         ]
-        story.append(Paragraph("<br/>".join(cliente_info), styles['Normal']))
+        story.append(Paragraph("<br/>".join(cliente_info), plantilla.normal))
         story.append(Spacer(1, 24))
-        
-        # Tabla de productos
-        data = [['CONSUMO', 'PRECIO', 'CANTIDAD', 'TOTAL']]
-        for linea in factura_data['lineas']:
-            data.append([
+
+        # Tabla de productos (el encabezado se repite en cada página)
+        story.append(plantilla.tabla_lineas([
+            [
                 linea['descripcion'],
                 f"${linea['precio_unitario']:,.2f}",
                 str(linea['cantidad']),
                 f"${linea['total_con_iva']:,.2f}"
-            ])
-        
-        t = Table(data, colWidths=[3*inch, inch, inch, inch])
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]
+            for linea in factura_data['lineas']
         ]))
-        story.append(t)
         story.append(Spacer(1, 24))
-        
+
         # Términos y condiciones
-        story.append(Paragraph("<b>Términos & condiciones</b>", styles['Normal']))
-        story.append(Paragraph(factura_data['factura']['terminos_condiciones'], styles['Normal']))
+        story.append(Paragraph("<b>Términos & condiciones</b>", plantilla.normal))
+        story.append(Paragraph(factura_data['factura']['terminos_condiciones'], plantilla.normal))
         story.append(Spacer(1, 24))
-        
+
         # Totales
-        data_totales = [
+        story.append(plantilla.tabla_totales([
             ['SUBTOTAL', f"${factura_data['factura']['subtotal']:,.2f}"],
             ['IVA (16%)', f"${factura_data['factura']['impuesto']:,.2f}"],
             ['TOTAL', f"${factura_data['factura']['total_general']:,.2f}"]
-        ]
-        t_totales = Table(data_totales, colWidths=[4*inch, inch])
-        t_totales.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black)
         ]))
-        story.append(t_totales)
         story.append(Spacer(1, 36))
-        
-        # Pie de página
+
+        # Datos del hospital
         hospital = factura_data['hospital']
         footer = [
             hospital['representante'],
@@ -92,40 +77,91 @@ class PDFService:
             hospital['email'],
             hospital['web']
         ]
-        story.append(Paragraph("<br/>".join(footer), styles['Normal']))
-        
-        doc.build(story)
+        story.append(Paragraph("<br/>".join(footer), plantilla.normal))
+
+        doc.build(story, onFirstPage=plantilla.primera_pagina, onLaterPages=plantilla.paginas_siguientes)
         buffer.seek(0)
         return buffer
 
+    @staticmethod
+    def renderizar(factura_data: dict) -> bytes:
+        """Bytes del PDF; en el pool de procesos si está iniciado, si no en este hilo."""
+        global _procesos
+        pool = _procesos
+        if pool is not None:
+            try:
+                return pool.submit(_renderizar_en_proceso, factura_data).result(TIEMPO_MAXIMO_PROCESO)
+            except BrokenProcessPool:
+                # Un proceso murió (OOM, kill): se reemplaza el pool y esta factura se
+                # renderiza aquí para no fallar la descarga
+                print("El pool de renderizado de PDFs se rompió; se reinicia")
+                with _lock_procesos:
+                    if _procesos is pool:
+                        _procesos = _crear_pool(_cantidad_procesos)
+                pool.shutdown(wait=False)
+        return PDFService.generar_factura_pdf(factura_data).getvalue()
+
+    @staticmethod
+    def iniciar_procesos(procesos: int):
+        """Arranca el pool de renderizado (lifespan); con 0 procesos se renderiza en el hilo."""
+        global _procesos, _cantidad_procesos
+        with _lock_procesos:
+            if procesos > 0 and _procesos is None:
+                _cantidad_procesos = procesos
+                _procesos = _crear_pool(procesos)
+        return _procesos
+
+    @staticmethod
+    def detener_procesos():
+        global _procesos
+        with _lock_procesos:
+            pool, _procesos = _procesos, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+# Un renderizado colgado no debe retener para siempre el hilo que lo espera
+TIEMPO_MAXIMO_PROCESO = 120
+
+_procesos = None
+_cantidad_procesos = 0
+_lock_procesos = threading.Lock()
+
+
+def _crear_pool(procesos: int) -> ProcessPoolExecutor:
+    # spawn: el proceso hijo no hereda hilos, conexiones ni sesiones del worker de la API;
+    # solo importa este módulo y reportlab, y arma la plantilla una vez al arrancar
+    return ProcessPoolExecutor(
+        max_workers=procesos, mp_context=multiprocessing.get_context("spawn"), initializer=obtener_plantilla
+    )
+
+
+def _renderizar_en_proceso(factura_data: dict) -> bytes:
+    return PDFService.generar_factura_pdf(factura_data).getvalue()
+
 class EmailService:
     @staticmethod
-    def enviar_factura(correo_destino: str, factura_data: dict, pdf_bytes: BytesIO):
-        message = emails.html(
-            subject=f"Factura #{factura_data['factura']['numero_factura']}",
-            html=JinjaTemplate('''
-                <p>Estimado {{ cliente.nombre }},</p>
-                <p>Adjunto encontrará la factura #{{ factura.numero_factura }} por un total de ${{ "%.2f"|format(factura.total_general) }}.</p>
-                <p>Fecha de emisión: {{ factura.fecha_emision.strftime('%d/%m/%Y') }}</p>
-                <p>Gracias por su preferencia.</p>
-                <p>Atentamente,<br/>{{ hospital.nombre }}</p>
-            ''').render(cliente=factura_data['cliente'], factura=factura_data['factura'], hospital=factura_data['hospital']),
-            mail_from=os.getenv('EMAIL_FROM', 'no-reply@hospital.com')
+    def mensaje_factura(correo_destino: str, factura_data: dict, pdf_bytes: bytes, remitente: str):
+        """Mensaje con la factura adjunta; lo envía EnviadorCorreos por su conexión SMTP."""
+        from email.message import EmailMessage
+        from html import escape
+
+        factura = factura_data['factura']
+        mensaje = EmailMessage()
+        mensaje["Subject"] = f"Factura #{factura['numero_factura']}"
+        mensaje["From"] = remitente
+        mensaje["To"] = correo_destino
+        mensaje.set_content(
+            f"<p>Estimado {escape(factura_data['cliente']['nombre'] or '')},</p>"
+            f"<p>Adjunto encontrará la factura #{escape(factura['numero_factura'])} "
+            f"por un total de ${factura['total_general']:.2f}.</p>"
+            f"<p>Fecha de emisión: {factura['fecha_emision'].strftime('%d/%m/%Y')}</p>"
+            "<p>Gracias por su preferencia.</p>"
+            f"<p>Atentamente,<br/>{escape(factura_data['hospital']['nombre'])}</p>",
+            subtype="html"
         )
-        
-        message.attach(
-            filename=f"factura_{factura_data['factura']['numero_factura']}.pdf",
-            content_disposition="attachment",
-            data=pdf_bytes
+        mensaje.add_attachment(
+            pdf_bytes, maintype="application", subtype="pdf",
+            filename=f"factura_{factura['numero_factura']}.pdf"
         )
-        
-        return message.send(
-            to=correo_destino,
-            smtp={
-                "host": os.getenv('SMTP_HOST'),
-                "port": int(os.getenv('SMTP_PORT', 587)),
-                "user": os.getenv('SMTP_USER'),
-                "password": os.getenv('SMTP_PASSWORD'),
-                "tls": True
-            }
-        )
\ No newline at end of file
+        return mensaje
@@ -0,0 +1,104 @@
+"""
+Plantilla de las facturas en PDF: hojas de estilo, estilos de tabla y encabezado/pie
+de página se arman una sola vez por proceso (obtener_plantilla) y se reutilizan en
+cada renderizado. Solo el contenido de la factura se construye por llamada.
+"""
+import threading
+
+_plantilla = None
+_lock = threading.Lock()
+
+
+class PlantillaFactura:
+    def __init__(self):
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+        from reportlab.lib.units import inch
+        from reportlab.platypus import TableStyle
+
+        self.pagesize = letter
+        self.margenes = {"rightMargin": 72, "leftMargin": 72, "topMargin": 72, "bottomMargin": 54}
+
+        self.estilos = getSampleStyleSheet()
+        self.estilos.add(ParagraphStyle(name='RightAlign', alignment=2))
+        self.titulo = self.estilos['Title']
+        self.normal = self.estilos['Normal']
+
+        self.anchos_lineas = [3 * inch, inch, inch, inch]
+        self.estilo_lineas = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+        self.anchos_totales = [4 * inch, inch]
+        self.estilo_totales = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 12),
+            ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black)
+        ])
+        self.encabezado_lineas = ['CONSUMO', 'PRECIO', 'CANTIDAD', 'TOTAL']
+
+    def documento(self, buffer, factura_data: dict):
+        """Documento listo para build(); el encabezado y el pie leen los datos de la factura."""
+        from reportlab.platypus import SimpleDocTemplate
+
+        # invariant: sin fecha ni id aleatorio en el documento, así la misma factura produce
+        # siempre los mismos bytes (y la misma dirección en el almacén de PDFs)
+        doc = SimpleDocTemplate(buffer, pagesize=self.pagesize, invariant=1, **self.margenes)
+        doc.numero_factura = factura_data['factura']['numero_factura']
+        doc.nombre_hospital = factura_data['hospital']['nombre']
+        return doc
+
+    def tabla_lineas(self, filas):
+        """LongTable con el encabezado repetido en cada página de una factura larga."""
+        from reportlab.platypus import LongTable
+
+        tabla = LongTable([self.encabezado_lineas, *filas], colWidths=self.anchos_lineas, repeatRows=1)
+        tabla.setStyle(self.estilo_lineas)
+        return tabla
+
+    def tabla_totales(self, filas):
+        from reportlab.platypus import Table
+
+        tabla = Table(filas, colWidths=self.anchos_totales)
+        tabla.setStyle(self.estilo_totales)
+        return tabla
+
+    def primera_pagina(self, canvas, doc):
+        self._pie(canvas, doc)
+
+    def paginas_siguientes(self, canvas, doc):
+        canvas.saveState()
+        canvas.setFont('Helvetica-Bold', 9)
+        canvas.drawString(
+            doc.leftMargin, doc.pagesize[1] - doc.topMargin / 2, f"FACTURA {doc.numero_factura} (continuación)"
+        )
+        canvas.restoreState()
+        self._pie(canvas, doc)
+
+    def _pie(self, canvas, doc):
+        canvas.saveState()
+        canvas.setFont('Helvetica', 8)
+        canvas.drawString(doc.leftMargin, doc.bottomMargin / 2, doc.nombre_hospital or "")
+        canvas.drawRightString(
+            doc.pagesize[0] - doc.rightMargin, doc.bottomMargin / 2,
+            f"Factura {doc.numero_factura} - Página {doc.page}"
+        )
+        canvas.restoreState()
+
+
+def obtener_plantilla() -> PlantillaFactura:
+    global _plantilla
+    if _plantilla is None:
+        with _lock:
+            if _plantilla is None:
+                _plantilla = PlantillaFactura()
+    return _plantilla
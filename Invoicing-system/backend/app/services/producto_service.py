@@ -1,5 +1,7 @@
 from fastapi import HTTPException, status
+from app.core.cache_http import etag
 from app.repositories.producto_repository import ProductoRepository
+from app.repositories.catalogo_cache import productos_cache
 from app.schemas.servicio_producto_schema import ProductoResponse
 from app.models.producto import TipoProducto, Producto
 
@@ -20,9 +22,11 @@ class ProductoService:
         return producto
 
     def listar_productos(self, tipo: TipoProducto = None):
-        if tipo:
-            return self.repository.db.query(Producto).filter(Producto.tipo == tipo).all()
-        return self.repository.listar_productos()
+        return self.repository.listar_productos(tipo)
+
+    def listar_productos_pagina(self, limite: int, cursor: str = None, tipo: TipoProducto = None):
+        items, next_cursor = self.repository.listar_productos_pagina(limite, cursor, tipo)
+        return {"items": items, "next_cursor": next_cursor, "limite": limite}
 
     def actualizar_producto(self, producto_id: int, producto_data):
         producto = self.repository.actualizar_producto(producto_id, producto_data.model_dump())
@@ -39,4 +43,11 @@ class ProductoService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Producto no encontrado"
             )
-        return {"message": "Producto eliminado correctamente"}
\ No newline at end of file
+        return {"message": "Producto eliminado correctamente"}
+
+    def estadisticas_cache(self):
+        return productos_cache.estadisticas()
+
+    def etag_catalogo(self, recurso: str) -> str:
+        """ETag de una lectura del catálogo: su versión confirmada y la ruta consultada."""
+        return etag("productos", productos_cache.version(self.repository.db), recurso)
\ No newline at end of file
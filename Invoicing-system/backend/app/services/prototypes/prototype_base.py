@@ -1,26 +1,47 @@
 from app.models.linea_transaccional import LineaDocumentoTransaccional, LineaDescargo, LineaFactura
+from app.services.prototypes.IPrototype import IPrototype
+
+class PrototipoLinea(IPrototype):
+    """
+    Prototipo de una línea ORM a partir de una plantilla de atributos.
+
+    clone() construye una instancia transitoria nueva con la plantilla en lugar de
+    hacer deepcopy de un objeto mapeado: no se copia el estado de SQLAlchemy
+    (_sa_instance_state) y ningún clon comparte estado con otro ni con el prototipo.
+    """
+
+    def __init__(self, modelo, **plantilla):
+        self.modelo = modelo
+        self.plantilla = plantilla
+
+    def clone(self):
+        return self.modelo(**self.plantilla)
 
 # Prototipo base para LineaDocumentoTransaccional
-linea_transaccional_prototype_servicio = LineaDocumentoTransaccional(
+linea_transaccional_prototype_servicio = PrototipoLinea(
+    LineaDocumentoTransaccional,
     cantidad=1,
     servicio_id=None,
     producto_id=None
 )
 
-linea_transaccional_prototype_producto = LineaDocumentoTransaccional(
+linea_transaccional_prototype_producto = PrototipoLinea(
+    LineaDocumentoTransaccional,
     cantidad=1,
     servicio_id=None,
     producto_id=None
 )
 
 # Prototipo base para LineaDescargo
-linea_descargo_prototype = LineaDescargo(
+linea_descargo_prototype = PrototipoLinea(
+    LineaDescargo,
     descripcion="Descripción genérica",
     subtotal_sin_iva=0.0
 )
 
 # Prototipo base para LineaFactura
-linea_factura_prototype = LineaFactura(
+linea_factura_prototype = PrototipoLinea(
+    LineaFactura,
     iva=0.16,
     total_con_iva=0.0
-)
\ No newline at end of file
+)
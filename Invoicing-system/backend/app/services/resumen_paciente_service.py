@@ -0,0 +1,54 @@
+"""
+Servicio de la proyección resumen_pacientes (lectura de los tableros).
+
+Reconstrucción desde cero, por ejemplo tras una migración o una carga directa en la base
+(desde backend/):
+    python -m app.services.resumen_paciente_service --reconstruir
+"""
+import argparse
+import sys
+import time
+from sqlalchemy.orm import Session
+from app.repositories.resumen_paciente_repository import ResumenPacienteRepository
+
+
+class ResumenPacienteService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = ResumenPacienteRepository(db)
+
+    def listar(self, estado: str = None, con_descargos: bool = False, no_facturados: bool = False):
+        return self.repo.listar(estado, con_descargos, no_facturados)
+
+    def reconstruir(self) -> int:
+        try:
+            filas = self.repo.reconstruir()
+            self.db.commit()
+            return filas
+        except Exception:
+            self.db.rollback()
+            raise
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reconstruir", action="store_true", help="regenera la proyección completa")
+    args = parser.parse_args(argv)
+    if not args.reconstruir:
+        parser.print_help()
+        return 2
+
+    from app.core.database import get_sessionmaker
+
+    db = get_sessionmaker()()
+    try:
+        inicio = time.perf_counter()
+        filas = ResumenPacienteService(db).reconstruir()
+    finally:
+        db.close()
+    print(f"resumen_pacientes reconstruida: {filas} pacientes en {time.perf_counter() - inicio:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
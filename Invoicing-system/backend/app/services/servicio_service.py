@@ -1,5 +1,7 @@
 from fastapi import HTTPException, status
+from app.core.cache_http import etag
 from app.repositories.servicio_repository import ServicioRepository
+from app.repositories.catalogo_cache import servicios_cache
 from app.schemas.servicio_producto_schema import ServicioResponse
 from app.models.servicio import TipoServicio, Servicio
 
@@ -20,9 +22,11 @@ class ServicioService:
         return servicio
 
     def listar_servicios(self, tipo: TipoServicio = None):
-        if tipo:
-            return self.repository.db.query(Servicio).filter(Servicio.tipo == tipo).all()
-        return self.repository.listar_servicios()
+        return self.repository.listar_servicios(tipo)
+
+    def listar_servicios_pagina(self, limite: int, cursor: str = None, tipo: TipoServicio = None):
+        items, next_cursor = self.repository.listar_servicios_pagina(limite, cursor, tipo)
+        return {"items": items, "next_cursor": next_cursor, "limite": limite}
 
     def actualizar_servicio(self, servicio_id: int, servicio_data):
         servicio = self.repository.actualizar_servicio(servicio_id, servicio_data.model_dump())
@@ -39,4 +43,11 @@ class ServicioService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Servicio no encontrado"
             )
-        return {"message": "Servicio eliminado correctamente"}
\ No newline at end of file
+        return {"message": "Servicio eliminado correctamente"}
+
+    def estadisticas_cache(self):
+        return servicios_cache.estadisticas()
+
+    def etag_catalogo(self, recurso: str) -> str:
+        """ETag de una lectura del catálogo: su versión confirmada y la ruta consultada."""
+        return etag("servicios", servicios_cache.version(self.repository.db), recurso)
\ No newline at end of file
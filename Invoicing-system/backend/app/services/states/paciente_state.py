@@ -5,6 +5,10 @@ class PacienteState(ABC):
     def agregar_descargo(self, paciente, descargo_data):
         pass
 
+    @abstractmethod
+    def validar_descargo(self, paciente):
+        pass
+
     @abstractmethod
     def dar_alta(self, paciente):
         pass
@@ -13,6 +17,10 @@ class PacienteState(ABC):
     def facturar(self, paciente, factura_data):
         pass
 
+    @abstractmethod
+    def registrar_factura(self, paciente):
+        pass
+
     @abstractmethod
     def get_estado(self):
         pass
\ No newline at end of file
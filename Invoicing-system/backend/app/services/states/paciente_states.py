@@ -10,6 +10,10 @@ class InternadoState(PacienteState):
         paciente.descargos.append(descargo)  # Agregar a la relación
         return descargo
 
+    def validar_descargo(self, paciente):
+        """El paciente internado admite descargos."""
+        return True
+
     def dar_alta(self, paciente):
         """Cambia el estado a AltaState."""
         paciente.estado = "alta"
@@ -21,6 +25,10 @@ class InternadoState(PacienteState):
         """No permite facturar mientras el paciente está internado."""
         raise ValueError("No se puede facturar a un paciente internado.")
 
+    def registrar_factura(self, paciente):
+        """No permite facturar mientras el paciente está internado."""
+        raise ValueError("No se puede facturar a un paciente internado.")
+
     def get_estado(self):
         return "internado"
 
@@ -29,6 +37,10 @@ class AltaState(PacienteState):
         """No permite agregar descargos después de dar de alta."""
         raise ValueError("No se pueden agregar descargos a un paciente dado de alta.")
 
+    def validar_descargo(self, paciente):
+        """Misma regla que agregar_descargo, sin crear el descargo."""
+        raise ValueError("No se pueden agregar descargos a un paciente dado de alta.")
+
     def dar_alta(self, paciente):
         """El paciente ya está dado de alta, no se permite repetir esta acción."""
         raise ValueError("El paciente ya está dado de alta.")
@@ -46,6 +58,12 @@ class AltaState(PacienteState):
             print("Error: La factura no se asoció correctamente al paciente.")
         return factura
 
+    def registrar_factura(self, paciente):
+        """Cambia el estado a FacturadoState para una factura ya creada (motor de facturación)."""
+        paciente.estado = "facturado"
+        paciente._state = FacturadoState()
+        return True
+
     def get_estado(self):
         return "alta"
 
@@ -54,6 +72,10 @@ class FacturadoState(PacienteState):
         """No permite agregar descargos después de facturar."""
         raise ValueError("No se pueden agregar descargos a un paciente facturado.")
 
+    def validar_descargo(self, paciente):
+        """Misma regla que agregar_descargo, sin crear el descargo."""
+        raise ValueError("No se pueden agregar descargos a un paciente facturado.")
+
     def dar_alta(self, paciente):
         """No permite cambiar el alta después de facturar."""
         raise ValueError("El paciente ya está facturado, no se puede dar de alta nuevamente.")
@@ -62,5 +84,9 @@ class FacturadoState(PacienteState):
         """No permite facturar nuevamente."""
         raise ValueError("El paciente ya está facturado.")
 
+    def registrar_factura(self, paciente):
+        """No permite facturar nuevamente."""
+        raise ValueError("El paciente ya está facturado.")
+
     def get_estado(self):
         return "facturado"
\ No newline at end of file
@@ -1,55 +1,33 @@
-import pytest
-from datetime import datetime, date
-from app.test.Test_dao.test_dao import get_test_db
-from app.repositories import paciente_dao
-
-def test_paciente_dao():
-    db = next(get_test_db())
-    
-    try:
-        # Crear paciente
-        paciente_data = {
-            "nombre": "Juan Pérez",
-            "estado": "Internado",
-            "fechaIngreso": date(2023, 1, 15)
-        }
-        paciente = paciente_dao.create(db, paciente_data)
-        db.commit()
-
-        # Verificar creación
-        assert paciente.nombre == "Juan Pérez"
-        assert paciente.estado == "Internado"
-        assert paciente.fechaIngreso == date(2023, 1, 15)
-        
-        # Buscar por nombre
-        pacientes = paciente_dao.get_by_name(db, "Juan")
-        assert len(pacientes) > 0
-        assert pacientes[0].nombre == "Juan Pérez"
-        
-        # Buscar por estado
-        internados = paciente_dao.get_active_patients(db)
-        assert any(p.nombre == "Juan Pérez" for p in internados)
-        
-        # Actualizar estado
-        paciente_dao.update(db, paciente, {
-            "estado": "Alta",
-            "fechaAlta": date(2023, 1, 20)  # Use date object here too
-        })
-        db.commit()  # Add commit after update
-        
-        assert paciente.estado == "Alta"
-        assert paciente.fechaAlta == date(2023, 1, 20)
-        
-        # Verificar actualización
-        paciente_actualizado = paciente_dao.get(db, paciente.id_paciente)
-        assert paciente_actualizado.estado == "Alta"
-        
-        # Eliminar
-        paciente_dao.delete(db, paciente.id_paciente)
-        db.commit()  # Add commit after delete
-        
-        assert paciente_dao.get(db, paciente.id_paciente) is None
-
-    finally:
-        db.rollback()  # Rollback any uncommitted changes
-        db.close()
\ No newline at end of file
+from datetime import datetime
+
+from app.repositories.paciente_repository import PacienteRepository
+
+
+def test_paciente_dao(db):
+    repo = PacienteRepository(db)
+
+    # Crear paciente
+    paciente = repo.crear_paciente({
+        "nombre_completo": "Juan Pérez",
+        "afeccion": "Fractura",
+        "fecha_ingreso": datetime(2023, 1, 15)
+    })
+    assert paciente.nombre_completo == "Juan Pérez"
+    assert paciente.estado == "internado"
+    assert paciente.fecha_ingreso == datetime(2023, 1, 15)
+
+    # Buscar por nombre (sin tildes ni mayúsculas)
+    assert [p.id for p in repo.buscar_pacientes("juan perez")] == [paciente.id]
+
+    # Buscar internados
+    assert paciente.id in [p.id for p in repo.obtener_pacientes_internados()]
+
+    # Dar de alta
+    repo.set_alta(paciente.id)
+    assert repo.obtener_por_id(paciente.id).estado == "alta"
+    assert paciente.id not in [p.id for p in repo.obtener_pacientes_internados()]
+
+    # Eliminar
+    repo.eliminar_paciente(paciente.id)
+    assert repo.obtener_por_id(paciente.id) is None
+
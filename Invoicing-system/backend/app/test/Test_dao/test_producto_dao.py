@@ -1,77 +1,30 @@
 import pytest
-from datetime import date
-from app.test.Test_dao.test_dao import get_test_db
-from app.models.producto import Medicamento
-from app.dao.base_dao import BaseDAO
 
-medicamento_dao = BaseDAO(Medicamento)
+from app.models import TipoProducto
+from app.repositories.producto_repository import ProductoRepository
+from app.schemas.servicio_producto_schema import ProductoCreate
 
-def test_producto_dao():
-    db = next(get_test_db())
-    
-    try:
-        # Crear producto
-        producto_data = {
-            "nombre": "Producto Test",
-            "precio": 10.99,
-            "tipo": "producto"
-        }
-        producto = producto_dao.create(db, producto_data)
-        db.commit()
 
-        # Verificar creación
-        assert producto.nombre == "Producto Test"
-        assert float(producto.precio) == 10.99
-        
-        # Buscar por tipo
-        productos = producto_dao.get_by_type(db, "producto")
-        assert len(productos) > 0
+def test_producto_dao(db):
+    repo = ProductoRepository(db)
 
-        # Eliminar producto
-        producto_dao.delete(db, producto.id_producto)
-        db.commit()
-        assert producto_dao.get(db, producto.id_producto) is None
+    # Crear medicamento (la fábrica agrega un 5% por costos de regulación)
+    medicamento = repo.crear_producto(
+        ProductoCreate(tipo="medicamentos", precio_base=10.0, descripcion="Paracetamol 500mg")
+    )
+    assert medicamento.descripcion == "Paracetamol 500mg"
+    assert medicamento.precio_base == pytest.approx(10.5)
 
-    finally:
-        db.rollback()
-        db.close()
+    # Buscar por tipo
+    assert [p.id for p in repo.listar_productos(TipoProducto.medicamentos)] == [medicamento.id]
+    assert repo.listar_productos(TipoProducto.insumos_medicos) == []
 
+    # Actualizar precio: el listado en caché refleja el cambio
+    repo.actualizar_producto(medicamento.id, {"precio_base": 12.99})
+    assert repo.obtener_por_id(medicamento.id).precio_base == 12.99
+    assert [p.precio_base for p in repo.listar_productos()] == [12.99]
 
-def test_producto_dao():
-    db = next(get_test_db())
-    
-    try:
-        # Crear medicamento
-        medicamento_data = {
-            "id_producto": "MED001",
-            "nombre": "Paracetamol",
-            "precio": 10.99,
-            "laboratorio": "Bayer",
-            "dosis": "500mg"
-        }
-        medicamento = medicamento_dao.create(db, medicamento_data)
-        db.commit()
-
-        # Verificar creación
-        assert medicamento.nombre == "Paracetamol"
-        assert float(medicamento.precio) == 10.99
-        assert medicamento.laboratorio == "Bayer"
-        assert medicamento.dosis == "500mg"
-
-        # Buscar todos los medicamentos
-        medicamentos = db.query(Medicamento).all()
-        assert len(medicamentos) > 0
-
-        # Actualizar precio
-        medicamento_dao.update(db, medicamento, {"precio": 12.99})
-        db.commit()
-        assert float(medicamento.precio) == 12.99
-
-        # Eliminar medicamento
-        medicamento_dao.delete(db, medicamento.id_producto)
-        db.commit()
-        assert medicamento_dao.get(db, medicamento.id_producto) is None
-
-    finally:
-        db.rollback()
-        db.close()
\ No newline at end of file
+    # Eliminar
+    repo.eliminar_producto(medicamento.id)
+    assert repo.obtener_por_id(medicamento.id) is None
+    assert repo.listar_productos() == []
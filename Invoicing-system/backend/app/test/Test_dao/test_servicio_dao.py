@@ -1,47 +1,25 @@
-import pytest
-from app.test.Test_dao.test_dao import get_test_db
-from backend.app.models.servicios import AtencionMedica
-from app.dao.base_dao import BaseDAO
+from app.models import TipoServicio
+from app.repositories.servicio_repository import ServicioRepository
+from app.schemas.servicio_producto_schema import ServicioCreate
 
-atencion_dao = BaseDAO(AtencionMedica)
 
-def test_servicio_dao():
-    db = next(get_test_db())
-    
-    try:
-        # Crear atención médica
-        atencion_data = {
-            "id_servicio": "SRV001",
-            "nombre": "Consulta General",
-            "costo": 150.00,
-            "medico": "Dr. Smith",
-            "especialidad": "Medicina General",
-            "duracion": 30
-        }
-        atencion = atencion_dao.create(db, atencion_data)
-        db.commit()
+def test_servicio_dao(db):
+    repo = ServicioRepository(db)
 
-        # Verificar creación
-        assert atencion.nombre == "Consulta General"
-        assert float(atencion.costo) == 150.00
-        assert atencion.medico == "Dr. Smith"
-        assert atencion.especialidad == "Medicina General"
-        assert atencion.duracion == 30
+    # Crear atención médica
+    atencion = repo.crear_servicio(
+        ServicioCreate(tipo="atencion_medica", precio_base=150.0, descripcion="Consulta General")
+    )
+    assert atencion.descripcion == "Consulta General"
+    assert atencion.precio_base == 150.0
 
-        # Buscar todos las atenciones médicas
-        atenciones = db.query(AtencionMedica).all()
-        assert len(atenciones) > 0
+    # Buscar por tipo
+    assert [s.id for s in repo.listar_servicios(TipoServicio.atencion_medica)] == [atencion.id]
 
-        # Actualizar costo
-        atencion_dao.update(db, atencion, {"costo": 175.00})
-        db.commit()
-        assert float(atencion.costo) == 175.00
+    # Actualizar costo
+    repo.actualizar_servicio(atencion.id, {"precio_base": 175.0})
+    assert repo.obtener_por_id(atencion.id).precio_base == 175.0
 
-        # Eliminar servicio
-        atencion_dao.delete(db, atencion.id_servicio)
-        db.commit()
-        assert atencion_dao.get(db, atencion.id_servicio) is None
-
-    finally:
-        db.rollback()
-        db.close()
\ No newline at end of file
+    # Eliminar
+    repo.eliminar_servicio(atencion.id)
+    assert repo.obtener_por_id(atencion.id) is None
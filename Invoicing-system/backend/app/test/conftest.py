@@ -0,0 +1,209 @@
+"""
+Base de datos de los tests.
+
+El esquema se crea una vez por sesión de pytest: en SQLite en memoria, o en un
+PostgreSQL desechable si TEST_DATABASE_URL apunta a uno que responde (por ejemplo
+postgresql://postgres@localhost/facturacion_test). Con pytest-xdist (`pytest -n 4`)
+cada worker es un proceso con su propia base: SQLite en memoria ya lo es, y en
+PostgreSQL se usa `<base>_<worker>`, que se crea si no existe.
+
+El fixture `db` envuelve cada test en una transacción que se deshace al terminar; la
+sesión trabaja sobre un SAVEPOINT, así que los commit de repositorios y servicios se
+comportan como siempre pero no dejan nada para el test siguiente. Los tests que piden
+`engine` (varias sesiones o hilos que deben ver commits reales) reciben en cambio un
+SQLite en memoria propio y `db` es una sesión normal sobre él.
+"""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.consultas import PresupuestoConsultas
+from app.core.database import Base, get_db
+from app.repositories.catalogo_cache import productos_cache, servicios_cache
+import app.models  # noqa: F401  registra todos los modelos en Base.metadata
+
+URL_POSTGRES = os.environ.get("TEST_DATABASE_URL")
+_motivo_sqlite = None
+
+
+def _engine_sqlite():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+
+    # pysqlite abre y cierra transacciones por su cuenta y con eso rompe los SAVEPOINT:
+    # se desactiva y el BEGIN lo emite SQLAlchemy
+    @event.listens_for(engine, "connect")
+    def _sin_transacciones_implicitas(dbapi_connection, registro):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conexion):
+        conexion.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+def _engine_postgres(url: str):
+    """Engine sobre la base del worker de xdist, creándola si hace falta."""
+    url = make_url(url)
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker:
+        url = url.set(database=f"{url.database}_{worker}")
+    admin = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        with admin.connect() as conexion:
+            existe = conexion.execute(
+                text("SELECT 1 FROM pg_database WHERE datname = :nombre"), {"nombre": url.database}
+            ).scalar()
+            if not existe:
+                conexion.execute(text(f'CREATE DATABASE "{url.database}"'))
+    finally:
+        admin.dispose()
+    return create_engine(url)
+
+
+def _engine_pruebas():
+    global _motivo_sqlite
+    if URL_POSTGRES:
+        try:
+            return _engine_postgres(URL_POSTGRES)
+        except Exception as e:
+            # Sin driver o sin servidor: la suite sigue en SQLite en lugar de fallar entera
+            url = make_url(URL_POSTGRES).render_as_string(hide_password=True)
+            _motivo_sqlite = f"{url} no disponible ({type(e).__name__}: {e})"
+    return _engine_sqlite()
+
+
+def pytest_report_header(config):
+    if URL_POSTGRES:
+        return f"base de datos de pruebas: {make_url(URL_POSTGRES).render_as_string(hide_password=True)}"
+    return "base de datos de pruebas: SQLite en memoria (TEST_DATABASE_URL para PostgreSQL)"
+
+
+def pytest_terminal_summary(terminalreporter):
+    if _motivo_sqlite:
+        terminalreporter.write_line(f"Tests sobre SQLite en memoria: {_motivo_sqlite}", yellow=True)
+
+
+@pytest.fixture(scope="session")
+def engine_sesion():
+    """Engine compartido por la sesión (o el worker de xdist), con el esquema ya creado."""
+    engine = _engine_pruebas()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def engine():
+    """SQLite en memoria propio del test, para sesiones o hilos que confirman de verdad."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(request):
+    if "engine" in request.fixturenames:
+        session = sessionmaker(autocommit=False, autoflush=False, bind=request.getfixturevalue("engine"))()
+        try:
+            yield session
+        finally:
+            session.close()
+        return
+
+    conexion = request.getfixturevalue("engine_sesion").connect()
+    transaccion = conexion.begin()
+    session = sessionmaker(
+        autoflush=False, bind=conexion, join_transaction_mode="create_savepoint"
+    )()
+    try:
+        yield session
+    finally:
+        session.close()
+        transaccion.rollback()
+        conexion.close()
+
+
+@pytest.fixture(autouse=True)
+def catalogo_vacio(monkeypatch):
+    """
+    Las cachés del catálogo son del proceso: tras el rollback de un test podrían
+    coincidir en versión con el catálogo (distinto) del siguiente.
+    """
+    for cache in (servicios_cache, productos_cache):
+        monkeypatch.setattr(cache, "_snapshot", None)
+        monkeypatch.setattr(cache, "_version", None)
+
+
+@pytest.fixture
+def cliente(db):
+    """TestClient de la aplicación con get_db servido por la sesión `db` del test."""
+    from main import app
+
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+def _es_control_de_transaccion(sentencia: str) -> bool:
+    # BEGIN y SAVEPOINT que emite el fixture `db`, no la aplicación
+    return sentencia.lstrip().upper().startswith(("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK"))
+
+
+@pytest.fixture
+def contar_consultas(db):
+    """Context manager que cuenta las sentencias SQL ejecutadas por la base de `db` dentro del bloque."""
+    objetivo = db.get_bind()
+
+    @contextmanager
+    def contar():
+        sentencias = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            if not _es_control_de_transaccion(statement):
+                sentencias.append(statement)
+
+        event.listen(objetivo, "before_cursor_execute", registrar)
+        try:
+            yield sentencias
+        finally:
+            event.remove(objetivo, "before_cursor_execute", registrar)
+
+    return contar
+
+
+@pytest.fixture
+def presupuesto_consultas(db):
+    """
+    PresupuestoConsultas sobre la base de `db`: `with presupuesto_consultas(3) as registro:`
+    falla si el bloque ejecuta más de 3 sentencias, repite una idéntica o repite una
+    forma más de `maximo_por_forma` veces.
+    """
+    def presupuesto(maximo=None, **opciones):
+        return PresupuestoConsultas(
+            maximo, engine=db.get_bind(), ignorar=_es_control_de_transaccion, **opciones
+        )
+
+    return presupuesto
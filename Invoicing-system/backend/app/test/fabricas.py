@@ -0,0 +1,87 @@
+"""
+Fábricas de datos para los tests: crean y confirman filas válidas con valores por
+defecto razonables, que cada test sobrescribe con lo que le importa.
+
+    paciente = fabricas.paciente(db, estado="alta")
+    fabricas.descargo(db, paciente, subtotales=[10.0, 20.0])
+    factura = fabricas.factura(db, paciente)
+
+Confirman con db.commit(): con el fixture `db` por defecto eso libera un SAVEPOINT
+que se descarta al terminar el test, así que no queda nada en la base.
+"""
+from itertools import count
+
+from app.models import (
+    Cliente, Descargo, LineaDescargo, LineaDocumentoTransaccional, Paciente, Producto, Servicio,
+    TipoProducto, TipoServicio
+)
+from app.services.factura_service import FacturaService
+
+_secuencia = count(1)
+
+
+def paciente(db, **campos) -> Paciente:
+    n = next(_secuencia)
+    campos.setdefault("nombre_completo", f"Paciente {n}")
+    campos.setdefault("afeccion", "N/A")
+    nuevo = Paciente(**campos)
+    db.add(nuevo)
+    db.commit()
+    return nuevo
+
+
+def cliente(db, **campos) -> Cliente:
+    n = next(_secuencia)
+    campos.setdefault("nombre", f"Aseguradora {n}")
+    campos.setdefault("correo", f"facturas{n}@aseguradora.example")
+    nuevo = Cliente(**campos)
+    db.add(nuevo)
+    db.commit()
+    return nuevo
+
+
+def servicio(db, **campos) -> Servicio:
+    campos.setdefault("tipo", TipoServicio.atencion_medica)
+    campos.setdefault("precio_base", 50.0)
+    campos.setdefault("descripcion", f"Servicio {next(_secuencia)}")
+    nuevo = Servicio(**campos)
+    db.add(nuevo)
+    db.commit()
+    return nuevo
+
+
+def producto(db, **campos) -> Producto:
+    campos.setdefault("tipo", TipoProducto.medicamentos)
+    campos.setdefault("precio_base", 10.0)
+    campos.setdefault("descripcion", f"Producto {next(_secuencia)}")
+    nuevo = Producto(**campos)
+    db.add(nuevo)
+    db.commit()
+    return nuevo
+
+
+def descargo(db, paciente_: Paciente = None, subtotales=(10.0,), **campos) -> Descargo:
+    """Descargo con una línea (cantidad 1) por subtotal; crea un paciente internado si no se pasa."""
+    if paciente_ is None:
+        paciente_ = paciente(db)
+    nuevo = Descargo(paciente_id=paciente_.id, total=sum(subtotales), **campos)
+    for subtotal in subtotales:
+        linea = LineaDocumentoTransaccional(cantidad=1)
+        linea.linea_descargo = LineaDescargo(descripcion="Consulta", subtotal_sin_iva=subtotal)
+        nuevo.lineas_transaccionales.append(linea)
+    db.add(nuevo)
+    db.commit()
+    return nuevo
+
+
+def factura(db, paciente_: Paciente = None, cliente_: Cliente = None, subtotales=(10.0,)):
+    """
+    Factura emitida por FacturaService.facturar, el mismo camino que la aplicación.
+    Sin paciente crea uno de alta con un descargo de `subtotales`.
+    """
+    if paciente_ is None:
+        paciente_ = paciente(db, estado="alta")
+        descargo(db, paciente_, subtotales)
+    if cliente_ is None:
+        cliente_ = cliente(db)
+    return FacturaService(db).facturar(paciente_.id, cliente_.id)
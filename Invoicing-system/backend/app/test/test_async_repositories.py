@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models import Descargo, LineaFactura, Paciente, ResumenPaciente, Servicio
+from app.models.servicio import TipoServicio
+from app.repositories.async_descargo_repository import AsyncDescargoRepository
+from app.repositories.async_paciente_repository import AsyncPacienteRepository
+from app.schemas.descargo_schema import LineaDescargoCreate
+from app.services.factura_service import AsyncFacturaService, FacturaService
+from app.test import fabricas
+
+
+def test_descargo_creado_y_leido_con_async_session(tmp_path):
+    url = f"sqlite:///{tmp_path}/async.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    async def escenario():
+        async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+        sesiones = async_sessionmaker(async_engine, expire_on_commit=False)
+        async with sesiones() as db:
+            servicio = Servicio(tipo=TipoServicio.atencion_medica, precio_base=10.0, descripcion="Consulta")
+            db.add(servicio)
+            await db.commit()
+            paciente = await AsyncPacienteRepository(db).crear_paciente(
+                {"nombre_completo": "Ana", "afeccion": "N/A"}
+            )
+            descargo = await AsyncDescargoRepository(db).crear_descargo_con_lineas(
+                paciente.id, [LineaDescargoCreate(servicio_id=servicio.id, cantidad=3)]
+            )
+            descargos = await AsyncDescargoRepository(db).obtener_descargos_por_paciente(paciente.id)
+        await async_engine.dispose()
+        return descargo, descargos
+
+    descargo, descargos = asyncio.run(escenario())
+
+    assert descargo.total == 30.0
+    assert [d.id for d in descargos] == [descargo.id]
+    assert descargos[0].lineas_transaccionales[0].linea_descargo.subtotal_sin_iva == 30.0
+
+
+def test_factura_emitida_con_async_session_usa_el_motor_compartido(tmp_path):
+    url = f"sqlite:///{tmp_path}/async.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        paciente = fabricas.paciente(db, estado="alta")
+        fabricas.descargo(db, paciente, subtotales=(10.0, 20.0))
+        ids = paciente.id, fabricas.cliente(db).id
+    engine.dispose()
+
+    async def escenario():
+        async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+        sesiones = async_sessionmaker(async_engine, expire_on_commit=False)
+        async with sesiones() as db:
+            respuesta = await AsyncFacturaService(db).generar_factura(*ids)
+            factura_id = respuesta["factura"]["id"]
+            etag = await AsyncFacturaService(db).etag_factura(factura_id)
+            lineas = await db.scalar(select(func.count()).where(LineaFactura.factura_id == factura_id))
+            marcas = (await db.scalars(select(Descargo.factura_id).where(Descargo.paciente_id == ids[0]))).all()
+            estado = await db.scalar(select(Paciente.estado).where(Paciente.id == ids[0]))
+            no_facturados = (await db.get(ResumenPaciente, ids[0])).descargos_no_facturados
+            with pytest.raises(HTTPException) as repetida:
+                await AsyncFacturaService(db).generar_factura(*ids)
+        await async_engine.dispose()
+        return respuesta, etag, lineas, marcas, estado, no_facturados, repetida.value
+
+    respuesta, etag, lineas, marcas, estado, no_facturados, repetida = asyncio.run(escenario())
+
+    assert respuesta["factura"]["subtotal"] == pytest.approx(30.0)
+    assert [linea["subtotal_sin_iva"] for linea in respuesta["lineas"]] == [10.0, 20.0]
+    assert (lineas, marcas, estado, no_facturados) == (2, [respuesta["factura"]["id"]], "facturado", 0)
+    assert repetida.status_code == 400
+    # El mismo ETag que el router síncrono
+    engine = create_engine(url)
+    with sessionmaker(bind=engine)() as db:
+        assert FacturaService(db).etag_factura(respuesta["factura"]["id"]) == etag
+    engine.dispose()
@@ -0,0 +1,21 @@
+import pytest
+
+from app.models import Paciente
+from app.test import fabricas
+
+
+@pytest.mark.parametrize("vuelta", [1, 2])
+def test_lo_confirmado_en_un_test_no_llega_al_siguiente(db, vuelta):
+    assert db.query(Paciente).count() == 0
+    fabricas.descargo(db, fabricas.paciente(db), subtotales=[10.0, 20.0])
+    db.rollback()  # un rollback de la aplicación solo deshace lo no confirmado
+    assert db.query(Paciente).count() == 1
+
+
+def test_el_cliente_http_usa_la_sesion_del_test(db, cliente):
+    factura = fabricas.factura(db, subtotales=[10.0])
+
+    respuesta = cliente.get(f"/facturas/{factura.id}")
+
+    assert respuesta.status_code == 200
+    assert respuesta.json()["factura"]["id"] == factura.id
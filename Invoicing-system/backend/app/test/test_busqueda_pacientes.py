@@ -0,0 +1,70 @@
+from app.models import Paciente
+from app.repositories.busqueda_pacientes import indice_para
+from app.repositories.paciente_repository import PacienteRepository
+
+
+def _crear(db, *nombres, estado="internado"):
+    db.add_all(Paciente(nombre_completo=nombre, afeccion="N/A", estado=estado) for nombre in nombres)
+    db.commit()
+
+
+def _nombres(pacientes):
+    return [paciente.nombre_completo for paciente in pacientes]
+
+
+def test_busqueda_ignora_tildes_y_mayusculas(db):
+    _crear(db, "José Núñez", "Maria Lopez", "Ana Pérez")
+    repo = PacienteRepository(db)
+    assert _nombres(repo.buscar_pacientes("NUNEZ")) == ["José Núñez"]
+    assert _nombres(repo.buscar_pacientes("pérez")) == ["Ana Pérez"]
+    assert _nombres(repo.buscar_pacientes("maría")) == ["Maria Lopez"]
+
+
+def test_subcadena_antes_que_coincidencia_aproximada_y_limite(db):
+    _crear(db, "Gonzalo Gonzalez", "Gonzales Ruiz", "Pedro Gonzalez Diaz", "Carlos Ruiz")
+    repo = PacienteRepository(db)
+    resultado = _nombres(repo.buscar_pacientes("gonzalez"))
+    # Las dos subcadenas exactas primero; "Gonzales" entra por similitud de trigramas
+    assert set(resultado[:2]) == {"Gonzalo Gonzalez", "Pedro Gonzalez Diaz"}
+    assert resultado[2:] == ["Gonzales Ruiz"]
+    assert len(repo.buscar_pacientes("gonzalez", limite=1)) == 1
+
+
+def test_modo_prefijo(db):
+    _crear(db, "Mariana Soto", "Ana Mariño", "Rosa Marin", "Juan Amarillo")
+    resultado = _nombres(PacienteRepository(db).buscar_pacientes("mari", modo="prefijo"))
+    assert resultado[0] == "Mariana Soto"
+    assert set(resultado[1:]) == {"Ana Mariño", "Rosa Marin"}
+
+
+def test_filtro_por_estado_y_termino_vacio(db):
+    _crear(db, "Luis Alta", estado="alta")
+    _crear(db, "Luis Internado")
+    repo = PacienteRepository(db)
+    assert _nombres(repo.buscar_pacientes("luis", estado="alta")) == ["Luis Alta"]
+    assert len(repo.buscar_pacientes("")) == 2
+
+
+def test_indice_en_memoria_sigue_los_commits(db):
+    _crear(db, "Elena Vidal")
+    repo = PacienteRepository(db)
+    assert _nombres(repo.buscar_pacientes("vidal")) == ["Elena Vidal"]
+
+    # Alta, cambio de nombre y borrado se reflejan tras el commit, no antes
+    paciente = repo.buscar_pacientes("vidal")[0]
+    paciente.nombre_completo = "Elena Ibáñez"
+    db.add(Paciente(nombre_completo="Tomás Vidal", afeccion="N/A", estado="internado"))
+    db.flush()
+    assert "Tomás Vidal" not in indice_para(db).nombres.values()
+    db.commit()
+    assert _nombres(repo.buscar_pacientes("vidal")) == ["Tomás Vidal"]
+    assert _nombres(repo.buscar_pacientes("ibanez")) == ["Elena Ibáñez"]
+
+    db.delete(repo.buscar_pacientes("vidal")[0])
+    db.commit()
+    assert repo.buscar_pacientes("vidal") == []
+
+    db.add(Paciente(nombre_completo="Rollback Vidal", afeccion="N/A", estado="internado"))
+    db.flush()
+    db.rollback()
+    assert repo.buscar_pacientes("vidal") == []
@@ -0,0 +1,77 @@
+import pytest
+
+from app.core.almacen_pdf import AlmacenPDF
+from app.models import Cliente, Descargo, Factura, LineaDescargo, LineaDocumentoTransaccional, Paciente
+from app.repositories.servicio_repository import ServicioRepository
+from app.schemas.servicio_producto_schema import ServicioCreate
+from app.services import cola_pdf_service
+from app.services.factura_service import FacturaService
+
+
+@pytest.fixture
+def cliente_http(cliente, tmp_path, monkeypatch):
+    monkeypatch.setattr(cola_pdf_service, "_almacen", AlmacenPDF(tmp_path / "pdfs"))
+    return cliente
+
+
+def _emitir_factura(db):
+    paciente = Paciente(nombre_completo="Paciente", afeccion="N/A", estado="alta")
+    descargo = Descargo(total=10.0)
+    linea = LineaDocumentoTransaccional(cantidad=1)
+    linea.linea_descargo = LineaDescargo(descripcion="Consulta", subtotal_sin_iva=10.0)
+    descargo.lineas_transaccionales.append(linea)
+    paciente.descargos.append(descargo)
+    cliente = Cliente(nombre="Aseguradora")
+    db.add_all([paciente, cliente])
+    db.commit()
+    return FacturaService(db).facturar(paciente.id, cliente.id).id
+
+
+def test_factura_responde_304_sin_cargar_lineas(db, cliente_http, contar_consultas):
+    factura_id = _emitir_factura(db)
+    primera = cliente_http.get(f"/facturas/{factura_id}")
+    etag = primera.headers["etag"]
+    assert primera.status_code == 200 and primera.headers["cache-control"] == "private, no-cache"
+
+    with contar_consultas() as sentencias:
+        revalidada = cliente_http.get(f"/facturas/{factura_id}", headers={"If-None-Match": etag})
+    assert revalidada.status_code == 304 and revalidada.content == b""
+    assert not any("lineas_factura" in sentencia for sentencia in sentencias)
+
+    # Cambiar el estado de pago incrementa la versión de la fila
+    factura = db.get(Factura, factura_id)
+    factura.estado_pago = "pagada"
+    db.commit()
+    assert factura.version == 2
+    cambiada = cliente_http.get(f"/facturas/{factura_id}", headers={"If-None-Match": etag})
+    assert cambiada.status_code == 200 and cambiada.headers["etag"] != etag
+    assert cambiada.json()["factura"]["estado_pago"] == "pagada"
+
+
+def test_pdf_con_etag_de_contenido_y_re_renderizado_si_cambia_el_cliente(db, cliente_http):
+    factura_id = _emitir_factura(db)
+    primera = cliente_http.get(f"/facturas/{factura_id}/pdf")
+    etag = primera.headers["etag"]
+    assert primera.status_code == 200 and len(etag) == 66
+
+    assert cliente_http.get(f"/facturas/{factura_id}/pdf", headers={"If-None-Match": etag}).status_code == 304
+
+    db.get(Factura, factura_id).cliente.direccion = "Av. Nueva 456"
+    db.commit()
+    cambiada = cliente_http.get(f"/facturas/{factura_id}/pdf", headers={"If-None-Match": etag})
+    assert cambiada.status_code == 200 and cambiada.headers["etag"] != etag
+    assert cambiada.content != primera.content
+
+
+def test_catalogo_cambia_de_etag_con_la_version(db, cliente_http):
+    respuesta = cliente_http.get("/servicios/")
+    etag = respuesta.headers["etag"]
+    assert respuesta.headers["cache-control"] == "public, max-age=60, must-revalidate"
+    assert cliente_http.get("/servicios/", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    # Otra consulta del mismo catálogo tiene su propio ETag
+    assert cliente_http.get("/servicios/", params={"limite": 5}).headers["etag"] != etag
+
+    ServicioRepository(db).crear_servicio(
+        ServicioCreate(tipo="atencion_medica", precio_base=10.0, descripcion="Consulta")
+    )
+    assert cliente_http.get("/servicios/", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,154 @@
+import json
+
+import pytest
+
+from app.models import Descargo
+from app.test import fabricas
+
+NDJSON = {"content-type": "application/x-ndjson"}
+CSV = {"content-type": "text/csv"}
+
+
+@pytest.fixture
+def datos(db):
+    return {
+        "internado": fabricas.paciente(db).id,
+        "otro": fabricas.paciente(db).id,
+        "servicio": fabricas.servicio(db, precio_base=50.0).id,
+        "producto": fabricas.producto(db, precio_base=10.0).id,
+    }
+
+
+def _ndjson(*filas) -> bytes:
+    return "\n".join(json.dumps(fila, ensure_ascii=False) for fila in filas).encode()
+
+
+def _en_fragmentos(cuerpo: bytes, tamano: int):
+    """Cuerpo en streaming, cortado cada `tamano` bytes (también en medio de un carácter)."""
+    return (cuerpo[i:i + tamano] for i in range(0, len(cuerpo), tamano))
+
+
+def test_ndjson_agrupa_las_filas_de_un_paciente_en_un_descargo(db, cliente, datos):
+    cuerpo = _ndjson(
+        {"paciente_id": datos["internado"], "servicio_id": datos["servicio"], "cantidad": 1},
+        {"paciente_id": datos["otro"], "producto_id": datos["producto"], "cantidad": 3},
+        {"paciente_id": datos["internado"], "producto_id": datos["producto"], "cantidad": 2},
+    )
+
+    respuesta = cliente.post("/descargos/bulk", content=cuerpo, headers=NDJSON)
+
+    assert respuesta.status_code == 200
+    reporte = respuesta.json()
+    assert (reporte["filas_aceptadas"], reporte["filas_rechazadas"], reporte["descargos_creados"]) == (3, 0, 2)
+    filas = reporte["filas"]
+    assert [f["fila"] for f in filas] == [1, 2, 3]
+    assert filas[0]["descargo_id"] == filas[2]["descargo_id"] != filas[1]["descargo_id"]
+    descargo = db.get(Descargo, filas[0]["descargo_id"])
+    assert descargo.paciente_id == datos["internado"]
+    assert len(descargo.lineas_transaccionales) == 2
+
+
+def test_csv_con_cabecera_y_columnas_vacias(db, cliente, datos):
+    cuerpo = (
+        "paciente_id,servicio_id,producto_id,cantidad\r\n"
+        f"{datos['internado']},{datos['servicio']},,2\r\n"
+        "\r\n"
+        f"{datos['internado']},,{datos['producto']},1\r\n"
+    ).encode()
+
+    reporte = cliente.post("/descargos/bulk", content=cuerpo, headers=CSV).json()
+
+    assert (reporte["filas_aceptadas"], reporte["descargos_creados"]) == (2, 1)
+    assert [f["fila"] for f in reporte["filas"]] == [2, 4]
+
+
+def test_filas_cortadas_entre_fragmentos_y_utf8_multibyte(db, cliente, datos):
+    # Los campos desconocidos se ignoran; "ñ" y "€" ocupan 2 y 3 bytes y quedan partidos
+    filas = [
+        {"paciente_id": datos["internado"], "servicio_id": datos["servicio"], "cantidad": 1, "nota": "señal €"}
+        for _ in range(5)
+    ]
+    cuerpo = _ndjson(*filas)
+
+    respuesta = cliente.post("/descargos/bulk", content=_en_fragmentos(cuerpo, 7), headers=NDJSON)
+
+    reporte = respuesta.json()
+    assert respuesta.status_code == 200
+    assert (reporte["filas_aceptadas"], reporte["filas_rechazadas"], reporte["descargos_creados"]) == (5, 0, 1)
+
+
+@pytest.mark.parametrize("fila, error", [
+    ({"paciente_id": "abc", "cantidad": 1}, "integer"),
+    ({"paciente_id": 999999, "servicio_id": 1, "cantidad": 1}, "Paciente no encontrado"),
+    ({"paciente_id": "{internado}", "servicio_id": 999999, "cantidad": 1}, "no encontrado"),
+    ({"paciente_id": "{internado}", "producto_id": 999999, "cantidad": 1}, "no encontrado"),
+    ({"paciente_id": "{internado}", "servicio_id": "{servicio}", "cantidad": 0}, "greater than 0"),
+])
+def test_rechazos_por_fila_sin_cortar_la_carga(db, cliente, datos, fila, error):
+    fila = {campo: valor.format(**datos) if isinstance(valor, str) else valor for campo, valor in fila.items()}
+    valida = {"paciente_id": datos["otro"], "servicio_id": datos["servicio"], "cantidad": 1}
+
+    respuesta = cliente.post("/descargos/bulk", content=_ndjson(valida, fila, valida), headers=NDJSON)
+
+    assert respuesta.status_code == 200
+    reporte = respuesta.json()
+    assert (reporte["filas_aceptadas"], reporte["filas_rechazadas"]) == (2, 1)
+    rechazo = reporte["filas"][1]
+    assert rechazo["aceptada"] is False and error in rechazo["error"]
+    assert rechazo["paciente_id"] == (None if fila["paciente_id"] == "abc" else int(fila["paciente_id"]))
+
+
+def test_lineas_ilegibles_se_rechazan(db, cliente, datos):
+    csv_con_nul = f"paciente_id,servicio_id,cantidad\n1\x00,2,3\n{datos['internado']},{datos['servicio']},1\n"
+    ndjson_roto = '{"paciente_id": \n[1, 2]\n'
+
+    reporte_csv = cliente.post("/descargos/bulk", content=csv_con_nul.encode(), headers=CSV).json()
+    reporte_ndjson = cliente.post("/descargos/bulk", content=ndjson_roto.encode(), headers=NDJSON).json()
+
+    assert (reporte_csv["filas_aceptadas"], reporte_csv["filas_rechazadas"]) == (1, 1)
+    assert reporte_csv["filas"][0]["fila"] == 2 and not reporte_csv["filas"][0]["aceptada"]
+    assert (reporte_ndjson["filas_aceptadas"], reporte_ndjson["filas_rechazadas"]) == (0, 2)
+
+
+@pytest.mark.parametrize("formato", ["ndjson", "csv"])
+def test_un_byte_invalido_rechaza_solo_su_linea(db, cliente, datos, formato):
+    valida = {"paciente_id": datos["internado"], "servicio_id": datos["servicio"], "cantidad": 1}
+    if formato == "ndjson":
+        lineas, headers = [json.dumps(valida).encode()] * 4, NDJSON
+        lineas[2] = b'{"paciente_id": 1, "nota": "se\xf1al"}'
+    else:
+        fila = f"{datos['internado']},{datos['servicio']},1".encode()
+        lineas, headers = [b"paciente_id,servicio_id,cantidad", fila, fila, fila], CSV
+        lineas[2] = fila + b"\xff"
+    # Fragmentos de 5 bytes: el byte inválido cae lejos del comienzo de un fragmento
+    respuesta = cliente.post(
+        "/descargos/bulk", content=_en_fragmentos(b"\n".join(lineas), 5), headers=headers
+    )
+
+    assert respuesta.status_code == 200
+    reporte = respuesta.json()
+    aceptadas = 3 if formato == "ndjson" else 2
+    assert (reporte["filas_aceptadas"], reporte["filas_rechazadas"], reporte["descargos_creados"]) == (aceptadas, 1, 1)
+    rechazo = next(f for f in reporte["filas"] if not f["aceptada"])
+    assert rechazo["fila"] == 3 and "UTF-8" in rechazo["error"]
+    assert db.query(Descargo).filter(Descargo.paciente_id == datos["internado"]).count() == 1
+
+
+def test_solo_rechazos_mantiene_el_reporte_acotado(db, cliente, datos):
+    valida = {"paciente_id": datos["internado"], "servicio_id": datos["servicio"], "cantidad": 1}
+    cuerpo = _ndjson(*[valida] * 50, {"paciente_id": "abc", "cantidad": 1}, *[valida] * 50)
+
+    respuesta = cliente.post(
+        "/descargos/bulk", params={"solo_rechazos": True, "tamano_lote": 20}, content=cuerpo, headers=NDJSON
+    )
+
+    reporte = respuesta.json()
+    assert (reporte["filas_aceptadas"], reporte["filas_rechazadas"]) == (100, 1)
+    # Un descargo por paciente y lote
+    assert reporte["descargos_creados"] == 6
+    assert [f["fila"] for f in reporte["filas"]] == [51]
+
+
+def test_formato_no_soportado(cliente):
+    respuesta = cliente.post("/descargos/bulk", content=b"{}", headers={"content-type": "application/json"})
+    assert respuesta.status_code == 415
@@ -0,0 +1,45 @@
+from sqlalchemy.orm import Session
+from app.models import Paciente
+from app.models.servicio import TipoServicio
+from app.repositories.catalogo_cache import CatalogoCache, servicios_cache
+from app.repositories.descargo_repository import DescargoRepository
+from app.repositories.servicio_repository import ServicioRepository
+from app.schemas.descargo_schema import LineaDescargoCreate
+from app.schemas.servicio_producto_schema import ServicioCreate
+
+
+def _crear_servicio(db, precio):
+    return ServicioRepository(db).crear_servicio(
+        ServicioCreate(tipo=TipoServicio.atencion_medica, precio_base=precio, descripcion="Consulta")
+    )
+
+
+def test_cambio_de_precio_visible_en_el_siguiente_descargo(db):
+    servicio = _crear_servicio(db, 10.0)
+    paciente = Paciente(nombre_completo="Ana", afeccion="N/A")
+    db.add(paciente)
+    db.commit()
+    repo = DescargoRepository(db)
+    linea = [LineaDescargoCreate(servicio_id=servicio.id, cantidad=2)]
+
+    assert repo.crear_descargo_con_lineas(paciente.id, linea).total == 20.0
+
+    ServicioRepository(db).actualizar_servicio(servicio.id, {"precio_base": 30.0})
+
+    assert repo.crear_descargo_con_lineas(paciente.id, linea).total == 60.0
+
+
+def test_cambio_confirmado_por_otra_sesion_invalida_el_snapshot(engine, db):
+    cache = CatalogoCache("servicios", servicios_cache.modelo)
+    servicio = _crear_servicio(db, 10.0)
+    assert cache.obtener(db)[servicio.id].calcular_precio() == 10.0
+    assert cache.obtener(db)[servicio.id].calcular_precio() == 10.0
+    db.commit()
+
+    # Otro worker modifica el catálogo con su propia sesión
+    with Session(bind=engine) as otra:
+        ServicioRepository(otra).actualizar_servicio(servicio.id, {"precio_base": 12.0})
+
+    assert cache.obtener(db)[servicio.id].calcular_precio() == 12.0
+    estadisticas = cache.estadisticas()
+    assert (estadisticas["hits"], estadisticas["misses"], estadisticas["invalidaciones"]) == (1, 2, 1)
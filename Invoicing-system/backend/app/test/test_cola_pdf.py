@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.core.almacen_pdf import AlmacenPDF
+from app.core.database import get_db
+from app.models import Cliente, Descargo, LineaDescargo, LineaDocumentoTransaccional, Paciente, TrabajoPDF
+from app.services import cola_pdf_service
+from app.services.cola_pdf_service import ColaPDF, FacturaPDFService
+from app.services.factura_service import FacturaService
+from app.services.pdf_service import PDFService
+
+
+@pytest.fixture
+def almacen(tmp_path, monkeypatch):
+    almacen = AlmacenPDF(tmp_path / "pdfs")
+    monkeypatch.setattr(cola_pdf_service, "_almacen", almacen)
+    return almacen
+
+
+@pytest.fixture
+def cola(engine, almacen):
+    # Sin hilos: los tests procesan la cola con drenar()
+    return ColaPDF(sessionmaker(bind=engine), almacen, workers=0)
+
+
+def _emitir_factura(db):
+    paciente = Paciente(nombre_completo="Paciente", afeccion="N/A", estado="alta")
+    descargo = Descargo(total=10.0)
+    linea = LineaDocumentoTransaccional(cantidad=1)
+    linea.linea_descargo = LineaDescargo(descripcion="Consulta", subtotal_sin_iva=10.0)
+    descargo.lineas_transaccionales.append(linea)
+    paciente.descargos.append(descargo)
+    cliente = Cliente(nombre="Aseguradora")
+    db.add_all([paciente, cliente])
+    db.commit()
+    return FacturaService(db).facturar(paciente.id, cliente.id).id
+
+
+def _trabajo(db, factura_id):
+    db.expire_all()
+    return db.query(TrabajoPDF).filter_by(factura_id=factura_id).one()
+
+
+def test_emision_encola_y_la_descarga_sirve_la_cache(db, cola, almacen, monkeypatch):
+    factura_id = _emitir_factura(db)
+    assert _trabajo(db, factura_id).estado == "pendiente"
+
+    cola.drenar()
+    trabajo = _trabajo(db, factura_id)
+    assert trabajo.estado == "listo" and almacen.existe(trabajo.sha256)
+
+    # Acierto de caché: no se vuelve a renderizar
+    monkeypatch.setattr(PDFService, "generar_factura_pdf", lambda datos: pytest.fail("no debía renderizar"))
+    ruta, _, sha256 = FacturaPDFService(db).obtener_pdf(factura_id)
+    assert sha256 == trabajo.sha256 and ruta == almacen.ruta(sha256) and ruta.read_bytes().startswith(b"%PDF")
+
+
+def test_endpoint_renderiza_si_falta_en_la_cache(db, almacen):
+    from main import app
+
+    factura_id = _emitir_factura(db)  # sin workers: el trabajo sigue pendiente
+
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        cliente = TestClient(app)
+        primera = cliente.get(f"/facturas/{factura_id}/pdf")
+        segunda = cliente.get(f"/facturas/{factura_id}/pdf")
+        ausente = cliente.get("/facturas/999/pdf")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert primera.status_code == 200 and primera.headers["content-type"] == "application/pdf"
+    assert "factura_FACT-" in primera.headers["content-disposition"]
+    # Renderizado determinista: el mismo contenido, guardado una sola vez
+    assert segunda.content == primera.content
+    assert _trabajo(db, factura_id).estado == "listo"
+    assert len(list(almacen.directorio.rglob("*.pdf"))) == 1
+    assert ausente.status_code == 404
+
+
+def test_fallos_se_reintentan_y_los_atascados_se_recuperan(db, cola, monkeypatch):
+    factura_id = _emitir_factura(db)
+
+    def fallar(datos):
+        raise RuntimeError("sin fuentes")
+
+    with monkeypatch.context() as parche:
+        parche.setattr(PDFService, "generar_factura_pdf", fallar)
+        cola.drenar()
+    trabajo = _trabajo(db, factura_id)
+    assert (trabajo.estado, trabajo.intentos, trabajo.error) == ("fallido", 3, "sin fuentes")
+
+    # Un worker que murió a mitad de trabajo: el arranque lo devuelve a la cola
+    trabajo.estado = "en_curso"
+    trabajo.iniciado_en = datetime.utcnow() - timedelta(hours=1)
+    db.commit()
+    cola.iniciar()
+    cola.drenar()
+    assert _trabajo(db, factura_id).estado == "listo"
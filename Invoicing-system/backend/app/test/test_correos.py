@@ -0,0 +1,159 @@
+import asyncio
+import socket
+import sys
+from datetime import datetime
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import event, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.almacen_pdf import AlmacenPDF
+from app.core.config import settings
+from app.models import Cliente, CorreoSaliente, Descargo, LineaDescargo, LineaDocumentoTransaccional, Paciente
+from app.services import cola_pdf_service, correo_service
+from app.services.correo_service import MAXIMO_INTENTOS, EnviadorCorreos, PoolSMTP
+from app.services.factura_service import FacturaService
+
+
+class TransporteMemoria:
+    """Transporte de prueba: guarda los mensajes o lanza el error indicado para su destinatario."""
+
+    def __init__(self, errores=None):
+        self.enviados = []
+        self.errores = errores or {}
+
+    async def enviar(self, mensaje):
+        if mensaje["To"] in self.errores:
+            raise self.errores.pop(mensaje["To"])
+        self.enviados.append(mensaje)
+
+    async def cerrar(self):
+        pass
+
+
+class Rechazo(Exception):
+    code = 550
+
+
+@pytest.fixture(autouse=True)
+def con_correo(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ENABLE_EMAIL", True)
+    monkeypatch.setattr(cola_pdf_service, "_almacen", AlmacenPDF(tmp_path / "pdfs"))
+
+
+def _emitir(db, correo="cliente@example.com"):
+    paciente = Paciente(nombre_completo="Paciente", afeccion="N/A", estado="alta")
+    descargo = Descargo(total=10.0)
+    linea = LineaDocumentoTransaccional(cantidad=1)
+    linea.linea_descargo = LineaDescargo(descripcion="Consulta", subtotal_sin_iva=10.0)
+    descargo.lineas_transaccionales.append(linea)
+    paciente.descargos.append(descargo)
+    cliente = Cliente(nombre="Aseguradora", correo=correo)
+    db.add_all([paciente, cliente])
+    db.commit()
+    return FacturaService(db).facturar(paciente.id, cliente.id).id
+
+
+def _correos(db):
+    db.expire_all()
+    return db.query(CorreoSaliente).order_by(CorreoSaliente.id).all()
+
+
+def test_la_factura_encola_su_correo_en_la_misma_transaccion(db, contar_consultas):
+    commits = []
+    with contar_consultas() as sentencias:
+        event.listen(db, "after_commit", lambda session: commits.append(len(sentencias)))
+        factura_id = _emitir(db)
+
+    en_la_factura = sentencias[commits[0]:commits[1]]  # el primer commit es el de los datos de prueba
+    assert any(s.startswith("INSERT INTO facturas") for s in en_la_factura)
+    assert any(s.startswith("INSERT INTO correos_salientes") for s in en_la_factura)
+    _emitir(db, correo=None)
+
+    [correo] = _correos(db)
+    assert (correo.factura_id, correo.destinatario, correo.estado) == (factura_id, "cliente@example.com", "pendiente")
+    assert correo.asunto.startswith("Factura #FACT-")
+
+
+def test_el_enviador_manda_el_lote_con_el_pdf_adjunto(db, engine):
+    _emitir(db)
+    _emitir(db, correo="otro@example.com")
+    transporte = TransporteMemoria()
+
+    asyncio.run(EnviadorCorreos(sessionmaker(bind=engine), transporte).drenar())
+
+    assert [c.estado for c in _correos(db)] == ["enviado", "enviado"]
+    assert sorted(m["To"] for m in transporte.enviados) == ["cliente@example.com", "otro@example.com"]
+    adjunto = next(transporte.enviados[0].iter_attachments())
+    assert adjunto.get_content_type() == "application/pdf" and adjunto.get_content().startswith(b"%PDF")
+
+
+def test_reintenta_con_espera_y_descarta_los_rechazos(db, engine):
+    _emitir(db)
+    _emitir(db, correo="inexistente@example.com")
+    transporte = TransporteMemoria({
+        "cliente@example.com": ConnectionError("caído"), "inexistente@example.com": Rechazo("550")
+    })
+    enviador = EnviadorCorreos(sessionmaker(bind=engine), transporte)
+
+    asyncio.run(enviador.drenar())
+    transitorio, permanente = _correos(db)
+    assert (transitorio.estado, transitorio.intentos) == ("pendiente", 1)
+    assert transitorio.proximo_intento > datetime.utcnow() and "caído" in transitorio.error
+    assert (permanente.estado, permanente.intentos) == ("descartado", 1)
+
+    # Al agotar los intentos queda descartado (dead letter) para revisión
+    db.execute(
+        update(CorreoSaliente).where(CorreoSaliente.id == transitorio.id)
+        .values(intentos=MAXIMO_INTENTOS - 1, proximo_intento=datetime.utcnow())
+    )
+    db.commit()
+    transporte.errores = {"cliente@example.com": ConnectionError("caído")}
+    asyncio.run(enviador.drenar())
+    assert _correos(db)[0].estado == "descartado"
+
+
+def test_pool_smtp_reutiliza_la_conexion(db, engine):
+    class Buzon:
+        def __init__(self):
+            self.sesiones = []
+
+        async def handle_DATA(self, server, session, envelope):
+            self.sesiones.append(id(session))
+            return "250 OK"
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        puerto = s.getsockname()[1]
+    buzon = Buzon()
+    servidor = Controller(buzon, hostname="127.0.0.1", port=puerto)
+    servidor.start()
+    try:
+        for _ in range(5):
+            _emitir(db)
+        transporte = PoolSMTP("127.0.0.1", puerto, starttls=False, conexiones=1)
+
+        async def enviar():
+            await EnviadorCorreos(sessionmaker(bind=engine), transporte).drenar()
+            await transporte.cerrar()
+
+        asyncio.run(enviar())
+    finally:
+        servidor.stop()
+
+    assert [c.estado for c in _correos(db)] == ["enviado"] * 5
+    assert len(buzon.sesiones) == 5 and len(set(buzon.sesiones)) == 1 and transporte.abiertas == 1
+
+
+@pytest.mark.parametrize("problema", ["sin_aiosmtplib", "sin_host"])
+def test_sin_smtp_utilizable_el_enviador_no_arranca(monkeypatch, problema):
+    if problema == "sin_aiosmtplib":
+        monkeypatch.setitem(sys.modules, "aiosmtplib", None)
+    else:
+        monkeypatch.setattr(settings, "SMTP_HOST", "")
+
+    # Falla al arrancar (el lifespan no lo atrapa) en lugar de reintentar y descartar cada correo
+    with pytest.raises((ImportError, ValueError)):
+        asyncio.run(correo_service.iniciar_enviador(session_factory=lambda: None))
+    assert correo_service._enviador is None
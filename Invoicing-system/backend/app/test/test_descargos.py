@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Descargo, LineaDescargo, LineaDocumentoTransaccional, ResumenPaciente
+from app.repositories.paciente_repository import PacienteRepository
+from app.repositories.resumen_paciente_repository import ResumenPacienteRepository
+from app.test import fabricas
+
+
+@pytest.fixture
+def datos(db):
+    paciente = PacienteRepository(db).crear_paciente({"nombre_completo": "Paciente", "afeccion": "N/A"})
+    return {
+        "paciente": paciente.id,
+        "servicio": fabricas.servicio(db, precio_base=50.0, descripcion="Consulta").id,
+        "producto": fabricas.producto(db, precio_base=10.0, descripcion="Ibuprofeno").id,
+    }
+
+
+def _filas(db, paciente_id):
+    """(descargos, líneas transaccionales, líneas de descargo) del paciente."""
+    descargos = db.query(Descargo).filter(Descargo.paciente_id == paciente_id).count()
+    transaccionales = db.query(LineaDocumentoTransaccional).join(Descargo).filter(
+        Descargo.paciente_id == paciente_id
+    ).count()
+    de_descargo = db.query(LineaDescargo).join(LineaDocumentoTransaccional).join(Descargo).filter(
+        Descargo.paciente_id == paciente_id
+    ).count()
+    return descargos, transaccionales, de_descargo
+
+
+def test_respuesta_con_la_forma_anterior_para_una_planilla_mixta(db, cliente, datos):
+    lineas = [
+        {"servicio_id": datos["servicio"], "cantidad": 2},
+        {"producto_id": datos["producto"], "cantidad": 3},
+        {"servicio_id": datos["servicio"], "cantidad": 1},
+    ]
+
+    respuesta = cliente.post("/descargos/", json={"paciente_id": datos["paciente"], "lineas": lineas})
+
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.json()
+    assert set(cuerpo) == {"id", "paciente_id", "fecha", "total", "lineas"}
+    assert cuerpo["paciente_id"] == datos["paciente"]
+    subtotales = [linea["subtotal_sin_iva"] for linea in cuerpo["lineas"]]
+    assert cuerpo["total"] == pytest.approx(sum(subtotales))
+    # Subtotal = precio del catálogo por cantidad (mismo servicio en las líneas 1 y 3)
+    assert subtotales[0] == pytest.approx(2 * subtotales[2])
+
+    # Una línea por línea pedida, en el mismo orden, con el id de su LineaDescargo
+    assert [set(linea) for linea in cuerpo["lineas"]] == [
+        {"id", "descripcion", "subtotal_sin_iva", "cantidad", "servicio_id", "producto_id"}
+    ] * 3
+    assert [(l["servicio_id"], l["producto_id"], l["cantidad"]) for l in cuerpo["lineas"]] == [
+        (datos["servicio"], None, 2), (None, datos["producto"], 3), (datos["servicio"], None, 1)
+    ]
+    assert [l["descripcion"].split(":")[0] for l in cuerpo["lineas"]] == ["Servicio", "Producto", "Servicio"]
+    ids = [linea["id"] for linea in cuerpo["lineas"]]
+    assert ids == sorted(ids) and len(set(ids)) == 3
+    for linea in cuerpo["lineas"]:
+        guardada = db.get(LineaDescargo, linea["id"])
+        transaccional = guardada.linea_transaccional
+        assert transaccional.descargo_id == cuerpo["id"]
+        assert (transaccional.servicio_id, transaccional.producto_id, transaccional.cantidad) == (
+            linea["servicio_id"], linea["producto_id"], linea["cantidad"]
+        )
+        assert (guardada.descripcion, guardada.subtotal_sin_iva) == (linea["descripcion"], linea["subtotal_sin_iva"])
+
+
+def test_planilla_grande_con_lineas_repetidas(db, cliente, datos, contar_consultas):
+    # Tres formas de línea repetidas muchas veces: las repetidas solo difieren en el id
+    formas = [
+        {"servicio_id": datos["servicio"], "cantidad": 1},
+        {"producto_id": datos["producto"], "cantidad": 2},
+        {"servicio_id": datos["servicio"], "cantidad": 3},
+    ]
+    lineas = [formas[i % 3] for i in range(150)]
+
+    with contar_consultas() as sentencias:
+        cuerpo = cliente.post("/descargos/", json={"paciente_id": datos["paciente"], "lineas": lineas}).json()
+
+    # Un INSERT por tabla de líneas, sin SELECT para recuperar los ids
+    for tabla in ("lineas_transaccionales", "lineas_descargo"):
+        assert sum(s.startswith(f"INSERT INTO {tabla}") for s in sentencias) == 1
+    assert [(l["servicio_id"], l["producto_id"], l["cantidad"]) for l in cuerpo["lineas"]] == [
+        (linea.get("servicio_id"), linea.get("producto_id"), linea["cantidad"]) for linea in lineas
+    ]
+    assert len({l["id"] for l in cuerpo["lineas"]}) == 150
+    for linea in cuerpo["lineas"]:
+        guardada = db.get(LineaDescargo, linea["id"])
+        transaccional = guardada.linea_transaccional
+        assert transaccional.descargo_id == cuerpo["id"]
+        assert (transaccional.servicio_id, transaccional.producto_id, transaccional.cantidad) == (
+            linea["servicio_id"], linea["producto_id"], linea["cantidad"]
+        )
+        assert guardada.subtotal_sin_iva == linea["subtotal_sin_iva"]
+
+
+@pytest.mark.parametrize("desconocido", ["servicio_id", "producto_id"])
+def test_un_item_desconocido_no_deja_nada_escrito(db, cliente, datos, desconocido):
+    lineas = [
+        {"servicio_id": datos["servicio"], "cantidad": 1},
+        {desconocido: 999999, "cantidad": 1},
+        {"producto_id": datos["producto"], "cantidad": 1},
+    ]
+
+    respuesta = cliente.post("/descargos/", json={"paciente_id": datos["paciente"], "lineas": lineas})
+
+    assert respuesta.status_code >= 400 and "999999" in respuesta.json()["detail"]
+    assert _filas(db, datos["paciente"]) == (0, 0, 0)
+    assert db.get(ResumenPaciente, datos["paciente"]).cantidad_descargos == 0
+
+
+def test_un_fallo_despues_de_insertar_las_lineas_deshace_todo(db, cliente, datos, monkeypatch):
+    # Falla al actualizar la proyección, con el descargo y ambas tablas de líneas ya insertadas
+    def fallar(self, paciente_ids):
+        raise RuntimeError("fallo de escritura")
+
+    monkeypatch.setattr(ResumenPacienteRepository, "actualizar", fallar)
+    lineas = [{"servicio_id": datos["servicio"], "cantidad": 1}, {"producto_id": datos["producto"], "cantidad": 2}]
+
+    respuesta = cliente.post("/descargos/", json={"paciente_id": datos["paciente"], "lineas": lineas})
+
+    assert respuesta.status_code == 500 and "fallo de escritura" in respuesta.json()["detail"]
+    db.expire_all()
+    assert _filas(db, datos["paciente"]) == (0, 0, 0)
+    assert db.query(LineaDocumentoTransaccional).count() == 0 and db.query(LineaDescargo).count() == 0
+    resumen = db.get(ResumenPaciente, datos["paciente"])
+    assert (resumen.cantidad_descargos, resumen.total_descargos) == (0, 0.0)
+
+
+def test_busqueda_por_rango_de_fechas_y_descripcion(db, cliente, datos):
+    inicio = datetime(2024, 3, 1)
+    otro = fabricas.paciente(db)
+    fuera = fabricas.descargo(db, otro, fecha=inicio - timedelta(days=1))
+    # fabricas.descargo describe sus líneas como "Consulta"
+    consulta = fabricas.descargo(db, otro, fecha=inicio + timedelta(hours=2))
+    creado = cliente.post("/descargos/", json={
+        "paciente_id": datos["paciente"], "lineas": [{"producto_id": datos["producto"], "cantidad": 1}]
+    }).json()
+    db.get(Descargo, creado["id"]).fecha = inicio + timedelta(hours=1)
+    db.commit()
+    rango = {"desde": inicio.isoformat(), "hasta": (inicio + timedelta(days=1)).isoformat()}
+
+    todos = cliente.get("/descargos/buscar/", params=rango)
+    por_texto = cliente.get("/descargos/buscar/", params={**rango, "search": "consul"})
+
+    assert todos.status_code == 200
+    assert [d["id"] for d in todos.json()] == [creado["id"], consulta.id]
+    assert fuera.id not in [d["id"] for d in todos.json()]
+    assert [d["id"] for d in por_texto.json()] == [consulta.id]
+    assert por_texto.json()[0]["lineas"][0]["descripcion"] == "Consulta"
+    invertido = cliente.get("/descargos/buscar/", params={"desde": rango["hasta"], "hasta": rango["desde"]})
+    assert invertido.status_code == 400
+    assert cliente.get("/descargos/buscar/", params={"search": "consul"}).status_code == 422
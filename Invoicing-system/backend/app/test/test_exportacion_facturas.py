@@ -0,0 +1,116 @@
+import io
+import zipfile
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.almacen_pdf import AlmacenPDF
+from app.core.database import Base, get_db
+from app.models import Cliente, Descargo, Factura, LineaDescargo, LineaDocumentoTransaccional, Paciente
+from app.services import cola_pdf_service, exportacion_facturas_service
+from app.services.cola_pdf_service import ColaPDF
+from app.services.exportacion_facturas_service import VENTANA_POR_WORKER, exportar_zip
+from app.services.factura_service import FacturaService
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # Archivo en disco en modo WAL: el cursor de la exportación no bloquea a los
+    # workers que registran PDFs, como en PostgreSQL
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'export.db'}", connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    event.listen(engine, "connect", lambda conexion, _: conexion.execute("PRAGMA journal_mode=WAL"))
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def almacen(tmp_path, monkeypatch):
+    almacen = AlmacenPDF(tmp_path / "pdfs")
+    monkeypatch.setattr(cola_pdf_service, "_almacen", almacen)
+    return almacen
+
+
+def _emitir(db, cliente_id, fecha):
+    paciente = Paciente(nombre_completo="Paciente", afeccion="N/A", estado="alta")
+    descargo = Descargo(total=10.0)
+    linea = LineaDocumentoTransaccional(cantidad=1)
+    linea.linea_descargo = LineaDescargo(descripcion="Consulta", subtotal_sin_iva=10.0)
+    descargo.lineas_transaccionales.append(linea)
+    paciente.descargos.append(descargo)
+    db.add(paciente)
+    db.commit()
+    factura = FacturaService(db).facturar(paciente.id, cliente_id)
+    db.execute(update(Factura).where(Factura.id == factura.id).values(fecha_emision=fecha))
+    db.commit()
+    return factura.numero_factura
+
+
+def _sembrar(db):
+    aseguradora, particular = Cliente(nombre="Aseguradora"), Cliente(nombre="Particular")
+    db.add_all([aseguradora, particular])
+    db.commit()
+    marzo = [_emitir(db, aseguradora.id, datetime(2024, 3, dia, 12)) for dia in (1, 15, 31)]
+    marzo_particular = _emitir(db, particular.id, datetime(2024, 3, 10))
+    abril = _emitir(db, aseguradora.id, datetime(2024, 4, 1))
+    return aseguradora.id, marzo, marzo_particular, abril
+
+
+def test_exporta_el_rango_en_un_zip(session_factory, almacen):
+    from main import app
+
+    db = session_factory()
+    aseguradora, marzo, marzo_particular, abril = _sembrar(db)
+    # Una parte ya está en la caché y el resto se renderiza durante la exportación
+    ColaPDF(session_factory, almacen, workers=0).procesar_uno()
+
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        cliente = TestClient(app)
+        respuesta = cliente.get("/facturas/export.zip", params={"desde": "2024-03-01", "hasta": "2024-03-31"})
+        del_cliente = cliente.get(
+            "/facturas/export.zip", params={"desde": "2024-03-01", "hasta": "2024-03-31", "cliente_id": aseguradora}
+        )
+        vacio = cliente.get("/facturas/export.zip", params={"desde": "2023-01-01", "hasta": "2023-01-31"})
+        invertido = cliente.get("/facturas/export.zip", params={"desde": "2024-04-01", "hasta": "2024-03-01"})
+    finally:
+        app.dependency_overrides.clear()
+        db.close()
+
+    assert respuesta.status_code == 200 and respuesta.headers["content-type"] == "application/zip"
+    assert "facturas_2024-03-01_2024-03-31.zip" in respuesta.headers["content-disposition"]
+    archivo = zipfile.ZipFile(io.BytesIO(respuesta.content))
+    assert sorted(archivo.namelist()) == sorted(f"factura_{numero}.pdf" for numero in [*marzo, marzo_particular])
+    assert all(archivo.read(nombre).startswith(b"%PDF") for nombre in archivo.namelist())
+    assert f"factura_{abril}.pdf" not in archivo.namelist()
+
+    assert sorted(zipfile.ZipFile(io.BytesIO(del_cliente.content)).namelist()) == sorted(
+        f"factura_{numero}.pdf" for numero in marzo
+    )
+    assert vacio.status_code == 404 and invertido.status_code == 400
+
+
+def test_la_exportacion_pide_pdfs_de_a_una_ventana(session_factory, almacen, monkeypatch):
+    db = session_factory()
+    _sembrar(db)
+    db.close()
+    pedidos = []
+    leer_pdf = exportacion_facturas_service.leer_pdf
+
+    def contar(*args):
+        pedidos.append(args[-1])
+        return leer_pdf(*args)
+
+    monkeypatch.setattr(exportacion_facturas_service, "leer_pdf", contar)
+    trozos = exportar_zip(session_factory, workers=1, desde=datetime(2024, 1, 1), hasta=datetime(2024, 12, 31))
+
+    primero = next(trozos)
+    # Solo la ventana en vuelo, no las cinco facturas del rango
+    assert len(pedidos) == VENTANA_POR_WORKER
+    archivo = zipfile.ZipFile(io.BytesIO(primero + b"".join(trozos)))
+    assert len(pedidos) == 5 and len(archivo.namelist()) == 5 and archivo.testzip() is None
@@ -0,0 +1,79 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.models import Cliente, Descargo, LineaDescargo, LineaDocumentoTransaccional, LineaFactura, Paciente
+from app.models.resumen_paciente import ResumenPaciente
+from app.services.factura_service import FacturaService
+
+
+def _paciente(db, subtotales, estado="alta"):
+    paciente = Paciente(nombre_completo="Paciente", afeccion="N/A", estado=estado)
+    for subtotal in subtotales:
+        descargo = Descargo(total=subtotal)
+        linea = LineaDocumentoTransaccional(cantidad=1)
+        linea.linea_descargo = LineaDescargo(descripcion="Consulta", subtotal_sin_iva=subtotal)
+        descargo.lineas_transaccionales.append(linea)
+        paciente.descargos.append(descargo)
+    cliente = Cliente(nombre="Aseguradora")
+    db.add_all([paciente, cliente])
+    db.commit()
+    return paciente, cliente
+
+
+def _escrituras(sentencias):
+    """["INSERT", "INTO", tabla] / ["UPDATE", tabla, "SET"] de cada escritura."""
+    return [s.split()[:3] for s in sentencias if s.lstrip().upper().startswith(("INSERT", "UPDATE"))]
+
+
+def test_generar_factura_calcula_totales_y_factura_al_paciente(db, contar_consultas):
+    paciente, cliente = _paciente(db, [10.0, 20.0, 30.0])
+    # Una línea con cantidad 0 no se factura
+    db.add(LineaDocumentoTransaccional(cantidad=0, descargo_id=paciente.descargos[0].id))
+    db.commit()
+
+    commits = []
+    with contar_consultas() as sentencias:
+        event.listen(db, "after_commit", lambda session: commits.append(len(sentencias)))
+        respuesta = FacturaService(db).generar_factura(paciente.id, cliente.id)
+
+    factura = respuesta["factura"]
+    assert factura["subtotal"] == pytest.approx(60.0)
+    assert factura["impuesto"] == pytest.approx(9.6)
+    assert factura["total_general"] == pytest.approx(69.6)
+    assert len(respuesta["lineas"]) == 3
+    # Las líneas se insertan con un único INSERT ... SELECT, en una sola transacción
+    inserts = [s for s in sentencias if s.lstrip().upper().startswith("INSERT INTO LINEAS_FACTURA")]
+    assert len(inserts) == 1 and "SELECT" in inserts[0].upper()
+    # Factura, líneas, marcas y estado del paciente en la primera transacción; después
+    # solo se encola el PDF
+    escrituras = _escrituras(sentencias)
+    en_la_factura = _escrituras(sentencias[:commits[0]])
+    assert ["UPDATE", "pacientes", "SET"] in en_la_factura and ["UPDATE", "descargos", "SET"] in en_la_factura
+    assert [e for e in escrituras if e not in en_la_factura] == [["INSERT", "INTO", "trabajos_pdf"]]
+
+    db.expire_all()
+    assert db.get(Paciente, paciente.id).estado == "facturado"
+    assert {d.factura_id for d in db.get(Paciente, paciente.id).descargos} == {factura["id"]}
+    assert db.get(ResumenPaciente, paciente.id).estado == "facturado"
+
+
+def test_generar_factura_sin_lineas_no_escribe_nada(db):
+    paciente, cliente = _paciente(db, [])
+
+    with pytest.raises(HTTPException) as error:
+        FacturaService(db).generar_factura(paciente.id, cliente.id)
+
+    assert error.value.status_code == 400
+    assert db.query(LineaFactura).count() == 0
+    assert db.get(Paciente, paciente.id).estado == "alta"
+
+
+def test_generar_factura_rechaza_paciente_internado(db):
+    paciente, cliente = _paciente(db, [10.0], estado="internado")
+
+    with pytest.raises(HTTPException) as error:
+        FacturaService(db).generar_factura(paciente.id, cliente.id)
+
+    assert error.value.status_code == 400
+    assert db.get(Descargo, paciente.descargos[0].id).factura_id is None
@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database
+from app.core.database import Base
+from app.models import Cliente, Descargo, Factura, LineaDescargo, LineaDocumentoTransaccional, LoteFacturacion, Paciente
+from app.services.factura_service import FacturaService
+from app.services.lote_facturacion_service import LoteFacturacionService, ejecutar_lote
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # Archivo en disco: los workers usan conexiones propias, como contra PostgreSQL
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'lotes.db'}", connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def _sembrar(db, altas=6, internados=1, sin_descargos=1):
+    clientes = [Cliente(nombre="Aseguradora"), Cliente(nombre="Particular")]
+    pacientes = []
+    for i in range(altas + internados):
+        paciente = Paciente(
+            nombre_completo=f"Paciente {i}", afeccion="N/A", estado="alta" if i < altas else "internado"
+        )
+        descargo = Descargo(total=10.0)
+        linea = LineaDocumentoTransaccional(cantidad=1)
+        linea.linea_descargo = LineaDescargo(descripcion="Consulta", subtotal_sin_iva=10.0)
+        descargo.lineas_transaccionales.append(linea)
+        paciente.descargos.append(descargo)
+        pacientes.append(paciente)
+    pacientes += [Paciente(nombre_completo="Sin descargos", afeccion="N/A", estado="alta") for _ in range(sin_descargos)]
+    db.add_all(clientes + pacientes)
+    db.commit()
+    return [c.id for c in clientes], [p.id for p in pacientes[:altas]]
+
+
+def test_lote_factura_en_paralelo_con_regla_de_cliente(session_factory):
+    db = session_factory()
+    (aseguradora, particular), altas = _sembrar(db)
+
+    progreso = LoteFacturacionService(db).crear_lote(aseguradora, {altas[0]: particular}, workers=4)
+    assert (progreso["estado"], progreso["total"], progreso["pendiente"]) == ("pendiente", len(altas), len(altas))
+
+    progreso = ejecutar_lote(progreso["id"], session_factory)
+    assert (progreso["estado"], progreso["facturado"], progreso["fallido"]) == ("terminado", len(altas), 0)
+
+    clientes = dict(db.execute(select(Factura.paciente_id, Factura.cliente_id)).all())
+    assert clientes == {pid: particular if pid == altas[0] else aseguradora for pid in altas}
+    assert db.scalar(select(func.count()).select_from(Paciente).where(Paciente.estado == "facturado")) == len(altas)
+    db.close()
+
+
+def test_fallos_aislados_y_reanudacion_idempotente(session_factory):
+    db = session_factory()
+    (aseguradora, _), altas = _sembrar(db, altas=4)
+    # Uno ya facturado desde la pantalla después de crear el lote; otro sin cliente
+    servicio = LoteFacturacionService(db)
+    lote_id = servicio.crear_lote(None, {pid: aseguradora for pid in altas[1:]}, workers=2)["id"]
+    FacturaService(db).facturar(altas[1], aseguradora)
+
+    progreso = ejecutar_lote(lote_id, session_factory)
+    assert (progreso["facturado"], progreso["omitido"], progreso["fallido"]) == (2, 1, 1)
+    assert progreso["errores"] == [{"paciente_id": altas[0], "error": "Sin cliente asignado"}]
+
+    # Reanudar solo reprocesa el fallido; un lote nuevo no encuentra nada que facturar
+    progreso = ejecutar_lote(lote_id, session_factory)
+    assert (progreso["facturado"], progreso["fallido"]) == (2, 1)
+    assert servicio.crear_lote(aseguradora)["total"] == 1
+    assert db.scalar(select(func.count()).select_from(Factura)) == 3
+    db.close()
+
+
+@pytest.fixture
+def api(session_factory, monkeypatch):
+    """TestClient cuyo get_db y tareas en segundo plano usan la base de `session_factory`."""
+    from main import app
+
+    monkeypatch.setattr(database, "_SessionLocal", session_factory)
+    return TestClient(app)
+
+
+def test_un_lote_que_falla_queda_interrumpido_y_se_reanuda_por_http(session_factory, api):
+    db = session_factory()
+    (aseguradora, _), altas = _sembrar(db, altas=5)
+    lote_id = LoteFacturacionService(db).crear_lote(aseguradora, workers=1)["id"]
+
+    def caer(estado):
+        raise RuntimeError("el worker se cayó")
+
+    with pytest.raises(RuntimeError):
+        ejecutar_lote(lote_id, session_factory, al_avanzar=caer)
+    progreso = api.get(f"/facturas/lotes/{lote_id}").json()
+    assert progreso["estado"] == "interrumpido" and progreso["pendiente"] > 0
+
+    # TestClient corre la tarea en segundo plano antes de devolver la respuesta
+    respuesta = api.post(f"/facturas/lotes/{lote_id}/reanudar")
+
+    assert respuesta.status_code == 202
+    progreso = api.get(f"/facturas/lotes/{lote_id}").json()
+    assert (progreso["estado"], progreso["facturado"], progreso["pendiente"]) == ("terminado", len(altas), 0)
+    assert db.scalar(select(func.count()).select_from(Factura)) == len(altas)
+    db.close()
+
+
+@pytest.mark.parametrize("hace, codigo", [(timedelta(hours=2), 202), (timedelta(minutes=1), 409)])
+def test_reanudar_un_lote_en_curso_solo_si_quedo_sin_actividad(session_factory, api, hace, codigo):
+    # Un proceso que murió a mitad de corrida deja el lote en curso
+    db = session_factory()
+    (aseguradora, _), altas = _sembrar(db, altas=2)
+    lote_id = LoteFacturacionService(db).crear_lote(aseguradora)["id"]
+    lote = db.get(LoteFacturacion, lote_id)
+    lote.estado, lote.iniciado_en = "en_curso", datetime.utcnow() - hace
+    db.commit()
+
+    respuesta = api.post(f"/facturas/lotes/{lote_id}/reanudar")
+
+    assert respuesta.status_code == codigo
+    db.expire_all()
+    esperado = ("terminado", len(altas)) if codigo == 202 else ("en_curso", 0)
+    assert (db.get(LoteFacturacion, lote_id).estado, db.scalar(select(func.count()).select_from(Factura))) == esperado
+    db.close()
@@ -0,0 +1,95 @@
+from app.models import Cliente, Descargo, LineaDescargo, LineaDocumentoTransaccional, Paciente, ResumenPaciente
+from app.repositories.factura_repository import FacturaRepository
+from app.repositories.resumen_paciente_repository import ResumenPacienteRepository
+from app.services.consistencia_facturacion import verificar_marcas_facturacion
+
+
+def _paciente_con_descargos(db, cantidad=2):
+    paciente = Paciente(nombre_completo="Paciente", afeccion="N/A", estado="alta")
+    for _ in range(cantidad):
+        descargo = Descargo(total=10.0)
+        linea = LineaDocumentoTransaccional(cantidad=1)
+        linea.linea_descargo = LineaDescargo(descripcion="Consulta", subtotal_sin_iva=10.0)
+        descargo.lineas_transaccionales.append(linea)
+        paciente.descargos.append(descargo)
+    cliente = Cliente(nombre="Aseguradora")
+    db.add_all([paciente, cliente])
+    db.commit()
+    return paciente, cliente
+
+
+def _facturar(db, paciente, cliente, descargos, numero="F-1"):
+    lineas = [
+        {"linea_transaccional_id": linea.id, "total_con_iva": 11.6}
+        for descargo in descargos
+        for linea in descargo.lineas_transaccionales
+    ]
+    return FacturaRepository(db).create_factura(
+        {"numero_factura": numero, "paciente_id": paciente.id, "cliente_id": cliente.id}, lineas
+    )
+
+
+def test_create_factura_marca_solo_los_descargos_facturados(db):
+    paciente, cliente = _paciente_con_descargos(db)
+    primero, segundo = paciente.descargos
+
+    factura = _facturar(db, paciente, cliente, [primero])
+    db.refresh(primero)
+    db.refresh(segundo)
+
+    assert primero.factura_id == factura.id
+    assert segundo.factura_id is None
+
+
+def test_create_factura_fallida_no_deja_marcas(db):
+    paciente, cliente = _paciente_con_descargos(db, cantidad=1)
+    _facturar(db, paciente, cliente, paciente.descargos, numero="F-1")
+    otro, _ = _paciente_con_descargos(db, cantidad=1)
+
+    # numero_factura es único: la segunda factura falla y no debe marcar nada
+    try:
+        _facturar(db, otro, cliente, otro.descargos, numero="F-1")
+    except Exception:
+        db.rollback()
+    assert db.get(Descargo, otro.descargos[0].id).factura_id is None
+
+
+def test_verificador_detecta_y_corrige_marcas(db):
+    paciente, cliente = _paciente_con_descargos(db, cantidad=3)
+    primero, segundo, tercero = paciente.descargos
+    factura = _facturar(db, paciente, cliente, [primero, segundo])
+    factura_id = factura.id
+    assert verificar_marcas_facturacion(db) == {"sin_marca": [], "marca_invalida": []}
+
+    # Marcas corrompidas a mano: una quitada y otra apuntando a una factura ajena
+    primero.factura_id = None
+    tercero.factura_id = factura_id
+    db.commit()
+
+    assert verificar_marcas_facturacion(db) == {"sin_marca": [primero.id], "marca_invalida": [tercero.id]}
+    verificar_marcas_facturacion(db, corregir=True)
+    db.expire_all()
+    assert [d.factura_id for d in (primero, segundo, tercero)] == [factura_id, factura_id, None]
+    assert verificar_marcas_facturacion(db) == {"sin_marca": [], "marca_invalida": []}
+
+
+def test_corregir_actualiza_el_resumen_del_paciente(db):
+    paciente, cliente = _paciente_con_descargos(db, cantidad=3)
+    primero, segundo, _ = paciente.descargos
+    _facturar(db, paciente, cliente, [primero, segundo])
+
+    # Marcas quitadas a mano, con el resumen recalculado sobre ellas
+    for descargo in (primero, segundo):
+        descargo.factura_id = None
+    db.flush()
+    ResumenPacienteRepository(db).actualizar([paciente.id])
+    db.commit()
+    resumen = db.get(ResumenPaciente, paciente.id)
+    assert (resumen.descargos_no_facturados, resumen.total_no_facturado) == (3, 30.0)
+
+    verificar_marcas_facturacion(db, corregir=True)
+
+    db.expire_all()
+    resumen = db.get(ResumenPaciente, paciente.id)
+    assert (resumen.descargos_no_facturados, resumen.total_no_facturado) == (1, 10.0)
+    assert (resumen.cantidad_descargos, resumen.total_descargos) == (3, 30.0)
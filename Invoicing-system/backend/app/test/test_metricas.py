@@ -0,0 +1,73 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import pacientes
+from app.core import metricas
+from app.core.database import get_db
+from app.core.metricas import MiddlewareMetricas, RegistroMetricas
+from app.models import Paciente
+
+
+@pytest.fixture
+def registro_metricas(engine):
+    from sqlalchemy import event
+
+    metricas.instrumentar(engine)
+    yield RegistroMetricas()
+    event.remove(engine, "before_cursor_execute", metricas._antes_de_ejecutar)
+    event.remove(engine, "after_cursor_execute", metricas._despues_de_ejecutar)
+
+
+def _app(db, registro_metricas, server_timing=False):
+    app = FastAPI()
+    app.include_router(pacientes.router)
+    app.add_middleware(MiddlewareMetricas, server_timing=server_timing, registro_metricas=registro_metricas)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def test_agrupa_por_plantilla_de_ruta_y_cuenta_sql(db, registro_metricas):
+    ids = []
+    for nombre in ("Ana", "Beto"):
+        paciente = Paciente(nombre_completo=nombre, afeccion="N/A")
+        db.add(paciente)
+        db.commit()
+        ids.append(paciente.id)
+    cliente = _app(db, registro_metricas)
+
+    for paciente_id in ids:
+        assert cliente.get(f"/pacientes/{paciente_id}").status_code == 200
+    assert cliente.get("/pacientes/999999").status_code == 404
+    assert cliente.get("/no-existe").status_code == 404
+
+    texto = registro_metricas.exportar()
+    ruta = 'method="GET",route="/pacientes/{paciente_id}"'
+    assert f"http_request_duration_seconds_count{{{ruta}}} 3" in texto
+    assert f'http_requests_total{{{ruta},status="200"}} 2' in texto
+    assert f'http_requests_total{{{ruta},status="404"}} 1' in texto
+    assert 'http_requests_total{method="GET",route="sin_ruta",status="404"} 1' in texto
+    # Ninguna petición quedó en la cubeta de cero sentencias
+    assert f'http_request_sql_statements_bucket{{{ruta},le="0"}} 0' in texto
+    assert "/pacientes/999999" not in texto
+
+
+def test_server_timing_informa_sql(db, registro_metricas):
+    paciente = Paciente(nombre_completo="Ana", afeccion="N/A")
+    db.add(paciente)
+    db.commit()
+
+    respuesta = _app(db, registro_metricas, server_timing=True).get(f"/pacientes/{paciente.id}")
+    app_timing, sql_timing = respuesta.headers["server-timing"].split(", ")
+    assert app_timing.startswith("app;dur=") and sql_timing.startswith("sql;dur=")
+    assert 'desc="0 sentencias"' not in sql_timing
+    assert "server-timing" not in _app(db, registro_metricas).get(f"/pacientes/{paciente.id}").headers
+
+
+def test_endpoint_metrics_expone_los_pools(db):
+    from main import app
+
+    respuesta = TestClient(app).get("/metrics")
+    assert respuesta.status_code == 200
+    assert respuesta.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'db_pool_checkouts_total{pool="sync"}' in respuesta.text
@@ -0,0 +1,69 @@
+import pytest
+from app.models import Cliente, Descargo, LineaDescargo, LineaDocumentoTransaccional, Paciente
+from app.repositories.factura_repository import FacturaRepository
+from app.services.paciente_service import PacienteService
+
+
+def _crear_pacientes(db, cantidad, estado):
+    """Crea pacientes con dos descargos de dos líneas cada uno y devuelve sus ids."""
+    pacientes = []
+    for i in range(cantidad):
+        paciente = Paciente(nombre_completo=f"Paciente {i}", afeccion="N/A", estado=estado)
+        for _ in range(2):
+            descargo = Descargo(total=20.0)
+            for _ in range(2):
+                linea = LineaDocumentoTransaccional(cantidad=1)
+                linea.linea_descargo = LineaDescargo(descripcion="Consulta", subtotal_sin_iva=10.0)
+                descargo.lineas_transaccionales.append(linea)
+            paciente.descargos.append(descargo)
+        pacientes.append(paciente)
+    db.add_all(pacientes)
+    db.commit()
+    ids = [paciente.id for paciente in pacientes]
+    db.expunge_all()
+    return ids
+
+
+def _facturar(db, paciente_id, descargos):
+    cliente = Cliente(nombre="Aseguradora")
+    db.add(cliente)
+    db.flush()
+    lineas = [
+        {"linea_transaccional_id": linea.id, "total_con_iva": 11.6}
+        for descargo in descargos
+        for linea in descargo.lineas_transaccionales
+    ]
+    FacturaRepository(db).create_factura(
+        {"numero_factura": f"F-{paciente_id}", "paciente_id": paciente_id, "cliente_id": cliente.id}, lineas
+    )
+    db.expunge_all()
+
+
+@pytest.mark.parametrize("metodo, estado", [
+    ("obtener_pacientes_internados_con_descargos", "internado"),
+    ("obtener_pacientes_alta_con_descargos_no_facturados", "alta"),
+])
+def test_numero_de_consultas_no_depende_de_los_pacientes(db, contar_consultas, metodo, estado):
+    conteos = []
+    for cantidad in (2, 20):
+        _crear_pacientes(db, cantidad, estado)
+        with contar_consultas() as sentencias:
+            resultado = getattr(PacienteService(db), metodo)()
+        db.expunge_all()
+        assert all(len(p.descargos) == 2 and len(p.descargos[0].lineas) == 2 for p in resultado)
+        conteos.append(len(sentencias))
+
+    assert conteos[0] == conteos[1], conteos
+
+
+def test_alta_excluye_pacientes_con_todo_facturado(db):
+    sin_facturar, parcial, facturado = _crear_pacientes(db, 3, "alta")
+    def descargos(paciente_id):
+        return db.query(Descargo).filter(Descargo.paciente_id == paciente_id).order_by(Descargo.id).all()
+
+    _facturar(db, parcial, descargos(parcial)[:1])
+    _facturar(db, facturado, descargos(facturado))
+
+    resultado = PacienteService(db).obtener_pacientes_alta_con_descargos_no_facturados()
+
+    assert [p.id for p in resultado] == [sin_facturar, parcial]
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from app.models import Cliente, Factura, Paciente
+from app.repositories.factura_repository import FacturaRepository
+from app.repositories.paciente_repository import PacienteRepository
+
+
+def _recorrer(listar, limite):
+    items, cursor, paginas = [], None, 0
+    while True:
+        pagina, cursor = listar(limite, cursor)
+        items.extend(pagina)
+        paginas += 1
+        if cursor is None:
+            return items, paginas
+
+
+def test_pacientes_paginados_por_id_con_filtro(db):
+    db.add_all(
+        Paciente(nombre_completo=f"Paciente {i}", afeccion="N/A", estado="alta" if i % 3 == 0 else "internado")
+        for i in range(10)
+    )
+    db.commit()
+    repo = PacienteRepository(db)
+
+    items, paginas = _recorrer(lambda limite, cursor: repo.listar_pacientes(limite, cursor), 4)
+    assert [p.id for p in items] == list(range(1, 11))
+    assert paginas == 3
+
+    items, _ = _recorrer(lambda limite, cursor: repo.listar_pacientes(limite, cursor, estado="alta"), 2)
+    assert [p.id for p in items] == [1, 4, 7, 10]
+
+
+def test_facturas_paginadas_por_fecha_descendente(db):
+    paciente = Paciente(nombre_completo="Ana", afeccion="N/A")
+    cliente = Cliente(nombre="Aseguradora")
+    db.add_all([paciente, cliente])
+    db.flush()
+    base = datetime(2024, 1, 1)
+    # Fechas repetidas: el id desempata dentro de la misma fecha
+    db.add_all(
+        Factura(
+            numero_factura=f"F-{i}", fecha_emision=base + timedelta(days=i // 2),
+            paciente_id=paciente.id, cliente_id=cliente.id
+        )
+        for i in range(7)
+    )
+    db.commit()
+    repo = FacturaRepository(db)
+
+    items, _ = _recorrer(lambda limite, cursor: repo.listar_facturas_pagina(limite, cursor), 3)
+    assert [f.numero_factura for f in items] == ["F-6", "F-5", "F-4", "F-3", "F-2", "F-1", "F-0"]
+
+    items, _ = _recorrer(
+        lambda limite, cursor: repo.listar_facturas_pagina(limite, cursor, desde=base + timedelta(days=2)), 10
+    )
+    assert [f.numero_factura for f in items] == ["F-6", "F-5", "F-4"]
+
+
+def test_cursor_invalido(db):
+    with pytest.raises(HTTPException) as error:
+        PacienteRepository(db).listar_pacientes(10, "no-es-un-cursor")
+    assert error.value.status_code == 400
+
+
+def test_resumen_de_facturas_sin_lineas(db):
+    paciente = Paciente(nombre_completo="Ana", afeccion="N/A")
+    cliente = Cliente(nombre="Aseguradora")
+    db.add_all([paciente, cliente])
+    db.flush()
+    db.add_all(
+        Factura(numero_factura=f"F-{i}", total_general=10.0 * i, paciente_id=paciente.id, cliente_id=cliente.id)
+        for i in range(3)
+    )
+    db.commit()
+
+    filas, cursor = FacturaRepository(db).listar_resumen(2)
+
+    assert [fila.numero_factura for fila in filas] == ["F-2", "F-1"]
+    assert filas[0].cliente_nombre == "Aseguradora"
+    assert filas[0].paciente_nombre == "Ana"
+    filas, cursor = FacturaRepository(db).listar_resumen(2, cursor)
+    assert [fila.numero_factura for fila in filas] == ["F-0"] and cursor is None
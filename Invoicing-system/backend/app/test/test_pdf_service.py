@@ -0,0 +1,67 @@
+import base64
+import re
+import zlib
+from datetime import datetime
+
+from app.services import plantilla_pdf
+from app.services.pdf_service import PDFService
+
+
+def _factura(n_lineas):
+    return {
+        "factura": {
+            "numero_factura": "FACT-20240101-0001", "fecha_emision": datetime(2024, 1, 1),
+            "subtotal": 100.0 * n_lineas, "impuesto": 16.0 * n_lineas, "total_general": 116.0 * n_lineas,
+            "terminos_condiciones": "Pago a 30 días",
+        },
+        "cliente": {"nombre": "Aseguradora", "direccion": "Calle 1", "telefono": "555", "correo": "a@b.com"},
+        "hospital": {
+            "representante": "Dirección", "nombre": "Hospital", "direccion": "Av. 2",
+            "telefono": "556", "email": "h@b.com", "web": "hospital.com",
+        },
+        "lineas": [
+            {"descripcion": f"Consulta {i}", "precio_unitario": 100.0, "cantidad": 1, "total_con_iva": 116.0}
+            for i in range(n_lineas)
+        ],
+    }
+
+
+def _paginas(pdf: bytes):
+    """Contenido (operadores de texto y dibujo) de cada página del PDF."""
+    return [
+        zlib.decompress(base64.a85decode(m.group(1).strip().removesuffix(b"~>")))
+        for m in re.finditer(rb"stream\r?\n(.*?)endstream", pdf, re.S)
+    ]
+
+
+def test_factura_larga_repite_el_encabezado_de_la_tabla():
+    paginas = _paginas(PDFService.generar_factura_pdf(_factura(120)).getvalue())
+
+    assert len(paginas) > 2
+    # La tabla ocupa todas las páginas menos, a lo sumo, la de totales
+    con_encabezado = [b"(CONSUMO)" in pagina for pagina in paginas]
+    assert sum(con_encabezado) >= len(paginas) - 1
+    assert all(b"continuaci" in pagina for pagina in paginas[1:])
+    assert all(b"Hospital" in pagina for pagina in paginas)
+
+
+def test_la_plantilla_se_arma_una_vez_por_proceso(monkeypatch):
+    plantilla = plantilla_pdf.obtener_plantilla()
+
+    def fallar():
+        raise AssertionError("no debía volver a armar la hoja de estilos")
+
+    monkeypatch.setattr("reportlab.lib.styles.getSampleStyleSheet", fallar)
+    PDFService.generar_factura_pdf(_factura(3))
+    assert plantilla_pdf.obtener_plantilla() is plantilla
+
+
+def test_el_pool_de_procesos_renderiza_los_mismos_bytes():
+    datos = _factura(40)
+    local = PDFService.renderizar(datos)
+    PDFService.iniciar_procesos(1)
+    try:
+        assert PDFService.renderizar(datos) == local
+    finally:
+        PDFService.detener_procesos()
+    assert local.startswith(b"%PDF")
@@ -0,0 +1,180 @@
+"""
+Regresión de planes de consulta: cada consulta de los repositorios se ejecuta sobre
+una base sembrada, se repite con EXPLAIN y el test falla si el plan recorre entera
+alguna de las tablas grandes, o su índice entero sin un LIMIT que lo corte.
+
+Por defecto corre en SQLite (EXPLAIN QUERY PLAN). Con PLANES_DATABASE_URL apuntando a
+una base PostgreSQL de pruebas corre allí, con enable_seqscan = off: si aun así el
+plan usa Seq Scan es que no hay un índice utilizable.
+"""
+import json
+import os
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import (
+    Cliente, Descargo, Factura, LineaDescargo, LineaDocumentoTransaccional, LineaFactura, Paciente
+)
+from app.repositories.descargo_repository import DescargoRepository
+from app.repositories.factura_repository import FacturaRepository
+from app.repositories.paciente_repository import PacienteRepository
+from app.services.descargo_service import DescargoService
+
+TABLAS_GRANDES = {
+    "pacientes", "descargos", "lineas_transaccionales", "lineas_descargo", "lineas_factura", "facturas"
+}
+PACIENTES = 300
+# "SCAN pacientes", "SCAN pacientes_1 LEFT-JOIN" (alias)...; "SCAN x USING INDEX" no es un
+# recorrido de la tabla. Un AUTOMATIC INDEX lo construye SQLite recorriendo la tabla en cada consulta.
+_SCAN_SQLITE = re.compile(
+    r"^(?:SCAN (?:TABLE )?(\w+?)(?:_\d+)?\b(?!.*\bUSING\b)|SEARCH (?:TABLE )?(\w+?)(?:_\d+)? USING AUTOMATIC\b)"
+)
+# Recorrer un índice entero sin clave de búsqueda solo vale si un LIMIT lo corta, como en
+# la paginación por keyset; sin LIMIT lee la tabla completa en orden del índice
+_SCAN_INDICE_SQLITE = re.compile(r"^SCAN (?:TABLE )?(\w+?)(?:_\d+)? USING (?:COVERING )?INDEX\b")
+_LIMIT = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
+
+def _sembrar(engine):
+    """La mayoría de pacientes facturados; unos pocos internados y de alta, como en producción."""
+    inicio = datetime(2024, 1, 1)
+    pacientes, descargos, lineas, lineas_descargo, facturas, lineas_factura = [], [], [], [], [], []
+    estados = ["internado", "alta"] + ["facturado"] * 8
+    for p in range(1, PACIENTES + 1):
+        estado = estados[p % len(estados)]
+        pacientes.append({
+            "id": p, "nombre_completo": f"Paciente {p}", "afeccion": "N/A", "estado": estado,
+            "fecha_ingreso": inicio + timedelta(days=p % 30),
+        })
+        if estado == "facturado":
+            facturas.append({
+                "id": p, "numero_factura": f"F-{p:05d}", "fecha_emision": inicio + timedelta(hours=p),
+                "paciente_id": p, "cliente_id": 1 + p % 5, "estado_pago": "pendiente",
+            })
+        for d in range(2):
+            descargo_id = p * 2 + d
+            descargos.append({
+                "id": descargo_id, "paciente_id": p, "total": 20.0, "fecha": inicio + timedelta(hours=descargo_id)
+            })
+            for l in range(2):
+                linea_id = descargo_id * 2 + l
+                lineas.append({"id": linea_id, "cantidad": 1, "descargo_id": descargo_id, "servicio_id": 1})
+                lineas_descargo.append({
+                    "id": linea_id, "descripcion": "Consulta", "subtotal_sin_iva": 10.0,
+                    "linea_transaccional_id": linea_id,
+                })
+                if estado == "facturado":
+                    lineas_factura.append({
+                        "id": linea_id, "total_con_iva": 11.6, "linea_transaccional_id": linea_id, "factura_id": p
+                    })
+
+    with engine.begin() as conexion:
+        conexion.execute(insert(Cliente.__table__), [{"id": c, "nombre": f"Cliente {c}"} for c in range(1, 6)])
+        conexion.execute(insert(Paciente.__table__), pacientes)
+        conexion.execute(insert(Descargo.__table__), descargos)
+        conexion.execute(insert(LineaDocumentoTransaccional.__table__), lineas)
+        conexion.execute(insert(LineaDescargo.__table__), lineas_descargo)
+        conexion.execute(insert(Factura.__table__), facturas)
+        conexion.execute(insert(LineaFactura.__table__), lineas_factura)
+
+
+@pytest.fixture(scope="module")
+def engine_planes():
+    url = os.environ.get("PLANES_DATABASE_URL")
+    engine = create_engine(url) if url else create_engine("sqlite://", poolclass=StaticPool)
+    if url:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    _sembrar(engine)
+    yield engine
+    if url:
+        Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def recorridos_completos(conexion, sentencia: str, parametros) -> set[str]:
+    """Tablas grandes que el plan de `sentencia` recorre enteras."""
+    con_limite = bool(_LIMIT.search(sentencia))
+    if conexion.dialect.name == "postgresql":
+        conexion.exec_driver_sql("SET enable_seqscan = off")
+        plan = conexion.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sentencia}", parametros).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        tablas, pendientes = set(), [plan[0]["Plan"]]
+        while pendientes:
+            nodo = pendientes.pop()
+            indice_entero = nodo["Node Type"] in ("Index Scan", "Index Only Scan") and "Index Cond" not in nodo
+            if nodo["Node Type"] == "Seq Scan" or (indice_entero and not con_limite):
+                tablas.add(nodo["Relation Name"])
+            pendientes.extend(nodo.get("Plans", ()))
+    else:
+        filas = conexion.exec_driver_sql(f"EXPLAIN QUERY PLAN {sentencia}", parametros).all()
+        tablas = {m.group(1) or m.group(2) for m in (_SCAN_SQLITE.match(fila[-1]) for fila in filas) if m}
+        if not con_limite:
+            tablas |= {m.group(1) for m in (_SCAN_INDICE_SQLITE.match(fila[-1]) for fila in filas) if m}
+    return tablas & TABLAS_GRANDES
+
+
+def _siguiente_pagina(listar):
+    _, cursor = listar(None)
+    return listar(cursor)
+
+
+CONSULTAS = {
+    "internados_con_descargos": lambda db: PacienteRepository(db).obtener_pacientes_internados_con_descargos(),
+    "alta_con_descargos_no_facturados":
+        lambda db: PacienteRepository(db).obtener_pacientes_alta_con_descargos_no_facturados(),
+    "pacientes_internados": lambda db: PacienteRepository(db).obtener_pacientes_internados(),
+    "listado_pacientes_por_estado": lambda db: _siguiente_pagina(
+        lambda cursor: PacienteRepository(db).listar_pacientes(10, cursor, estado="alta")
+    ),
+    "descargos_de_paciente": lambda db: PacienteRepository(db).obtener_descargos_paciente(40),
+    "descargos_por_paciente": lambda db: DescargoRepository(db).obtener_descargos_por_paciente(40),
+    "busqueda_descargos_por_periodo": lambda db: DescargoService(db).buscar_descargos(
+        datetime(2024, 1, 3), datetime(2024, 1, 4)
+    ),
+    "busqueda_descargos_por_periodo_y_texto": lambda db: DescargoService(db).buscar_descargos(
+        datetime(2024, 1, 3), datetime(2024, 1, 4), "consulta"
+    ),
+    "factura": lambda db: FacturaRepository(db).obtener_factura(3),
+    "listado_facturas": lambda db: _siguiente_pagina(
+        lambda cursor: FacturaRepository(db).listar_facturas_pagina(10, cursor)
+    ),
+    "resumen_facturas": lambda db: _siguiente_pagina(
+        lambda cursor: FacturaRepository(db).listar_resumen(10, cursor)
+    ),
+    "resumen_facturas_por_cliente": lambda db: FacturaRepository(db).listar_resumen(10, None, cliente_id=2),
+    "resumen_facturas_por_paciente": lambda db: FacturaRepository(db).listar_resumen(10, None, paciente_id=5),
+    "resumen_facturas_por_periodo": lambda db: FacturaRepository(db).listar_resumen(
+        10, None, desde=datetime(2024, 1, 3), hasta=datetime(2024, 1, 5)
+    ),
+}
+
+
+@pytest.mark.parametrize("nombre", CONSULTAS)
+def test_consulta_sin_recorridos_completos(engine_planes, nombre):
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            sentencias.append((statement, parameters))
+
+    db = sessionmaker(bind=engine_planes)()
+    event.listen(engine_planes, "before_cursor_execute", registrar)
+    try:
+        CONSULTAS[nombre](db)
+    finally:
+        event.remove(engine_planes, "before_cursor_execute", registrar)
+        db.close()
+
+    assert sentencias, "la consulta no ejecutó ningún SELECT"
+    with engine_planes.connect() as conexion:
+        for sentencia, parametros in sentencias:
+            tablas = recorridos_completos(conexion, sentencia, parametros)
+            assert not tablas, f"recorrido completo de {sorted(tablas)} en:\n{sentencia}"
@@ -0,0 +1,28 @@
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+from app.core.pool import MonitorPool
+
+
+def test_monitor_registra_uso_y_timeouts_del_pool(tmp_path):
+    monitor = MonitorPool("prueba")
+    engine = monitor.instrumentar(create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=monitor.clase_pool(QueuePool),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05
+    ))
+
+    with engine.connect():
+        assert monitor.estadisticas()["en_uso"] == 1
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    estadisticas = monitor.estadisticas()
+    assert estadisticas["checkouts"] == 1
+    assert estadisticas["checkins"] == 1
+    assert estadisticas["en_uso"] == 0
+    assert estadisticas["timeouts"] == 1
+    assert estadisticas["espera_maxima_ms"] >= 50
+    engine.dispose()
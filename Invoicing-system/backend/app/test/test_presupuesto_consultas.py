@@ -0,0 +1,154 @@
+import io
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import pacientes
+from app.core.almacen_pdf import AlmacenPDF
+from app.core.consultas import MiddlewareNMas1, PresupuestoConsultas, PresupuestoExcedido, normalizar
+from app.core.database import get_db
+from app.models import Cliente, Descargo, LineaDescargo, LineaDocumentoTransaccional, Paciente
+from app.repositories.catalogo_cache import productos_cache, servicios_cache
+from app.repositories.servicio_repository import ServicioRepository
+from app.schemas.servicio_producto_schema import ServicioCreate
+from app.services import cola_pdf_service
+from app.services.factura_service import FacturaService
+
+
+def _crear_pacientes(db, cantidad, estado):
+    ids = []
+    for i in range(cantidad):
+        paciente = Paciente(nombre_completo=f"Paciente {i}", afeccion="N/A", estado=estado)
+        for _ in range(2):
+            descargo = Descargo(total=20.0)
+            for _ in range(2):
+                linea = LineaDocumentoTransaccional(cantidad=1)
+                linea.linea_descargo = LineaDescargo(descripcion="Consulta", subtotal_sin_iva=10.0)
+                descargo.lineas_transaccionales.append(linea)
+            paciente.descargos.append(descargo)
+        db.add(paciente)
+        db.commit()
+        ids.append(paciente.id)
+    return ids
+
+
+def test_normalizar_agrupa_la_misma_consulta_con_otros_valores():
+    assert normalizar("SELECT * FROM t\n WHERE id = 1 AND x IN (?, ?, ?)") == \
+        normalizar("SELECT * FROM t WHERE id = 27 AND x IN (?, ?)") == \
+        "SELECT * FROM t WHERE id = ? AND x IN (?, ...)"
+    assert normalizar("INSERT INTO t (a, b) VALUES (%(a_0)s, %(b_0)s), (%(a_1)s, %(b_1)s)") == \
+        "INSERT INTO t (a, b) VALUES (?, ...), ..."
+    assert normalizar("SELECT * FROM t1 WHERE n = 'o''k' AND m = $1") == "SELECT * FROM t1 WHERE n = ? AND m = ?"
+
+
+def test_detecta_el_n_mas_1_de_una_carga_perezosa(db, engine, presupuesto_consultas):
+    _crear_pacientes(db, 3, "internado")
+    db.expunge_all()
+
+    with pytest.raises(PresupuestoExcedido, match="3 repeticiones .* FROM descargos"):
+        with presupuesto_consultas(maximo_por_forma=1):
+            for paciente in db.query(Paciente).all():
+                [descargo.total for descargo in paciente.descargos]
+
+    @PresupuestoConsultas(1, engine=engine)
+    def dos_veces_lo_mismo():
+        db.query(Paciente).count()
+        db.query(Paciente).count()
+
+    db.expunge_all()
+    with pytest.raises(PresupuestoExcedido, match="2 sentencias, el presupuesto es 1") as error:
+        dos_veces_lo_mismo()
+    assert "2 veces idéntica" in str(error.value)
+
+
+@pytest.fixture
+def datos(db, tmp_path, monkeypatch):
+    """Cuatro internados, cuatro de alta (uno facturado), un cliente y un servicio."""
+    monkeypatch.setattr(cola_pdf_service, "_almacen", AlmacenPDF(tmp_path / "pdfs"))
+    internados = _crear_pacientes(db, 4, "internado")
+    altas = _crear_pacientes(db, 4, "alta")
+    cliente = Cliente(nombre="Aseguradora", direccion="Calle 1", telefono="555", correo="pagos@aseguradora.com")
+    db.add(cliente)
+    db.commit()
+    servicio = ServicioRepository(db).crear_servicio(
+        ServicioCreate(nombre="Consulta", descripcion="General", precio_base=10.0, tipo="atencion_medica")
+    )
+    factura = FacturaService(db).facturar(altas[0], cliente.id)
+    # Los presupuestos se miden con la caché de catálogo cargada, el caso normal
+    for cache in (servicios_cache, productos_cache):
+        monkeypatch.setattr(cache, "_snapshot", None)
+        cache.obtener(db)
+    db.commit()
+    datos = {
+        "internado": internados[0], "por_alta": internados[1], "alta": altas[1], "factura": factura.id,
+        "cliente": cliente.id, "servicio": servicio.id,
+    }
+    db.expunge_all()
+    return datos
+
+
+# Presupuesto de sentencias por endpoint con varios pacientes, descargos y líneas:
+# no debe crecer con los datos. Subirlo es una decisión explícita.
+PRESUPUESTOS = [
+    ("GET", "/pacientes/{internado}", None, 1),
+    ("GET", "/pacientes/listar_pacientes/", None, 1),
+    ("GET", "/pacientes/resumen/", None, 1),
+    ("GET", "/pacientes/internados-con-descargos/", None, 4),
+    ("GET", "/pacientes/alta-con-descargos-no-facturados/", None, 4),
+    ("PATCH", "/pacientes/daralta_paciente/{por_alta}/alta", None, 6),
+    ("GET", "/descargos/paciente/{internado}", None, 2),
+    ("GET", "/descargos/internados-con-descargos/", None, 4),
+    ("POST", "/descargos/", {"paciente_id": "internado", "servicio_id": "servicio"}, 11),
+    ("GET", "/facturas/{factura}", None, 2),
+    ("GET", "/facturas/", None, 1),
+    ("GET", "/facturas/resumen", None, 1),
+    ("POST", "/facturas/generar/{alta}/{cliente}", None, 14),
+    ("GET", "/clientes/", None, 1),
+    ("GET", "/servicios/", None, 1),
+    ("GET", "/productos/", None, 1),
+]
+
+
+@pytest.mark.parametrize("metodo, ruta, cuerpo, maximo", PRESUPUESTOS, ids=[f"{m} {r}" for m, r, _, _ in PRESUPUESTOS])
+def test_presupuesto_por_endpoint(db, datos, presupuesto_consultas, metodo, ruta, cuerpo, maximo):
+    from main import app
+
+    if cuerpo:
+        cuerpo = {"paciente_id": datos[cuerpo["paciente_id"]],
+                  "lineas": [{"servicio_id": datos[cuerpo["servicio_id"]], "cantidad": 2}]}
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        with presupuesto_consultas(maximo, maximo_por_forma=1):
+            respuesta = TestClient(app).request(metodo, ruta.format(**datos), json=cuerpo)
+    finally:
+        app.dependency_overrides.clear()
+    assert respuesta.status_code == 200, respuesta.text
+
+
+def test_middleware_informa_el_n_mas_1_con_su_pila(db, engine):
+    _crear_pacientes(db, 3, "internado")
+    db.expunge_all()
+    app = FastAPI()
+
+    @app.get("/n_mas_1")
+    def n_mas_1():
+        return [len(paciente.descargos) for paciente in db.query(Paciente).all()]
+
+    app.include_router(pacientes.router)
+    salida = io.StringIO()
+    app.add_middleware(MiddlewareNMas1, salida=salida)
+    cliente = TestClient(app)
+
+    assert cliente.get("/n_mas_1").json() == [2, 2, 2]
+    informe = salida.getvalue()
+    assert informe.startswith("Posible N+1 en GET /n_mas_1 (4 sentencias):")
+    assert "3 x SELECT descargos.id" in informe
+    assert "test_presupuesto_consultas.py" in informe and "in n_mas_1" in informe
+
+    salida.truncate(0)
+    db.expunge_all()
+    paciente_id = db.query(Paciente.id).first()[0]
+    app.dependency_overrides[get_db] = lambda: db
+    assert cliente.get(f"/pacientes/{paciente_id}").status_code == 200
+    assert salida.getvalue() == ""
@@ -0,0 +1,43 @@
+from sqlalchemy import inspect
+from app.models import LineaFactura
+from app.services.prototypes.prototype_base import (
+    linea_factura_prototype,
+    linea_descargo_prototype,
+    linea_transaccional_prototype_servicio
+)
+
+
+def test_clones_son_instancias_transitorias_con_la_plantilla():
+    clon = linea_factura_prototype.clone()
+
+    assert isinstance(clon, LineaFactura)
+    assert inspect(clon).transient
+    assert (clon.id, clon.iva, clon.total_con_iva) == (None, 0.16, 0.0)
+
+
+def test_clones_no_comparten_estado_de_instancia():
+    for prototipo in (linea_factura_prototype, linea_descargo_prototype, linea_transaccional_prototype_servicio):
+        a, b = prototipo.clone(), prototipo.clone()
+
+        assert a is not b
+        assert inspect(a) is not inspect(b)
+        assert a.__dict__["_sa_instance_state"] is not b.__dict__["_sa_instance_state"]
+
+    a, b = linea_factura_prototype.clone(), linea_factura_prototype.clone()
+    a.total_con_iva = 99.0
+    assert b.total_con_iva == 0.0
+    assert linea_factura_prototype.clone().total_con_iva == 0.0
+
+
+def test_clone_de_linea_persistida_no_copia_id_ni_estado(db):
+    original = linea_factura_prototype.clone()
+    original.total_con_iva = 10.0
+    db.add(original)
+    db.commit()
+
+    copia = original.clone()
+
+    assert inspect(copia).transient
+    assert copia.id is None
+    assert copia.total_con_iva == 10.0
+    assert inspect(copia) is not inspect(original)
@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import update
+
+from app.models import Cliente, Descargo, ResumenPaciente, Servicio, TipoServicio
+from app.repositories.descargo_repository import DescargoRepository
+from app.repositories.factura_repository import FacturaRepository
+from app.repositories.paciente_repository import PacienteRepository
+from app.schemas.descargo_schema import LineaDescargoCreate
+from app.services.resumen_paciente_service import ResumenPacienteService
+
+
+@pytest.fixture
+def servicio_id(db):
+    servicio = Servicio(tipo=TipoServicio.atencion_medica, precio_base=10.0, descripcion="Consulta")
+    db.add(servicio)
+    db.commit()
+    return servicio.id
+
+
+def _resumen(db, paciente_id):
+    db.expire_all()
+    return db.get(ResumenPaciente, paciente_id)
+
+
+def _crear_paciente(db, nombre="Paciente"):
+    return PacienteRepository(db).crear_paciente({"nombre_completo": nombre, "afeccion": "N/A"}).id
+
+
+def test_escrituras_mantienen_la_proyeccion(db, servicio_id):
+    paciente_id = _crear_paciente(db)
+    resumen = _resumen(db, paciente_id)
+    assert (resumen.estado, resumen.cantidad_descargos, resumen.total_descargos) == ("internado", 0, 0.0)
+
+    repo_descargos = DescargoRepository(db)
+    lineas = [LineaDescargoCreate(servicio_id=servicio_id, cantidad=2)]
+    primero = repo_descargos.crear_descargo_con_lineas(paciente_id, lineas)
+    repo_descargos.crear_descargo_con_lineas(paciente_id, lineas)
+    resumen = _resumen(db, paciente_id)
+    assert (resumen.cantidad_descargos, resumen.total_descargos) == (2, 40.0)
+    assert (resumen.descargos_no_facturados, resumen.total_no_facturado) == (2, 40.0)
+    assert resumen.ultimo_descargo_en is not None
+
+    PacienteRepository(db).set_alta(paciente_id)
+    assert _resumen(db, paciente_id).estado == "alta"
+
+    cliente = Cliente(nombre="Aseguradora")
+    db.add(cliente)
+    db.commit()
+    linea_ids = [linea.id for linea in db.get(Descargo, primero.id).lineas_transaccionales]
+    FacturaRepository(db).create_factura(
+        {"numero_factura": "F-1", "paciente_id": paciente_id, "cliente_id": cliente.id},
+        [{"linea_transaccional_id": linea_id, "total_con_iva": 23.2} for linea_id in linea_ids]
+    )
+    resumen = _resumen(db, paciente_id)
+    assert (resumen.descargos_no_facturados, resumen.total_no_facturado) == (1, 20.0)
+
+    PacienteRepository(db).eliminar_paciente(_crear_paciente(db, "Temporal"))
+    assert [r.paciente_id for r in ResumenPacienteService(db).listar()] == [paciente_id]
+
+
+def test_reconstruir_recupera_una_proyeccion_desfasada(db, servicio_id):
+    con_descargo = _crear_paciente(db, "Con descargo")
+    sin_descargo = _crear_paciente(db, "Sin descargo")
+    DescargoRepository(db).crear_descargo_con_lineas(
+        con_descargo, [LineaDescargoCreate(servicio_id=servicio_id, cantidad=1)]
+    )
+    # Escritura directa que no pasa por los repositorios
+    db.execute(update(Descargo).values(total=99.0))
+    db.commit()
+    assert _resumen(db, con_descargo).total_descargos == 10.0
+
+    assert ResumenPacienteService(db).reconstruir() == 2
+    assert _resumen(db, con_descargo).total_descargos == 99.0
+    assert [r.paciente_id for r in ResumenPacienteService(db).listar(con_descargos=True)] == [con_descargo]
+    assert _resumen(db, sin_descargo).cantidad_descargos == 0
+
+
+def test_endpoint_resumen_filtra_por_estado(db, cliente, servicio_id):
+    internado = _crear_paciente(db, "Internado")
+    DescargoRepository(db).crear_descargo_con_lineas(
+        internado, [LineaDescargoCreate(servicio_id=servicio_id, cantidad=1)]
+    )
+    _crear_paciente(db, "Sin descargos")
+
+    respuesta = cliente.get("/pacientes/resumen/", params={"estado": "internado", "con_descargos": True})
+
+    assert respuesta.status_code == 200
+    assert [(r["id"], r["cantidad_descargos"], r["total_descargos"]) for r in respuesta.json()] == [
+        (internado, 1, 10.0)
+    ]
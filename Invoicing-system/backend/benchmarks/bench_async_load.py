@@ -0,0 +1,146 @@
+"""
+Benchmark de carga: routers síncronos frente a routers async (ASYNC_ROUTERS).
+
+Levanta el backend con uvicorn dos veces sobre la misma base de datos, primero con
+los routers síncronos y luego con pacientes y descargos en modo async, y lanza
+GET /pacientes/listar_pacientes/ y POST /descargos/ con 50, 200 y 1000 clientes
+concurrentes. Reporta peticiones/s, latencia p50/p99 y errores por escenario.
+
+SQLite serializa las escrituras, así que el POST solo es representativo contra
+PostgreSQL (--database-url postgresql://...).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_async_load
+    python -m benchmarks.bench_async_load --database-url postgresql://... --concurrencia 50 200
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.bench_descargo_write import crear_entorno
+from app.models import Paciente
+
+BACKEND = Path(__file__).resolve().parent.parent
+MODOS = {"sync": "", "async": "pacientes,descargos"}
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(database_url: str, routers_async: str, puerto: int, workers: int) -> subprocess.Popen:
+    entorno = dict(os.environ, DATABASE_URL=database_url, ASYNC_ROUTERS=routers_async)
+    proceso = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--port", str(puerto), "--workers", str(workers), "--log-level", "warning"
+        ],
+        cwd=BACKEND,
+        env=entorno,
+        stdout=subprocess.DEVNULL
+    )
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        try:
+            httpx.get(f"http://127.0.0.1:{puerto}/", timeout=1)
+            return proceso
+        except httpx.TransportError:
+            time.sleep(0.2)
+    proceso.terminate()
+    raise RuntimeError("El servidor no respondió en 30 s")
+
+
+async def ejecutar_escenario(url: str, concurrencia: int, peticiones: int, construir) -> dict:
+    """Lanza `peticiones` con `concurrencia` clientes simultáneos y mide cada latencia."""
+    latencias = []
+    errores = 0
+    pendientes = iter(range(peticiones))
+    limites = httpx.Limits(max_connections=concurrencia, max_keepalive_connections=concurrencia)
+
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=60) as cliente:
+        async def trabajador():
+            nonlocal errores
+            for i in pendientes:
+                metodo, ruta, cuerpo = construir(i)
+                inicio = time.perf_counter()
+                try:
+                    respuesta = await cliente.request(metodo, ruta, json=cuerpo)
+                    if respuesta.status_code >= 400:
+                        errores += 1
+                except httpx.HTTPError:
+                    errores += 1
+                latencias.append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+        duracion = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "req_s": len(latencias) / duracion,
+        "p50": latencias[len(latencias) // 2] * 1000,
+        "p99": latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))] * 1000,
+        "errores": errores
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url")
+    parser.add_argument("--concurrencia", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--peticiones", type=int, default=2000, help="peticiones por escenario")
+    parser.add_argument("--pacientes", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench_async.db"
+    engine, session_factory, catalogo, _ = crear_entorno(database_url)
+    db = session_factory()
+    pacientes = [Paciente(nombre_completo=f"Paciente {i}", afeccion="N/A") for i in range(args.pacientes)]
+    db.add_all(pacientes)
+    db.commit()
+    paciente_ids = [paciente.id for paciente in pacientes]
+    db.close()
+    engine.dispose()
+
+    def listar(i):
+        return "GET", "/pacientes/listar_pacientes/", None
+
+    def descargo(i):
+        tipo, item_id = catalogo[i % len(catalogo)]
+        lineas = [{f"{tipo}_id": item_id, "cantidad": 1 + i % 3}]
+        return "POST", "/descargos/", {"paciente_id": paciente_ids[i % len(paciente_ids)], "lineas": lineas}
+
+    escenarios = {"GET listar_pacientes": listar, "POST descargos": descargo}
+
+    print(f"{'modo':>6} {'escenario':>22} {'clientes':>9} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errores':>8}")
+    for modo, routers_async in MODOS.items():
+        puerto = puerto_libre()
+        servidor = iniciar_servidor(database_url, routers_async, puerto, args.workers)
+        try:
+            for nombre, construir in escenarios.items():
+                for concurrencia in args.concurrencia:
+                    r = asyncio.run(ejecutar_escenario(
+                        f"http://127.0.0.1:{puerto}", concurrencia, args.peticiones, construir
+                    ))
+                    print(
+                        f"{modo:>6} {nombre:>22} {concurrencia:>9} {r['req_s']:>8.0f} "
+                        f"{r['p50']:>8.1f} {r['p99']:>8.1f} {r['errores']:>8}"
+                    )
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark de la búsqueda de pacientes por nombre.
+
+Compara, para 10k, 100k y 1M pacientes, el ILIKE '%término%' anterior (recorre la
+tabla entera y devuelve todo lo que coincide) con PacienteRepository.buscar_pacientes
+en modo "contiene" y "prefijo" (normalizado, con ranking y límite). En SQLite la
+búsqueda usa el índice de trigramas en memoria, cuya carga se mide aparte; en
+PostgreSQL se crean la extensión pg_trgm y los índices de la migración.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_busqueda_pacientes
+    python -m benchmarks.bench_busqueda_pacientes --tamanos 10000 100000 --database-url postgresql://...
+"""
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import insert, text
+
+from benchmarks.bench_descargo_write import crear_entorno
+from app.core.texto import normalizar_texto
+from app.models import Paciente
+from app.repositories.busqueda_pacientes import indice_para
+from app.repositories.paciente_repository import PacienteRepository
+
+TAMANO_INSERCION = 20000
+NOMBRES = (
+    "José", "María", "Ángel", "Lucía", "Martín", "Sofía", "Raúl", "Inés", "Jesús", "Verónica",
+    "Carlos", "Ana", "Luis", "Elena", "Andrés", "Mónica", "Iván", "Begoña", "Óscar", "Nuria",
+)
+APELLIDOS = (
+    "García", "Fernández", "González", "Rodríguez", "López", "Martínez", "Sánchez", "Pérez",
+    "Gómez", "Díaz", "Muñoz", "Álvarez", "Jiménez", "Ruiz", "Hernández", "Ibáñez", "Núñez",
+    "Castaño", "Peña", "Ordóñez",
+)
+# (modo, término): apellido frecuente, nombre poco frecuente, error de tipeo, autocompletado
+CONSULTAS = (
+    ("contiene", "gonzalez"),
+    ("contiene", "begona ordonez 77"),
+    ("contiene", "fernandes"),
+    ("prefijo", "mar"),
+    ("prefijo", "ivan ib"),
+)
+
+
+def nombre_aleatorio(rnd: random.Random, i: int) -> str:
+    # El sufijo numérico hace los nombres únicos, como lo serían con datos reales
+    return f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)} {i}"
+
+
+def poblar(session_factory, cantidad: int):
+    rnd = random.Random(cantidad)
+    db = session_factory()
+    db.execute(text("DELETE FROM pacientes"))
+    for desde in range(0, cantidad, TAMANO_INSERCION):
+        filas = []
+        for i in range(desde, min(desde + TAMANO_INSERCION, cantidad)):
+            nombre = nombre_aleatorio(rnd, i)
+            filas.append({
+                "nombre_completo": nombre, "nombre_normalizado": normalizar_texto(nombre),
+                "afeccion": "N/A", "estado": "internado",
+            })
+        db.execute(insert(Paciente.__table__), filas)
+    db.commit()
+    db.close()
+
+
+def crear_indices_postgres(engine):
+    with engine.begin() as conexion:
+        conexion.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conexion.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_pacientes_nombre_normalizado_trgm "
+            "ON pacientes USING gin (nombre_normalizado gin_trgm_ops)"
+        ))
+        conexion.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_pacientes_nombre_normalizado_prefijo "
+            "ON pacientes (nombre_normalizado varchar_pattern_ops)"
+        ))
+        conexion.execute(text("ANALYZE pacientes"))
+
+
+def busqueda_anterior(db, termino: str):
+    return db.query(Paciente).filter(Paciente.nombre_completo.ilike(f"%{termino}%")).all()
+
+
+def medir(funcion, repeticiones: int) -> tuple[float, int]:
+    """Mediana en ms y cantidad de filas devueltas."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        filas = funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos), len(filas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--limite", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    engine, session_factory, _, _ = crear_entorno(args.database_url)
+    postgres = engine.dialect.name == "postgresql"
+    if postgres:
+        crear_indices_postgres(engine)
+
+    print(f"{'pacientes':>10} {'modo':>9} {'término':>18} {'ILIKE ms':>9} {'filas':>7} {'índice ms':>10} {'filas':>6}")
+    for tamano in args.tamanos:
+        inicio = time.perf_counter()
+        poblar(session_factory, tamano)
+        if postgres:
+            with engine.begin() as conexion:
+                conexion.execute(text("ANALYZE pacientes"))
+        print(f"-- {tamano} pacientes insertados en {time.perf_counter() - inicio:.1f} s")
+
+        db = session_factory()
+        if not postgres:
+            inicio = time.perf_counter()
+            indice_para(db).cargar(db)
+            print(f"-- carga del índice de trigramas en memoria: {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+        repo = PacienteRepository(db)
+        for modo, termino in CONSULTAS:
+            anterior_ms, anterior_filas = medir(lambda: busqueda_anterior(db, termino), args.repeticiones)
+            db.expunge_all()
+            nuevo_ms, nuevo_filas = medir(
+                lambda: repo.buscar_pacientes(termino, args.limite, modo), args.repeticiones
+            )
+            db.expunge_all()
+            print(
+                f"{tamano:>10} {modo:>9} {termino:>18} {anterior_ms:>9.1f} {anterior_filas:>7} "
+                f"{nuevo_ms:>10.1f} {nuevo_filas:>6}"
+            )
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
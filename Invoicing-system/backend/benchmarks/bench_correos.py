@@ -0,0 +1,149 @@
+"""
+Benchmark del envío de correos de facturas: correos/s.
+
+Emite N facturas (con su PDF ya renderizado) contra un servidor SMTP local de aiosmtpd
+y las envía:
+  - una conexión por correo (como el envío anterior, dentro de la petición),
+  - con EnviadorCorreos y PoolSMTP de 1, 2 y 4 conexiones persistentes, vaciando
+    la bandeja de salida en lotes.
+--latencia agrega una demora a cada comando del servidor (red o TLS hacia un
+servidor remoto), que es donde la conexión por correo paga el handshake completo.
+
+Requiere aiosmtplib y aiosmtpd. Uso (desde backend/):
+    python -m benchmarks.bench_correos
+    python -m benchmarks.bench_correos --facturas 1000 --latencia 20 --conexiones 1 4 8
+"""
+import argparse
+import asyncio
+import os
+import socket
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import aiosmtplib
+from aiosmtpd.controller import Controller
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.almacen_pdf import AlmacenPDF
+from app.core.config import settings
+from app.core.database import Base
+from app.models import Cliente, CorreoSaliente, Descargo, LineaDescargo, LineaDocumentoTransaccional, Paciente
+from app.services import cola_pdf_service
+from app.services.cola_pdf_service import ColaPDF
+from app.services.correo_service import EnviadorCorreos, PoolSMTP
+from app.services.factura_service import FacturaService
+from app.services.pdf_service import EmailService
+
+
+class Buzon:
+    """Handler de aiosmtpd que acepta todo, con una demora opcional por comando."""
+
+    def __init__(self, latencia: float):
+        self.latencia = latencia
+        self.recibidos = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.latencia)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latencia)
+        self.recibidos += 1
+        return "250 OK"
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def poblar(session_factory, n_facturas: int):
+    db = session_factory()
+    cliente = Cliente(nombre="Aseguradora", correo="facturas@aseguradora.com")
+    db.add(cliente)
+    db.commit()
+    for i in range(n_facturas):
+        paciente = Paciente(nombre_completo=f"Paciente {i}", afeccion="N/A", estado="alta")
+        descargo = Descargo(total=10.0)
+        linea = LineaDocumentoTransaccional(cantidad=1)
+        linea.linea_descargo = LineaDescargo(descripcion="Consulta", subtotal_sin_iva=10.0)
+        descargo.lineas_transaccionales.append(linea)
+        paciente.descargos.append(descargo)
+        db.add(paciente)
+        db.commit()
+        FacturaService(db).facturar(paciente.id, cliente.id)
+    db.close()
+
+
+def reiniciar_bandeja(session_factory):
+    db = session_factory()
+    db.execute(update(CorreoSaliente).values(estado="pendiente", intentos=0, reclamado_por=None))
+    db.commit()
+    db.close()
+
+
+async def una_conexion_por_correo(session_factory, puerto: int) -> int:
+    """Arma los mismos mensajes y abre una conexión SMTP para cada uno, en serie."""
+    enviador = EnviadorCorreos(session_factory, None, lote=10 ** 9)
+    correos = await asyncio.to_thread(enviador._reclamar)
+    for correo in correos:
+        pdf = (await asyncio.to_thread(enviador._leer_pdfs, [correo.factura_id]))[correo.factura_id]
+        mensaje = EmailService.mensaje_factura(correo.destinatario, enviador._datos(correo), pdf, settings.EMAIL_FROM)
+        await aiosmtplib.send(mensaje, hostname="127.0.0.1", port=puerto, start_tls=False)
+    return len(correos)
+
+
+async def pool(session_factory, puerto: int, conexiones: int) -> int:
+    transporte = PoolSMTP("127.0.0.1", puerto, starttls=False, conexiones=conexiones)
+    enviador = EnviadorCorreos(session_factory, transporte)
+    await enviador.drenar()
+    await transporte.cerrar()
+    return transporte.abiertas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--facturas", type=int, default=300)
+    parser.add_argument("--latencia", type=float, default=5.0, help="ms por comando del servidor")
+    parser.add_argument("--conexiones", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args(argv)
+
+    directorio = Path(tempfile.mkdtemp())
+    settings.ENABLE_EMAIL = True
+    cola_pdf_service._almacen = AlmacenPDF(directorio / "pdfs")
+    engine = create_engine(f"sqlite:///{directorio / 'correos.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    poblar(session_factory, args.facturas)
+    ColaPDF(session_factory, cola_pdf_service._almacen, workers=0).drenar(timeout=600)
+
+    puerto = puerto_libre()
+    buzon = Buzon(args.latencia / 1000)
+    servidor = Controller(buzon, hostname="127.0.0.1", port=puerto)
+    servidor.start()
+    print(f"{args.facturas} correos, {args.latencia:.0f} ms por comando SMTP\n")
+    print(f"{'modo':>24} {'correos/s':>10} {'conexiones':>11}")
+    try:
+        reiniciar_bandeja(session_factory)
+        inicio = time.perf_counter()
+        enviados = asyncio.run(una_conexion_por_correo(session_factory, puerto))
+        print(f"{'conexión por correo':>24} {enviados / (time.perf_counter() - inicio):>10.1f} {enviados:>11}")
+        for conexiones in args.conexiones:
+            reiniciar_bandeja(session_factory)
+            inicio = time.perf_counter()
+            abiertas = asyncio.run(pool(session_factory, puerto, conexiones))
+            duracion = time.perf_counter() - inicio
+            print(f"{f'pool de {conexiones}':>24} {args.facturas / duracion:>10.1f} {abiertas:>11}")
+    finally:
+        servidor.stop()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
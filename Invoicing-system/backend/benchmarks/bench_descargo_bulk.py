@@ -0,0 +1,74 @@
+"""
+Benchmark de la carga masiva de descargos (POST /descargos/bulk).
+
+Alimenta CargaMasivaDescargosService con un cuerpo NDJSON generado por fragmentos
+(nunca existe completo en memoria) y mide filas/s y el pico de memoria con
+tracemalloc para archivos de tamaño creciente. El pico debe mantenerse plano.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_descargo_bulk
+    python -m benchmarks.bench_descargo_bulk --filas 10000 100000 --pacientes 200
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from benchmarks.bench_descargo_write import crear_entorno
+from app.models import Paciente
+from app.services.carga_masiva_service import CargaMasivaDescargosService, TAMANO_LOTE
+
+TAMANO_FRAGMENTO = 64 * 1024
+
+
+async def cuerpo_ndjson(n_filas: int, paciente_ids: list[int], catalogo: list[tuple[str, int]]):
+    """Produce el archivo NDJSON en fragmentos de ~64 KiB, como llegaría por la red."""
+    partes = []
+    tamano = 0
+    for i in range(n_filas):
+        tipo, item_id = catalogo[i % len(catalogo)]
+        fila = {"paciente_id": paciente_ids[i % len(paciente_ids)], f"{tipo}_id": item_id, "cantidad": 1 + i % 3}
+        linea = json.dumps(fila) + "\n"
+        partes.append(linea)
+        tamano += len(linea)
+        if tamano >= TAMANO_FRAGMENTO:
+            yield "".join(partes).encode()
+            partes = []
+            tamano = 0
+    if partes:
+        yield "".join(partes).encode()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--filas", type=int, nargs="+", default=[5000, 20000, 80000])
+    parser.add_argument("--pacientes", type=int, default=100)
+    parser.add_argument("--tamano-lote", type=int, default=TAMANO_LOTE)
+    args = parser.parse_args(argv)
+
+    engine, session_factory, catalogo, _ = crear_entorno(args.database_url)
+    db = session_factory()
+    pacientes = [Paciente(nombre_completo=f"Paciente {i}", afeccion="N/A") for i in range(args.pacientes)]
+    db.add_all(pacientes)
+    db.commit()
+    paciente_ids = [paciente.id for paciente in pacientes]
+    db.close()
+
+    print(f"{'filas':>8} {'filas/s':>10} {'pico KiB':>10} {'aceptadas':>10}")
+    for n in args.filas:
+        db = session_factory()
+        service = CargaMasivaDescargosService(db, args.tamano_lote, solo_rechazos=True)
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        reporte = asyncio.run(service.procesar(cuerpo_ndjson(n, paciente_ids, catalogo), "ndjson"))
+        duracion = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        db.close()
+        print(f"{n:>8} {n / duracion:>10.0f} {pico / 1024:>10.0f} {reporte['filas_aceptadas']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Benchmark del camino de escritura de DescargoRepository.crear_descargo_con_lineas.
+
+Compara el camino actual (catálogo resuelto en lote, un solo flush y un solo
+commit) con el camino anterior línea a línea, contando sentencias SQL, commits
+y tiempo para descargos de 1, 10, 100 y 1000 líneas.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_descargo_write
+    python -m benchmarks.bench_descargo_write --database-url postgresql://...
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi import HTTPException
+
+from app.core.database import Base
+from app.models import (
+    Paciente, Servicio, Producto, TipoServicio, TipoProducto,
+    Descargo, LineaDescargo
+)
+from app.repositories.descargo_repository import DescargoRepository
+from app.schemas.descargo_schema import LineaDescargoCreate
+from app.services.prototypes.prototype_base import (
+    linea_transaccional_prototype_servicio,
+    linea_transaccional_prototype_producto,
+    linea_descargo_prototype
+)
+
+TAMANOS = (1, 10, 100, 1000)
+
+
+class DescargoRepositoryPorLinea(DescargoRepository):
+    """Camino anterior: un commit por fila y dos SELECT de catálogo por línea (referencia)."""
+
+    def crear_descargo_con_lineas(self, paciente_id, lineas):
+        try:
+            descargo = Descargo(paciente_id=paciente_id)
+            self.db.add(descargo)
+            self.db.commit()
+            self.db.refresh(descargo)
+
+            total = 0.0
+            lineas_response = []
+            for linea in lineas:
+                linea_trans = (
+                    linea_transaccional_prototype_servicio.clone() if linea.servicio_id
+                    else linea_transaccional_prototype_producto.clone()
+                )
+                precio = self._obtener_precio(linea.servicio_id, linea.producto_id)
+                subtotal = precio * linea.cantidad
+                total += subtotal
+
+                linea_trans.cantidad = linea.cantidad
+                linea_trans.servicio_id = linea.servicio_id
+                linea_trans.producto_id = linea.producto_id
+                linea_trans.descargo_id = descargo.id
+                self.db.add(linea_trans)
+                self.db.commit()
+
+                linea_descargo = linea_descargo_prototype.clone()
+                descripcion = self._generar_descripcion(linea.servicio_id, linea.producto_id)
+                linea_descargo.descripcion = descripcion
+                linea_descargo.subtotal_sin_iva = subtotal
+                linea_descargo.linea_transaccional_id = linea_trans.id
+                self.db.add(linea_descargo)
+                self.db.commit()
+
+                lineas_response.append({
+                    "id": linea_descargo.id,
+                    "descripcion": descripcion,
+                    "subtotal_sin_iva": subtotal,
+                    "cantidad": linea.cantidad,
+                    "servicio_id": linea.servicio_id,
+                    "producto_id": linea.producto_id
+                })
+
+            descargo.total = total
+            self.db.commit()
+            self.db.refresh(descargo)
+            setattr(descargo, 'lineas', lineas_response)
+            return descargo
+        except Exception as e:
+            self.db.rollback()
+            raise HTTPException(status_code=500, detail=f"Error al crear descargo: {str(e)}")
+
+    def _obtener_precio(self, servicio_id=None, producto_id=None):
+        if servicio_id:
+            return self.db.query(Servicio).filter(Servicio.id == servicio_id).first().calcular_precio()
+        return self.db.query(Producto).filter(Producto.id == producto_id).first().calcular_precio()
+
+    def _generar_descripcion(self, servicio_id=None, producto_id=None):
+        if servicio_id:
+            servicio = self.db.query(Servicio).filter(Servicio.id == servicio_id).first()
+            return f"Servicio: {servicio.get_descripcion()}"
+        producto = self.db.query(Producto).filter(Producto.id == producto_id).first()
+        return f"Producto: {producto.get_descripcion()}"
+
+
+class Contador:
+    """Cuenta sentencias enviadas al driver y commits de sesión."""
+
+    def __init__(self, engine, session_factory):
+        self.sentencias = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(session_factory, "after_commit", self._on_commit)
+
+    def _on_execute(self, *args):
+        self.sentencias += 1
+
+    def _on_commit(self, session):
+        self.commits += 1
+
+    def reiniciar(self):
+        self.sentencias = 0
+        self.commits = 0
+
+
+def crear_entorno(database_url: str):
+    if database_url.startswith("sqlite"):
+        engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+    else:
+        engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = session_factory()
+    servicios = [
+        Servicio(tipo=tipo, precio_base=10.0 + i, descripcion=f"Servicio {tipo.value}")
+        for i, tipo in enumerate(TipoServicio)
+    ]
+    productos = [
+        Producto(tipo=tipo, precio_base=5.0 + i, descripcion=f"Producto {tipo.value}")
+        for i, tipo in enumerate(TipoProducto)
+    ]
+    paciente = Paciente(nombre_completo="Paciente Benchmark", afeccion="N/A")
+    db.add_all(servicios + productos + [paciente])
+    db.commit()
+    catalogo = (
+        [("servicio", s.id) for s in servicios] + [("producto", p.id) for p in productos]
+    )
+    paciente_id = paciente.id
+    db.close()
+    return engine, session_factory, catalogo, paciente_id
+
+
+def construir_lineas(catalogo, n: int) -> list[LineaDescargoCreate]:
+    lineas = []
+    for i in range(n):
+        tipo, item_id = catalogo[i % len(catalogo)]
+        if tipo == "servicio":
+            lineas.append(LineaDescargoCreate(servicio_id=item_id, cantidad=1 + i % 3))
+        else:
+            lineas.append(LineaDescargoCreate(producto_id=item_id, cantidad=1 + i % 3))
+    return lineas
+
+
+def medir(repo_cls, session_factory, contador, paciente_id, lineas):
+    db = session_factory()
+    try:
+        contador.reiniciar()
+        inicio = time.perf_counter()
+        descargo = repo_cls(db).crear_descargo_con_lineas(paciente_id, lineas)
+        duracion = time.perf_counter() - inicio
+        assert len(descargo.lineas) == len(lineas)
+        return contador.sentencias, contador.commits, duracion
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS))
+    args = parser.parse_args(argv)
+
+    engine, session_factory, catalogo, paciente_id = crear_entorno(args.database_url)
+    contador = Contador(engine, session_factory)
+
+    print(f"{'líneas':>7} {'camino':>10} {'sentencias':>11} {'commits':>8} {'ms':>10}")
+    for n in args.tamanos:
+        lineas = construir_lineas(catalogo, n)
+        for nombre, repo_cls in (("por_linea", DescargoRepositoryPorLinea), ("lote", DescargoRepository)):
+            sentencias, commits, duracion = medir(repo_cls, session_factory, contador, paciente_id, lineas)
+            print(f"{n:>7} {nombre:>10} {sentencias:>11} {commits:>8} {duracion * 1000:>10.1f}")
+
+    db = session_factory()
+    assert db.query(LineaDescargo).count() == 2 * sum(args.tamanos)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
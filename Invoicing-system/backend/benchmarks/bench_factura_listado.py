@@ -0,0 +1,188 @@
+"""
+Benchmark del listado de facturas: detalle completo frente a la proyección resumen.
+
+Genera N facturas con M líneas cada una (por defecto 100k x 20) y compara
+FacturaService.listar_facturas_pagina (ORM con paciente, cliente y el grafo de
+líneas) con FacturaService.listar_resumen (select de columnas, sin hidratar
+modelos), incluyendo la serialización a JSON de cada página. Mide una página
+suelta y el recorrido completo con cursor, con tiempo y pico de memoria.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_factura_listado
+    python -m benchmarks.bench_factura_listado --facturas 10000 --lineas 20 --incluir-completo
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+
+from benchmarks.bench_descargo_write import crear_entorno
+from app.models import (
+    Cliente, Descargo, Factura, LineaDescargo, LineaDocumentoTransaccional, LineaFactura, Paciente
+)
+from app.schemas.factura import FacturaResumen
+from app.services.factura_service import FacturaService
+
+TAMANO_INSERCION = 20000
+serializador_resumen = TypeAdapter(list[FacturaResumen])
+
+
+def poblar(session_factory, n_facturas: int, n_lineas: int, servicio_id: int):
+    """Inserta los datos con executemany de Core por bloques, con ids explícitos."""
+    db = session_factory()
+    n_pacientes = max(1, n_facturas // 10)
+    db.execute(insert(Cliente.__table__), [{"id": i, "nombre": f"Cliente {i}"} for i in range(1, 101)])
+    db.execute(insert(Paciente.__table__), [
+        {"id": i, "nombre_completo": f"Paciente {i}", "afeccion": "N/A", "estado": "facturado",
+         "fecha_ingreso": datetime(2024, 1, 1)}
+        for i in range(2, n_pacientes + 2)
+    ])
+    inicio = datetime(2024, 1, 1)
+
+    def bloques(filas):
+        bloque = []
+        for fila in filas:
+            bloque.append(fila)
+            if len(bloque) >= TAMANO_INSERCION:
+                yield bloque
+                bloque = []
+        if bloque:
+            yield bloque
+
+    for bloque in bloques(
+        {"id": f, "paciente_id": 2 + f % n_pacientes, "total": 100.0 * n_lineas, "fecha": inicio}
+        for f in range(1, n_facturas + 1)
+    ):
+        db.execute(insert(Descargo.__table__), bloque)
+    for bloque in bloques(
+        {
+            "id": f, "numero_factura": f"FACT-{f:08d}", "fecha_emision": inicio + timedelta(minutes=f),
+            "subtotal": 100.0 * n_lineas, "impuesto": 16.0 * n_lineas, "total_general": 116.0 * n_lineas,
+            "estado_pago": "pendiente", "terminos_condiciones": "Pago a 30 días",
+            "paciente_id": 2 + f % n_pacientes, "cliente_id": 1 + f % 100
+        }
+        for f in range(1, n_facturas + 1)
+    ):
+        db.execute(insert(Factura.__table__), bloque)
+
+    ids_lineas = ((f, (f - 1) * n_lineas + l + 1) for f in range(1, n_facturas + 1) for l in range(n_lineas))
+    for bloque in bloques(ids_lineas):
+        db.execute(insert(LineaDocumentoTransaccional.__table__), [
+            {"id": i, "cantidad": 1, "descargo_id": f, "servicio_id": servicio_id} for f, i in bloque
+        ])
+        db.execute(insert(LineaDescargo.__table__), [
+            {"id": i, "descripcion": "Servicio: consulta", "subtotal_sin_iva": 100.0, "linea_transaccional_id": i}
+            for _, i in bloque
+        ])
+        db.execute(insert(LineaFactura.__table__), [
+            {"id": i, "iva": 0.16, "total_con_iva": 116.0, "linea_transaccional_id": i, "factura_id": f}
+            for f, i in bloque
+        ])
+    db.commit()
+    db.close()
+
+
+def serializar_detalle(pagina: dict) -> bytes:
+    return json.dumps(pagina["items"], default=str).encode()
+
+
+def serializar_resumen(pagina: dict) -> bytes:
+    # Igual que FastAPI con response_model: validar las filas y volcarlas a JSON
+    filas = serializador_resumen.validate_python(pagina["items"], from_attributes=True)
+    return serializador_resumen.dump_json(filas)
+
+
+def medir(funcion):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, duracion, pico
+
+
+def primera_pagina(db, listar, serializar, limite: int) -> tuple[int, int]:
+    pagina = listar(FacturaService(db), limite, None)
+    return len(pagina["items"]), len(serializar(pagina))
+
+
+def listado_completo(db) -> tuple[int, int]:
+    facturas = FacturaService(db).listar_facturas()
+    return len(facturas), len(json.dumps(facturas, default=str))
+
+
+def recorrer(session_factory, listar, serializar, limite: int) -> tuple[int, int]:
+    """Recorre todas las páginas con el cursor; devuelve (filas, bytes de JSON)."""
+    db = session_factory()
+    filas = octetos = 0
+    cursor = None
+    while True:
+        pagina = listar(FacturaService(db), limite, cursor)
+        filas += len(pagina["items"])
+        octetos += len(serializar(pagina))
+        cursor = pagina["next_cursor"]
+        db.expunge_all()
+        if cursor is None:
+            db.close()
+            return filas, octetos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--facturas", type=int, default=100_000)
+    parser.add_argument("--lineas", type=int, default=20)
+    parser.add_argument("--limites", type=int, nargs="+", default=[50, 500])
+    parser.add_argument(
+        "--incluir-completo", action="store_true",
+        help="mide también GET /facturas/?completo=true (carga todo en memoria)"
+    )
+    args = parser.parse_args(argv)
+
+    _, session_factory, catalogo, _ = crear_entorno(args.database_url)
+    servicio_id = next(item_id for tipo, item_id in catalogo if tipo == "servicio")
+    inicio = time.perf_counter()
+    poblar(session_factory, args.facturas, args.lineas, servicio_id)
+    print(f"Datos: {args.facturas} facturas x {args.lineas} líneas ({time.perf_counter() - inicio:.1f} s)\n")
+
+    variantes = {
+        "detalle": (lambda s, limite, cursor: s.listar_facturas_pagina(limite, cursor), serializar_detalle),
+        "resumen": (lambda s, limite, cursor: s.listar_resumen(limite, cursor), serializar_resumen),
+    }
+
+    print(f"{'variante':>9} {'escenario':>16} {'filas':>8} {'ms':>10} {'pico MiB':>9} {'JSON KiB':>10}")
+    for limite in args.limites:
+        for nombre, (listar, serializar) in variantes.items():
+            db = session_factory()
+            (filas, octetos), duracion, pico = medir(lambda: primera_pagina(db, listar, serializar, limite))
+            db.close()
+            print(
+                f"{nombre:>9} {f'página {limite}':>16} {filas:>8} {duracion * 1000:>10.1f} "
+                f"{pico / 2**20:>9.1f} {octetos / 1024:>10.0f}"
+            )
+
+    limite = max(args.limites)
+    for nombre, (listar, serializar) in variantes.items():
+        (filas, octetos), duracion, pico = medir(lambda: recorrer(session_factory, listar, serializar, limite))
+        print(
+            f"{nombre:>9} {f'recorrido x{limite}':>16} {filas:>8} {duracion * 1000:>10.1f} "
+            f"{pico / 2**20:>9.1f} {octetos / 1024:>10.0f}"
+        )
+
+    if args.incluir_completo:
+        db = session_factory()
+        (filas, octetos), duracion, pico = medir(lambda: listado_completo(db))
+        db.close()
+        print(
+            f"{'detalle':>9} {'completo=true':>16} {filas:>8} {duracion * 1000:>10.1f} "
+            f"{pico / 2**20:>9.1f} {octetos / 1024:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Benchmark de la generación de facturas: bucle en Python frente al motor en SQL.
+
+Para facturas de 10, 1k y 10k líneas compara el camino anterior (cargar los
+descargos con sus líneas, sumar en Python, create_factura con una LineaFactura
+por línea y el paso a facturado aparte) con FacturaService.generar_factura
+(agregado + INSERT ... SELECT + paso a facturado en una transacción), este
+último solo el motor ("sql") y con la respuesta que arma el endpoint
+("servicio"). Mide tiempo, sentencias SQL y pico de memoria.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_generar_factura
+    python -m benchmarks.bench_generar_factura --lineas 10 1000 10000 --por-descargo 20
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import event, insert, select, func
+
+from benchmarks.bench_descargo_write import crear_entorno
+from app.models import Cliente, Descargo, LineaDescargo, LineaDocumentoTransaccional, Paciente
+from app.repositories.descargo_repository import DescargoRepository
+from app.repositories.factura_repository import FacturaRepository
+from app.services.factura_service import FacturaService
+
+
+def poblar_paciente(session_factory, n_lineas: int, por_descargo: int, servicio_id: int) -> int:
+    """Paciente de alta con `n_lineas` líneas sin facturar repartidas en descargos."""
+    db = session_factory()
+    paciente = Paciente(nombre_completo=f"Paciente {n_lineas} líneas", afeccion="N/A", estado="alta")
+    db.add(paciente)
+    db.flush()
+    siguiente_descargo = (db.scalar(select(func.max(Descargo.id))) or 0) + 1
+    siguiente_linea = (db.scalar(select(func.max(LineaDocumentoTransaccional.id))) or 0) + 1
+
+    n_descargos = -(-n_lineas // por_descargo)
+    descargo_ids = range(siguiente_descargo, siguiente_descargo + n_descargos)
+    db.execute(insert(Descargo.__table__), [
+        {"id": d, "paciente_id": paciente.id, "total": 100.0 * por_descargo, "fecha": datetime(2024, 1, 1)}
+        for d in descargo_ids
+    ])
+    lineas = [(siguiente_linea + i, descargo_ids[i // por_descargo]) for i in range(n_lineas)]
+    db.execute(insert(LineaDocumentoTransaccional.__table__), [
+        {"id": i, "cantidad": 1, "descargo_id": d, "servicio_id": servicio_id} for i, d in lineas
+    ])
+    db.execute(insert(LineaDescargo.__table__), [
+        {"id": i, "descripcion": "Servicio: consulta", "subtotal_sin_iva": 100.0, "linea_transaccional_id": i}
+        for i, _ in lineas
+    ])
+    db.commit()
+    paciente_id = paciente.id
+    db.close()
+    return paciente_id
+
+
+def generar_en_python(db, paciente_id: int, cliente_id: int):
+    """El camino anterior de generar_factura, reproducido para comparar."""
+    paciente = db.get(Paciente, paciente_id)
+    descargos = DescargoRepository(db).obtener_descargos_por_paciente(paciente_id)
+    subtotal = impuesto = 0.0
+    lineas_factura = []
+    for descargo in descargos:
+        for linea in descargo.lineas_transaccionales:
+            if not (linea.linea_descargo and linea.cantidad and linea.cantidad > 0):
+                continue
+            subtotal_linea = linea.linea_descargo.subtotal_sin_iva or 0
+            iva = subtotal_linea * 0.16
+            subtotal += subtotal_linea
+            impuesto += iva
+            lineas_factura.append(
+                {"linea_transaccional_id": linea.id, "iva": iva, "total_con_iva": subtotal_linea + iva}
+            )
+    factura = FacturaRepository(db).create_factura({
+        "numero_factura": f"PY-{paciente_id:06d}", "fecha_emision": datetime.now(),
+        "subtotal": subtotal, "impuesto": impuesto, "total_general": subtotal + impuesto,
+        "paciente_id": paciente_id, "cliente_id": cliente_id, "estado_pago": "pendiente",
+    }, lineas_factura)
+    paciente.estado = "facturado"
+    db.commit()
+    return factura.total_general
+
+
+def generar_en_sql(db, paciente_id: int, cliente_id: int):
+    """Solo el motor: FacturaRepository.crear_factura_desde_descargos."""
+    factura = FacturaRepository(db).crear_factura_desde_descargos(db.get(Paciente, paciente_id), {
+        "numero_factura": f"SQL-{paciente_id:06d}", "fecha_emision": datetime.now(),
+        "paciente_id": paciente_id, "cliente_id": cliente_id, "estado_pago": "pendiente",
+    })
+    return factura.total_general
+
+
+def generar_servicio(db, paciente_id: int, cliente_id: int):
+    """El endpoint completo: motor más la respuesta con todas las líneas."""
+    return FacturaService(db).generar_factura(paciente_id, cliente_id)["factura"]["total_general"]
+
+
+def medir(engine, funcion):
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        resultado = funcion()
+    finally:
+        duracion = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        event.remove(engine, "before_cursor_execute", registrar)
+    return resultado, duracion, len(sentencias), pico
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--lineas", type=int, nargs="+", default=[10, 1_000, 10_000])
+    parser.add_argument("--por-descargo", type=int, default=10, help="líneas por descargo")
+    args = parser.parse_args(argv)
+
+    engine, session_factory, catalogo, _ = crear_entorno(args.database_url)
+    servicio_id = next(item_id for tipo, item_id in catalogo if tipo == "servicio")
+    db = session_factory()
+    cliente = Cliente(nombre="Aseguradora Benchmark")
+    db.add(cliente)
+    db.commit()
+    cliente_id = cliente.id
+    db.close()
+
+    variantes = {"python": generar_en_python, "sql": generar_en_sql, "servicio": generar_servicio}
+    # Calentamiento: compilación de sentencias y carga de módulos fuera de la medición
+    for generar in variantes.values():
+        db = session_factory()
+        generar(db, poblar_paciente(session_factory, 10, args.por_descargo, servicio_id), cliente_id)
+        db.close()
+
+    print(f"{'variante':>9} {'líneas':>8} {'ms':>10} {'sentencias':>11} {'pico MiB':>9} {'total':>12}")
+    for n_lineas in args.lineas:
+        for nombre, generar in variantes.items():
+            paciente_id = poblar_paciente(session_factory, n_lineas, args.por_descargo, servicio_id)
+            db = session_factory()
+            total, duracion, sentencias, pico = medir(engine, lambda: generar(db, paciente_id, cliente_id))
+            db.close()
+            print(
+                f"{nombre:>9} {n_lineas:>8} {duracion * 1000:>10.1f} {sentencias:>11} "
+                f"{pico / 2**20:>9.1f} {total:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
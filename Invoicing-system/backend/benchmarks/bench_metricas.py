@@ -0,0 +1,170 @@
+"""
+Benchmark del costo de MiddlewareMetricas sobre GET /pacientes/{paciente_id}.
+
+Arma dos aplicaciones con el mismo router de pacientes y la misma base SQLite: una
+sin métricas y otra con el middleware (y Server-Timing) y el engine instrumentado.
+Las llama directamente por ASGI, sin red, para que la diferencia no se pierda en el
+ruido del servidor HTTP, en rondas alternadas (cambiando cuál va primero). Reporta la mediana de µs por petición
+de cada una y el sobrecosto en % (mediana de los cocientes por ronda).
+
+Con ~1,5 ms por petición la diferencia entre rondas es del orden del sobrecosto, así
+que también se mide aparte el costo fijo: el middleware sobre una app ASGI vacía y
+el par de eventos del engine por sentencia, en µs.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_metricas
+    python -m benchmarks.bench_metricas --peticiones 5000 --rondas 15
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.endpoints import pacientes
+from app.core import metricas
+from app.core.database import Base, get_db
+from app.core.metricas import MiddlewareMetricas, RegistroMetricas
+from app.models import Paciente
+
+
+def crear_app(session_factory, con_metricas: bool) -> FastAPI:
+    app = FastAPI()
+    app.include_router(pacientes.router)
+    if con_metricas:
+        app.add_middleware(MiddlewareMetricas, server_timing=True, registro_metricas=RegistroMetricas())
+
+    def get_db_bench():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_db_bench
+    return app
+
+
+async def ronda(app, paciente_ids, peticiones: int) -> float:
+    """µs por petición de `peticiones` GET /pacientes/{id} en serie."""
+    async def recibir():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def enviar(mensaje):
+        pass
+
+    inicio = time.perf_counter()
+    for i in range(peticiones):
+        ruta = f"/pacientes/{paciente_ids[i % len(paciente_ids)]}"
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": ruta, "raw_path": ruta.encode(), "root_path": "",
+            "query_string": b"", "headers": [(b"host", b"bench")], "server": ("bench", 80),
+            "client": ("127.0.0.1", 1),
+        }
+        await app(scope, recibir, enviar)
+    return (time.perf_counter() - inicio) / peticiones * 1e6
+
+
+def costo_fijo(repeticiones: int = 100_000):
+    """µs del middleware sobre una app vacía y µs de los eventos del engine por sentencia."""
+    async def vacia(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def enviar(mensaje):
+        pass
+
+    async def medir(app):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            await app({"type": "http", "method": "GET"}, None, enviar)
+        return (time.perf_counter() - inicio) / repeticiones * 1e6
+
+    async def comparar():
+        envuelta = MiddlewareMetricas(vacia, server_timing=True, registro_metricas=RegistroMetricas())
+        return await medir(envuelta) - await medir(vacia)
+
+    middleware = asyncio.run(comparar())
+
+    class Cursor:
+        rowcount = 1
+
+    class Conexion:
+        info = {}
+
+    token = metricas._medicion.set(metricas.Medicion())
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        metricas._antes_de_ejecutar(Conexion, Cursor, None, None, None, False)
+        metricas._despues_de_ejecutar(Conexion, Cursor, None, None, None, False)
+    por_sentencia = (time.perf_counter() - inicio) / repeticiones * 1e6
+    metricas._medicion.reset(token)
+    return middleware, por_sentencia
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--peticiones", type=int, default=2000, help="peticiones por ronda")
+    parser.add_argument("--rondas", type=int, default=9)
+    parser.add_argument("--pacientes", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    ruta_db = f"sqlite:///{tempfile.mkdtemp()}/metricas.db"
+    engine_carga = create_engine(ruta_db)
+    Base.metadata.create_all(bind=engine_carga)
+    db = sessionmaker(bind=engine_carga)()
+    db.add_all(Paciente(nombre_completo=f"Paciente {i}", afeccion="N/A") for i in range(args.pacientes))
+    db.commit()
+    paciente_ids = [paciente.id for paciente in db.query(Paciente.id)]
+    db.close()
+    engine_carga.dispose()
+
+    # Dos engines nuevos sobre el mismo archivo (el que cargó los datos queda con la
+    # caché de SQLite caliente y sesgaría la comparación); solo uno se instrumenta
+    engine = create_engine(ruta_db, connect_args={"check_same_thread": False})
+    engine_instrumentado = metricas.instrumentar(create_engine(ruta_db, connect_args={"check_same_thread": False}))
+
+    apps = {
+        "sin métricas": crear_app(sessionmaker(bind=engine), False),
+        "con métricas": crear_app(sessionmaker(bind=engine_instrumentado), True),
+    }
+    tiempos = {nombre: [] for nombre in apps}
+
+    async def medir():
+        for app in apps.values():
+            await ronda(app, paciente_ids, 200)  # calentamiento
+        for i in range(args.rondas):
+            # Se alterna cuál va primero para no favorecer a ninguna por el orden
+            for nombre, app in (list(apps.items()) if i % 2 == 0 else list(apps.items())[::-1]):
+                tiempos[nombre].append(await ronda(app, paciente_ids, args.peticiones))
+
+    asyncio.run(medir())
+    medianas = {nombre: statistics.median(valores) for nombre, valores in tiempos.items()}
+    print(f"GET /pacientes/{{paciente_id}}, {args.rondas} rondas de {args.peticiones} peticiones\n")
+    print(f"{'modo':>14} {'µs/petición':>12}")
+    for nombre, mediana in medianas.items():
+        print(f"{nombre:>14} {mediana:>12.1f}")
+    # Mediana de los cocientes de cada ronda: compara mediciones hechas una junto a la otra
+    sobrecosto = (statistics.median(
+        con / sin for con, sin in zip(tiempos["con métricas"], tiempos["sin métricas"])
+    ) - 1) * 100
+    print(f"\nsobrecosto: {sobrecosto:+.2f} %")
+    middleware, por_sentencia = costo_fijo()
+    print(
+        f"costo fijo: {middleware:.1f} µs de middleware + {por_sentencia:.1f} µs por sentencia "
+        f"({(middleware + 2 * por_sentencia) / medianas['sin métricas'] * 100:.2f} % con 2 sentencias)"
+    )
+    engine.dispose()
+    engine_instrumentado.dispose()
+
+
+if __name__ == "__main__":
+    main()
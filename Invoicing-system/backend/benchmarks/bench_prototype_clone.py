@@ -0,0 +1,75 @@
+"""
+Microbenchmark del clonado de prototipos de línea.
+
+Compara el clone() basado en plantilla de atributos (PrototipoLinea) con el
+copy.deepcopy de una instancia ORM que se usaba antes: clones por segundo y
+bloques de memoria asignados por clon (tracemalloc).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_prototype_clone --clones 20000
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import app.models  # noqa: F401  configura los mappers
+from app.models import LineaFactura, LineaDocumentoTransaccional
+from app.services.prototypes.prototype_base import (
+    linea_factura_prototype,
+    linea_transaccional_prototype_servicio
+)
+
+
+def clonar_deepcopy(prototipo):
+    return lambda: copy.deepcopy(prototipo)
+
+
+def medir(nombre, clonar, n):
+    clones = [clonar() for _ in range(100)]  # calentamiento
+    del clones
+
+    inicio = time.perf_counter()
+    for _ in range(n):
+        clonar()
+    duracion = time.perf_counter() - inicio
+
+    muestras = min(n, 2000)
+    tracemalloc.start()
+    antes = tracemalloc.take_snapshot()
+    clones = [clonar() for _ in range(muestras)]
+    despues = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    bloques = sum(stat.count_diff for stat in despues.compare_to(antes, "filename"))
+    bytes_ = sum(stat.size_diff for stat in despues.compare_to(antes, "filename"))
+    del clones
+
+    print(f"{nombre:>32} {n / duracion:>12.0f} {bloques / muestras:>14.1f} {bytes_ / muestras:>12.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clones", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    print(f"{'prototipo':>32} {'clones/s':>12} {'bloques/clon':>14} {'bytes/clon':>12}")
+    casos = (
+        ("LineaFactura deepcopy", clonar_deepcopy(LineaFactura(iva=0.16, total_con_iva=0.0))),
+        ("LineaFactura plantilla", linea_factura_prototype.clone),
+        ("LineaDocTransaccional deepcopy", clonar_deepcopy(
+            LineaDocumentoTransaccional(cantidad=1, servicio_id=None, producto_id=None)
+        )),
+        ("LineaDocTransaccional plantilla", linea_transaccional_prototype_servicio.clone),
+    )
+    for nombre, clonar in casos:
+        medir(nombre, clonar, args.clones)
+
+
+if __name__ == "__main__":
+    main()
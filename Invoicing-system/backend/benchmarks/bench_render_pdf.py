@@ -0,0 +1,128 @@
+"""
+Benchmark del renderizado de PDFs: en el proceso frente al pool de procesos.
+
+1. PDFs/s renderizando N facturas de M líneas en un solo proceso (la plantilla ya
+   armada) y con el pool de PDF_PROCESOS procesos (--procesos) alimentado por tantos
+   hilos como procesos.
+2. Latencia p50/p99 de la API (GET /, en el threadpool de la app) mientras hilos del
+   mismo proceso renderizan sin parar, como lo hacen la cola de PDFs y las descargas
+   bajo demanda: sin carga, renderizando en el hilo y renderizando en el pool.
+
+El pool escala con los núcleos disponibles; con un solo núcleo lo que se gana es que
+el render deja de competir por el GIL del worker de la API.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_render_pdf
+    python -m benchmarks.bench_render_pdf --facturas 200 --lineas 300 --procesos 4
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.testclient import TestClient
+
+from app.services.pdf_service import PDFService
+
+
+def factura(n_lineas: int) -> dict:
+    return {
+        "factura": {
+            "numero_factura": "FACT-20240101-0001", "fecha_emision": datetime(2024, 1, 1),
+            "subtotal": 100.0 * n_lineas, "impuesto": 16.0 * n_lineas, "total_general": 116.0 * n_lineas,
+            "terminos_condiciones": "Pago a 30 días",
+        },
+        "cliente": {"nombre": "Aseguradora", "direccion": "Calle 1", "telefono": "555", "correo": "a@b.com"},
+        "hospital": {
+            "representante": "Dirección", "nombre": "Hospital", "direccion": "Av. 2",
+            "telefono": "556", "email": "h@b.com", "web": "hospital.com",
+        },
+        "lineas": [
+            {"descripcion": f"Consulta {i}", "precio_unitario": 100.0, "cantidad": 1, "total_con_iva": 116.0}
+            for i in range(n_lineas)
+        ],
+    }
+
+
+def pdfs_por_segundo(datos: dict, n_facturas: int, hilos: int) -> float:
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        list(pool.map(lambda _: PDFService.renderizar(datos), range(n_facturas)))
+    return n_facturas / (time.perf_counter() - inicio)
+
+
+def latencia_api(cliente: TestClient, peticiones: int, datos: dict = None, hilos: int = 0) -> dict:
+    """Latencia de GET / mientras `hilos` hilos renderizan `datos` en bucle."""
+    detener = threading.Event()
+
+    def renderizar_en_bucle():
+        while not detener.is_set():
+            PDFService.renderizar(datos)
+
+    fondo = [threading.Thread(target=renderizar_en_bucle) for _ in range(hilos)]
+    for hilo in fondo:
+        hilo.start()
+    time.sleep(0.2 if hilos else 0)
+    latencias = []
+    try:
+        for _ in range(peticiones):
+            inicio = time.perf_counter()
+            cliente.get("/")
+            latencias.append(time.perf_counter() - inicio)
+    finally:
+        detener.set()
+        for hilo in fondo:
+            hilo.join()
+    latencias.sort()
+    return {
+        "p50": latencias[len(latencias) // 2] * 1000,
+        "p99": latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))] * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--facturas", type=int, default=100)
+    parser.add_argument("--lineas", type=int, default=120, help="líneas por factura (120 son unas 4 páginas)")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--peticiones", type=int, default=500, help="peticiones a la API por escenario")
+    args = parser.parse_args(argv)
+
+    datos = factura(args.lineas)
+    PDFService.renderizar(datos)  # importa reportlab y arma la plantilla
+    print(f"{args.facturas} facturas de {args.lineas} líneas, {os.cpu_count()} núcleos\n")
+
+    print(f"{'backend':>18} {'PDFs/s':>8}")
+    print(f"{'un proceso':>18} {pdfs_por_segundo(datos, args.facturas, 1):>8.1f}")
+    PDFService.iniciar_procesos(args.procesos)
+    try:
+        pdfs_por_segundo(datos, args.procesos, args.procesos)  # arranque de los procesos
+        por_segundo = pdfs_por_segundo(datos, args.facturas, args.procesos)
+        print(f"{f'pool ({args.procesos} proc.)':>18} {por_segundo:>8.1f}")
+    finally:
+        PDFService.detener_procesos()
+
+    from main import app
+
+    # Sin lifespan: ni cola de PDFs ni pool arrancados por la app
+    cliente = TestClient(app)
+    hilos = max(2, args.procesos)
+    print(f"\n{'API (GET /)':>26} {'p50 ms':>8} {'p99 ms':>8}")
+    r = latencia_api(cliente, args.peticiones)
+    print(f"{'sin renderizar':>26} {r['p50']:>8.2f} {r['p99']:>8.2f}")
+    r = latencia_api(cliente, args.peticiones, datos, hilos)
+    print(f"{f'{hilos} hilos renderizando':>26} {r['p50']:>8.2f} {r['p99']:>8.2f}")
+    PDFService.iniciar_procesos(args.procesos)
+    try:
+        r = latencia_api(cliente, args.peticiones, datos, hilos)
+        print(f"{f'{hilos} hilos -> pool':>26} {r['p50']:>8.2f} {r['p99']:>8.2f}")
+    finally:
+        PDFService.detener_procesos()
+
+
+if __name__ == "__main__":
+    main()
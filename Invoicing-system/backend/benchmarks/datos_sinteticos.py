@@ -0,0 +1,254 @@
+"""
+Generador de un hospital sintético y reproducible para los benchmarks.
+
+Con la misma semilla produce siempre los mismos datos:
+  - catálogo de varios servicios por cada TipoServicio y productos por cada
+    TipoProducto, con precios log-normales,
+  - N pacientes repartidos entre internado, alta y facturado, con nombres
+    combinados de listas (para que la búsqueda tenga coincidencias parciales),
+  - de 1 a 4 descargos por paciente con una cantidad de líneas que sigue una
+    distribución de Zipf (muchos descargos cortos y algunos de cientos de líneas),
+  - clientes y facturas de los pacientes facturados, con fechas repartidas en los
+    últimos meses.
+
+Los descargos se insertan con DescargoRepository.crear_descargos_en_lote y las
+facturas con FacturaService.facturar, es decir, por los mismos caminos que usa la
+aplicación. Sirve con SQLite o con PostgreSQL (la URL decide).
+
+Uso (desde backend/):
+    python -m benchmarks.datos_sinteticos --database-url sqlite:///hospital.db --pacientes 5000
+"""
+import argparse
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import Cliente, Factura, Paciente, Producto, Servicio, TipoProducto, TipoServicio
+from app.repositories.descargo_repository import DescargoRepository
+from app.schemas.descargo_schema import LineaDescargoCreate
+from app.services.factura_service import FacturaService
+
+NOMBRES = (
+    "Ana", "Andrés", "Beatriz", "Carlos", "Daniela", "Eduardo", "Fernanda", "Gabriel", "Helena",
+    "Ignacio", "Julia", "Luis", "María", "Nicolás", "Olga", "Pablo", "Rosa", "Sofía", "Tomás", "Valeria",
+)
+APELLIDOS = (
+    "Rodríguez", "González", "Pérez", "Sánchez", "Ramírez", "Torres", "Flores", "Rivera", "Gómez",
+    "Díaz", "Morales", "Ortiz", "Castillo", "Jiménez", "Vargas", "Romero", "Herrera", "Medina",
+)
+AFECCIONES = ("Fractura", "Neumonía", "Apendicitis", "Control", "Deshidratación", "Cirugía menor")
+ESTADOS = {"internado": 0.3, "alta": 0.3, "facturado": 0.4}
+DESCARGOS_POR_PACIENTE = {1: 0.5, 2: 0.3, 3: 0.15, 4: 0.05}
+SERVICIOS_POR_TIPO = 8
+PRODUCTOS_POR_TIPO = 12
+CLIENTES = 20
+LOTE_PACIENTES = 250
+DIAS_DE_HISTORIA = 180
+
+
+@dataclass
+class Hospital:
+    """Ids generados, para que los benchmarks elijan sus objetivos sin consultar."""
+    pacientes: dict = field(default_factory=dict)  # estado → ids
+    servicios: list = field(default_factory=list)
+    productos: list = field(default_factory=list)
+    clientes: list = field(default_factory=list)
+    facturas: list = field(default_factory=list)
+    descargos: int = 0
+    lineas: int = 0
+
+    def resumen(self) -> dict:
+        return {
+            "pacientes": {estado: len(ids) for estado, ids in self.pacientes.items()},
+            "servicios": len(self.servicios),
+            "productos": len(self.productos),
+            "clientes": len(self.clientes),
+            "facturas": len(self.facturas),
+            "descargos": self.descargos,
+            "lineas": self.lineas,
+        }
+
+
+class Zipf:
+    """Muestras de 1..maximo con P(k) proporcional a 1 / k**s."""
+
+    def __init__(self, s: float, maximo: int):
+        self.valores = range(1, maximo + 1)
+        self.acumulados = list(accumulate(1 / k ** s for k in self.valores))
+
+    def muestra(self, rng: random.Random) -> int:
+        return rng.choices(self.valores, cum_weights=self.acumulados)[0]
+
+
+def crear_engine(database_url: str):
+    if database_url.startswith("sqlite"):
+        return create_engine(database_url, connect_args={"check_same_thread": False})
+    return create_engine(database_url)
+
+
+def generar(session_factory, pacientes: int = 1000, semilla: int = 42,
+            zipf_s: float = 1.3, lineas_maximas: int = 200) -> Hospital:
+    """Puebla una base vacía (con el esquema ya creado) y devuelve los ids generados."""
+    rng = random.Random(semilla)
+    hospital = Hospital()
+    db = session_factory()
+    try:
+        _catalogo(db, rng, hospital)
+        _pacientes(db, rng, hospital, pacientes)
+        _descargos(db, rng, hospital, Zipf(zipf_s, lineas_maximas))
+        _facturas(db, rng, hospital)
+    finally:
+        db.close()
+    return hospital
+
+
+def _catalogo(db, rng, hospital):
+    servicios = [
+        Servicio(tipo=tipo, precio_base=round(rng.lognormvariate(4, 0.8), 2), descripcion=f"{tipo.value} {i + 1}")
+        for tipo in TipoServicio for i in range(SERVICIOS_POR_TIPO)
+    ]
+    productos = [
+        Producto(tipo=tipo, precio_base=round(rng.lognormvariate(2.5, 1.0), 2), descripcion=f"{tipo.value} {i + 1}")
+        for tipo in TipoProducto for i in range(PRODUCTOS_POR_TIPO)
+    ]
+    clientes = [
+        Cliente(
+            nombre=f"Aseguradora {i + 1}", direccion=f"Avenida {i + 1}", telefono=f"555-{i:04d}",
+            correo=f"facturas{i + 1}@aseguradora.example"
+        )
+        for i in range(CLIENTES)
+    ]
+    db.add_all(servicios + productos + clientes)
+    db.commit()
+    hospital.servicios = [servicio.id for servicio in servicios]
+    hospital.productos = [producto.id for producto in productos]
+    hospital.clientes = [cliente.id for cliente in clientes]
+
+
+def _pacientes(db, rng, hospital, cantidad):
+    ahora = datetime.now()
+    estados = rng.choices(list(ESTADOS), weights=list(ESTADOS.values()), k=cantidad)
+    hospital.pacientes = {estado: [] for estado in ESTADOS}
+    for inicio in range(0, cantidad, LOTE_PACIENTES):
+        lote = [(estado, _paciente(rng, estado, ahora)) for estado in estados[inicio:inicio + LOTE_PACIENTES]]
+        db.add_all(paciente for _, paciente in lote)
+        db.commit()
+        for estado, paciente in lote:
+            hospital.pacientes[estado].append(paciente.id)
+
+
+def _paciente(rng, estado, ahora):
+    ingreso = ahora - timedelta(days=rng.uniform(0, DIAS_DE_HISTORIA))
+    return Paciente(
+        nombre_completo=f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}",
+        afeccion=rng.choice(AFECCIONES),
+        fecha_ingreso=ingreso,
+        # Los facturados se crean de alta y pasan a facturado al emitir su factura
+        estado="internado" if estado == "internado" else "alta",
+        fecha_alta=None if estado == "internado" else ingreso + timedelta(days=rng.uniform(1, 10)),
+    )
+
+
+def _descargos(db, rng, hospital, zipf):
+    repo = DescargoRepository(db)
+    todos = sorted(id_ for ids in hospital.pacientes.values() for id_ in ids)
+    cantidades = {
+        paciente_id: rng.choices(list(DESCARGOS_POR_PACIENTE), weights=list(DESCARGOS_POR_PACIENTE.values()))[0]
+        for paciente_id in todos
+    }
+    # Una ronda por descargo: crear_descargos_en_lote crea uno por paciente y llamada
+    for ronda in range(max(DESCARGOS_POR_PACIENTE)):
+        pendientes = [paciente_id for paciente_id in todos if cantidades[paciente_id] > ronda]
+        for inicio in range(0, len(pendientes), LOTE_PACIENTES):
+            grupos = {}
+            for paciente_id in pendientes[inicio:inicio + LOTE_PACIENTES]:
+                grupos[paciente_id] = lineas_resueltas(repo, rng, hospital, zipf.muestra(rng))
+                hospital.lineas += len(grupos[paciente_id])
+            repo.crear_descargos_en_lote(grupos)
+            hospital.descargos += len(grupos)
+
+
+def lineas_resueltas(repo: DescargoRepository, rng, hospital: Hospital, cantidad: int) -> list[tuple]:
+    """`cantidad` líneas al azar del catálogo, resueltas como las espera crear_descargos_en_lote."""
+    catalogo = [("servicio_id", i) for i in hospital.servicios] + [("producto_id", i) for i in hospital.productos]
+    lineas = []
+    for _ in range(cantidad):
+        campo, item_id = rng.choice(catalogo)
+        lineas.append(LineaDescargoCreate(**{campo: item_id, "cantidad": rng.randint(1, 5)}))
+    servicios, productos = repo.cargar_catalogo(lineas)
+    return [
+        (linea, descripcion, precio * linea.cantidad)
+        for linea in lineas
+        for precio, descripcion in [repo.resolver_item(linea, servicios, productos)]
+    ]
+
+
+def pacientes_nuevos(session_factory, hospital: Hospital, rng, cantidad: int = 1,
+                     estado: str = "internado", lineas: int = 10) -> list[int]:
+    """
+    Agrega al hospital ya generado `cantidad` pacientes internados o de alta, cada uno
+    con un descargo de `lineas` líneas (ninguno con 0). Son los datos frescos de los
+    benchmarks que consumen lo que tocan: dar de alta, facturar, eliminar. No se
+    anotan en `hospital`, que sigue describiendo los datos de `generar`.
+    """
+    db = session_factory()
+    try:
+        pacientes = [_paciente(rng, estado, datetime.now()) for _ in range(cantidad)]
+        db.add_all(pacientes)
+        db.commit()
+        ids = [paciente.id for paciente in pacientes]
+        if lineas:
+            repo = DescargoRepository(db)
+            repo.crear_descargos_en_lote({
+                paciente_id: lineas_resueltas(repo, rng, hospital, lineas) for paciente_id in ids
+            })
+    finally:
+        db.close()
+    return ids
+
+
+def _facturas(db, rng, hospital):
+    ahora = datetime.now()
+    service = FacturaService(db)
+    fechas = {}
+    for paciente_id in hospital.pacientes["facturado"]:
+        factura = service.facturar(paciente_id, rng.choice(hospital.clientes))
+        factura_id = factura.id
+        hospital.facturas.append(factura_id)
+        fechas[factura_id] = ahora - timedelta(days=rng.uniform(0, DIAS_DE_HISTORIA))
+    # Fechas de emisión repartidas en la historia (facturar usa la fecha actual)
+    if fechas:
+        db.execute(
+            update(Factura),
+            [{"id": factura_id, "fecha_emision": fecha} for factura_id, fecha in fechas.items()]
+        )
+        db.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--pacientes", type=int, default=1000)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    engine = crear_engine(args.database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    inicio = time.perf_counter()
+    hospital = generar(sessionmaker(autocommit=False, autoflush=False, bind=engine), args.pacientes, args.semilla)
+    print(f"{hospital.resumen()} en {time.perf_counter() - inicio:.1f} s")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
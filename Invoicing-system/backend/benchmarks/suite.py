@@ -0,0 +1,640 @@
+"""
+Suite de benchmarks reproducible: todos los endpoints y los métodos de repositorio
+sobre el hospital sintético de benchmarks.datos_sinteticos.
+
+Genera los datos con una semilla fija y mide cada escenario: tiempo por llamada
+(p50, p95, media, mínimo), sentencias SQL por llamada y respuestas con error. Las
+rutas de la API y los métodos públicos de los repositorios sin escenario se listan
+en "sin_escenario", para que lo que no se mide quede a la vista.
+
+Los resultados se escriben en JSON y se comparan con una línea base guardada
+(benchmarks/linea_base.json). Se marca regresión cuando un escenario ejecuta más
+sentencias que en la línea base (determinista) o cuando su p50 crece más que
+--tolerancia y más que --umbral-ms (el tiempo depende de la máquina: la línea base
+solo es comparable con resultados de la misma máquina, base de datos y datos).
+
+Uso (desde backend/):
+    python -m benchmarks.suite
+    python -m benchmarks.suite --salida resultados.json --comparar benchmarks/linea_base.json
+    python -m benchmarks.suite --database-url postgresql://localhost/bench --pacientes 10000
+    python -m benchmarks.suite --filtro facturas --repeticiones 50
+    python -m benchmarks.suite --guardar-linea-base
+"""
+import argparse
+import inspect
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import sqlalchemy
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.core import database
+from app.core.almacen_pdf import AlmacenPDF
+from app.core.config import settings
+from app.core.consultas import PresupuestoConsultas
+from app.core.database import Base
+from app.models import Descargo, LineaDocumentoTransaccional, Paciente
+from app.repositories.cliente_repository import ClienteRepository
+from app.repositories.descargo_repository import DescargoRepository
+from app.repositories.factura_repository import FacturaRepository
+from app.repositories.paciente_repository import PacienteRepository
+from app.repositories.producto_repository import ProductoRepository
+from app.repositories.resumen_paciente_repository import ResumenPacienteRepository
+from app.repositories.servicio_repository import ServicioRepository
+from app.schemas.descargo_schema import LineaDescargoCreate
+from app.services import cola_pdf_service
+from app.services.lote_facturacion_service import LoteFacturacionService
+from benchmarks.datos_sinteticos import generar, lineas_resueltas, pacientes_nuevos
+
+LINEA_BASE = Path(__file__).resolve().parent / "linea_base.json"
+VERSION_FORMATO = 1
+CALENTAMIENTO = 2
+
+
+# Orden de medición: primero lo que lee o edita el hospital generado; después lo que
+# crea datos frescos en cada repetición (así las lecturas no ven esas filas de más);
+# al final los lotes, que facturan a todo paciente facturable de la base
+FASE_HOSPITAL, FASE_DATOS_FRESCOS, FASE_LOTES = range(3)
+
+
+@dataclass
+class Escenario:
+    nombre: str
+    # ejecutar(i) hace la llamada i-ésima; devuelve True si respondió con error
+    ejecutar: callable
+    repeticiones: int = None
+    # preparar(i) crea fuera de la medición los datos de la llamada i-ésima; ejecutar
+    # recibe lo que devuelve en lugar de i
+    preparar: callable = None
+    fase: int = FASE_HOSPITAL
+
+
+class Objetivos:
+    """
+    Ids del hospital que usan los escenarios. Los que consumen sus datos (dar de alta,
+    facturar, eliminar) no los toman del hospital: piden pacientes nuevos en cada
+    repetición, para que ninguna llamada encuentre los datos de otra ya cambiados.
+    """
+
+    def __init__(self, hospital, session_factory, semilla: int):
+        self.hospital = hospital
+        self.session_factory = session_factory
+        self.rng = random.Random(semilla)
+        self.internados = hospital.pacientes["internado"]
+        self.pacientes = sorted(id_ for ids in hospital.pacientes.values() for id_ in ids)
+        self.lotes = []
+
+    def ciclico(self, ids, i):
+        return ids[i % len(ids)]
+
+    def nuevos(self, cantidad=1, estado="internado", lineas=10):
+        return pacientes_nuevos(self.session_factory, self.hospital, self.rng, cantidad, estado, lineas)
+
+    def nuevo(self, estado="internado", lineas=10):
+        return self.nuevos(1, estado, lineas)[0]
+
+
+def fresco(preparar, ejecutar) -> Escenario:
+    """Escenario que consume datos: cada llamada recibe los que preparar(i) creó para ella."""
+    return Escenario("", ejecutar, preparar=preparar, fase=FASE_DATOS_FRESCOS)
+
+
+def _ruta_clave(metodo: str, ruta: str) -> str:
+    return f"{metodo} {ruta}"
+
+
+def escenarios_http(cliente: TestClient, objetivos: Objetivos) -> dict:
+    """Escenarios explícitos por ruta: los que necesitan parámetros, cuerpo o cuidado."""
+    h = objetivos.hospital
+    hoy = datetime.now().date()
+
+    def get(ruta, **params):
+        return cliente.get(ruta, params=params).status_code >= 400
+
+    def post(ruta, cuerpo=None):
+        return cliente.post(ruta, json=cuerpo).status_code >= 400
+
+    def carga_masiva(i, pacientes=5, filas=20):
+        # NDJSON de `filas` líneas por paciente nuevo, como el archivo nocturno de farmacia
+        ids = objetivos.nuevos(pacientes, lineas=0)
+        return "".join(
+            json.dumps({"paciente_id": paciente_id, **linea}) + "\n"
+            for paciente_id in ids for linea in lineas(i, filas)
+        ).encode()
+
+    def bulk(cuerpo):
+        respuesta = cliente.post("/descargos/bulk", content=cuerpo, headers={"content-type": "application/x-ndjson"})
+        return respuesta.status_code >= 400 or respuesta.json()["filas_rechazadas"] > 0
+
+    def crear_lote(i):
+        objetivos.nuevos(3, "alta")
+        return objetivos.ciclico(h.clientes, i)
+
+    def post_lote(cliente_id):
+        respuesta = cliente.post("/facturas/lotes", json={"cliente_id": cliente_id})
+        if respuesta.status_code < 400:
+            objetivos.lotes.append(respuesta.json()["id"])
+        return respuesta.status_code >= 400
+
+    def lote_pendiente(i):
+        # Creado sin ejecutar, como el de un proceso que murió antes de empezar
+        objetivos.nuevos(3, "alta")
+        db = objetivos.session_factory()
+        try:
+            return LoteFacturacionService(db).crear_lote(objetivos.ciclico(h.clientes, i))["id"]
+        finally:
+            db.close()
+
+    def lineas(i, cantidad=10):
+        catalogo = [{"servicio_id": s} for s in h.servicios] + [{"producto_id": p} for p in h.productos]
+        return [dict(catalogo[(i + j) % len(catalogo)], cantidad=1 + j % 3) for j in range(cantidad)]
+
+    return {
+        "GET /pacientes/buscar_paciente/": Escenario(
+            "", lambda i: get("/pacientes/buscar_paciente/", search=("Rodr", "gonzalez", "María Pé")[i % 3])
+        ),
+        "GET /pacientes/listar_pacientes/": Escenario(
+            "", lambda i: get("/pacientes/listar_pacientes/", estado=("internado", "alta", "facturado")[i % 3])
+        ),
+        "GET /pacientes/resumen/": Escenario("", lambda i: get("/pacientes/resumen/", con_descargos="true")),
+        "POST /pacientes/crear_paciente/": Escenario(
+            "", lambda i: post("/pacientes/crear_paciente/", {"nombre_completo": f"Nuevo {i}", "afeccion": "Control"})
+        ),
+        "PUT /pacientes/{paciente_id}": Escenario(
+            "", lambda i: cliente.put(
+                f"/pacientes/{objetivos.ciclico(objetivos.internados, i)}",
+                json={"nombre_completo": f"Paciente editado {i}", "afeccion": "Control"}
+            ).status_code >= 400
+        ),
+        "DELETE /pacientes/{paciente_id}": fresco(
+            lambda i: objetivos.nuevo(),
+            lambda paciente_id: cliente.delete(f"/pacientes/{paciente_id}").status_code >= 400
+        ),
+        "PATCH /pacientes/daralta_paciente/{paciente_id}/alta": fresco(
+            lambda i: objetivos.nuevo(),
+            lambda paciente_id: cliente.patch(f"/pacientes/daralta_paciente/{paciente_id}/alta").status_code >= 400
+        ),
+        # El endpoint da de alta antes de agregar el descargo, y el estado de alta lo
+        # rechaza: responde con error en todas las llamadas, y así queda registrado
+        "POST /pacientes/{paciente_id}/agregar_descargo/": fresco(
+            lambda i: objetivos.nuevo(lineas=0),
+            lambda paciente_id: post(f"/pacientes/{paciente_id}/agregar_descargo/", {"total": 10.0})
+        ),
+        "POST /pacientes/{paciente_id}/facturar/": fresco(
+            lambda i: (objetivos.nuevo("alta"), objetivos.ciclico(h.clientes, i)),
+            lambda datos: post(f"/pacientes/{datos[0]}/facturar/", {
+                "numero_factura": f"LEGADO-{datos[0]}", "cliente_id": datos[1]
+            })
+        ),
+        "POST /descargos/": Escenario(
+            "", lambda i: post("/descargos/", {
+                "paciente_id": objetivos.ciclico(objetivos.internados, i), "lineas": lineas(i)
+            })
+        ),
+        "POST /descargos/bulk": fresco(carga_masiva, bulk),
+        "GET /descargos/buscar/": Escenario("", lambda i: get(
+            "/descargos/buscar/", desde=str(hoy - timedelta(days=30)), hasta=str(hoy + timedelta(days=1)),
+            search=("Consulta", "medicamentos", "insumos")[i % 3]
+        )),
+        "GET /servicios/tipo/{tipo}": Escenario("", lambda i: get("/servicios/tipo/atencion_medica")),
+        "GET /productos/tipo/{tipo}": Escenario("", lambda i: get("/productos/tipo/medicamentos")),
+        # Cada alta o cambio del catálogo invalida su caché: el GET siguiente la recarga
+        "POST /servicios/": Escenario("", lambda i: post("/servicios/", {
+            "tipo": "examen_laboratorio", "precio_base": 35.0, "descripcion": f"Perfil {i}"
+        })),
+        "PUT /servicios/{servicio_id}": Escenario(
+            "", lambda i: cliente.put(f"/servicios/{objetivos.ciclico(h.servicios, i)}", json={
+                "tipo": "atencion_medica", "precio_base": 50.0, "descripcion": f"Consulta {i}"
+            }).status_code >= 400
+        ),
+        "POST /productos/": Escenario("", lambda i: post("/productos/", {
+            "tipo": "insumos_medicos", "precio_base": 4.5, "descripcion": f"Insumo {i}"
+        })),
+        "PUT /productos/{producto_id}": Escenario(
+            "", lambda i: cliente.put(f"/productos/{objetivos.ciclico(h.productos, i)}", json={
+                "tipo": "medicamentos", "precio_base": 12.0, "descripcion": f"Medicamento {i}"
+            }).status_code >= 400
+        ),
+        "POST /clientes/": Escenario("", lambda i: post("/clientes/", {
+            "nombre": f"Cliente {i}", "direccion": "Calle 1", "telefono": "555", "correo": f"c{i}@example.com"
+        })),
+        "PUT /clientes/{cliente_id}": Escenario(
+            "", lambda i: cliente.put(
+                f"/clientes/{objetivos.ciclico(h.clientes, i)}", json={"telefono": f"555-{i}"}
+            ).status_code >= 400
+        ),
+        "POST /facturas/generar/{paciente_id}/{cliente_id}": fresco(
+            lambda i: (objetivos.nuevo("alta"), objetivos.ciclico(h.clientes, i)),
+            lambda datos: post(f"/facturas/generar/{datos[0]}/{datos[1]}")
+        ),
+        # La ejecución del lote (tarea en segundo plano) corre dentro de la llamada con
+        # TestClient. El primer calentamiento factura además a las altas del hospital
+        "POST /facturas/lotes": Escenario("", post_lote, preparar=crear_lote, fase=FASE_LOTES),
+        # Lee los lotes del escenario anterior (sin ellos, con --filtro, el 404 cuenta como error)
+        "GET /facturas/lotes/{lote_id}": Escenario(
+            "", lambda i: get(f"/facturas/lotes/{objetivos.ciclico(objetivos.lotes or [0], i)}"), fase=FASE_LOTES
+        ),
+        "POST /facturas/lotes/{lote_id}/reanudar": Escenario(
+            "", lambda lote_id: post(f"/facturas/lotes/{lote_id}/reanudar"), preparar=lote_pendiente, fase=FASE_LOTES
+        ),
+        "GET /facturas/resumen": Escenario(
+            "", lambda i: get("/facturas/resumen", cliente_id=objetivos.ciclico(h.clientes, i))
+        ),
+        "GET /facturas/export.zip": Escenario(
+            "", lambda i: get(
+                "/facturas/export.zip", desde=str(hoy - timedelta(days=30)), hasta=str(hoy),
+                cliente_id=objetivos.ciclico(h.clientes, i)
+            ),
+            repeticiones=3
+        ),
+    }
+
+
+def parametros_ruta(objetivos: Objetivos) -> dict:
+    """Valor de cada parámetro de ruta conocido para la llamada i-ésima de un GET genérico."""
+    h = objetivos.hospital
+    return {
+        "paciente_id": lambda i: objetivos.ciclico(objetivos.pacientes, i),
+        "cliente_id": lambda i: objetivos.ciclico(h.clientes, i),
+        "factura_id": lambda i: objetivos.ciclico(h.facturas, i),
+        "servicio_id": lambda i: objetivos.ciclico(h.servicios, i),
+        "producto_id": lambda i: objetivos.ciclico(h.productos, i),
+    }
+
+
+def armar_escenarios_http(app, cliente: TestClient, objetivos: Objetivos):
+    explicitos = escenarios_http(cliente, objetivos)
+    parametros = parametros_ruta(objetivos)
+    escenarios, sin_escenario = [], []
+    for ruta in app.routes:
+        if not isinstance(ruta, APIRoute):
+            continue
+        for metodo in sorted(ruta.methods):
+            clave = _ruta_clave(metodo, ruta.path)
+            if clave in explicitos:
+                escenario = explicitos[clave]
+                escenario.nombre = clave
+                escenarios.append(escenario)
+                continue
+            nombres = [parametro.name for parametro in ruta.dependant.path_params]
+            if metodo == "GET" and all(nombre in parametros for nombre in nombres):
+                escenarios.append(Escenario(clave, _get_generico(cliente, ruta.path, nombres, parametros)))
+            else:
+                sin_escenario.append(clave)
+    # Rutas duplicadas (mismo método y path en dos endpoints) se miden una vez
+    unicos = {escenario.nombre: escenario for escenario in escenarios}
+    return list(unicos.values()), sorted(set(sin_escenario) - set(unicos))
+
+
+def _get_generico(cliente, ruta, nombres, parametros):
+    def ejecutar(i):
+        return cliente.get(ruta.format(**{nombre: parametros[nombre](i) for nombre in nombres})).status_code >= 400
+    return ejecutar
+
+
+def escenarios_repositorios(session_factory, objetivos: Objetivos) -> dict:
+    """Escenarios por método de repositorio; cada llamada usa una sesión nueva, como una petición."""
+    h = objetivos.hospital
+    ciclico = objetivos.ciclico
+
+    def con_sesion(funcion):
+        def ejecutar(i):
+            db = session_factory()
+            try:
+                resultado = funcion(db, i)
+                if inspect.isgenerator(resultado):
+                    for _ in resultado:
+                        pass
+            finally:
+                db.close()
+            return False
+        return ejecutar
+
+    def lineas(i, cantidad=10):
+        catalogo = [("servicio_id", s) for s in h.servicios] + [("producto_id", p) for p in h.productos]
+        elegidos = (catalogo[(i + j) % len(catalogo)] for j in range(cantidad))
+        return [LineaDescargoCreate(**{campo: item_id, "cantidad": 1 + j % 3}) for j, (campo, item_id) in enumerate(elegidos)]
+
+    def grupos(i, pacientes=5, cantidad=20):
+        ids = objetivos.nuevos(pacientes, lineas=0)
+        db = session_factory()
+        try:
+            repo = DescargoRepository(db)
+            return {paciente_id: lineas_resueltas(repo, objetivos.rng, h, cantidad) for paciente_id in ids}
+        finally:
+            db.close()
+
+    def catalogo_cargado(i):
+        db = session_factory()
+        try:
+            return lineas(i), *DescargoRepository(db).cargar_catalogo(lineas(i))
+        finally:
+            db.close()
+
+    def lineas_pendientes(i):
+        paciente_id = objetivos.nuevo("alta")
+        db = session_factory()
+        try:
+            ids = db.scalars(
+                select(LineaDocumentoTransaccional.id)
+                .join(LineaDocumentoTransaccional.descargo)
+                .where(Descargo.paciente_id == paciente_id)
+            ).all()
+        finally:
+            db.close()
+        return paciente_id, ciclico(h.clientes, i), ids
+
+    def factura_data(paciente_id, cliente_id):
+        return {"numero_factura": f"REPO-{paciente_id}", "paciente_id": paciente_id, "cliente_id": cliente_id}
+
+    def desde_descargos(db, datos):
+        paciente_id, cliente_id = datos
+        return FacturaRepository(db).crear_factura_desde_descargos(
+            db.get(Paciente, paciente_id), factura_data(paciente_id, cliente_id))
+
+    def alta_y_cliente(i):
+        return objetivos.nuevo("alta"), ciclico(h.clientes, i)
+
+    frescos = {
+        "PacienteRepository.set_alta": (
+            lambda i: objetivos.nuevo(), lambda db, paciente_id: PacienteRepository(db).set_alta(paciente_id)),
+        "PacienteRepository.agregar_descargo": (
+            lambda i: objetivos.nuevo(lineas=0),
+            lambda db, paciente_id: PacienteRepository(db).agregar_descargo(paciente_id, {"total": 10.0})),
+        "PacienteRepository.facturar": (alta_y_cliente, lambda db, datos: PacienteRepository(db).facturar(
+            datos[0], {"numero_factura": f"LEGADO-{datos[0]}", "cliente_id": datos[1]})),
+        "PacienteRepository.eliminar_paciente": (
+            lambda i: objetivos.nuevo(), lambda db, paciente_id: PacienteRepository(db).eliminar_paciente(paciente_id)),
+        "DescargoRepository.crear_descargos_en_lote": (
+            grupos, lambda db, grupos_: DescargoRepository(db).crear_descargos_en_lote(grupos_)),
+        "FacturaRepository.crear_factura_desde_descargos": (alta_y_cliente, desde_descargos),
+        "FacturaRepository.create_factura": (lineas_pendientes, lambda db, datos: FacturaRepository(db).create_factura(
+            factura_data(datos[0], datos[1]),
+            [{"linea_transaccional_id": linea_id, "total_con_iva": 11.6} for linea_id in datos[2]])),
+    }
+
+    hace_un_mes = datetime.now() - timedelta(days=30)
+    tabla = {
+        "PacienteRepository.obtener_por_id": lambda db, i: PacienteRepository(db).obtener_por_id(
+            ciclico(objetivos.pacientes, i)),
+        "PacienteRepository.obtener_por_ids": lambda db, i: PacienteRepository(db).obtener_por_ids(
+            objetivos.pacientes[i:i + 50]),
+        "PacienteRepository.obtener_todos_pacientes": lambda db, i: PacienteRepository(db).obtener_todos_pacientes(),
+        "PacienteRepository.obtener_pacientes_internados":
+            lambda db, i: PacienteRepository(db).obtener_pacientes_internados(),
+        "PacienteRepository.listar_pacientes": lambda db, i: PacienteRepository(db).listar_pacientes(50),
+        "PacienteRepository.buscar_pacientes": lambda db, i: PacienteRepository(db).buscar_pacientes(
+            ("Rodr", "gonzalez", "María Pé")[i % 3]),
+        "PacienteRepository.obtener_descargos_paciente": lambda db, i: PacienteRepository(db).obtener_descargos_paciente(
+            ciclico(objetivos.pacientes, i)),
+        "PacienteRepository.obtener_pacientes_internados_con_descargos":
+            lambda db, i: PacienteRepository(db).obtener_pacientes_internados_con_descargos(),
+        "PacienteRepository.obtener_pacientes_alta_con_descargos_no_facturados":
+            lambda db, i: PacienteRepository(db).obtener_pacientes_alta_con_descargos_no_facturados(),
+        "PacienteRepository.crear_paciente": lambda db, i: PacienteRepository(db).crear_paciente(
+            {"nombre_completo": f"Repositorio {i}", "afeccion": "Control"}),
+        "PacienteRepository.actualizar_paciente": lambda db, i: PacienteRepository(db).actualizar_paciente(
+            ciclico(objetivos.internados, i), {"alergias": f"Ninguna {i}"}),
+        "DescargoRepository.obtener_descargos_por_paciente":
+            lambda db, i: DescargoRepository(db).obtener_descargos_por_paciente(ciclico(objetivos.pacientes, i)),
+        "DescargoRepository.buscar_descargos": lambda db, i: DescargoRepository(db).buscar_descargos(
+            hace_un_mes, datetime.now(), ("Consulta", "medicamentos", "insumos")[i % 3]),
+        "DescargoRepository.cargar_catalogo": lambda db, i: DescargoRepository(db).cargar_catalogo(lineas(i)),
+        "DescargoRepository.resolver_item": lambda db, datos: [
+            DescargoRepository(db).resolver_item(linea, datos[1], datos[2]) for linea in datos[0]],
+        "DescargoRepository.crear_descargo_con_lineas": lambda db, i: DescargoRepository(db).crear_descargo_con_lineas(
+            ciclico(objetivos.internados, i), lineas(i)),
+        "FacturaRepository.obtener_factura": lambda db, i: FacturaRepository(db).obtener_factura(
+            ciclico(h.facturas, i)),
+        "FacturaRepository.firma_factura": lambda db, i: FacturaRepository(db).firma_factura(ciclico(h.facturas, i)),
+        "FacturaRepository.listar_facturas": lambda db, i: FacturaRepository(db).listar_facturas(),
+        "FacturaRepository.listar_facturas_pagina": lambda db, i: FacturaRepository(db).listar_facturas_pagina(50),
+        "FacturaRepository.listar_resumen": lambda db, i: FacturaRepository(db).listar_resumen(
+            50, cliente_id=ciclico(h.clientes, i)),
+        "FacturaRepository.hay_facturas": lambda db, i: FacturaRepository(db).hay_facturas(desde=hace_un_mes),
+        "FacturaRepository.facturas_para_exportar":
+            lambda db, i: FacturaRepository(db).facturas_para_exportar(desde=hace_un_mes),
+        "ClienteRepository.get": lambda db, i: ClienteRepository(db).get(ciclico(h.clientes, i)),
+        "ClienteRepository.list": lambda db, i: ClienteRepository(db).list(),
+        "ClienteRepository.list_page": lambda db, i: ClienteRepository(db).list_page(50),
+        "ServicioRepository.obtener_por_id": lambda db, i: ServicioRepository(db).obtener_por_id(
+            ciclico(h.servicios, i)),
+        "ServicioRepository.listar_servicios": lambda db, i: ServicioRepository(db).listar_servicios(),
+        "ServicioRepository.listar_servicios_pagina": lambda db, i: ServicioRepository(db).listar_servicios_pagina(20),
+        "ProductoRepository.obtener_por_id": lambda db, i: ProductoRepository(db).obtener_por_id(
+            ciclico(h.productos, i)),
+        "ProductoRepository.listar_productos": lambda db, i: ProductoRepository(db).listar_productos(),
+        "ProductoRepository.listar_productos_pagina": lambda db, i: ProductoRepository(db).listar_productos_pagina(20),
+        "ResumenPacienteRepository.listar": lambda db, i: ResumenPacienteRepository(db).listar(con_descargos=True),
+        "ResumenPacienteRepository.actualizar": lambda db, i: (
+            ResumenPacienteRepository(db).actualizar(objetivos.pacientes[i:i + 50]), db.commit()),
+    }
+    escenarios = {nombre: Escenario(nombre, con_sesion(funcion)) for nombre, funcion in tabla.items()}
+    # Sin consultas: el catálogo de las líneas se carga en preparar
+    escenarios["DescargoRepository.resolver_item"].preparar = catalogo_cargado
+    for nombre, (preparar, funcion) in frescos.items():
+        escenarios[nombre] = fresco(preparar, con_sesion(funcion))
+        escenarios[nombre].nombre = nombre
+    escenarios["ResumenPacienteRepository.reconstruir"] = Escenario(
+        "ResumenPacienteRepository.reconstruir",
+        con_sesion(lambda db, i: (ResumenPacienteRepository(db).reconstruir(), db.commit())),
+        repeticiones=3
+    )
+    return escenarios
+
+
+REPOSITORIOS = (
+    PacienteRepository, DescargoRepository, FacturaRepository, ClienteRepository,
+    ServicioRepository, ProductoRepository, ResumenPacienteRepository,
+)
+
+
+def metodos_sin_escenario(escenarios: dict) -> list:
+    return sorted(
+        f"{clase.__name__}.{nombre}"
+        for clase in REPOSITORIOS
+        for nombre, _ in inspect.getmembers(clase, inspect.isfunction)
+        if not nombre.startswith("_") and f"{clase.__name__}.{nombre}" not in escenarios
+    )
+
+
+def medir(escenario: Escenario, engine, repeticiones: int) -> dict:
+    repeticiones = escenario.repeticiones or repeticiones
+    preparar = escenario.preparar or (lambda i: i)
+    errores = 0
+    for i in range(CALENTAMIENTO):
+        escenario.ejecutar(preparar(-1 - i))
+    tiempos, sentencias = [], []
+    for i in range(repeticiones):
+        datos = preparar(i)
+        with PresupuestoConsultas(permitir_duplicadas=True, engine=engine) as registro:
+            inicio = time.perf_counter()
+            errores += bool(escenario.ejecutar(datos))
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        sentencias.append(registro.total)
+    tiempos.sort()
+    return {
+        "repeticiones": repeticiones,
+        "p50_ms": round(statistics.median(tiempos), 3),
+        "p95_ms": round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 3),
+        "media_ms": round(statistics.fmean(tiempos), 3),
+        "min_ms": round(tiempos[0], 3),
+        "sentencias": statistics.median_low(sentencias),
+        "errores": errores,
+    }
+
+
+def entorno(engine, args) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=Path(__file__).parent
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "base_de_datos": engine.dialect.name,
+        "pacientes": args.pacientes,
+        "semilla": args.semilla,
+        "filtro": args.filtro,
+    }
+
+
+def comparar(resultados: dict, base: dict, tolerancia: float, umbral_ms: float) -> list:
+    """Imprime la comparación con la línea base y devuelve los escenarios con regresión."""
+    claves = ("base_de_datos", "pacientes", "semilla", "plataforma", "cpus")
+    distintos = [c for c in claves if resultados["entorno"].get(c) != base["entorno"].get(c)]
+    if distintos:
+        print(f"Aviso: la línea base es de otro entorno ({', '.join(distintos)}); los tiempos no son comparables.")
+
+    regresiones, mejoras = [], []
+    actuales, anteriores = resultados["resultados"], base["resultados"]
+    for nombre, actual in sorted(actuales.items()):
+        anterior = anteriores.get(nombre)
+        if anterior is None:
+            continue
+        motivos = []
+        if actual["sentencias"] > anterior["sentencias"]:
+            motivos.append(f"sentencias {anterior['sentencias']} -> {actual['sentencias']}")
+        cambio = actual["p50_ms"] / anterior["p50_ms"] - 1 if anterior["p50_ms"] else 0.0
+        diferencia = actual["p50_ms"] - anterior["p50_ms"]
+        if cambio > tolerancia and diferencia > umbral_ms:
+            motivos.append(f"p50 {anterior['p50_ms']:.2f} -> {actual['p50_ms']:.2f} ms ({cambio:+.0%})")
+        if actual["errores"] > anterior["errores"]:
+            motivos.append(f"errores {anterior['errores']} -> {actual['errores']}")
+        if motivos:
+            regresiones.append((nombre, motivos))
+        elif cambio < -tolerancia and -diferencia > umbral_ms or actual["sentencias"] < anterior["sentencias"]:
+            mejoras.append((nombre, f"p50 {anterior['p50_ms']:.2f} -> {actual['p50_ms']:.2f} ms, "
+                                    f"sentencias {anterior['sentencias']} -> {actual['sentencias']}"))
+
+    nuevos = sorted(set(actuales) - set(anteriores))
+    # Con --filtro los escenarios que quedaron afuera no faltan: no se corrieron
+    faltantes = [] if resultados["entorno"].get("filtro") else sorted(set(anteriores) - set(actuales))
+    print(f"\nComparación con la línea base del {base['entorno'].get('fecha')} ({base['entorno'].get('commit')}):")
+    for nombre, motivos in regresiones:
+        print(f"  REGRESIÓN {nombre}: {'; '.join(motivos)}")
+    for nombre, detalle in mejoras:
+        print(f"  mejora    {nombre}: {detalle}")
+    for nombre in nuevos:
+        print(f"  nuevo     {nombre}")
+    for nombre in faltantes:
+        print(f"  faltante  {nombre}")
+    if not (regresiones or mejoras or nuevos or faltantes):
+        print("  sin cambios fuera de la tolerancia")
+    return regresiones
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", help="por defecto, SQLite en un directorio temporal")
+    parser.add_argument("--pacientes", type=int, default=1000)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--filtro", help="solo escenarios cuyo nombre contiene este texto")
+    parser.add_argument("--salida", type=Path, help="archivo JSON de resultados")
+    parser.add_argument("--comparar", type=Path, help="línea base JSON contra la que comparar")
+    parser.add_argument("--guardar-linea-base", action="store_true", help=f"escribe {LINEA_BASE.name}")
+    parser.add_argument("--tolerancia", type=float, default=0.5, help="aumento relativo del p50 tolerado")
+    parser.add_argument("--umbral-ms", type=float, default=1.0, help="aumento absoluto del p50 tolerado")
+    args = parser.parse_args(argv)
+
+    directorio = Path(tempfile.mkdtemp(prefix="bench_suite_"))
+    # La aplicación crea su engine en el primer uso: apuntarla a la base del benchmark
+    # mide la configuración real (pool, instrumentación) sin reemplazar get_db
+    settings.DATABASE_URL = args.database_url or f"sqlite:///{directorio / 'hospital.db'}"
+    engine = database.get_engine()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session_factory = database.get_sessionmaker()
+    cola_pdf_service._almacen = AlmacenPDF(directorio / "pdfs")
+
+    inicio = time.perf_counter()
+    hospital = generar(session_factory, args.pacientes, args.semilla)
+    print(f"Datos: {hospital.resumen()} ({time.perf_counter() - inicio:.1f} s)\n")
+    objetivos = Objetivos(hospital, session_factory, args.semilla)
+
+    from main import app
+
+    # Una excepción del endpoint cuenta como error (500) del escenario, no corta la suite
+    cliente = TestClient(app, raise_server_exceptions=False)
+    http, rutas_sin_escenario = armar_escenarios_http(app, cliente, objetivos)
+    repositorios = escenarios_repositorios(session_factory, objetivos)
+    # sorted es estable: dentro de cada fase se conserva el orden de las rutas
+    escenarios = sorted(http + list(repositorios.values()), key=lambda escenario: escenario.fase)
+    if args.filtro:
+        escenarios = [escenario for escenario in escenarios if args.filtro in escenario.nombre]
+
+    resultados = {}
+    print(f"{'escenario':<72} {'p50 ms':>9} {'p95 ms':>9} {'SQL':>5} {'err':>4}")
+    try:
+        for escenario in escenarios:
+            r = resultados[escenario.nombre] = medir(escenario, engine, args.repeticiones)
+            print(f"{escenario.nombre:<72} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+                  f"{r['sentencias']:>5} {r['errores']:>4}")
+    finally:
+        engine.dispose()
+
+    documento = {
+        "version": VERSION_FORMATO,
+        "entorno": entorno(engine, args),
+        "datos": hospital.resumen(),
+        "resultados": resultados,
+        "sin_escenario": rutas_sin_escenario + metodos_sin_escenario(repositorios),
+    }
+    print(f"\nSin escenario: {', '.join(documento['sin_escenario'])}")
+    salidas = [args.salida] if args.salida else []
+    if args.guardar_linea_base:
+        salidas.append(LINEA_BASE)
+    for salida in salidas:
+        salida.write_text(json.dumps(documento, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Resultados en {salida}")
+
+    if args.comparar:
+        base = json.loads(args.comparar.read_text(encoding="utf-8"))
+        if comparar(documento, base, args.tolerancia, args.umbral_ms):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,6 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.endpoints import (
     pacientes,
@@ -6,10 +8,48 @@ from app.api.v1.endpoints import (
     servicios,
     productos,
     clientes,
-    facturas
+    facturas,
+    health,
+    metricas,
+    pacientes_async,
+    descargos_async,
+    clientes_async,
+    facturas_async
 )
+from app.core.config import settings
+from app.core.consultas import MiddlewareNMas1
+from app.core.database import verificar_conexion
+from app.core.metricas import MiddlewareMetricas
+from app.services.cola_pdf_service import detener_cola, iniciar_cola
+from app.services.correo_service import detener_enviador, iniciar_enviador
+from app.services.pdf_service import PDFService
 
-app = FastAPI(debug=True)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # La conexión se verifica al arrancar y no al importar app.core.database; si la
+    # base no responde el worker arranca igual y /health/db informa el error.
+    try:
+        await run_in_threadpool(verificar_conexion)
+        print("Conexión exitosa con la base de datos.")
+    except Exception as e:
+        print(f"Error al conectar a la base de datos: {e}")
+    # Procesos de renderizado (PDF_PROCESOS) y workers que renderizan los PDFs de
+    # facturas emitidas (PDF_WORKERS)
+    try:
+        await run_in_threadpool(PDFService.iniciar_procesos, settings.PDF_PROCESOS)
+        await run_in_threadpool(iniciar_cola)
+    except Exception as e:
+        print(f"No se pudo iniciar la cola de PDFs: {e}")
+    # Envío de la bandeja de salida de correos (con ENABLE_EMAIL). Sin aiosmtplib o con
+    # la configuración SMTP inválida el worker no arranca: seguir aceptando facturas
+    # cuyos correos nunca podrán salir solo esconde el problema
+    await iniciar_enviador()
+    yield
+    await detener_enviador()
+    await run_in_threadpool(detener_cola)
+    await run_in_threadpool(PDFService.detener_procesos)
+
+app = FastAPI(debug=True, lifespan=lifespan)
 
 # Configuración de CORS
 app.add_middleware(
@@ -20,12 +60,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latencia, SQL y tamaño de respuesta por ruta (GET /metrics); se agrega al final para
+# que envuelva también a CORS y mida la petición completa
+app.add_middleware(MiddlewareMetricas, server_timing=settings.METRICAS_SERVER_TIMING)
+if settings.DETECTAR_N_MAS_1:
+    app.add_middleware(MiddlewareNMas1)
+
+# Routers migrados a AsyncSession, seleccionables con ASYNC_ROUTERS. Se montan antes
+# que los síncronos para que sus rutas tengan prioridad; el resto sigue siendo síncrono.
+ROUTERS_ASYNC = {
+    "pacientes": pacientes_async.router,
+    "descargos": descargos_async.router,
+    "clientes": clientes_async.router,
+    "facturas": facturas_async.router,
+}
+
+for nombre in settings.routers_async:
+    if nombre not in ROUTERS_ASYNC:
+        raise ValueError(f"Router async desconocido en ASYNC_ROUTERS: {nombre}")
+    app.include_router(ROUTERS_ASYNC[nombre])
+
 app.include_router(pacientes.router)
 app.include_router(descargos.router)
 app.include_router(servicios.router)
 app.include_router(productos.router)
 app.include_router(clientes.router)
 app.include_router(facturas.router)
+app.include_router(health.router)
+app.include_router(metricas.router)
 
 @app.get("/")
 def read_root():
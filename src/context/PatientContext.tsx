@@ -4,7 +4,7 @@ import {
   searchPatients as apiSearchPatients, 
   dischargePatient as apiDischargePatient,
   createPatient as apiCreatePatient,
-  fetchInternedPatientsWithDischarges,
+  fetchPatientSummaries,
   getPatientDischarges,
   fetchServices,
   fetchProducts,
@@ -15,9 +15,8 @@ import {
   fetchInvoice,
   downloadInvoicePDF,
   createInvoice,
-  fetchDischargedPatientsWithUnbilledDischarges,
   Patient,
-  PatientWithDischarges,
+  PatientSummary,
   Discharge,
   Service,
   Product,
@@ -32,7 +31,7 @@ interface PatientContextType {
   products: Product[];
   clients: Client[];
   invoices: Invoice[];
-  patientsWithDischarges: PatientWithDischarges[];
+  patientsWithDischarges: PatientSummary[];
   loadPatients: () => Promise<void>;
   searchPatients: (query: string) => Promise<Patient[]>;
   dischargePatient: (id: number) => Promise<void>;
@@ -48,7 +47,7 @@ interface PatientContextType {
   fetchInvoice: (invoiceId: number) => Promise<Invoice>;
   downloadInvoicePDF: (invoiceId: number) => Promise<Blob>;
   createInvoice: (pacienteId: number, clienteId: number) => Promise<Invoice>;
-  dischargedPatientsWithUnbilledDischarges: PatientWithDischarges[];
+  dischargedPatientsWithUnbilledDischarges: PatientSummary[];
   loadDischargedPatientsWithUnbilledDischarges: () => Promise<void>;
 
 }
@@ -69,12 +68,12 @@ export const PatientProvider: React.FC<{ children: ReactNode }> = ({ children })
   const [products, setProducts] = useState<Product[]>([]);
   const [clients, setClients] = useState<Client[]>([]);
   const [invoices, setInvoices] = useState<Invoice[]>([]);
-  const [patientsWithDischarges, setPatientsWithDischarges] = useState<PatientWithDischarges[]>([]);
-  const [dischargedPatientsWithUnbilledDischarges, setDischargedPatientsWithUnbilledDischarges] = useState<PatientWithDischarges[]>([]);
+  const [patientsWithDischarges, setPatientsWithDischarges] = useState<PatientSummary[]>([]);
+  const [dischargedPatientsWithUnbilledDischarges, setDischargedPatientsWithUnbilledDischarges] = useState<PatientSummary[]>([]);
   
   const loadDischargedPatientsWithUnbilledDischarges = async () => {
     try {
-      const data = await fetchDischargedPatientsWithUnbilledDischarges();
+      const data = await fetchPatientSummaries({ estado: 'alta', no_facturados: true });
       setDischargedPatientsWithUnbilledDischarges(data);
     } catch (error) {
       console.error('Error loading discharged patients with unbilled discharges:', error);
@@ -92,7 +91,8 @@ export const PatientProvider: React.FC<{ children: ReactNode }> = ({ children })
 
   const loadPatientsWithDischarges = async () => {
     try {
-      const data = await fetchInternedPatientsWithDischarges();
+      // Summary rows only; the descargo detail is loaded per patient when expanded
+      const data = await fetchPatientSummaries({ estado: 'internado', con_descargos: true });
       setPatientsWithDischarges(data);
     } catch (error) {
       console.error('Error loading patients with discharges:', error);
@@ -2,12 +2,13 @@ import React, { useEffect, useState } from 'react';
 import { usePatients } from '../context/PatientContext';
 import Layout from '../components/layout/Layout';
 import Card from '../components/ui/Card';
-import { PatientWithDischarges } from '../services/api';
+import { Discharge, getPatientDischarges } from '../services/api';
 import { ChevronDownIcon, ChevronUpIcon } from '@heroicons/react/24/outline';
 
 const Discharges: React.FC = () => {
   const { patientsWithDischarges, loadPatientsWithDischarges } = usePatients();
   const [expandedPatient, setExpandedPatient] = useState<number | null>(null);
+  const [dischargesByPatient, setDischargesByPatient] = useState<Record<number, Discharge[]>>({});
 
   useEffect(() => {
     loadInternedPatients();
@@ -21,14 +22,17 @@ const Discharges: React.FC = () => {
     }
   };
 
-  const togglePatient = (patientId: number) => {
-    setExpandedPatient(expandedPatient === patientId ? null : patientId);
-  };
-
-  const calculateTotals = (patient: PatientWithDischarges) => {
-    const totalDischarges = patient.descargos?.length || 0;
-    const totalAmount = patient.descargos?.reduce((sum, discharge) => sum + discharge.total, 0) || 0;
-    return { totalDischarges, totalAmount };
+  const togglePatient = async (patientId: number) => {
+    const expanding = expandedPatient !== patientId;
+    setExpandedPatient(expanding ? patientId : null);
+    if (expanding && !dischargesByPatient[patientId]) {
+      try {
+        const discharges = await getPatientDischarges(patientId);
+        setDischargesByPatient(prev => ({ ...prev, [patientId]: discharges }));
+      } catch (error) {
+        console.error('Error loading patient discharges:', error);
+      }
+    }
   };
 
   return (
@@ -41,7 +45,8 @@ const Discharges: React.FC = () => {
         {patientsWithDischarges.length > 0 ? (
           <ul className="divide-y divide-gray-200">
             {patientsWithDischarges.map((patient) => {
-              const { totalDischarges, totalAmount } = calculateTotals(patient);
+              const totalDischarges = patient.cantidad_descargos;
+              const totalAmount = patient.total_descargos;
               const isExpanded = expandedPatient === patient.id;
 
               return (
@@ -75,7 +80,7 @@ const Discharges: React.FC = () => {
                   {isExpanded && (
                     <div className="mt-2 pl-6 transition-all duration-300 ease-in-out">
                       <ul className="space-y-2">
-                        {patient.descargos?.map((discharge) => (
+                        {dischargesByPatient[patient.id]?.map((discharge) => (
                           <li
                             key={discharge.id}
                             className="text-sm text-gray-600 bg-gray-50 p-3 rounded-md"
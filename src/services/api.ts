@@ -41,6 +41,26 @@ export interface PatientWithDischarges extends Patient {
   descargos?: Discharge[];
 }
 
+// Row of the server-side patient summary projection (counts and totals only)
+export interface PatientSummary {
+  id: number;
+  nombre_completo: string;
+  estado: string;
+  fecha_ingreso?: string;
+  fecha_alta?: string;
+  cantidad_descargos: number;
+  total_descargos: number;
+  ultimo_descargo_en?: string;
+  descargos_no_facturados: number;
+  total_no_facturado: number;
+}
+
+export interface PatientSummaryFilters {
+  estado?: string;
+  con_descargos?: boolean;
+  no_facturados?: boolean;
+}
+
 export interface Service {
   id: number;
   tipo: string;
@@ -115,8 +135,10 @@ export interface Invoice {
   };
 }
 
+// List endpoints are cursor-paginated; `completo: true` keeps the old full-list
+// shape until the views are migrated to `next_cursor`.
 export const fetchPatients = async (): Promise<Patient[]> => {
-  const response = await api.get('/pacientes/listar_pacientes/');
+  const response = await api.get('/pacientes/listar_pacientes/', { params: { completo: true } });
   return response.data;
 };
 
@@ -147,18 +169,23 @@ export const fetchDischargedPatientsWithDischarges = async (): Promise<PatientWi
   return response.data;
 };
 
+export const fetchPatientSummaries = async (filters: PatientSummaryFilters): Promise<PatientSummary[]> => {
+  const response = await api.get('/pacientes/resumen/', { params: filters });
+  return response.data;
+};
+
 export const getPatientDischarges = async (patientId: number): Promise<Discharge[]> => {
   const response = await api.get(`/descargos/paciente/${patientId}`);
   return response.data;
 };
 
 export const fetchServices = async (): Promise<Service[]> => {
-  const response = await api.get('/servicios/');
+  const response = await api.get('/servicios/', { params: { completo: true } });
   return response.data;
 };
 
 export const fetchProducts = async (): Promise<Product[]> => {
-  const response = await api.get('/productos/');
+  const response = await api.get('/productos/', { params: { completo: true } });
   return response.data;
 };
 
@@ -168,7 +195,7 @@ export const createDischarge = async (dischargeData: DescargoCreate): Promise<Di
 };
 
 export const fetchClients = async (): Promise<Client[]> => {
-  const response = await api.get('/clientes/');
+  const response = await api.get('/clientes/', { params: { completo: true } });
   return response.data;
 };
 
@@ -178,7 +205,7 @@ export const createClient = async (clientData: Omit<Client, 'id'>): Promise<Clie
 };
 
 export const fetchInvoices = async (): Promise<Invoice[]> => {
-  const response = await api.get('/facturas/');
+  const response = await api.get('/facturas/', { params: { completo: true } });
   return response.data;
 };
 